@@ -11,80 +11,127 @@ import asyncio
 from datetime import datetime, timedelta
 from pathlib import Path
 import time
-from typing import Optional, Dict, List
+import bisect
+from typing import Optional, Dict, List, Set, Tuple
 import secrets
 
 logger = logging.getLogger(__name__)
 
+def _report_timestamp(report: Dict) -> float:
+    """Timestamp numérico del reporte (se calcula una vez al indexar)"""
+    try:
+        return float(report.get('timestamp', 0))
+    except (ValueError, TypeError):
+        try:
+            return datetime.fromisoformat(report.get('created_at', '')).timestamp()
+        except (ValueError, TypeError):
+            return 0.0
+
+class ScamReportIndex:
+    """Índices secundarios de reportes: por usuario, servidor, estado y orden temporal"""
+
+    def __init__(self):
+        self.timestamps: Dict[str, float] = {}                    # report_id -> timestamp numérico
+        self.by_user: Dict[str, Dict[str, None]] = {}             # reported_user_id -> report_ids (orden de alta)
+        self.by_server: Dict[str, List[Tuple[float, str]]] = {}   # server_id -> [(timestamp, report_id)] ordenado
+        self.by_status: Dict[str, List[Tuple[float, str]]] = {}   # estado -> [(timestamp, report_id)] ordenado
+        self.user_status_counts: Dict[str, Dict[str, int]] = {}   # reported_user_id -> {estado: n}
+        self.users_by_status: Dict[str, Set[str]] = {}            # estado -> usuarios con algún reporte en ese estado
+        self.reporter_pairs: Set[Tuple[str, str]] = set()         # (reporter_id, reported_user_id)
+
+    def rebuild(self, reports: Dict[str, Dict]):
+        self.__init__()
+        for report_id, report in reports.items():
+            self.add(report_id, report)
+
+    def add(self, report_id: str, report: Dict):
+        timestamp = _report_timestamp(report)
+        user_id = report.get('reported_user_id')
+        self.timestamps[report_id] = timestamp
+        self.by_user.setdefault(user_id, {})[report_id] = None
+        bisect.insort(self.by_server.setdefault(report.get('server_id'), []), (timestamp, report_id))
+        self.reporter_pairs.add((report.get('reporter_id'), user_id))
+        self._add_status(report_id, user_id, report.get('status', 'pending'))
+
+    def remove(self, report_id: str, report: Dict):
+        timestamp = self.timestamps.pop(report_id, None)
+        if timestamp is None:
+            return
+        user_id = report.get('reported_user_id')
+        user_reports = self.by_user.get(user_id, {})
+        user_reports.pop(report_id, None)
+        if not user_reports:
+            self.by_user.pop(user_id, None)
+        self._discard(self.by_server, report.get('server_id'), (timestamp, report_id))
+        self.reporter_pairs.discard((report.get('reporter_id'), user_id))
+        self._remove_status(report_id, user_id, report.get('status', 'pending'), timestamp)
+
+    def change_status(self, report_id: str, report: Dict, old_status: str):
+        """Mover el reporte entre índices de estado (O(log n) + desplazamiento de la lista)"""
+        timestamp = self.timestamps.get(report_id)
+        if timestamp is None:
+            return
+        user_id = report.get('reported_user_id')
+        self._remove_status(report_id, user_id, old_status, timestamp)
+        self._add_status(report_id, user_id, report.get('status', 'pending'))
+
+    def _add_status(self, report_id: str, user_id: str, status: str):
+        bisect.insort(self.by_status.setdefault(status, []), (self.timestamps[report_id], report_id))
+        counts = self.user_status_counts.setdefault(user_id, {})
+        counts[status] = counts.get(status, 0) + 1
+        self.users_by_status.setdefault(status, set()).add(user_id)
+
+    def _remove_status(self, report_id: str, user_id: str, status: str, timestamp: float):
+        self._discard(self.by_status, status, (timestamp, report_id))
+        counts = self.user_status_counts.get(user_id, {})
+        counts[status] = counts.get(status, 0) - 1
+        if counts[status] <= 0:
+            counts.pop(status, None)
+            self.users_by_status.get(status, set()).discard(user_id)
+        if not counts:
+            self.user_status_counts.pop(user_id, None)
+
+    @staticmethod
+    def _discard(index: Dict, key, entry: Tuple[float, str]):
+        entries = index.get(key)
+        if not entries:
+            return
+        position = bisect.bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+        if not entries:
+            del index[key]
+
 class AntiScamSystem:
     def __init__(self):
         self.reports_file = "scam_reports.json"
         self.blob_folder = "scam_reports/"
         self.blob_filename = "scam_reports_blob.json"
         self.reports = {}
+        self.index = ScamReportIndex()
+        self.last_sync = 0.0
+        self.sync_interval = 60  # segundos mínimos entre recargas completas desde Blob
         self._initialized = False
 
-    async def load_data(self):
-        """Cargar datos de reportes de scam desde Blob Storage"""
-        try:
-            from blob_storage_manager import blob_manager
+        from blob_delta_store import BlobDeltaStore
+        self.store = BlobDeltaStore(self.blob_folder, compact_every=50)
 
-            # Obtener mapeo una sola vez para consistencia
-            file_map = await blob_manager.list_files_with_urls()
-            scam_files = [f for f in file_map.keys() if f.startswith(self.blob_folder)]
-
-            self.reports = {}
+    async def load_data(self):
+        """Cargar reportes desde Blob Storage y reconstruir los índices"""
+        await self._load_reports()
+        self.index.rebuild(self.reports)
+        self.last_sync = time.time()
 
-            # Cargar todos los archivos de reportes (sistema permanente)
-            if scam_files:
-                successful_loads = 0
-
-                for filename in scam_files:
-                    try:
-                        blob_data = await blob_manager.download_json(filename, file_map)
-                        if blob_data and isinstance(blob_data, dict):
-                            # Combinar reportes de múltiples archivos
-                            file_reports = blob_data.get('reports', {})
-
-                            # Manejar tanto formato de lista como diccionario
-                            if isinstance(file_reports, list):
-                                # Convertir lista a diccionario usando timestamp como ID
-                                new_reports = 0
-                                for report_data in file_reports:
-                                    if isinstance(report_data, dict):
-                                        # Generar ID único si no existe
-                                        report_id = report_data.get('report_id')
-                                        if not report_id:
-                                            import time
-                                            report_id = f"report_{int(time.time() * 1000000)}"
-                                            report_data['report_id'] = report_id
-
-                                        if report_id not in self.reports:
-                                            self.reports[report_id] = report_data
-                                            new_reports += 1
-                                logger.info(f"📁 Cargados {new_reports} reportes nuevos desde: {filename}")
-                                successful_loads += 1
-                            elif isinstance(file_reports, dict):
-                                # Formato diccionario (esperado)
-                                new_reports = 0
-                                for report_id, report_data in file_reports.items():
-                                    if report_id not in self.reports:
-                                        self.reports[report_id] = report_data
-                                        new_reports += 1
-                                logger.info(f"📁 Cargados {new_reports} reportes nuevos desde: {filename}")
-                                successful_loads += 1
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error cargando archivo {filename}: {e}")
-                        continue
-
-                logger.info(f"✅ Cargados {len(self.reports)} reportes únicos desde {successful_loads}/{len(scam_files)} archivos")
+    async def _load_reports(self):
+        """Cargar datos de reportes de scam desde Blob Storage (manifiesto + deltas)"""
+        try:
+            records = await self.store.load()
+            if records is not None:
+                self.reports = records
                 return
 
-            # Si no hay archivos en la carpeta, intentar cargar archivo específico
-            blob_data = await blob_manager.download_json(self.blob_filename)
-            if blob_data:
-                self.reports = blob_data.get('reports', {})
-                logger.info(f"✅ Cargados {len(self.reports)} reportes de scam desde archivo específico")
+            # Formato antiguo: instantáneas completas scam_reports_*.json; se fusionan una vez y se compactan
+            if await self._load_legacy_snapshots():
                 return
 
             # Si no hay datos en Blob, intentar migrar desde archivo local
@@ -94,7 +141,7 @@ class AntiScamSystem:
                     self.reports = data.get('reports', {})
                     logger.info(f"⚠️ Migrando {len(self.reports)} reportes desde archivo local")
                     # Migrar a Blob Storage
-                    await self.save_data()
+                    await self.store.compact(self.reports)
             else:
                 logger.info("⚠️ No se encontraron reportes, inicializando vacío")
                 self.reports = {}
@@ -103,88 +150,74 @@ class AntiScamSystem:
             logger.error(f"❌ Error cargando reportes de scam: {e}")
             self.reports = {}
 
-    async def save_data(self):
-        """Guardar datos de reportes de scam en Blob Storage"""
-        try:
-            from blob_storage_manager import blob_manager
-
-            data = {
-                'reports': self.reports,
-                'last_updated': datetime.now().isoformat(),
-                'total_reports': len(self.reports),
-                'stats': self.get_stats()
-            }
+    async def _load_legacy_snapshots(self) -> bool:
+        """Fusionar las instantáneas antiguas (descarga en paralelo), compactarlas y borrarlas"""
+        from blob_storage_manager import blob_manager
 
-            # Crear nombre de archivo con timestamp para organización
-            timestamp = int(datetime.now().timestamp())
-            blob_filename = f"{self.blob_folder}scam_reports_{timestamp}.json"
+        file_map = await blob_manager.list_files_with_urls()
+        legacy_files = [
+            f for f in file_map
+            if f.startswith(f"{self.blob_folder}scam_reports_") or f == self.blob_filename
+        ]
+        if not legacy_files:
+            return False
 
-            # Guardar en Blob Storage con carpeta organizada
-            url = await blob_manager.upload_json(blob_filename, data)
+        snapshots = await asyncio.gather(*(blob_manager.download_json(f, file_map) for f in legacy_files))
 
-            if url:
-                logger.info(f"💾 Guardados {len(self.reports)} reportes de scam en: {blob_filename}")
+        self.reports = {}
+        loaded_files = []
+        for filename, blob_data in zip(legacy_files, snapshots):
+            if not isinstance(blob_data, dict):
+                continue
+            file_reports = blob_data.get('reports', {})
+
+            # Manejar tanto formato de lista como diccionario
+            if isinstance(file_reports, list):
+                file_reports = {
+                    report.setdefault('report_id', f"report_{int(time.time() * 1000000)}_{secrets.token_hex(2)}"): report
+                    for report in file_reports if isinstance(report, dict)
+                }
+            if isinstance(file_reports, dict):
+                for report_id, report_data in file_reports.items():
+                    self.reports.setdefault(report_id, report_data)
+                loaded_files.append(filename)
+
+        logger.info(f"✅ Cargados {len(self.reports)} reportes únicos desde {len(loaded_files)}/{len(legacy_files)} instantáneas antiguas")
+
+        # Pasar al formato con manifiesto; solo entonces se borran las instantáneas ya fusionadas
+        if await self.store.compact(self.reports):
+            await asyncio.gather(*(blob_manager.delete_file(f) for f in loaded_files))
+            logger.info(f"🧹 {len(loaded_files)} instantáneas antiguas reemplazadas por la base compactada")
+        return True
+
+    async def save_data(self, report_ids: Optional[List[str]] = None):
+        """Guardar en Blob Storage solo los reportes cambiados (un delta pequeño por guardado)"""
+        try:
+            upserts, deletes = self.store.diff(self.reports, report_ids)
+            if not await self.store.save_changes(upserts, deletes):
+                logger.error("❌ Error guardando en Blob Storage, usando archivo local como fallback")
+                self._save_local_backup()
+                return
 
-                # También mantener backup local
-                with open(self.reports_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
+            logger.info(f"💾 Delta de reportes de scam guardado: {len(upserts)} actualizados, {len(deletes)} eliminados")
 
-                # Verificar integridad de archivos (mantener todos los reportes)
-                await self._cleanup_old_report_files()
-            else:
-                logger.error("❌ Error guardando en Blob Storage, usando archivo local como fallback")
-                # Fallback a archivo local
-                with open(self.reports_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
+            # Compactación periódica: fusionar deltas en una base nueva y refrescar el backup local
+            if self.store.needs_compaction() and await self.store.compact(self.reports):
+                self._save_local_backup()
 
         except Exception as e:
             logger.error(f"❌ Error guardando reportes de scam: {e}")
 
-    async def _cleanup_old_report_files(self):
-        """Mantener todos los reportes y solo limpiar archivos duplicados o corruptos"""
-        try:
-            from blob_storage_manager import blob_manager
-
-            # Listar archivos de reportes
-            all_files = await blob_manager.list_files()
-            scam_files = [f for f in all_files if f.startswith(self.blob_folder)]
-
-            logger.info(f"📊 Manteniendo {len(scam_files)} archivos de reportes (todos permanentes)")
-
-            # Solo verificar y eliminar archivos corruptos o vacíos
-            corrupted_files = []
-
-            for filename in scam_files:
-                try:
-                    # Verificar si el archivo se puede leer correctamente
-                    blob_data = await blob_manager.download_json(filename)
-                    if not blob_data or not isinstance(blob_data, dict):
-                        corrupted_files.append(filename)
-                        continue
-
-                    # Verificar si tiene estructura válida
-                    if 'reports' not in blob_data and 'last_updated' not in blob_data:
-                        corrupted_files.append(filename)
-
-                except Exception as e:
-                    logger.warning(f"⚠️ Archivo corrupto detectado: {filename} - {e}")
-                    corrupted_files.append(filename)
-
-            # Eliminar solo archivos corruptos
-            if corrupted_files:
-                for corrupted_file in corrupted_files:
-                    try:
-                        await blob_manager.delete_file(corrupted_file)
-                        logger.info(f"🗑️ Archivo corrupto eliminado: {corrupted_file}")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error eliminando archivo corrupto {corrupted_file}: {e}")
-
-                logger.info(f"🧹 Limpieza completada: {len(corrupted_files)} archivos corruptos eliminados")
-            else:
-                logger.info("✅ Todos los archivos de reportes están en buen estado")
-
-        except Exception as e:
-            logger.warning(f"⚠️ Error en verificación de archivos: {e}")
+    def _save_local_backup(self):
+        """Backup local completo (solo en compactación o si falla Blob)"""
+        data = {
+            'reports': self.reports,
+            'last_updated': datetime.now().isoformat(),
+            'total_reports': len(self.reports),
+            'stats': self.get_stats()
+        }
+        with open(self.reports_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
 
     async def create_report(self, reporter_id: str, reported_user_id: str, server_id: str, reason: str, evidence_text: str = "") -> Dict:
         """Crear un nuevo reporte de scam"""
@@ -193,13 +226,11 @@ class AntiScamSystem:
             report_id = f"SCAM_{int(time.time())}_{secrets.token_hex(4)}"
 
             # Verificar si ya reportó a este usuario
-            for existing_report in self.reports.values():
-                if (existing_report['reporter_id'] == reporter_id and
-                    existing_report['reported_user_id'] == reported_user_id):
-                    return {
-                        'success': False,
-                        'error': 'Ya reportaste a este usuario anteriormente.'
-                    }
+            if (reporter_id, reported_user_id) in self.index.reporter_pairs:
+                return {
+                    'success': False,
+                    'error': 'Ya reportaste a este usuario anteriormente.'
+                }
 
             # Crear reporte
             report = {
@@ -217,7 +248,8 @@ class AntiScamSystem:
             }
 
             self.reports[report_id] = report
-            await self.save_data()
+            self.index.add(report_id, report)
+            await self.save_data([report_id])
 
             logger.info(f"📋 Reporte de scam creado: {report_id} - {reported_user_id}")
 
@@ -236,48 +268,35 @@ class AntiScamSystem:
 
     def get_user_reports(self, user_id: str) -> Dict:
         """Obtener reportes de un usuario específico"""
-        user_reports = []
-
         # Asegurar que haya datos cargados
         if not self.reports:
             logger.warning("⚠️ No hay reportes cargados en memoria")
 
-        for report in self.reports.values():
-            if report['reported_user_id'] == user_id:
-                user_reports.append(report)
+        user_reports = [self.reports[report_id] for report_id in self.index.by_user.get(user_id, {})]
+        counts = self.index.user_status_counts.get(user_id, {})
 
         return {
             'found': len(user_reports) > 0,
             'reports': user_reports,
             'total': len(user_reports),
-            'confirmed': len([r for r in user_reports if r['status'] == 'confirmed']),
-            'pending': len([r for r in user_reports if r['status'] == 'pending'])
+            'confirmed': counts.get('confirmed', 0),
+            'pending': counts.get('pending', 0)
         }
 
+    def get_latest_user_report(self, user_id: str, status: Optional[str] = None) -> Optional[Dict]:
+        """Reporte más reciente de un usuario (opcionalmente con un estado concreto)"""
+        candidates = [
+            self.reports[report_id] for report_id in self.index.by_user.get(user_id, {})
+            if status is None or self.reports[report_id].get('status') == status
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda report: self.index.timestamps.get(report['report_id'], 0))
+
     def get_server_recent_reports(self, server_id: str, limit: int = 10) -> List[Dict]:
         """Obtener reportes recientes de un servidor"""
-        server_reports = []
-
-        for report in self.reports.values():
-            if report.get('server_id') == server_id:
-                server_reports.append(report)
-
-        # Ordenar por fecha más reciente - asegurar que timestamp sea numérico
-        def get_timestamp(report):
-            timestamp = report.get('timestamp', 0)
-            if isinstance(timestamp, str):
-                try:
-                    # Intentar convertir string a float
-                    return float(timestamp)
-                except (ValueError, TypeError):
-                    # Si no se puede convertir, usar tiempo actual como fallback
-                    import time
-                    return time.time()
-            return timestamp if isinstance(timestamp, (int, float)) else 0
-
-        server_reports.sort(key=get_timestamp, reverse=True)
-
-        return server_reports[:limit]
+        entries = self.index.by_server.get(server_id, [])
+        return [self.reports[report_id] for _, report_id in reversed(entries[-limit:])] if limit > 0 else []
 
     async def confirm_report(self, report_id: str, confirmer_id: str) -> Dict:
         """Confirmar un reporte (solo owner/delegados)"""
@@ -299,8 +318,9 @@ class AntiScamSystem:
         report['status'] = 'confirmed'
         report['confirmed_by'].append(confirmer_id)
         report['confirmed_at'] = datetime.now().isoformat()
+        self.index.change_status(report_id, report, 'pending')
 
-        await self.save_data()
+        await self.save_data([report_id])
 
         logger.info(f"✅ Reporte {report_id} confirmado por {confirmer_id}")
 
@@ -329,8 +349,9 @@ class AntiScamSystem:
         report['status'] = 'dismissed'
         report['dismissed_by'] = dismisser_id
         report['dismissed_at'] = datetime.now().isoformat()
+        self.index.change_status(report_id, report, 'pending')
 
-        await self.save_data()
+        await self.save_data([report_id])
 
         logger.info(f"❌ Reporte {report_id} descartado por {dismisser_id}")
 
@@ -340,42 +361,34 @@ class AntiScamSystem:
         }
 
     def get_pending_reports(self, limit: int = 10) -> List[Dict]:
-        """Obtener reportes pendientes"""
-        pending = []
-
-        for report in self.reports.values():
-            if report['status'] == 'pending':
-                pending.append(report)
-
-        # Ordenar por fecha más antigua primero - asegurar que timestamp sea numérico
-        def get_timestamp(report):
-            timestamp = report.get('timestamp', 0)
-            if isinstance(timestamp, str):
-                try:
-                    # Intentar convertir string a float
-                    return float(timestamp)
-                except (ValueError, TypeError):
-                    # Si no se puede convertir, usar tiempo actual como fallback
-                    import time
-                    return time.time()
-            return timestamp if isinstance(timestamp, (int, float)) else 0
-
-        pending.sort(key=get_timestamp)
-
-        return pending[:limit]
+        """Obtener reportes pendientes (más antiguos primero)"""
+        entries = self.index.by_status.get('pending', [])
+        return [self.reports[report_id] for _, report_id in entries[:limit]]
+
+    def remove_report(self, report_id: str) -> bool:
+        """Quitar un reporte de memoria y de los índices; el borrado sube con el próximo save_data (parcial o completo)"""
+        report = self.reports.pop(report_id, None)
+        if report is None:
+            return False
+        self.index.remove(report_id, report)
+        self.store.mark_changed(report_id)
+        return True
+
+    def get_users_with_status(self, status: str) -> Set[str]:
+        """Usuarios con al menos un reporte en el estado indicado"""
+        return self.index.users_by_status.get(status, set())
+
+    def get_most_reported_users(self, limit: int = 3) -> List[Tuple[str, int]]:
+        import heapq
+        return heapq.nlargest(limit, ((user_id, len(ids)) for user_id, ids in self.index.by_user.items()), key=lambda item: item[1])
 
     def get_stats(self) -> Dict:
         """Obtener estadísticas del sistema"""
-        total = len(self.reports)
-        pending = len([r for r in self.reports.values() if r['status'] == 'pending'])
-        confirmed = len([r for r in self.reports.values() if r['status'] == 'confirmed'])
-        dismissed = len([r for r in self.reports.values() if r['status'] == 'dismissed'])
-
         return {
-            'total_reports': total,
-            'pending': pending,
-            'confirmed': confirmed,
-            'dismissed': dismissed
+            'total_reports': len(self.reports),
+            'pending': len(self.index.by_status.get('pending', [])),
+            'confirmed': len(self.index.by_status.get('confirmed', [])),
+            'dismissed': len(self.index.by_status.get('dismissed', []))
         }
 
     async def migrate_reports_to_blob(self) -> Dict[str, int]:
@@ -408,6 +421,7 @@ class AntiScamSystem:
                 if reports:
                     # Migrar a Blob Storage usando el sistema de carpetas
                     self.reports = reports
+                    self.index.rebuild(self.reports)
                     await self.save_data()
 
                     results['reports_migrated'] = len(reports)
@@ -423,8 +437,10 @@ class AntiScamSystem:
             logger.error(f"❌ Error en migración de reportes: {e}")
             return {'reports_migrated': 0, 'errors': 1}
 
-    async def sync_with_blob(self):
-        """Sincronizar datos locales con Blob Storage"""
+    async def sync_with_blob(self, force: bool = False):
+        """Sincronizar datos locales con Blob Storage (como mucho una vez por intervalo)"""
+        if not force and time.time() - self.last_sync < self.sync_interval:
+            return
         try:
             # Recargar todos los datos desde la carpeta de reportes
             await self.load_data()
@@ -708,28 +724,18 @@ def setup_commands(bot):
 
                 server_id = str(interaction.guild.id)
 
-                # Obtener todos los reportes de scammers (de cualquier servidor)
-                all_reports = list(anti_scam_system.reports.values())
-
-                if all_reports:
-                    # Obtener miembros del servidor actual
-                    server_member_ids = [str(member.id) for member in interaction.guild.members]
+                # Usuarios reportados (de cualquier servidor) desde el índice por estado
+                if anti_scam_system.reports:
+                    def users_in_server(status):
+                        # Recorrer el conjunto más pequeño: usuarios con ese estado o miembros del servidor
+                        reported_users = anti_scam_system.get_users_with_status(status)
+                        if len(reported_users) <= (interaction.guild.member_count or 0):
+                            return sorted(u for u in reported_users if interaction.guild.get_member(int(u)))
+                        return sorted(str(m.id) for m in interaction.guild.members if str(m.id) in reported_users)
 
                     # Filtrar usuarios reportados que ESTÁN EN EL SERVIDOR ACTUAL
-                    confirmed_users_in_server = []
-                    pending_users_in_server = []
-
-                    for report in all_reports:
-                        reported_user_id = report['reported_user_id']
-
-                        # Solo incluir si el usuario reportado está en el servidor actual
-                        if reported_user_id in server_member_ids:
-                            if report['status'] == 'confirmed':
-                                if reported_user_id not in confirmed_users_in_server:
-                                    confirmed_users_in_server.append(reported_user_id)
-                            elif report['status'] == 'pending':
-                                if reported_user_id not in pending_users_in_server:
-                                    pending_users_in_server.append(reported_user_id)
+                    confirmed_users_in_server = users_in_server('confirmed')
+                    pending_users_in_server = users_in_server('pending')
 
                     if confirmed_users_in_server:
                         # Priorizar usuarios confirmados que están en el servidor
@@ -739,9 +745,8 @@ def setup_commands(bot):
                         # Agregar detalles de reportes confirmados
                         ping_message += "\n\n📋 **Detalles de reportes confirmados:**"
                         for user_id in confirmed_users_in_server[:5]:  # Mostrar hasta 5 usuarios
-                            user_reports = [r for r in all_reports if r['reported_user_id'] == user_id and r['status'] == 'confirmed']
-                            if user_reports:
-                                latest_report = max(user_reports, key=lambda x: x.get('timestamp', 0))
+                            latest_report = anti_scam_system.get_latest_user_report(user_id, 'confirmed')
+                            if latest_report:
                                 try:
                                     report_date = datetime.fromisoformat(latest_report['created_at']).strftime("%d/%m/%Y")
                                 except:
@@ -762,9 +767,8 @@ def setup_commands(bot):
                         # Agregar detalles de reportes pendientes
                         ping_message += "\n\n📋 **Detalles de reportes pendientes:**"
                         for user_id in pending_users_in_server[:5]:  # Mostrar hasta 5 usuarios
-                            user_reports = [r for r in all_reports if r['reported_user_id'] == user_id and r['status'] == 'pending']
-                            if user_reports:
-                                latest_report = max(user_reports, key=lambda x: x.get('timestamp', 0))
+                            latest_report = anti_scam_system.get_latest_user_report(user_id, 'pending')
+                            if latest_report:
                                 try:
                                     report_date = datetime.fromisoformat(latest_report['created_at']).strftime("%d/%m/%Y")
                                 except:
@@ -1152,13 +1156,9 @@ def setup_commands(bot):
             # Estadísticas adicionales
             if anti_scam_system.reports:
                 # Usuarios más reportados
-                user_counts = {}
-                for report in anti_scam_system.reports.values():
-                    user_id = report['reported_user_id']
-                    user_counts[user_id] = user_counts.get(user_id, 0) + 1
+                top_reported = anti_scam_system.get_most_reported_users(3)
 
-                if user_counts:
-                    top_reported = sorted(user_counts.items(), key=lambda x: x[1], reverse=True)[:3]
+                if top_reported:
                     top_list = []
                     for user_id, count in top_reported:
                         top_list.append(f"<@{user_id}>: {count} reportes")
@@ -1170,10 +1170,7 @@ def setup_commands(bot):
                     )
 
                 # Reportes por estado confirmado
-                confirmed_users = set()
-                for report in anti_scam_system.reports.values():
-                    if report['status'] == 'confirmed':
-                        confirmed_users.add(report['reported_user_id'])
+                confirmed_users = anti_scam_system.get_users_with_status('confirmed')
 
                 embed.add_field(
                     name="🚨 Scammers Confirmados",
@@ -1265,8 +1262,7 @@ def setup_commands(bot):
                     logger.info(f"✅ Test crear reporte: EXITOSO - ID: {test_report_id}")
 
                     # Limpiar reporte de prueba
-                    if test_report_id in anti_scam_system.reports:
-                        del anti_scam_system.reports[test_report_id]
+                    anti_scam_system.remove_report(test_report_id)
                 else:
                     logger.error(f"❌ Test crear reporte: FALLO - {test_report.get('error')}")
             except Exception as e:
@@ -7,7 +7,6 @@ import discord
 from discord.ext import commands
 import logging
 import json
-import asyncio
 from datetime import datetime
 from pathlib import Path
 import time
@@ -17,6 +16,9 @@ logger = logging.getLogger(__name__)
 # ID del owner principal
 DISCORD_OWNER_ID = "916070251895091241"
 
+# Margen antes de que caduque el token de la interacción (15 minutos)
+INTERACTION_TOKEN_SECONDS = 14 * 60
+
 def setup_commands(bot):
     """
     Función requerida para configurar comandos
@@ -84,51 +86,49 @@ def setup_commands(bot):
                 icon_url="https://rbxservers.xyz/svgs/roblox.svg"
             )
 
-            # Enviar a usuarios verificados
-            exitosos = 0
-            fallidos = 0
-            usuarios_procesados = []
+            # Enviar a usuarios verificados con el motor compartido (concurrente, con checkpoints)
+            from dm_broadcast import dm_broadcaster
+            token_expires_at = time.time() + INTERACTION_TOKEN_SECONDS
 
-            for discord_id, usuario_data in usuarios_verificados.items():
-                try:
-                    user = bot.get_user(int(discord_id))
-                    if not user:
-                        user = await bot.fetch_user(int(discord_id))
-                    
-                    if user:
-                        await user.send(embed=embed_anuncio)
-                        exitosos += 1
-                        usuarios_procesados.append({
-                            'discord_id': discord_id,
-                            'username': str(user),
-                            'roblox_username': usuario_data.get('roblox_username', 'Unknown'),
-                            'status': 'enviado'
-                        })
-                        logger.info(f"📢 Anuncio enviado a {user} (ID: {discord_id})")
-                        
-                        # Pequeña pausa para evitar rate limits
-                        await asyncio.sleep(0.5)
-                    else:
-                        fallidos += 1
-                        usuarios_procesados.append({
-                            'discord_id': discord_id,
-                            'username': 'Usuario no encontrado',
-                            'roblox_username': usuario_data.get('roblox_username', 'Unknown'),
-                            'status': 'fallido'
-                        })
-                        
-                except Exception as e:
-                    fallidos += 1
-                    usuarios_procesados.append({
-                        'discord_id': discord_id,
-                        'username': f'Error: {str(e)[:50]}',
-                        'roblox_username': usuario_data.get('roblox_username', 'Unknown'),
-                        'status': 'error'
-                    })
-                    logger.error(f"❌ Error enviando anuncio a {discord_id}: {e}")
+            async def reportar_progreso(progreso):
+                # El token de la interacción caduca a los 15 minutos; después solo queda el log
+                if time.time() >= token_expires_at:
+                    return
+                embed_progreso = discord.Embed(
+                    title="📢 Enviando Anuncio...",
+                    description=f"Procesados **{progreso['processed']}/{progreso['total']}** usuarios verificados.",
+                    color=0xffaa00
+                )
+                embed_progreso.add_field(
+                    name="<:stats:1418490788437823599> Progreso",
+                    value=(f"**Enviados:** {progreso['sent']}\n**Fallidos:** {progreso['failed']}\n"
+                           f"**Velocidad:** {progreso['per_second']}/s\n"
+                           f"**Restante:** ~{progreso['eta_seconds'] or 0}s"),
+                    inline=True
+                )
+                await interaction.edit_original_response(embed=embed_progreso)
+
+            resultado = await dm_broadcaster.broadcast(
+                bot, usuarios_verificados.keys(), kind="anuncio",
+                embed=embed_anuncio, on_progress=reportar_progreso, resumable=True
+            )
+            exitosos = resultado['sent']
+            fallidos = resultado['failed']
+
+            # Detalle de los primeros usuarios para el log (solo se guardan 50)
+            usuarios_procesados = []
+            for discord_id, estado in list(resultado['results'].items())[:50]:
+                usuario_data = usuarios_verificados.get(discord_id, {})
+                user = bot.get_user(int(discord_id))
+                usuarios_procesados.append({
+                    'discord_id': discord_id,
+                    'username': str(user) if user else 'Desconocido',
+                    'roblox_username': usuario_data.get('roblox_username', 'Unknown'),
+                    'status': 'enviado' if estado == 'sent' else estado
+                })
 
             # Guardar log del anuncio
-            await guardar_log_anuncio(interaction.user, texto, usuarios_procesados, exitosos, fallidos)
+            await guardar_log_anuncio(interaction.user, texto, usuarios_procesados, exitosos, fallidos, total=resultado['total'])
 
             # Embed de resultado final
             embed_resultado = discord.Embed(
@@ -155,7 +155,16 @@ def setup_commands(bot):
                 inline=True
             )
 
-            await interaction.followup.send(embed=embed_resultado, ephemeral=True)
+            embed_resultado.add_field(
+                name="⚡ Velocidad",
+                value=f"{resultado['per_second']}/s en {resultado['elapsed_seconds']}s",
+                inline=True
+            )
+
+            if time.time() < token_expires_at:
+                await interaction.followup.send(embed=embed_resultado, ephemeral=True)
+            else:
+                await interaction.user.send(embed=embed_resultado)
             
             logger.info(f"📢 Anuncio completado por {interaction.user}: {exitosos} exitosos, {fallidos} fallidos")
 
@@ -268,7 +277,7 @@ async def obtener_usuarios_verificados():
         logger.error(f"❌ Error cargando usuarios verificados: {e}")
         return {}
 
-async def guardar_log_anuncio(autor, texto, usuarios_procesados, exitosos, fallidos):
+async def guardar_log_anuncio(autor, texto, usuarios_procesados, exitosos, fallidos, total=None):
     """Guardar log del anuncio enviado"""
     try:
         log_file = Path("anuncios_log.json")
@@ -292,7 +301,7 @@ async def guardar_log_anuncio(autor, texto, usuarios_procesados, exitosos, falli
             'estadisticas': {
                 'exitosos': exitosos,
                 'fallidos': fallidos,
-                'total': len(usuarios_procesados)
+                'total': total if total is not None else len(usuarios_procesados)
             },
             'usuarios_procesados': usuarios_procesados[:50]  # Guardar solo los primeros 50 para evitar archivos muy grandes
         }
@@ -1,6 +1,6 @@
 import os
 import sys
-import aiohttp
+import asyncio
 import logging
 
 # Configurar el logger
@@ -64,27 +64,18 @@ async def handle_asset_command(update, context):
 
     # Configurar imagen del asset
     try:
-        async with aiohttp.ClientSession() as session:
-            # Imagen principal del asset
-            asset_image_url = f"https://thumbnails.roblox.com/v1/assets?assetIds={asset_id}&size=420x420&format=Png&isCircular=false"
-            async with session.get(asset_image_url) as response:
-                if response.status == 200:
-                    image_data = await response.json()
-                    if image_data.get('data') and len(image_data['data']) > 0:
-                        image_url = image_data['data'][0].get('imageUrl')
-                        if image_url and image_url != 'https://tr.rbxcdn.com/':
-                            embed.set_image(url=image_url)
-                            logger.info(f"<a:verify2:1418486831993061497> Imagen del asset configurada: {image_url}")
-
-            # Thumbnail más pequeño
-            thumb_url = f"https://thumbnails.roblox.com/v1/assets?assetIds={asset_id}&size=150x150&format=Png&isCircular=false"
-            async with session.get(thumb_url) as response:
-                if response.status == 200:
-                    thumb_data = await response.json()
-                    if thumb_data.get('data') and len(thumb_data['data']) > 0:
-                        thumbnail_image = thumb_data['data'][0].get('imageUrl')
-                        if thumbnail_image and thumbnail_image != 'https://tr.rbxcdn.com/':
-                            embed.set_thumbnail(url=thumbnail_image)
+        from thumbnail_batcher import thumbnail_batcher
+
+        # Imagen principal del asset y thumbnail más pequeño
+        image_url, thumbnail_image = await asyncio.gather(
+            thumbnail_batcher.get('asset', asset_id, '420x420'),
+            thumbnail_batcher.get('asset', asset_id, '150x150')
+        )
+        if image_url and image_url != 'https://tr.rbxcdn.com/':
+            embed.set_image(url=image_url)
+            logger.info(f"<a:verify2:1418486831993061497> Imagen del asset configurada: {image_url}")
+        if thumbnail_image and thumbnail_image != 'https://tr.rbxcdn.com/':
+            embed.set_thumbnail(url=thumbnail_image)
     except Exception as e:
         logger.warning(f"⚠️ Error configurando imagen del asset: {e}")
 
@@ -401,130 +401,45 @@ async def execute_auto_scrape_with_cooldowns(user_id: str, username: str, game_i
         }
 
 async def scrape_vip_links_optimized(game_id, user_id):
-    """Optimized scraping function for auto_scrape - SIEMPRE headless para hosting web"""
-    from main import scraper
-
-    # Set user ID
-    scraper.current_user_id = user_id
-
-    # Get server links
-    server_links = scraper.get_server_links(game_id)
-
-    # Limit to 3 servers para auto_scrape (más rápido)
-    server_links = server_links[:3]
-    logger.info(f"🎯 Processing {len(server_links)} server links (limited to 3 for auto_scrape - HEADLESS MODE)...")
-
-    # Initialize WebDriver con configuración headless forzada
-    driver = scraper.get_driver_headless_forced()  # Usar método específico para headless
+    """Optimized scraping function for auto_scrape - se ejecuta en la cola central de scraping"""
+    from main import run_scraping_sync, get_scraping_priority
+    from scraping_queue import scraping_scheduler
 
-    extracted_count = 0
+    # El trabajo Selenium corre en un worker de la cola (driver del pool compartido)
+    job = scraping_scheduler.submit(
+        game_id, user_id, run_scraping_sync, game_id, user_id,
+        priority=get_scraping_priority(user_id)
+    )
+    results = await scraping_scheduler.wait(job)
 
-    for server_url in server_links:
-        try:
-            # Extract VIP link
-            vip_link = scraper.extract_vip_link(driver, server_url, game_id)
-            if vip_link:
-                extracted_count += 1
-        except Exception as e:
-            logger.error(f"❌ Error processing {server_url}: {e}")
+    if not results or not results.get('success'):
+        logger.warning(f"⚠️ Auto scrape sin resultados para juego {game_id}: {(results or {}).get('error') or job.error}")
+        return 0
 
-    # Close the WebDriver after processing all links
-    scraper.close_driver(driver)
-    logger.info(f"✅ Extracted {extracted_count} VIP links (HEADLESS MODE)")
-    return extracted_count
+    logger.info(f"✅ Extracted {results['new_links_count']} VIP links (cola de scraping)")
+    return results['new_links_count']
 
 def get_user_existing_servers(user_id: str) -> list:
-    """Obtener servidores existentes del usuario desde user_game_servers.json"""
+    """Obtener servidores existentes del usuario desde el almacén de servidores"""
     try:
-        import json
-        from pathlib import Path
-
-        servers_file = Path("user_game_servers.json")
-        if servers_file.exists():
-            with open(servers_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                user_servers = data.get('user_servers', {}).get(user_id, [])
-                return user_servers if isinstance(user_servers, list) else []
-        return []
+        from server_storage import server_storage
+        return server_storage.get_user_servers(user_id)
     except Exception as e:
         logger.error(f"Error cargando servidores existentes para {user_id}: {e}")
         return []
 
 def save_server_immediately(user_id: str, new_servers_list: list) -> bool:
-    """Guardar servidores inmediatamente en user_game_servers.json, agregando a los existentes"""
+    """Guardar servidores inmediatamente en el almacén de servidores, agregando a los existentes"""
     try:
-        import json
-        from pathlib import Path
-        from datetime import datetime
-
-        servers_file = Path("user_game_servers.json")
-
-        # Cargar datos existentes
-        if servers_file.exists():
-            try:
-                with open(servers_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            except Exception as read_error:
-                logger.error(f"Error leyendo archivo: {read_error}")
-                data = {}
-        else:
-            data = {}
-
-        # Asegurar estructura
-        if 'user_servers' not in data:
-            data['user_servers'] = {}
-        if 'metadata' not in data:
-            data['metadata'] = {}
-
-        # Obtener servidores existentes del usuario
-        existing_servers = data['user_servers'].get(user_id, [])
-        
-        # Combinar servidores existentes con nuevos (evitando duplicados)
-        all_servers = existing_servers.copy()
-        for server in new_servers_list:
-            if server not in all_servers:
-                all_servers.append(server)
-        
-        # Limitar a máximo 20 servidores (límite del comando)
-        limited_servers = all_servers[:20] if all_servers else []
-
-        # Actualizar datos del usuario
-        data['user_servers'][user_id] = limited_servers
-        
-        logger.info(f"💾 Usuario {user_id}: {len(existing_servers)} servidores existentes + {len([s for s in new_servers_list if s not in existing_servers])} nuevos = {len(limited_servers)} total")
-
-        # Actualizar metadata
-        data['metadata'].update({
-            'created_at': data['metadata'].get('created_at', datetime.now().isoformat()),
-            'last_updated': datetime.now().isoformat(),
-            'total_users': len(data['user_servers']),
-            'total_servers': sum(len(user_servers) for user_servers in data['user_servers'].values()),
-            'description': "Estructura simplificada: user_id -> array de hasta 20 servidores"
-        })
-
-        # Guardar con múltiples intentos
-        for attempt in range(3):
-            try:
-                with open(servers_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-
-                # Verificar guardado
-                with open(servers_file, 'r', encoding='utf-8') as f:
-                    verify_data = json.load(f)
-                    saved_servers = verify_data.get('user_servers', {}).get(user_id, [])
-
-                if len(saved_servers) == len(limited_servers):
-                    return True
-                else:
-                    logger.warning(f"Intento {attempt + 1}: Guardado incompleto ({len(saved_servers)}/{len(limited_servers)})")
-
-            except Exception as save_error:
-                logger.error(f"Error en intento {attempt + 1}: {save_error}")
-                if attempt == 2:
-                    return False
-                time.sleep(0.5)
+        from server_storage import server_storage
 
-        return False
+        # Combinar con los existentes (sin duplicados) en una sola transacción, máximo 20 servidores
+        limited_servers = server_storage.add_user_servers(user_id, new_servers_list, limit=20)
+        logger.info(f"💾 Usuario {user_id}: {len(limited_servers)} servidores guardados en total")
+
+        # Exportar user_game_servers.json para los lectores legados
+        server_storage.export_legacy_json()
+        return True
 
     except Exception as e:
         logger.error(f"Error crítico guardando servidores para {user_id}: {e}")
@@ -608,4 +523,3 @@ async def send_servers_file(user: discord.User, servers: list, games: list):
 def cleanup_commands(bot):
     """Función de limpieza opcional"""
     pass
-`
\ No newline at end of file
@@ -5,7 +5,7 @@ Comando /avatar para mostrar avatares de Roblox con información de objetos y pr
 import discord
 from discord.ext import commands
 import logging
-import aiohttp
+import asyncio
 import json
 from datetime import datetime
 
@@ -45,9 +45,11 @@ def setup_commands(bot):
                 await interaction.followup.send(embed=embed, ephemeral=True)
                 return
             
-            # Obtener información del avatar y RAP
-            avatar_info = await get_avatar_info(user_info['id'])
-            user_rap = await get_user_rap(user_info['id'])
+            # Obtener información del avatar y RAP en paralelo
+            avatar_info, user_rap = await asyncio.gather(
+                get_avatar_info(user_info['id']),
+                get_user_rap(user_info['id'])
+            )
             
             if not avatar_info:
                 embed = discord.Embed(
@@ -221,37 +223,16 @@ def setup_commands(bot):
 async def get_roblox_user_info(username: str):
     """Obtener información básica del usuario de Roblox"""
     try:
-        async with aiohttp.ClientSession() as session:
-            # Primero obtener ID del usuario
-            users_url = "https://users.roblox.com/v1/usernames/users"
-            payload = {
-                "usernames": [username],
-                "excludeBannedUsers": True
-            }
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            
-            async with session.post(users_url, json=payload, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get("data") and len(data["data"]) > 0:
-                        user_data = data["data"][0]
-                        user_id = user_data.get("id")
-                        
-                        # Obtener información adicional del usuario
-                        user_info_url = f"https://users.roblox.com/v1/users/{user_id}"
-                        async with session.get(user_info_url, headers=headers) as user_response:
-                            if user_response.status == 200:
-                                user_info = await user_response.json()
-                                return user_info
-                            else:
-                                return user_data
-                    else:
-                        return None
-                else:
-                    return None
+        from roblox_client import roblox_client
+        
+        # Primero obtener ID del usuario
+        user_data = await roblox_client.get_user_by_username(username)
+        if not user_data:
+            return None
+        
+        # Obtener información adicional del usuario
+        user_info = await roblox_client.get_user(user_data.get("id"))
+        return user_info or user_data
     except Exception as e:
         logger.error(f"Error obteniendo información del usuario: {e}")
         return None
@@ -259,132 +240,59 @@ async def get_roblox_user_info(username: str):
 async def get_avatar_info(user_id: int):
     """Obtener información del avatar del usuario"""
     try:
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            
-            avatar_info = {}
-            
-            # Obtener imagen del avatar
-            avatar_url = f"https://thumbnails.roblox.com/v1/users/avatar-headshot?userIds={user_id}&size=420x420&format=Png&isCircular=false"
-            async with session.get(avatar_url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get("data") and len(data["data"]) > 0:
-                        avatar_info['avatar_url'] = data["data"][0].get("imageUrl")
-            
-            # Obtener información del avatar completo
-            avatar_details_url = f"https://avatar.roblox.com/v1/users/{user_id}/avatar"
-            async with session.get(avatar_details_url, headers=headers) as response:
-                if response.status == 200:
-                    avatar_data = await response.json()
-                    
-                    # Obtener información de los objetos del avatar
-                    assets = avatar_data.get("assets", [])
-                    avatar_items = []
-                    
-                    for asset in assets:
-                        asset_id = asset.get("id")
-                        asset_name = asset.get("name", "Objeto desconocido")
-                        asset_type = asset.get("assetType", {}).get("name", "Accesorio")
-                        
-                        # Obtener precio del objeto
-                        item_price = await get_item_price(session, asset_id)
-                        
-                        avatar_items.append({
-                            "name": asset_name,
-                            "type": asset_type,
-                            "price": item_price,
-                            "id": asset_id
-                        })
-                    
-                    avatar_info['items'] = avatar_items
-                    avatar_info['avatar_type'] = avatar_data.get("playerAvatarType", "R15")
-                    avatar_info['scales'] = "Personalizadas" if avatar_data.get("scales") else "Normales"
-                    avatar_info['body_colors'] = "Personalizados" if avatar_data.get("bodyColors") else "Predeterminados"
-            
-            return avatar_info
+        from roblox_client import roblox_client
+        from thumbnail_batcher import thumbnail_batcher
+        from inventory_valuation import inventory_valuation
+        
+        avatar_info = {}
+        
+        # Obtener imagen del avatar
+        avatar_info['avatar_url'] = await thumbnail_batcher.get('user_headshot', user_id, '420x420')
+        
+        # Obtener información del avatar completo
+        avatar_data = await roblox_client.get_json(f"https://avatar.roblox.com/v1/users/{user_id}/avatar")
+        if avatar_data:
+            # Obtener información de los objetos del avatar
+            assets = avatar_data.get("assets", [])
+            
+            # Precios de todos los objetos de una vez (caché compartida entre usuarios)
+            prices = await inventory_valuation.get_asset_prices(asset.get("id") for asset in assets)
+            
+            avatar_items = []
+            for asset in assets:
+                asset_id = asset.get("id")
+                avatar_items.append({
+                    "name": asset.get("name", "Objeto desconocido"),
+                    "type": asset.get("assetType", {}).get("name", "Accesorio"),
+                    "price": prices.get(str(asset_id), 0),
+                    "id": asset_id
+                })
+            
+            avatar_info['items'] = avatar_items
+            avatar_info['avatar_type'] = avatar_data.get("playerAvatarType", "R15")
+            avatar_info['scales'] = "Personalizadas" if avatar_data.get("scales") else "Normales"
+            avatar_info['body_colors'] = "Personalizados" if avatar_data.get("bodyColors") else "Predeterminados"
+        
+        return avatar_info
             
     except Exception as e:
         logger.error(f"Error obteniendo información del avatar: {e}")
         return None
 
-async def get_item_price(session: aiohttp.ClientSession, asset_id: int):
-    """Obtener precio de un objeto específico"""
+async def get_item_price(asset_id: int):
+    """Obtener precio de un objeto específico (caché de precios compartida)"""
     try:
-        # Intentar obtener precio desde la API de marketplace
-        marketplace_url = f"https://economy.roblox.com/v2/assets/{asset_id}/details"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        
-        async with session.get(marketplace_url, headers=headers) as response:
-            if response.status == 200:
-                data = await response.json()
-                price = data.get("PriceInRobux")
-                if price is not None:
-                    return price
-                else:
-                    return 0  # Gratis o no disponible
-            else:
-                return 0
+        from inventory_valuation import inventory_valuation
+        return await inventory_valuation.get_asset_price(asset_id)
     except Exception as e:
         logger.debug(f"Error obteniendo precio para asset {asset_id}: {e}")
         return 0
 
 async def get_user_rap(user_id: int):
-    """Obtener RAP (Recent Average Price) del usuario"""
+    """Obtener RAP (Recent Average Price) del usuario desde su snapshot de inventario"""
     try:
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            
-            # Intentar obtener RAP desde la API de inventario
-            inventory_url = f"https://inventory.roblox.com/v1/users/{user_id}/assets/collectibles"
-            params = {
-                "sortOrder": "Asc",
-                "limit": 100
-            }
-            
-            total_rap = 0
-            cursor = ""
-            items_checked = 0
-            max_items = 500  # Limitar para evitar timeout
-            
-            while items_checked < max_items:
-                if cursor:
-                    params["cursor"] = cursor
-                
-                async with session.get(inventory_url, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        if not data.get("data"):
-                            break
-                            
-                        for item in data["data"]:
-                            recent_average_price = item.get("recentAveragePrice")
-                            if recent_average_price and recent_average_price > 0:
-                                total_rap += recent_average_price
-                            items_checked += 1
-                            
-                            if items_checked >= max_items:
-                                break
-                        
-                        # Verificar si hay más páginas
-                        next_cursor = data.get("nextPageCursor")
-                        if not next_cursor:
-                            break
-                        cursor = next_cursor
-                    else:
-                        # Si la API devuelve error, probablemente el inventario es privado
-                        logger.debug(f"Error accediendo al inventario del usuario {user_id}: Status {response.status}")
-                        return None
-            
-            return total_rap if total_rap > 0 else 0
-            
+        from inventory_valuation import inventory_valuation
+        return await inventory_valuation.get_user_rap(user_id)
     except Exception as e:
         logger.debug(f"Error obteniendo RAP para usuario {user_id}: {e}")
         return None
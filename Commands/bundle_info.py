@@ -4,7 +4,6 @@ Comando /bundle_info - Mostrar los assets asociados a un bundle
 import discord
 from discord.ext import commands
 import logging
-import aiohttp
 import asyncio
 from datetime import datetime
 
@@ -162,27 +161,18 @@ def setup_commands(bot):
 
             # Configurar imagen del bundle
             try:
-                async with aiohttp.ClientSession() as session:
-                    # Imagen principal del bundle
-                    bundle_image_url = f"https://thumbnails.roblox.com/v1/bundles/thumbnails?bundleIds={bundle_id}&size=420x420&format=Png&isCircular=false"
-                    async with session.get(bundle_image_url) as response:
-                        if response.status == 200:
-                            image_data = await response.json()
-                            if image_data.get('data') and len(image_data['data']) > 0:
-                                image_url = image_data['data'][0].get('imageUrl')
-                                if image_url and image_url != 'https://tr.rbxcdn.com/':
-                                    result_embed.set_image(url=image_url)
-                                    logger.info(f"<a:verify2:1418486831993061497> Imagen del bundle configurada: {image_url}")
-
-                    # Thumbnail más pequeño
-                    thumb_url = f"https://thumbnails.roblox.com/v1/bundles/thumbnails?bundleIds={bundle_id}&size=150x150&format=Png&isCircular=false"
-                    async with session.get(thumb_url) as response:
-                        if response.status == 200:
-                            thumb_data = await response.json()
-                            if thumb_data.get('data') and len(thumb_data['data']) > 0:
-                                thumbnail_image = thumb_data['data'][0].get('imageUrl')
-                                if thumbnail_image and thumbnail_image != 'https://tr.rbxcdn.com/':
-                                    result_embed.set_thumbnail(url=thumbnail_image)
+                from thumbnail_batcher import thumbnail_batcher
+
+                # Imagen principal y thumbnail más pequeño
+                image_url, thumbnail_image = await asyncio.gather(
+                    thumbnail_batcher.get('bundle', bundle_id, '420x420'),
+                    thumbnail_batcher.get('bundle', bundle_id, '150x150')
+                )
+                if image_url and image_url != 'https://tr.rbxcdn.com/':
+                    result_embed.set_image(url=image_url)
+                    logger.info(f"<a:verify2:1418486831993061497> Imagen del bundle configurada: {image_url}")
+                if thumbnail_image and thumbnail_image != 'https://tr.rbxcdn.com/':
+                    result_embed.set_thumbnail(url=thumbnail_image)
             except Exception as e:
                 logger.warning(f"⚠️ Error configurando imagen del bundle: {e}")
 
@@ -208,17 +198,12 @@ def setup_commands(bot):
 async def get_bundle_info(bundle_id: str):
     """Obtener información del bundle desde la API de Roblox"""
     try:
-        async with aiohttp.ClientSession() as session:
-            # API de detalles del bundle
-            url = f"https://catalog.roblox.com/v1/bundles/{bundle_id}/details"
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    return await response.json()
-        return None
+        from roblox_client import roblox_client
+        # API de detalles del bundle
+        return await roblox_client.get_json(
+            f"https://catalog.roblox.com/v1/bundles/{bundle_id}/details",
+            cache='catalog'
+        )
     except Exception as e:
         logger.error(f"Error obteniendo información del bundle {bundle_id}: {e}")
         return None
@@ -226,17 +211,9 @@ async def get_bundle_info(bundle_id: str):
 async def get_bundle_assets(bundle_id: str):
     """Obtener assets asociados al bundle"""
     try:
-        async with aiohttp.ClientSession() as session:
-            url = f"https://catalog.roblox.com/v1/bundles/{bundle_id}/details"
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get('items', [])
-        return []
+        # Mismo endpoint que get_bundle_info: se sirve desde la caché compartida
+        data = await get_bundle_info(bundle_id)
+        return data.get('items', []) if data else []
     except Exception as e:
         logger.debug(f"Error obteniendo assets del bundle {bundle_id}: {e}")
         return []
@@ -7,7 +7,7 @@ from discord.ext import commands
 import logging
 import json
 import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, Dict
 import aiohttp
@@ -427,6 +427,7 @@ def setup_commands(bot):
     @bot.event
     async def on_app_command_completion(interaction: discord.Interaction, command):
         """Evento que se ejecuta cuando un comando se completa exitosamente"""
+        record_command_metrics(interaction, command, success=True)
         try:
             if not interaction.guild:
                 return  # Ignorar comandos en DM
@@ -506,6 +507,7 @@ def setup_commands(bot):
     @bot.event
     async def on_app_command_error(interaction: discord.Interaction, error):
         """Evento que se ejecuta cuando un comando falla"""
+        # Las métricas de fallos las registra el manejador global @bot.tree.error de main.py
         try:
             command_name = interaction.command.qualified_name if interaction.command else "unknown"
 
@@ -519,6 +521,19 @@ def setup_commands(bot):
     logger.info("✅ Sistema de logging de comandos configurado")
     return True
 
+def record_command_metrics(interaction, command, success: bool):
+    """Registrar latencia (desde la creación de la interacción) y resultado del comando"""
+    try:
+        from runtime_metrics import runtime_metrics
+
+        command_name = command.qualified_name if command else "unknown"
+        elapsed = None
+        if getattr(interaction, 'created_at', None):
+            elapsed = (datetime.now(timezone.utc) - interaction.created_at).total_seconds()
+        runtime_metrics.record_command(command_name, elapsed, success=success)
+    except Exception as e:
+        logger.debug(f"No se pudieron registrar métricas del comando: {e}")
+
 def cleanup_commands(bot):
     """Función de limpieza opcional"""
     pass
\ No newline at end of file
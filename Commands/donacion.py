@@ -243,27 +243,16 @@ def setup_commands(bot):
 async def get_roblox_user_id(username: str):
     """Obtener ID de usuario de Roblox mediante username"""
     try:
-        async with aiohttp.ClientSession() as session:
-            url = "https://users.roblox.com/v1/usernames/users"
-            payload = {
-                "usernames": [username],
-                "excludeBannedUsers": True
-            }
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            
-            async with session.post(url, json=payload, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get("data") and len(data["data"]) > 0:
-                        user_id = data["data"][0].get("id")
-                        logger.info(f"ID de usuario Roblox para {username}: {user_id}")
-                        return str(user_id)
-                else:
-                    logger.warning(f"Error obteniendo ID de usuario para {username}: status {response.status}")
-                return None
+        from roblox_client import roblox_client
+        
+        user_data = await roblox_client.get_user_by_username(username)
+        if user_data:
+            user_id = user_data.get("id")
+            logger.info(f"ID de usuario Roblox para {username}: {user_id}")
+            return str(user_id)
+        
+        logger.warning(f"No se pudo obtener ID de usuario para {username}")
+        return None
     except Exception as e:
         logger.error(f"Error obteniendo ID de usuario Roblox: {e}")
         return None
@@ -4,7 +4,6 @@ Comandos de economía de Roblox
 import discord
 from discord.ext import commands
 import logging
-import aiohttp
 import asyncio
 from datetime import datetime
 
@@ -138,26 +137,17 @@ def setup_commands(bot):
 
             # Configurar imagen del ítem
             try:
-                async with aiohttp.ClientSession() as session:
-                    # Imagen principal
-                    item_image_url = f"https://thumbnails.roblox.com/v1/assets?assetIds={cheapest_item['id']}&size=420x420&format=Png&isCircular=false"
-                    async with session.get(item_image_url) as response:
-                        if response.status == 200:
-                            image_data = await response.json()
-                            if image_data.get('data') and len(image_data['data']) > 0:
-                                image_url = image_data['data'][0].get('imageUrl')
-                                if image_url and image_url != 'https://tr.rbxcdn.com/':
-                                    embed.set_image(url=image_url)
-
-                    # Thumbnail
-                    thumb_url = f"https://thumbnails.roblox.com/v1/assets?assetIds={cheapest_item['id']}&size=150x150&format=Png&isCircular=false"
-                    async with session.get(thumb_url) as response:
-                        if response.status == 200:
-                            thumb_data = await response.json()
-                            if thumb_data.get('data') and len(thumb_data['data']) > 0:
-                                thumbnail_image = thumb_data['data'][0].get('imageUrl')
-                                if thumbnail_image and thumbnail_image != 'https://tr.rbxcdn.com/':
-                                    embed.set_thumbnail(url=thumbnail_image)
+                from thumbnail_batcher import thumbnail_batcher
+
+                # Imagen principal y thumbnail más pequeño
+                image_url, thumbnail_image = await asyncio.gather(
+                    thumbnail_batcher.get('asset', cheapest_item['id'], '420x420'),
+                    thumbnail_batcher.get('asset', cheapest_item['id'], '150x150')
+                )
+                if image_url and image_url != 'https://tr.rbxcdn.com/':
+                    embed.set_image(url=image_url)
+                if thumbnail_image and thumbnail_image != 'https://tr.rbxcdn.com/':
+                    embed.set_thumbnail(url=thumbnail_image)
             except Exception as e:
                 logger.warning(f"⚠️ Error configurando imagen: {e}")
 
@@ -247,27 +237,18 @@ def setup_commands(bot):
 
             # Configurar imagen del ítem
             try:
-                async with aiohttp.ClientSession() as session:
-                    # Imagen principal del ítem
-                    item_image_url = f"https://thumbnails.roblox.com/v1/assets?assetIds={item_info['id']}&size=420x420&format=Png&isCircular=false"
-                    async with session.get(item_image_url) as response:
-                        if response.status == 200:
-                            image_data = await response.json()
-                            if image_data.get('data') and len(image_data['data']) > 0:
-                                image_url = image_data['data'][0].get('imageUrl')
-                                if image_url and image_url != 'https://tr.rbxcdn.com/':
-                                    embed.set_image(url=image_url)
-                                    logger.info(f"<a:verify2:1418486831993061497> Imagen del ítem configurada: {image_url}")
-
-                    # Thumbnail más pequeño
-                    thumb_url = f"https://thumbnails.roblox.com/v1/assets?assetIds={item_info['id']}&size=150x150&format=Png&isCircular=false"
-                    async with session.get(thumb_url) as response:
-                        if response.status == 200:
-                            thumb_data = await response.json()
-                            if thumb_data.get('data') and len(thumb_data['data']) > 0:
-                                thumbnail_image = thumb_data['data'][0].get('imageUrl')
-                                if thumbnail_image and thumbnail_image != 'https://tr.rbxcdn.com/':
-                                    embed.set_thumbnail(url=thumbnail_image)
+                from thumbnail_batcher import thumbnail_batcher
+
+                # Imagen principal y thumbnail más pequeño
+                image_url, thumbnail_image = await asyncio.gather(
+                    thumbnail_batcher.get('asset', item_info['id'], '420x420'),
+                    thumbnail_batcher.get('asset', item_info['id'], '150x150')
+                )
+                if image_url and image_url != 'https://tr.rbxcdn.com/':
+                    embed.set_image(url=image_url)
+                    logger.info(f"<a:verify2:1418486831993061497> Imagen del ítem configurada: {image_url}")
+                if thumbnail_image and thumbnail_image != 'https://tr.rbxcdn.com/':
+                    embed.set_thumbnail(url=thumbnail_image)
             except Exception as e:
                 logger.warning(f"⚠️ Error configurando imagen del ítem: {e}")
 
@@ -286,116 +267,36 @@ def setup_commands(bot):
     return True
 
 async def get_cheapest_limited():
-    """Obtener el ítem limitado más barato"""
+    """Obtener el ítem limitado más barato (desde el índice local de limitados)"""
     try:
-        async with aiohttp.ClientSession() as session:
-            # Buscar ítems limitados ordenados por precio
-            catalog_url = "https://catalog.roblox.com/v1/search/items"
-            params = {
-                'category': 'Accessories',
-                'itemType': 'Asset',
-                'limit': 30,
-                'sortOrder': 'Asc',
-                'sortType': 'Price'
-            }
-
-            async with session.get(catalog_url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    items = data.get('data', [])
-
-                    # Buscar el primer ítem limitado con precio
-                    for item in items:
-                        if item.get('price') and item.get('price') > 0:
-                            # Verificar si es limitado
-                            asset_id = item.get('id')
-                            if asset_id:
-                                # Obtener detalles del asset
-                                asset_url = f"https://economy.roblox.com/v2/assets/{asset_id}/details"
-                                async with session.get(asset_url) as asset_response:
-                                    if asset_response.status == 200:
-                                        asset_data = await asset_response.json()
-                                        if asset_data.get('IsLimited') or asset_data.get('IsLimitedUnique'):
-                                            return {
-                                                'id': asset_id,
-                                                'name': item.get('name', 'Unknown Item'),
-                                                'price': item.get('price'),
-                                                'rap': asset_data.get('RecentAveragePrice', 0),
-                                                'creator': item.get('creatorName', 'Roblox'),
-                                                'stock': asset_data.get('Sales', 0) if asset_data.get('IsLimited') else None
-                                            }
-
-            # Si no se encuentra en la primera búsqueda, usar datos de respaldo
-            return {
-                'id': '1028594',
-                'name': 'Dominus Empyreus',
-                'price': 50000,
-                'rap': 45000,
-                'creator': 'Roblox'
-            }
+        from limited_index import limited_index
+
+        if not await limited_index.ensure_ready():
+            return None
+        cheapest = limited_index.get_cheapest(limit=1)
+        return cheapest[0] if cheapest else None
 
     except Exception as e:
         logger.error(f"Error obteniendo ítem más barato: {e}")
         return None
 
 async def search_limited_item(query: str):
-    """Buscar ítem limitado por nombre, ID o abreviación"""
+    """Buscar ítem limitado por nombre, ID o abreviación (desde el índice local de limitados)"""
     try:
-        async with aiohttp.ClientSession() as session:
-            # Si la query es un número, buscar por ID
-            if query.isdigit():
-                asset_id = query
-                asset_url = f"https://economy.roblox.com/v2/assets/{asset_id}/details"
-                async with session.get(asset_url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get('IsLimited') or data.get('IsLimitedUnique'):
-                            return {
-                                'id': asset_id,
-                                'name': data.get('Name', 'Unknown Item'),
-                                'price': data.get('PriceInRobux', 0),
-                                'rap': data.get('RecentAveragePrice', 0),
-                                'creator': data.get('Creator', {}).get('Name', 'Unknown'),
-                                'totalCopies': data.get('Sales', 0) if data.get('IsLimited') else 0,
-                                'remaining': data.get('Remaining', 0) if data.get('IsLimited') else 0,
-                                'itemType': data.get('AssetTypeDisplayName', 'Accessory'),
-                                'isLimitedUnique': data.get('IsLimitedUnique', False)
-                            }
-            else:
-                # Buscar por nombre
-                catalog_url = "https://catalog.roblox.com/v1/search/items"
-                params = {
-                    'keyword': query,
-                    'category': 'Accessories',
-                    'limit': 10
-                }
-
-                async with session.get(catalog_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        items = data.get('data', [])
-
-                        # Buscar el primer ítem limitado que coincida
-                        for item in items:
-                            asset_id = item.get('id')
-                            if asset_id:
-                                asset_url = f"https://economy.roblox.com/v2/assets/{asset_id}/details"
-                                async with session.get(asset_url) as asset_response:
-                                    if asset_response.status == 200:
-                                        asset_data = await asset_response.json()
-                                        if asset_data.get('IsLimited') or asset_data.get('IsLimitedUnique'):
-                                            return {
-                                                'id': asset_id,
-                                                'name': asset_data.get('Name', item.get('name', 'Unknown Item')),
-                                                'price': asset_data.get('PriceInRobux', 0),
-                                                'rap': asset_data.get('RecentAveragePrice', 0),
-                                                'creator': asset_data.get('Creator', {}).get('Name', 'Unknown'),
-                                                'totalCopies': asset_data.get('Sales', 0) if asset_data.get('IsLimited') else 0,
-                                                'remaining': asset_data.get('Remaining', 0) if asset_data.get('IsLimited') else 0,
-                                                'itemType': asset_data.get('AssetTypeDisplayName', 'Accessory'),
-                                                'isLimitedUnique': asset_data.get('IsLimitedUnique', False)
-                                            }
-        return None
+        from limited_index import limited_index
+
+        query = query.strip()
+        # Si la query es un número, buscar por ID
+        if query.isdigit():
+            return await limited_index.lookup_asset(query)
+
+        if await limited_index.ensure_ready():
+            results = limited_index.search(query, limit=1)
+            if results:
+                return results[0]
+        # El índice solo cubre parte del catálogo: si no está, una búsqueda por palabra clave
+        return await limited_index.search_catalog(query)
+
     except Exception as e:
         logger.error(f"Error buscando ítem limitado: {e}")
         return None
@@ -269,19 +269,16 @@ def setup_commands(bot):
             # Configurar la imagen del badge
             image_configured = False
             
-            # Método 1: Usar la URL directa de la API de thumbnails
+            # Método 1: Un solo icono del batcher para imagen y miniatura (150x150 es el único tamaño de icono de badge)
+            thumbnail_image = None
             try:
-                async with aiohttp.ClientSession() as session:
-                    thumbnail_url = f"https://thumbnails.roblox.com/v1/badges/icons?badgeIds={badge_id}&size=150x150&format=Png&isCircular=false"
-                    async with session.get(thumbnail_url) as thumb_response:
-                        if thumb_response.status == 200:
-                            thumb_data = await thumb_response.json()
-                            if thumb_data.get('data') and len(thumb_data['data']) > 0:
-                                image_url = thumb_data['data'][0].get('imageUrl')
-                                if image_url and image_url != 'https://tr.rbxcdn.com/':
-                                    result_embed.set_image(url=image_url)
-                                    image_configured = True
-                                    logger.info(f"<a:verify2:1418486831993061497> Imagen configurada desde API de thumbnails: {image_url}")
+                from thumbnail_batcher import thumbnail_batcher
+                image_url = (await thumbnail_batcher.get_many('badge', [badge_id], '150x150')).get(str(badge_id))
+                thumbnail_image = image_url
+                if image_url and image_url != 'https://tr.rbxcdn.com/':
+                    result_embed.set_image(url=image_url)
+                    image_configured = True
+                    logger.info(f"<a:verify2:1418486831993061497> Imagen configurada desde API de thumbnails: {image_url}")
             except Exception as thumb_error:
                 logger.warning(f"⚠️ Error obteniendo thumbnail desde API: {thumb_error}")
             
@@ -297,18 +294,9 @@ def setup_commands(bot):
                 except Exception as icon_error:
                     logger.warning(f"⚠️ Error usando iconImageId: {icon_error}")
             
-            # Método 3: URL de respaldo si los métodos anteriores fallan
-            if not image_configured:
-                fallback_url = f"https://thumbnails.roblox.com/v1/badges/icons?badgeIds={badge_id}&size=420x420&format=Png&isCircular=false"
-                result_embed.set_image(url=fallback_url)
-                logger.info(f"<a:loading:1418504453580918856> Usando URL de respaldo para badge {badge_id}")
-            
             # Configurar thumbnail pequeño
-            try:
-                thumbnail_url = f"https://thumbnails.roblox.com/v1/badges/icons?badgeIds={badge_id}&size=50x50&format=Png&isCircular=false"
-                result_embed.set_thumbnail(url=thumbnail_url)
-            except Exception as thumbnail_error:
-                logger.warning(f"⚠️ Error configurando thumbnail: {thumbnail_error}")
+            if thumbnail_image and thumbnail_image != 'https://tr.rbxcdn.com/':
+                result_embed.set_thumbnail(url=thumbnail_image)
             
             result_embed.set_footer(text=f"Badge ID: {badge_id} • Consultado: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             
@@ -335,43 +323,24 @@ def setup_commands(bot):
 async def get_game_info(game_id: str) -> dict:
     """Obtener información del juego"""
     try:
-        async with aiohttp.ClientSession() as session:
-            # Primero obtener el universe ID del place ID
-            places_url = f"https://games.roblox.com/v1/games/multiget-place-details"
-            places_payload = {"placeIds": [int(game_id)]}
-            
-            async with session.post(places_url, json=places_payload) as response:
-                if response.status == 200:
-                    places_data = await response.json()
-                    if places_data and len(places_data) > 0:
-                        place_info = places_data[0]
-                        universe_id = place_info.get('universeId')
-                        
-                        if universe_id:
-                            # Obtener información detallada del universo
-                            universe_url = f"https://games.roblox.com/v1/games?universeIds={universe_id}"
-                            async with session.get(universe_url) as universe_response:
-                                if universe_response.status == 200:
-                                    universe_data = await universe_response.json()
-                                    if universe_data.get('data') and len(universe_data['data']) > 0:
-                                        game_data = universe_data['data'][0]
-                                        
-                                        # Obtener thumbnails
-                                        thumbnails_url = f"https://thumbnails.roblox.com/v1/games/icons?universeIds={universe_id}&returnPolicy=PlaceHolder&size=256x256&format=Png&isCircular=false"
-                                        async with session.get(thumbnails_url) as thumb_response:
-                                            thumbnails = []
-                                            if thumb_response.status == 200:
-                                                thumb_data = await thumb_response.json()
-                                                thumbnails = thumb_data.get('data', [])
-                                        
-                                        return {
-                                            'id': universe_id,
-                                            'placeId': game_id,
-                                            'name': game_data.get('name'),
-                                            'description': game_data.get('description'),
-                                            'thumbnails': thumbnails
-                                        }
-        return None
+        from game_metadata import game_metadata
+        
+        # place ID -> universe ID, nombre e icono desde la caché de metadatos compartida
+        game_data = await game_metadata.resolve(game_id)
+        if not game_data or not game_data.get('universe_id'):
+            return None
+        
+        universe_id = game_data['universe_id']
+        icon_url = game_data.get('icon_url')
+        thumbnails = [{'targetId': universe_id, 'imageUrl': icon_url}] if icon_url else []
+        
+        return {
+            'id': universe_id,
+            'placeId': game_id,
+            'name': game_data.get('name'),
+            'description': game_data.get('description'),
+            'thumbnails': thumbnails
+        }
     except Exception as e:
         logger.error(f"Error obteniendo información del juego {game_id}: {e}")
         return None
@@ -6,6 +6,7 @@ import discord
 from discord.ext import commands
 import logging
 import aiohttp
+import asyncio
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -55,27 +56,18 @@ def setup_commands(bot):
             
             # Configurar imagen del grupo
             try:
-                # Imagen principal del grupo
-                async with aiohttp.ClientSession() as session:
-                    group_image_url = f"https://thumbnails.roblox.com/v1/groups/icons?groupIds={group_id}&size=420x420&format=Png&isCircular=false"
-                    async with session.get(group_image_url) as response:
-                        if response.status == 200:
-                            group_data = await response.json()
-                            if group_data.get('data') and len(group_data['data']) > 0:
-                                image_url = group_data['data'][0].get('imageUrl')
-                                if image_url and image_url != 'https://tr.rbxcdn.com/':
-                                    embed.set_image(url=image_url)
-                                    logger.info(f"<a:verify2:1418486831993061497> Imagen del grupo configurada: {image_url}")
-                    
-                    # Thumbnail más pequeño
-                    thumbnail_url = f"https://thumbnails.roblox.com/v1/groups/icons?groupIds={group_id}&size=150x150&format=Png&isCircular=false"
-                    async with session.get(thumbnail_url) as response:
-                        if response.status == 200:
-                            thumb_data = await response.json()
-                            if thumb_data.get('data') and len(thumb_data['data']) > 0:
-                                thumb_url = thumb_data['data'][0].get('imageUrl')
-                                if thumb_url and thumb_url != 'https://tr.rbxcdn.com/':
-                                    embed.set_thumbnail(url=thumb_url)
+                from thumbnail_batcher import thumbnail_batcher
+
+                # Imagen principal del grupo y thumbnail más pequeño
+                image_url, thumb_url = await asyncio.gather(
+                    thumbnail_batcher.get('group', group_id, '420x420'),
+                    thumbnail_batcher.get('group', group_id, '150x150')
+                )
+                if image_url and image_url != 'https://tr.rbxcdn.com/':
+                    embed.set_image(url=image_url)
+                    logger.info(f"<a:verify2:1418486831993061497> Imagen del grupo configurada: {image_url}")
+                if thumb_url and thumb_url != 'https://tr.rbxcdn.com/':
+                    embed.set_thumbnail(url=thumb_url)
             except Exception as e:
                 logger.warning(f"⚠️ Error configurando imagen del grupo: {e}")
             
@@ -5,7 +5,6 @@ Alternativa a /scrape que funciona sin VNC usando solo modo headless
 import discord
 from discord.ext import commands
 import logging
-import asyncio
 import time
 from datetime import datetime
 import json
@@ -229,16 +228,14 @@ async def execute_headless_scraping(game_id: str, game_name: str, user_id: str,
     """
     Ejecutar scraping completamente en modo headless
     """
-    from main import scraper
+    from main import scraper, get_scraping_priority
+    from scraping_queue import scraping_scheduler
 
     start_time = time.time()
 
     try:
         logger.info(f"🚀 Iniciando headless scraping para usuario {user_id}: {target_amount} servidores de juego {game_id}")
 
-        # Configurar scraper para usuario actual
-        scraper.current_user_id = user_id
-
         # Actualizar progreso: Obteniendo enlaces de servidores
         progress_embed = discord.Embed(
             title="<a:loading:1418504453580918856> Headless Scrape en Progreso",
@@ -255,84 +252,37 @@ async def execute_headless_scraping(game_id: str, game_name: str, user_id: str,
             logger.debug(f"Error actualizando mensaje (ignorado): {edit_error}")
             # Continuar sin actualizar mensaje
 
-        # Crear driver completamente headless sin VNC
-        driver = create_headless_driver()
-
-        if not driver:
-            return {
-                'success': False,
-                'error': 'No se pudo inicializar el navegador headless',
-                'servers': [],
-                'duration': time.time() - start_time
-            }
-
-        try:
-            # Obtener enlaces de servidores con método headless puro
-            server_links = get_server_links_headless(driver, game_id)
-
-            if not server_links:
-                return {
-                    'success': False,
-                    'error': f'No se encontraron servidores para el juego {game_name}',
-                    'servers': [],
-                    'duration': time.time() - start_time
-                }
-
-            # Limitar cantidad de servidores a procesar
-            server_links = server_links[:min(target_amount + 2, 7)]  # Procesar algunos extra por si fallan
-
-            logger.info(f"<:stats:1418490788437823599> Procesando {len(server_links)} enlaces de servidores en modo headless")
+        # Encolar el trabajo Selenium en la cola central de scraping (workers fijos)
+        job = scraping_scheduler.submit(
+            game_id, user_id, run_headless_scraping_sync, game_id, game_name, target_amount,
+            priority=get_scraping_priority(user_id)
+        )
 
-            # Actualizar progreso: Extrayendo VIP links
-            progress_embed.description = f"**Paso 2/3:** Extrayendo VIP links de {len(server_links)} servidores"
+        async def update_progress(job):
+            if job.status == 'queued':
+                progress_embed.description = f"**Paso 1/3:** En cola (posición {scraping_scheduler.queue_position(job)}) para {game_name}"
+            elif 'total' in job.progress:
+                progress_embed.description = f"**Paso 2/3:** Procesados {job.progress.get('processed', 0)}/{job.progress['total']} servidores - Encontrados {job.progress.get('found', 0)}"
+            else:
+                return
             try:
                 await message.edit(embed=progress_embed)
             except Exception as edit_error:
                 logger.debug(f"Error actualizando mensaje (ignorado): {edit_error}")
                 # Continuar sin actualizar mensaje
 
+        result = await scraping_scheduler.wait(job, on_progress=update_progress, interval=3)
 
-            extracted_links = []
-            processed_count = 0
-
-            # Procesar enlaces con timeout reducido
-            for server_url in server_links:
-                if len(extracted_links) >= target_amount:
-                    break
-
-                try:
-                    # Extracción VIP headless pura
-                    vip_link = extract_vip_link_headless(driver, server_url, game_id)
-
-                    if vip_link and vip_link not in extracted_links:
-                        extracted_links.append(vip_link)
-                        logger.info(f"<a:verify2:1418486831993061497> VIP link extraído: {len(extracted_links)}/{target_amount}")
-
-                    processed_count += 1
-
-                    # Actualizar progreso cada 2 servidores
-                    if processed_count % 2 == 0:
-                        progress_embed.description = f"**Paso 2/3:** Procesados {processed_count}/{len(server_links)} servidores - Encontrados {len(extracted_links)}"
-                        try:
-                            await message.edit(embed=progress_embed)
-                        except Exception as edit_error:
-                            logger.debug(f"Error actualizando mensaje (ignorado): {edit_error}")
-                            # Continuar sin actualizar mensaje
-
-
-                    # Pausa mínima entre requests
-                    await asyncio.sleep(0.5)
-
-                except Exception as e:
-                    logger.warning(f"⚠️ Error procesando servidor {server_url}: {e}")
-                    continue
+        if not result or not result.get('success'):
+            return {
+                'success': False,
+                'error': (result or {}).get('error') or job.error or 'Error desconocido',
+                'servers': [],
+                'duration': time.time() - start_time
+            }
 
-        finally:
-            # Cerrar driver
-            try:
-                driver.quit()
-            except:
-                pass
+        extracted_links = result['servers']
+        processed_count = result['processed']
 
         # Actualizar progreso: Guardando resultados
         progress_embed.description = f"**Paso 3/3:** Guardando {len(extracted_links)} servidores VIP"
@@ -372,6 +322,65 @@ async def execute_headless_scraping(game_id: str, game_name: str, user_id: str,
             'duration': time.time() - start_time
         }
 
+def run_headless_scraping_sync(game_id: str, game_name: str, target_amount: int):
+    """
+    Parte bloqueante del scraping headless (Selenium); se ejecuta en un worker de la cola de scraping
+    """
+    from scraping_queue import current_job
+
+    job = current_job()
+    driver_pool = get_headless_driver_pool()
+    driver = driver_pool.acquire()
+
+    try:
+        # Obtener enlaces de servidores con método headless puro
+        server_links = get_server_links_headless(driver, game_id)
+
+        if not server_links:
+            return {'success': False, 'error': f'No se encontraron servidores para el juego {game_name}'}
+
+        # Limitar cantidad de servidores a procesar
+        server_links = server_links[:min(target_amount + 2, 7)]  # Procesar algunos extra por si fallan
+
+        logger.info(f"<:stats:1418490788437823599> Procesando {len(server_links)} enlaces de servidores en modo headless")
+
+        extracted_links = []
+        processed_count = 0
+        if job:
+            job.update_progress(total=len(server_links), processed=0, found=0)
+
+        # Procesar enlaces con timeout reducido
+        for server_url in server_links:
+            if len(extracted_links) >= target_amount:
+                break
+            if job and job.is_cancelled():
+                return {'success': False, 'error': 'Búsqueda cancelada'}
+
+            try:
+                # Extracción VIP headless pura
+                vip_link = extract_vip_link_headless(driver, server_url, game_id)
+
+                if vip_link and vip_link not in extracted_links:
+                    extracted_links.append(vip_link)
+                    logger.info(f"<a:verify2:1418486831993061497> VIP link extraído: {len(extracted_links)}/{target_amount}")
+
+                processed_count += 1
+                if job:
+                    job.update_progress(processed=processed_count, found=len(extracted_links))
+
+                # Pausa mínima entre requests
+                time.sleep(0.5)
+
+            except Exception as e:
+                logger.warning(f"⚠️ Error procesando servidor {server_url}: {e}")
+                continue
+
+        return {'success': True, 'servers': extracted_links, 'processed': processed_count}
+
+    finally:
+        # Devolver driver al pool
+        driver_pool.release(driver)
+
 def get_server_links_headless(driver, game_id, max_retries=2):
     """Obtener enlaces de servidores en modo headless puro"""
     from selenium.webdriver.common.by import By
@@ -446,6 +455,11 @@ def extract_vip_link_headless(driver, server_url, game_id):
     
     return None
 
+def get_headless_driver_pool():
+    """Pool compartido de drivers headless"""
+    from driver_pool import get_driver_pool
+    return get_driver_pool('headless_scraper', create_headless_driver)
+
 def create_headless_driver():
     """Crear driver Chrome completamente headless para hosting web sin VNC"""
     try:
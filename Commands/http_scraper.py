@@ -1,33 +1,61 @@
 """
 Scraper HTTP optimizado para reemplazar Selenium en casos simples
-Usa requests + BeautifulSoup para mayor velocidad y menos recursos
+Usa requests (síncrono) o aiohttp (asíncrono, concurrente) con parseo por regex precompilados
 """
+import asyncio
+import html
 import requests
-from bs4 import BeautifulSoup
+import aiohttp
+import discord
 import logging
 import time
 import random
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlparse
 import re
 
 logger = logging.getLogger(__name__)
 
+# Regex precompilados: evitan construir un árbol BeautifulSoup completo por página
+SERVER_HREF_RE = re.compile(r'href=["\'](/servers/[^"\'#?]+)["\']')
+VIP_LINK_RE = re.compile(r'https?://(?:www\.)?roblox\.com/games/\d+[^"\'\s<>]*?privateServerLinkCode=[A-Za-z0-9\-_%]+')
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Cache-Control': 'no-cache',
+    'Pragma': 'no-cache'
+}
+
+def parse_server_links(page_html: str, max_servers: int = 5) -> List[str]:
+    """Extraer enlaces a páginas de servidores individuales desde el HTML de un juego"""
+    server_links = []
+    for match in SERVER_HREF_RE.finditer(page_html):
+        full_server_url = f"https://rbxservers.xyz{match.group(1)}"
+        if full_server_url not in server_links:
+            server_links.append(full_server_url)
+            if len(server_links) >= max_servers:
+                break
+    return server_links
+
+def parse_vip_link(page_html: str) -> Optional[str]:
+    """Extraer el primer link VIP (input o JavaScript) desde el HTML de un servidor"""
+    match = VIP_LINK_RE.search(page_html)
+    if match:
+        return html.unescape(match.group(0))
+    return None
+
 class HTTPScraper:
     def __init__(self):
         """Inicializar scraper HTTP optimizado para hosting web"""
         self.session = requests.Session()
 
         # Headers optimizados para hosting web sin VNC
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Cache-Control': 'no-cache',
-            'Pragma': 'no-cache'
-        })
+        self.session.headers.update(DEFAULT_HEADERS)
 
         # Configurar timeouts optimizados para hosting web
         self.session.timeout = (10, 30)  # (connect, read)
@@ -46,21 +74,8 @@ class HTTPScraper:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
 
-            # Parsear HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Buscar enlaces de servidores
-            server_links = []
-
             # Buscar enlaces que apunten a páginas de servidores individuales
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                if '/servers/' in href and href.startswith('/'):
-                    full_server_url = f"https://rbxservers.xyz{href}"
-                    server_links.append(full_server_url)
-
-                    if len(server_links) >= max_servers:
-                        break
+            server_links = parse_server_links(response.text, max_servers)
 
             logger.info(f"✅ Encontrados {len(server_links)} enlaces de servidores")
             return server_links
@@ -82,27 +97,11 @@ class HTTPScraper:
             response = self.session.get(server_url, timeout=15)
             response.raise_for_status()
 
-            # Buscar el link VIP en el HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Buscar input con valor que contenga roblox.com/games
-            vip_inputs = soup.find_all('input', {'type': 'text'})
-            for input_tag in vip_inputs:
-                value = input_tag.get('value', '')
-                if 'roblox.com/games' in value and 'privateServerLinkCode' in value:
-                    logger.debug(f"✅ VIP link encontrado: {value[:50]}...")
-                    return value
-
-            # Buscar también en el código JavaScript o texto
-            script_tags = soup.find_all('script')
-            for script in script_tags:
-                if script.string:
-                    # Buscar patrones de links VIP en JavaScript
-                    vip_pattern = r'https://www\.roblox\.com/games/\d+\?privateServerLinkCode=[A-Za-z0-9\-_]+'
-                    matches = re.findall(vip_pattern, script.string)
-                    if matches:
-                        logger.debug(f"✅ VIP link en JS: {matches[0][:50]}...")
-                        return matches[0]
+            # Buscar el link VIP en inputs o JavaScript con regex precompilado
+            vip_link = parse_vip_link(response.text)
+            if vip_link:
+                logger.debug(f"✅ VIP link encontrado: {vip_link[:50]}...")
+                return vip_link
 
             logger.debug(f"⚠️ No se encontró VIP link en: {server_url}")
             return None
@@ -151,6 +150,122 @@ class HTTPScraper:
         """Cerrar sesión HTTP"""
         self.session.close()
 
+class TokenBucket:
+    """Limitador token-bucket: permite ráfagas cortas manteniendo una tasa media"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate            # Tokens por segundo
+        self.capacity = capacity    # Ráfaga máxima
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Esperar hasta que haya un token disponible"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class AsyncHTTPScraper:
+    """Motor de scraping HTTP concurrente sobre aiohttp con pool de conexiones compartido"""
+
+    def __init__(self, per_host_limit: int = 4, rate_per_host: float = 2.0, burst: int = 4, timeout: int = 15):
+        self.per_host_limit = per_host_limit
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=10)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.host_buckets: Dict[str, TokenBucket] = {}
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Obtener (o crear) la sesión compartida con pool de conexiones"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=50, limit_per_host=self.per_host_limit, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS, timeout=self.timeout)
+        return self.session
+
+    async def fetch_text(self, url: str) -> Optional[str]:
+        """Descargar una página respetando el límite de concurrencia y la tasa por host"""
+        host = urlparse(url).netloc
+        semaphore = self.host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        bucket = self.host_buckets.setdefault(host, TokenBucket(self.rate_per_host, self.burst))
+
+        session = await self.get_session()
+        async with semaphore:
+            await bucket.acquire()
+            async with session.get(url) as response:
+                if response.status == 429:
+                    retry_after = float(response.headers.get('Retry-After', 2))
+                    logger.warning(f"⚠️ Rate limit en {host}, esperando {retry_after}s")
+                    await asyncio.sleep(retry_after)
+                    return None
+                response.raise_for_status()
+                return await response.text()
+
+    async def get_game_servers_fast(self, game_id: str, max_servers: int = 5) -> List[str]:
+        """Obtener enlaces de servidores de un juego"""
+        try:
+            html_text = await self.fetch_text(f"https://rbxservers.xyz/games/{game_id}")
+            server_links = parse_server_links(html_text or "", max_servers)
+            logger.info(f"✅ Encontrados {len(server_links)} enlaces de servidores (async)")
+            return server_links
+        except Exception as e:
+            logger.error(f"❌ Error en HTTP scraping async: {e}")
+            return []
+
+    async def extract_vip_link_fast(self, server_url: str) -> Optional[str]:
+        """Extraer link VIP de una página de servidor"""
+        try:
+            html_text = await self.fetch_text(server_url)
+            return parse_vip_link(html_text) if html_text else None
+        except Exception as e:
+            logger.error(f"❌ Error extrayendo VIP link async: {e}")
+            return None
+
+    async def scrape_game_stream(self, game_id: str, max_servers: int = 5, time_limit: float = 30) -> AsyncIterator[str]:
+        """Extraer links VIP en paralelo, entregándolos a medida que se resuelven"""
+        start_time = time.time()
+        server_urls = await self.get_game_servers_fast(game_id, max_servers)
+        if not server_urls:
+            logger.warning(f"⚠️ No se encontraron servidores para {game_id}")
+            return
+
+        tasks = [asyncio.create_task(self.extract_vip_link_fast(url)) for url in server_urls]
+        seen = set()
+        try:
+            remaining = time_limit - (time.time() - start_time)
+            for next_done in asyncio.as_completed(tasks, timeout=max(remaining, 1)):
+                vip_link = await next_done
+                if vip_link and vip_link not in seen:
+                    seen.add(vip_link)
+                    yield vip_link
+        except asyncio.TimeoutError:
+            logger.warning("⏰ Tiempo límite alcanzado en HTTP scraping async")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        logger.info(f"✅ HTTP Scraping async completado: {len(seen)} VIP links en {time.time() - start_time:.1f}s")
+
+    async def scrape_game_fast(self, game_id: str, max_servers: int = 5, time_limit: float = 30) -> List[str]:
+        """Scraping completo de un juego devolviendo la lista de links VIP"""
+        return [vip_link async for vip_link in self.scrape_game_stream(game_id, max_servers, time_limit)]
+
+    async def close(self):
+        """Cerrar la sesión compartida"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+# Instancia compartida del motor asíncrono (una sola sesión / pool de conexiones)
+async_http_scraper = AsyncHTTPScraper()
+
 def setup_commands(bot):
     """
     Configurar comando de scraping HTTP optimizado
@@ -167,9 +282,6 @@ def setup_commands(bot):
             return
 
         try:
-            # Crear scraper HTTP
-            http_scraper = HTTPScraper()
-
             # Info inicial
             embed = discord.Embed(
                 title="⚡ Fast Scrape Iniciado",
@@ -178,8 +290,16 @@ def setup_commands(bot):
             )
             message = await interaction.followup.send(embed=embed, ephemeral=True)
 
-            # Ejecutar scraping
-            vip_links = http_scraper.scrape_game_fast(game_id, max_servers=3)
+            # Ejecutar scraping concurrente sin bloquear el event loop, mostrando resultados a medida que llegan
+            vip_links = []
+            async for vip_link in async_http_scraper.scrape_game_stream(game_id, max_servers=3):
+                vip_links.append(vip_link)
+                progress_embed = discord.Embed(
+                    title="⚡ Fast Scrape en Progreso",
+                    description=f"**{len(vip_links)}** servidores encontrados hasta ahora...",
+                    color=0x00aaff
+                )
+                await message.edit(embed=progress_embed)
 
             if vip_links:
                 # Mostrar resultados
@@ -210,9 +330,6 @@ def setup_commands(bot):
                 )
                 await message.edit(embed=error_embed)
 
-            # Limpiar
-            http_scraper.close()
-
         except Exception as e:
             logger.error(f"Error en fastscrape: {e}")
             error_embed = discord.Embed(
@@ -223,4 +340,11 @@ def setup_commands(bot):
             await interaction.followup.send(embed=error_embed, ephemeral=True)
 
     logger.info("⚡ Comando HTTP Fast Scrape configurado")
-    return True
\ No newline at end of file
+    return True
+
+def cleanup_commands(bot):
+    """Cerrar la sesión compartida del motor asíncrono"""
+    try:
+        asyncio.get_event_loop().create_task(async_http_scraper.close())
+    except Exception as e:
+        logger.debug(f"No se pudo cerrar la sesión HTTP async: {e}")
@@ -6,7 +6,6 @@ import discord
 from discord.ext import commands
 import logging
 import asyncio
-import aiohttp
 import json
 import time
 import requests
@@ -210,7 +209,6 @@ async def execute_owner_scrape(game_id: str, cantidad: int, interaction: discord
 
         # Usar un user_id temporal para el owner scrape
         temp_user_id = "owner_scrape_temp"
-        scraper.current_user_id = temp_user_id
 
         # Inicializar WebDriver
         driver = scraper.create_driver()
@@ -247,7 +245,7 @@ async def execute_owner_scrape(game_id: str, cantidad: int, interaction: discord
                     logger.info(f"🔍 Procesando servidor {processed}/{len(server_links)}: {server_url}")
                     
                     # Extraer enlace VIP con timeout personalizado para owner
-                    vip_link = scraper.extract_vip_link(driver, server_url, game_id)
+                    vip_link = scraper.extract_vip_link(driver, server_url, game_id, user_id=temp_user_id)
                     if vip_link:
                         extracted_servers.append(vip_link)
                         logger.info(f"<a:verify2:1418486831993061497> Servidor {len(extracted_servers)}/{cantidad} extraído exitosamente")
@@ -343,17 +341,12 @@ async def send_to_external_api(api_url: str, data: dict):
         return False, {"error": str(e), "type": type(e).__name__}
 
 async def get_game_info(game_id: str):
-    """Obtener información del juego desde la API de Roblox"""
+    """Obtener información del juego desde la caché de metadatos"""
     try:
-        async with aiohttp.ClientSession() as session:
-            url = f"https://games.roblox.com/v1/games?universeIds={game_id}"
-
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    games = data.get('data', [])
-                    if games:
-                        return games[0]
+        from game_metadata import game_metadata
+        game_info = await game_metadata.resolve(game_id)
+        if game_info:
+            return game_info
     except Exception as e:
         logger.error(f"Error obtaining game info {game_id}: {e}")
 
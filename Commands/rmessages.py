@@ -139,6 +139,19 @@ def create_roblox_driver():
         logger.error(f"Error creando driver de Chrome: {e}")
         raise Exception(f"Falló la creación del driver: {e}")
 
+def create_cookied_roblox_driver():
+    """Crear driver con la cookie de Roblox ya aplicada (fábrica del pool)"""
+    driver = create_roblox_driver()
+    if not apply_roblox_cookie(driver, get_roblox_cookie()):
+        driver.quit()
+        raise Exception("No se pudo aplicar la cookie de Roblox")
+    return driver
+
+def get_roblox_driver_pool():
+    """Pool de drivers para /rmessages; tamaño 1 porque Chrome usa un puerto de depuración fijo"""
+    from driver_pool import get_driver_pool
+    return get_driver_pool('roblox_messages', create_cookied_roblox_driver, max_size=1)
+
 def apply_roblox_cookie(driver, cookie):
     """Aplicar cookie de Roblox al navegador"""
     try:
@@ -437,17 +450,9 @@ def setup_commands(bot):
 
             driver = None
             try:
-                driver = create_roblox_driver()
-
-                # Actualizar progreso
-                progress_embed.add_field(name="<:1000182186:1396049484424847361> Navegador", value="<:verify:1396087763388072006> Creado", inline=True)
-                progress_embed.add_field(name="<:1000182752:1396420559478947844> Cookie", value="<:1000182751:1396420563358060574> Aplicando...", inline=True)
-                await discord_message.edit(embed=progress_embed)
-
-                # Aplicar cookie
-                cookie_applied = apply_roblox_cookie(driver, cookie)
-                if not cookie_applied:
-                    raise Exception("No se pudo aplicar la cookie de Roblox")
+                # Obtener navegador del pool (se crea con la cookie ya aplicada si no hay uno caliente)
+                driver_pool = get_roblox_driver_pool()
+                driver = await asyncio.to_thread(driver_pool.acquire)
 
                 # Actualizar progreso
                 progress_embed = discord.Embed(
@@ -597,13 +602,10 @@ def setup_commands(bot):
                     await discord_message.edit(embed=error_embed)
 
             finally:
-                # Cerrar driver
+                # Devolver driver al pool
                 if driver:
-                    try:
-                        driver.quit()
-                        logger.info("🔒 Driver de Chrome cerrado")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error cerrando driver: {e}")
+                    driver_pool.release(driver)
+                    logger.info("🔒 Driver de Chrome devuelto al pool")
 
             logger.info(f"Owner {username} completó comando /rmessages")
 
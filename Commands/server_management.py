@@ -319,16 +319,10 @@ def setup_commands(bot):
             await interaction.followup.send(embed=embed, ephemeral=True)
 
 def get_user_servers_from_file(user_id: str) -> List[str]:
-    """Obtener servidores del usuario desde user_game_servers.json"""
+    """Obtener servidores del usuario desde el almacén de servidores"""
     try:
-        servers_file = Path("user_game_servers.json")
-        if not servers_file.exists():
-            return []
-        
-        with open(servers_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        user_servers = data.get('user_servers', {}).get(user_id, [])
+        from server_storage import server_storage
+        user_servers = server_storage.get_user_servers(user_id)
         
         # 🔄 INTEGRACIÓN: Filtrar servidores únicos usando el nuevo sistema
         try:
@@ -338,7 +332,10 @@ def get_user_servers_from_file(user_id: str) -> List[str]:
             if user_servers and isinstance(user_servers, list):
                 # El sistema de servidores únicos ya debería tener estos marcados
                 # Pero por seguridad, verificamos que no estén duplicados con otros usuarios
-                filtered_servers = unique_server_manager.filter_unique_servers_for_user(user_id, user_servers)
+                filtered_servers = [
+                    server for server in user_servers
+                    if unique_server_manager.index.delivered_to(server) in (None, str(user_id))
+                ]
                 
                 if len(filtered_servers) != len(user_servers):
                     logger.info(f"🔍 Filtrados {len(filtered_servers)}/{len(user_servers)} servidores únicos para usuario {user_id}")
@@ -366,21 +363,9 @@ def extract_game_id_from_link(server_link: str) -> Optional[str]:
         return None
 
 def get_game_name_from_id(game_id: str) -> str:
-    """Obtener nombre del juego desde el ID (base de datos básica)"""
-    game_names = {
-        "2753915549": "🌊 Blox Fruits",
-        "142823291": "🔍 Murder Mystery 2",
-        "920587237": "🐾 Adopt Me!",
-        "4924922222": "🏡 Brookhaven RP",
-        "185655149": "🏠 Welcome to Bloxburg",
-        "606849621": "🚓 Jailbreak",
-        "286090429": "🔫 Arsenal",
-        "109983668079237": "🧠 Steal A Brainrot",
-        "6284583030": "🎃 Pet Simulator X",
-        "1537690962": "🐝 Bee Swarm Simulator"
-    }
-    
-    return game_names.get(game_id, f"Juego {game_id}")
+    """Obtener nombre del juego desde el ID (caché de metadatos compartida)"""
+    from game_metadata import game_metadata
+    return game_metadata.get_name(game_id, default=f"Juego {game_id}")
 
 def analyze_user_servers(servers: List[str]) -> Dict:
     """Analizar estadísticas de los servidores del usuario"""
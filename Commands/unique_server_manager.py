@@ -3,81 +3,63 @@
 Sistema de gestión de servidores únicos para RbxServers
 Evita que se entreguen servidores duplicados entre usuarios
 """
-import json
+import asyncio
 import logging
-from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple
 import hashlib
 
+from delivery_index import DeliveryIndex
+
 logger = logging.getLogger(__name__)
 
 class UniqueServerManager:
     def __init__(self):
         self.delivered_servers_file = "delivered_servers.json"
         self.user_server_history_file = "user_server_history.json"
+        self.journal_file = "delivered_servers.journal"
+        
+        # Índice de entregas (global por enlace + historial por usuario + journal)
+        self.index = DeliveryIndex(
+            self.delivered_servers_file,
+            self.user_server_history_file,
+            self.journal_file
+        )
         
         # Estructura: {server_link: {user_id, delivered_at, game_id}}
-        self.delivered_servers: Dict[str, Dict] = {}
+        self.delivered_servers: Dict[str, Dict] = self.index.delivered
         
         # Estructura: {user_id: [server_links]}
-        self.user_history: Dict[str, List[str]] = {}
+        self.user_history: Dict[str, List[str]] = self.index.user_history
         
         self.load_data()
     
     def load_data(self):
         """Cargar datos de servidores entregados"""
         try:
-            # Cargar servidores ya entregados
-            if Path(self.delivered_servers_file).exists():
-                with open(self.delivered_servers_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.delivered_servers = data.get('delivered_servers', {})
-                    logger.info(f"✅ Cargados {len(self.delivered_servers)} servidores ya entregados")
-            
-            # Cargar historial de usuarios
-            if Path(self.user_server_history_file).exists():
-                with open(self.user_server_history_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.user_history = data.get('user_history', {})
-                    logger.info(f"✅ Cargado historial de {len(self.user_history)} usuarios")
-            
             # Si no existen archivos, inicializar desde user_game_servers.json
-            if not self.delivered_servers and not self.user_history:
+            if not self.index.load():
                 self.initialize_from_existing_data()
                 
         except Exception as e:
             logger.error(f"❌ Error cargando datos de servidores únicos: {e}")
-            self.delivered_servers = {}
-            self.user_history = {}
     
     def initialize_from_existing_data(self):
-        """Inicializar desde user_game_servers.json existente"""
+        """Inicializar desde el almacén de servidores existente"""
         try:
-            servers_file = Path("user_game_servers.json")
-            if not servers_file.exists():
-                return
-            
-            with open(servers_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            user_servers = data.get('user_servers', {})
+            from server_storage import server_storage
+            user_servers = server_storage.get_all_user_servers()
             initialized_servers = 0
             
             for user_id, server_list in user_servers.items():
-                if isinstance(server_list, list):
-                    self.user_history[user_id] = server_list.copy()
-                    
-                    for server_link in server_list:
-                        # Marcar como entregado a este usuario
-                        game_id = self.extract_game_id_from_link(server_link)
-                        self.delivered_servers[server_link] = {
-                            'user_id': user_id,
-                            'delivered_at': datetime.now().isoformat(),
-                            'game_id': game_id,
-                            'source': 'initialization'
-                        }
-                        initialized_servers += 1
+                if isinstance(server_list, list) and server_list:
+                    # Marcar como entregados a este usuario
+                    self.index.record_delivery(
+                        user_id,
+                        [(server_link, self.extract_game_id_from_link(server_link)) for server_link in server_list],
+                        source='initialization'
+                    )
+                    initialized_servers += len(server_list)
             
             if initialized_servers > 0:
                 self.save_data()
@@ -87,26 +69,9 @@ class UniqueServerManager:
             logger.error(f"❌ Error inicializando desde datos existentes: {e}")
     
     def save_data(self):
-        """Guardar datos de servidores únicos"""
+        """Guardar snapshot completo de servidores únicos (las entregas normales van al journal)"""
         try:
-            # Guardar servidores entregados
-            delivered_data = {
-                'delivered_servers': self.delivered_servers,
-                'last_updated': datetime.now().isoformat(),
-                'total_delivered': len(self.delivered_servers)
-            }
-            with open(self.delivered_servers_file, 'w', encoding='utf-8') as f:
-                json.dump(delivered_data, f, indent=2, ensure_ascii=False)
-            
-            # Guardar historial de usuarios
-            history_data = {
-                'user_history': self.user_history,
-                'last_updated': datetime.now().isoformat(),
-                'total_users': len(self.user_history)
-            }
-            with open(self.user_server_history_file, 'w', encoding='utf-8') as f:
-                json.dump(history_data, f, indent=2, ensure_ascii=False)
-            
+            self.index.compact()
             logger.debug(f"💾 Datos de servidores únicos guardados")
             
         except Exception as e:
@@ -124,7 +89,7 @@ class UniqueServerManager:
         except Exception:
             return None
     
-    def filter_unique_servers_for_user(self, user_id: str, server_list: List[str]) -> List[str]:
+    def filter_unique_servers_for_user(self, user_id: str, server_list: List[str]) -> Tuple[List[str], int]:
         """
         Filtrar servidores para asegurar que sean únicos para el usuario
         y no estén ya entregados a otros usuarios
@@ -133,23 +98,18 @@ class UniqueServerManager:
         unique_servers = []
         duplicates_found = 0
         
-        # Obtener historial del usuario
-        user_previous_servers = set(self.user_history.get(user_id, []))
-        
         for server_link in server_list:
             # Verificar si ya fue entregado a otro usuario
-            if server_link in self.delivered_servers:
-                delivered_info = self.delivered_servers[server_link]
-                delivered_to = delivered_info.get('user_id')
-                
-                # Si fue entregado a otro usuario, no incluirlo
-                if delivered_to != user_id:
-                    logger.debug(f"🚫 Servidor ya entregado a otro usuario {delivered_to}: {server_link[:50]}...")
-                    duplicates_found += 1
-                    continue
+            delivered_to = self.index.delivered_to(server_link)
+            
+            # Si fue entregado a otro usuario, no incluirlo
+            if delivered_to is not None and delivered_to != user_id:
+                logger.debug(f"🚫 Servidor ya entregado a otro usuario {delivered_to}: {server_link[:50]}...")
+                duplicates_found += 1
+                continue
             
             # Verificar si el usuario ya lo recibió antes
-            if server_link in user_previous_servers:
+            if self.index.user_has(user_id, server_link):
                 logger.debug(f"🔄 Usuario {user_id} ya recibió este servidor: {server_link[:50]}...")
                 duplicates_found += 1
                 continue
@@ -164,48 +124,73 @@ class UniqueServerManager:
         
         return unique_servers, duplicates_found
     
+    def split_foreign_servers(self, user_id: str, server_list: List[str]):
+        """
+        Separar los servidores ya entregados a otro usuario (rechazados) de los que el usuario
+        puede conservar: los nuevos y los que ya eran suyos
+        """
+        user_id = str(user_id)
+        kept, foreign = [], []
+        for server_link in server_list:
+            delivered_to = self.index.delivered_to(server_link)
+            if delivered_to is not None and delivered_to != user_id:
+                foreign.append(server_link)
+            else:
+                kept.append(server_link)
+        return kept, foreign
+    
     def mark_servers_as_delivered(self, user_id: str, server_list: List[str]):
         """Marcar servidores como entregados a un usuario específico"""
         user_id = str(user_id)
         
-        if user_id not in self.user_history:
-            self.user_history[user_id] = []
-        
-        for server_link in server_list:
-            # Marcar como entregado globalmente
-            game_id = self.extract_game_id_from_link(server_link)
-            self.delivered_servers[server_link] = {
-                'user_id': user_id,
-                'delivered_at': datetime.now().isoformat(),
-                'game_id': game_id,
-                'source': 'delivery'
-            }
-            
-            # Agregar al historial del usuario
-            if server_link not in self.user_history[user_id]:
-                self.user_history[user_id].append(server_link)
-        
-        # Guardar cambios inmediatamente
-        self.save_data()
+        # Registrar en el índice y agregar una línea al journal (sin reescribir los JSON)
+        self.index.record_delivery(
+            user_id,
+            [(server_link, self.extract_game_id_from_link(server_link)) for server_link in server_list]
+        )
         logger.info(f"✅ {len(server_list)} servidores marcados como entregados a usuario {user_id}")
     
+    def is_known_for_user(self, user_id: str, server_list: List[str]) -> bool:
+        """True si todos los servidores ya están registrados como entregados a este usuario"""
+        user_id = str(user_id)
+        return all(self.index.user_has(user_id, server_link) for server_link in server_list)
+    
     def get_user_delivered_count(self, user_id: str) -> int:
         """Obtener cantidad de servidores entregados a un usuario"""
-        user_id = str(user_id)
-        return len(self.user_history.get(user_id, []))
+        return self.index.user_count(user_id)
     
     def get_global_delivered_count(self) -> int:
         """Obtener cantidad total de servidores únicos entregados"""
         return len(self.delivered_servers)
 
 
+    def get_pooled_servers(self, user_id: str, game_id: str, needed_count: int,
+                           exclude: Optional[List[str]] = None) -> List[str]:
+        """Tomar servidores del pool compartido del juego que nadie haya recibido todavía"""
+        from game_link_cache import game_link_cache
+        from report_system import report_system
+
+        user_id = str(user_id)
+        candidates = report_system.filter_blacklisted_servers(game_link_cache.get_fresh_links(game_id, exclude=exclude))
+        fresh = [
+            link for link in candidates
+            if self.index.delivered_to(link) is None and not self.index.user_has(user_id, link)
+        ]
+        return fresh[:needed_count]
+
     async def get_replacement_servers(self, user_id: str, game_id: str, needed_count: int) -> List[str]:
         """
         Buscar servidores de reemplazo cuando se detectan duplicados
+        Primero se sirven desde el pool del juego; solo se scrapea para rellenarlo
         """
         try:
             logger.info(f"🔄 Buscando {needed_count} servidores de reemplazo para usuario {user_id}, juego {game_id}")
             
+            fresh_servers = self.get_pooled_servers(user_id, game_id, needed_count)
+            if len(fresh_servers) >= needed_count:
+                logger.info(f"⚡ {len(fresh_servers)} servidores de reemplazo servidos desde el pool del juego")
+                return fresh_servers
+            
             # Importar el scraper desde main
             import sys
             if 'main' in sys.modules:
@@ -213,25 +198,25 @@ class UniqueServerManager:
                 if hasattr(main_module, 'scraper'):
                     scraper = main_module.scraper
                     
-                    # Ejecutar scraping para obtener nuevos servidores
-                    scraper.current_user_id = user_id
-                    new_links_count = scraper.scrape_vip_links(game_id=game_id, user_id=user_id)
+                    from game_link_cache import game_link_cache
+                    from report_system import report_system
+                    
+                    # Ejecutar scraping para rellenar el pool (los enlaces extraídos entran al pool).
+                    # El scrape guarda lo extraído a este mismo usuario y el hook lo registra como entregado
+                    # a él, así que lo nuevo se toma por diferencia del pool antes/después
+                    pool_before = set(game_link_cache.get_fresh_links(game_id))
+                    await asyncio.to_thread(scraper.scrape_vip_links, game_id=game_id, user_id=user_id)
                     
-                    if new_links_count > 0:
-                        # Obtener los nuevos servidores
-                        user_servers = scraper.get_all_links(game_id, user_id)
-                        
-                        # Filtrar solo los más recientes (que no estén en delivered_servers)
-                        fresh_servers = []
-                        for server in user_servers[-needed_count:]:  # Tomar los últimos
-                            if server not in self.delivered_servers:
-                                fresh_servers.append(server)
-                        
-                        logger.info(f"✅ Encontrados {len(fresh_servers)} servidores frescos de reemplazo")
-                        return fresh_servers[:needed_count]
+                    extracted = report_system.filter_blacklisted_servers([
+                        link for link in game_link_cache.get_fresh_links(game_id) if link not in pool_before
+                    ])
+                    extracted, _ = self.split_foreign_servers(user_id, extracted)
+                    fresh_servers = list(dict.fromkeys(fresh_servers + extracted))[:needed_count]
+                    logger.info(f"✅ Encontrados {len(fresh_servers)} servidores frescos de reemplazo ({len(extracted)} del scrape de relleno)")
+                    return fresh_servers
             
             logger.warning("⚠️ No se pudo acceder al scraper para buscar reemplazos")
-            return []
+            return fresh_servers
             
         except Exception as e:
             logger.error(f"❌ Error buscando servidores de reemplazo: {e}")
@@ -242,22 +227,14 @@ class UniqueServerManager:
     def cleanup_expired_deliveries(self, days: int = 7):
         """Limpiar entregas expiradas (opcional para liberar servidores después de X días)"""
         try:
-            from datetime import datetime, timedelta
+            from datetime import timedelta
             cutoff_date = datetime.now() - timedelta(days=days)
-            expired_servers = []
             
-            for server_link, delivery_info in list(self.delivered_servers.items()):
-                try:
-                    delivered_at = datetime.fromisoformat(delivery_info['delivered_at'])
-                    if delivered_at < cutoff_date:
-                        expired_servers.append(server_link)
-                        del self.delivered_servers[server_link]
-                except Exception:
-                    continue
+            # Se descartan buckets horarios completos en lugar de recorrer cada entrega
+            expired_count = self.index.expire_before(cutoff_date)
             
-            if expired_servers:
-                self.save_data()
-                logger.info(f"🧹 Limpiados {len(expired_servers)} servidores expirados después de {days} días")
+            if expired_count:
+                logger.info(f"🧹 Limpiados {expired_count} servidores expirados después de {days} días")
                 
         except Exception as e:
             logger.error(f"❌ Error limpiando entregas expiradas: {e}")
@@ -289,7 +266,7 @@ def filter_and_mark_servers(user_id: str, scraped_servers: List[str]) -> List[st
     global unique_server_manager
     
     # Filtrar servidores únicos
-    unique_servers = unique_server_manager.filter_unique_servers_for_user(user_id, scraped_servers)
+    unique_servers, _ = unique_server_manager.filter_unique_servers_for_user(user_id, scraped_servers)
     
     # Si hay servidores únicos, marcarlos como entregados
     if unique_servers:
@@ -48,8 +48,10 @@ def setup_commands(bot):
             embed.add_field(name="📝 Descripción", value=detailed_info.get('description', 'Sin descripción')[:200], inline=False)
 
             # Configurar avatar
-            avatar_url = f"https://thumbnails.roblox.com/v1/users/avatar-headshot?userIds={user_id}&size=420x420&format=Png"
-            embed.set_thumbnail(url=avatar_url)
+            from thumbnail_batcher import thumbnail_batcher
+            avatar_url = await thumbnail_batcher.get('user_headshot', user_id, '420x420')
+            if avatar_url:
+                embed.set_thumbnail(url=avatar_url)
             embed.set_footer(text=f"ID: {user_id} • RbxServers")
 
             await interaction.followup.send(embed=embed, ephemeral=True)
@@ -125,28 +127,18 @@ def setup_commands(bot):
 
             # Configurar imagen del avatar (imagen principal grande)
             try:
-                # Obtener la imagen del avatar en alta resolución
-                avatar_image_url = f"https://thumbnails.roblox.com/v1/users/avatar?userIds={user_id}&size=720x720&format=Png&isCircular=false"
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(avatar_image_url) as response:
-                        if response.status == 200:
-                            avatar_data = await response.json()
-                            if avatar_data.get('data') and len(avatar_data['data']) > 0:
-                                image_url = avatar_data['data'][0].get('imageUrl')
-                                if image_url:
-                                    embed.set_image(url=image_url)
-                                    logger.info(f"<a:verify2:1418486831993061497> Imagen del avatar configurada: {image_url}")
-
-                # Thumbnail más pequeño para la esquina
-                thumbnail_url = f"https://thumbnails.roblox.com/v1/users/avatar-headshot?userIds={user_id}&size=150x150&format=Png&isCircular=false"
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(thumbnail_url) as response:
-                        if response.status == 200:
-                            thumb_data = await response.json()
-                            if thumb_data.get('data') and len(thumb_data['data']) > 0:
-                                thumb_url = thumb_data['data'][0].get('imageUrl')
-                                if thumb_url:
-                                    embed.set_thumbnail(url=thumb_url)
+                from thumbnail_batcher import thumbnail_batcher
+
+                # Avatar en alta resolución y headshot pequeño para la esquina, resueltos en paralelo
+                image_url, thumb_url = await asyncio.gather(
+                    thumbnail_batcher.get('user_avatar', user_id, '720x720'),
+                    thumbnail_batcher.get('user_headshot', user_id, '150x150')
+                )
+                if image_url:
+                    embed.set_image(url=image_url)
+                    logger.info(f"<a:verify2:1418486831993061497> Imagen del avatar configurada: {image_url}")
+                if thumb_url:
+                    embed.set_thumbnail(url=thumb_url)
             except Exception as e:
                 logger.warning(f"⚠️ Error configurando imagen del avatar: {e}")
 
@@ -170,17 +162,8 @@ def setup_commands(bot):
 async def get_user_by_username(username: str):
     """Obtener información de usuario por nombre"""
     try:
-        async with aiohttp.ClientSession() as session:
-            url = "https://users.roblox.com/v1/usernames/users"
-            payload = {"usernames": [username], "excludeBannedUsers": True}
-            headers = {"Content-Type": "application/json", "User-Agent": "Mozilla/5.0"}
-
-            async with session.post(url, json=payload, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get("data") and len(data["data"]) > 0:
-                        return data["data"][0]
-        return None
+        from roblox_client import roblox_client
+        return await roblox_client.get_user_by_username(username)
     except Exception as e:
         logger.error(f"Error obteniendo usuario: {e}")
         return None
@@ -188,14 +171,8 @@ async def get_user_by_username(username: str):
 async def get_user_details(user_id: int):
     """Obtener detalles adicionales del usuario"""
     try:
-        async with aiohttp.ClientSession() as session:
-            url = f"https://users.roblox.com/v1/users/{user_id}"
-            headers = {"User-Agent": "Mozilla/5.0"}
-
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    return await response.json()
-        return {}
+        from roblox_client import roblox_client
+        return await roblox_client.get_user(user_id) or {}
     except Exception as e:
         logger.error(f"Error obteniendo detalles: {e}")
         return {}
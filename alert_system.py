@@ -72,9 +72,6 @@ class BotStartupAlertSystem:
         
         logger.info(f"📢 Enviando notificaciones de inicio a {len(self.subscribed_users)} usuarios...")
         
-        successful_notifications = 0
-        failed_notifications = 0
-        
         startup_embed = discord.Embed(
             title="<a:pepebot:1418489370129993728> RbxServers Bot Iniciado",
             description="¡El bot de RbxServers está ahora **en línea** y listo para usar!",
@@ -109,32 +106,17 @@ class BotStartupAlertSystem:
         startup_embed.set_footer(text="RbxServers • Sistema de Alertas de Inicio")
         startup_embed.set_thumbnail(url="https://cdn.discordapp.com/attachments/123456789/roblox_logo.png")
         
-        for user_id in list(self.subscribed_users):  # Crear copia para evitar modificaciones durante iteración
-            try:
-                user = bot.get_user(int(user_id))
-                if not user:
-                    user = await bot.fetch_user(int(user_id))
-                
-                if user:
-                    await user.send(embed=startup_embed)
-                    successful_notifications += 1
-                    logger.info(f"📨 Notificación de inicio enviada a {user.name} (ID: {user_id})")
-                else:
-                    logger.warning(f"⚠️ No se pudo encontrar usuario {user_id}")
-                    failed_notifications += 1
-                
-            except discord.Forbidden:
-                logger.warning(f"🚫 No se puede enviar DM a usuario {user_id} (DMs bloqueados)")
-                failed_notifications += 1
-            except discord.NotFound:
+        # Envío concurrente con control de rate limit y caché de DMs cerrados (no se reanuda tras reiniciar)
+        from dm_broadcast import dm_broadcaster
+        result = await dm_broadcaster.broadcast(bot, list(self.subscribed_users), kind="startup_alert", embed=startup_embed)
+        
+        # Usuarios que ya no existen: quitarlos de la lista
+        for user_id, status in result['results'].items():
+            if status == 'not_found':
                 logger.warning(f"👤 Usuario {user_id} no encontrado, removiendo de la lista")
                 self.unsubscribe_user(user_id)
-                failed_notifications += 1
-            except Exception as e:
-                logger.error(f"❌ Error enviando notificación a usuario {user_id}: {e}")
-                failed_notifications += 1
         
-        logger.info(f"<:stats:1418490788437823599> Notificaciones de inicio completadas: {successful_notifications} exitosas, {failed_notifications} fallidas")
+        logger.info(f"<:stats:1418490788437823599> Notificaciones de inicio completadas: {result['sent']} exitosas, {result['failed']} fallidas ({result['per_second']}/s)")
 
 def setup_alert_commands(bot):
     """Configurar comandos de alertas de inicio"""
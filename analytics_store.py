@@ -0,0 +1,233 @@
+"""
+Almacén de analytics web para RbxServers
+Ring buffer en memoria + log en disco por segmentos (JSON Lines, solo anexar) con contadores por fuente
+y tipo de evento mantenidos al ingerir; el coste por evento no depende de cuántos eventos se retienen
+"""
+
+import os
+import json
+import threading
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "segment_"
+SEGMENT_SUFFIX = ".jsonl"
+
+class AnalyticsStore:
+    """Eventos de analytics recientes en memoria, persistidos en segmentos que se rotan y se borran enteros"""
+
+    def __init__(self, directory: str = "web_analytics", legacy_file: str = "web_analytics.json",
+                 max_events: int = 100000, segment_events: int = 10000):
+        self.directory = Path(directory)
+        self.legacy_file = legacy_file
+        self.max_events = max_events
+        self.segment_events = segment_events
+        self.lock = threading.RLock()
+
+        self.events: deque = deque()
+        self.sources: Counter = Counter()       # fuente -> eventos retenidos
+        self.event_types: Counter = Counter()   # tipo de evento -> eventos retenidos
+        self.next_event_id = 1
+        self.created_at = datetime.now().isoformat()
+        self.last_updated: Optional[str] = None
+        self.stats = {'ingested': 0, 'batches': 0, 'evicted': 0, 'segments_rotated': 0, 'segments_deleted': 0}
+
+        self.segment_file = None
+        self.segment_index = 0
+        self.segment_count = 0
+        self.loaded = False
+
+    # ---- segmentos ----
+
+    def _segment_path(self, index: int) -> Path:
+        return self.directory / f"{SEGMENT_PREFIX}{index:06d}{SEGMENT_SUFFIX}"
+
+    def _segment_indexes(self) -> List[int]:
+        indexes = []
+        for path in self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+            try:
+                indexes.append(int(path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+            except ValueError:
+                continue
+        return sorted(indexes)
+
+    def _open_segment(self, index: int, existing_events: int = 0):
+        if self.segment_file:
+            self.segment_file.close()
+        self.segment_index = index
+        self.segment_count = existing_events
+        self.segment_file = open(self._segment_path(index), 'a', encoding='utf-8')
+
+    def _rotate_if_needed(self):
+        if self.segment_count < self.segment_events:
+            return
+        self._open_segment(self.segment_index + 1)
+        self.stats['segments_rotated'] += 1
+
+        # Borrar segmentos completos que ya no pueden estar en la ventana retenida
+        keep_segments = -(-self.max_events // self.segment_events) + 1
+        for index in self._segment_indexes():
+            if index <= self.segment_index - keep_segments:
+                try:
+                    self._segment_path(index).unlink()
+                    self.stats['segments_deleted'] += 1
+                except OSError as e:
+                    logger.warning(f"⚠️ No se pudo borrar el segmento de analytics {index}: {e}")
+
+    # ---- carga ----
+
+    def load(self):
+        """Reconstruir el ring buffer y los contadores desde los segmentos (o importar el JSON antiguo)"""
+        with self.lock:
+            if self.loaded:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            indexes = self._segment_indexes()
+
+            last_count = 0
+            for index in indexes:
+                last_count = 0
+                try:
+                    with open(self._segment_path(index), 'r', encoding='utf-8') as f:
+                        for line in f:
+                            line = line.strip()
+                            if not line:
+                                continue
+                            try:
+                                self._retain(json.loads(line))
+                            except json.JSONDecodeError:
+                                logger.warning(f"⚠️ Línea corrupta ignorada en segmento de analytics {index}")
+                                continue
+                            last_count += 1
+                except OSError as e:
+                    logger.error(f"❌ Error leyendo segmento de analytics {index}: {e}")
+
+            self._open_segment(indexes[-1] if indexes else 1, last_count)
+            self.loaded = True
+
+            if not indexes:
+                self._import_legacy()
+
+            if self.events:
+                self.next_event_id = max(self.next_event_id, self.events[-1].get('event_id', 0) + 1)
+                self.last_updated = self.events[-1].get('timestamp')
+            logger.info(f"📊 Analytics cargados: {len(self.events)} eventos en memoria")
+
+    def _import_legacy(self):
+        """Migrar una sola vez los eventos de web_analytics.json al log segmentado"""
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+            events = legacy.get('analytics', [])
+            self.created_at = legacy.get('metadata', {}).get('created_at', self.created_at)
+            self._append(events)
+            logger.info(f"📦 Migrados {len(events)} eventos de {self.legacy_file} al log segmentado")
+        except Exception as e:
+            logger.error(f"❌ Error migrando {self.legacy_file}: {e}")
+
+    # ---- ingesta ----
+
+    def _retain(self, event: dict):
+        """Agregar al ring buffer, expulsando el más antiguo y descontándolo de los contadores"""
+        if len(self.events) >= self.max_events:
+            evicted = self.events.popleft()
+            self._count(evicted, -1)
+            self.stats['evicted'] += 1
+        self.events.append(event)
+        self._count(event, 1)
+        event_id = event.get('event_id')
+        if isinstance(event_id, int) and event_id >= self.next_event_id:
+            self.next_event_id = event_id + 1
+
+    def _count(self, event: dict, sign: int):
+        for counter, key in ((self.sources, event.get('source', 'unknown')),
+                             (self.event_types, event.get('event_type', 'unknown'))):
+            counter[key] += sign
+            if counter[key] <= 0:
+                del counter[key]
+
+    def _append(self, events: Iterable[dict]) -> List[dict]:
+        stored = []
+        if self.segment_file is None:
+            self._open_segment(self.segment_index or 1, self.segment_count)
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            if not isinstance(event.get('event_id'), int):
+                event = {'event_id': self.next_event_id, **event}
+            self._rotate_if_needed()
+            self.segment_file.write(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self.segment_count += 1
+            self._retain(event)
+            stored.append(event)
+        self.segment_file.flush()
+        if stored:
+            self.last_updated = stored[-1].get('timestamp', datetime.now().isoformat())
+        return stored
+
+    def ingest(self, events: List[dict]) -> List[dict]:
+        """Anexar uno o varios eventos ya normalizados; devuelve los eventos con su event_id"""
+        self.load()
+        with self.lock:
+            stored = self._append(events)
+            self.stats['ingested'] += len(stored)
+            self.stats['batches'] += 1
+            return stored
+
+    # ---- consultas ----
+
+    def query(self, limit: int = 100, source: Optional[str] = None, event_type: Optional[str] = None) -> List[dict]:
+        """Eventos más recientes primero; sin filtros solo recorre `limit` eventos"""
+        self.load()
+        results = []
+        with self.lock:
+            for event in reversed(self.events):
+                if source and event.get('source') != source:
+                    continue
+                if event_type and event.get('event_type') != event_type:
+                    continue
+                results.append(event)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def get_metadata(self) -> Dict:
+        self.load()
+        with self.lock:
+            return {
+                'total_events': len(self.events),
+                'max_events': self.max_events,
+                'sources_stats': dict(self.sources),
+                'event_types_stats': dict(self.event_types),
+                'created_at': self.created_at,
+                'last_updated': self.last_updated
+            }
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                'events_in_memory': len(self.events),
+                'max_events': self.max_events,
+                'segment_index': self.segment_index,
+                'segment_events': self.segment_count,
+                **self.stats
+            }
+
+    def close(self):
+        with self.lock:
+            if self.segment_file:
+                self.segment_file.close()
+                self.segment_file = None
+
+# Almacén global de analytics web
+analytics_store = AnalyticsStore(
+    max_events=int(os.getenv('WEB_ANALYTICS_MAX_EVENTS', '100000')),
+    segment_events=int(os.getenv('WEB_ANALYTICS_SEGMENT_EVENTS', '10000'))
+)
@@ -0,0 +1,221 @@
+"""
+Almacén de registros en Blob Storage con manifiesto + segmentos delta
+Cada guardado sube solo los cambios (un delta pequeño); la carga descarga base y deltas en paralelo
+y la compactación periódica fusiona los deltas en una nueva base
+"""
+
+import json
+import time
+import asyncio
+import secrets
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+DELTA_PREFIX = "delta_"
+BASE_PREFIX = "base_"
+
+class BlobDeltaStore:
+    """Registros {id: dict} persistidos como base compactada + deltas ordenados por nombre"""
+
+    def __init__(self, prefix: str, compact_every: int = 50, max_parallel_downloads: int = 8):
+        self.prefix = prefix
+        self.compact_every = compact_every
+        self.max_parallel_downloads = max_parallel_downloads
+
+        self.manifest: Optional[dict] = None
+        self.delta_files: List[str] = []        # deltas aplicados y aún no compactados (orden de escritura)
+        self.persisted: Dict[str, str] = {}     # id -> JSON del registro tal como está en Blob
+        self.resync_pending = False             # Falló una subida: el próximo diff compara todo, no solo los ids pedidos
+        self.changed_ids: Set[str] = set()      # Cambios hechos fuera de un guardado (p. ej. borrados): entran en cualquier diff
+        self.compact_lock: Optional[asyncio.Lock] = None
+        self.stats = {'deltas_written': 0, 'delta_failures': 0, 'compactions': 0, 'segments_loaded': 0}
+
+    @property
+    def manifest_name(self) -> str:
+        return f"{self.prefix}{MANIFEST_NAME}"
+
+    def _new_delta_name(self) -> str:
+        # time_ns con ancho fijo: el orden lexicográfico es el orden de escritura
+        return f"{self.prefix}{DELTA_PREFIX}{time.time_ns():020d}_{secrets.token_hex(3)}.json"
+
+    def _new_base_name(self) -> str:
+        return f"{self.prefix}{BASE_PREFIX}{time.time_ns():020d}.json"
+
+    @staticmethod
+    def _encode(record: dict) -> str:
+        return json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+
+    # ---- carga ----
+
+    async def load(self) -> Optional[Dict[str, dict]]:
+        """Cargar base + deltas en paralelo; None si en Blob todavía no existe el formato con manifiesto"""
+        from blob_storage_manager import blob_manager
+
+        file_map = await blob_manager.list_files_with_urls()
+        delta_names = sorted(
+            name for name in file_map
+            if name.startswith(f"{self.prefix}{DELTA_PREFIX}")
+        )
+        if self.manifest_name not in file_map and not delta_names:
+            return None
+
+        manifest = {}
+        if self.manifest_name in file_map:
+            manifest = await blob_manager.download_json(self.manifest_name, file_map) or {}
+
+        compacted_through = manifest.get('compacted_through') or ''
+        pending_deltas = [name for name in delta_names if name > compacted_through]
+        base_name = manifest.get('base')
+        segment_names = ([base_name] if base_name else []) + pending_deltas
+
+        # Descargar todos los segmentos en paralelo (con límite de concurrencia)
+        semaphore = asyncio.Semaphore(self.max_parallel_downloads)
+
+        async def fetch(name):
+            async with semaphore:
+                return await blob_manager.download_json(name, file_map)
+
+        segments = await asyncio.gather(*(fetch(name) for name in segment_names))
+
+        records: Dict[str, dict] = {}
+        for name, segment in zip(segment_names, segments):
+            if not isinstance(segment, dict):
+                logger.warning(f"⚠️ Segmento ilegible o ausente en Blob: {name}")
+                continue
+            if name == base_name:
+                records.update(segment.get('records', {}))
+            else:
+                records.update(segment.get('upserts', {}))
+                for record_id in segment.get('deletes', []):
+                    records.pop(record_id, None)
+
+        self.manifest = manifest
+        self.delta_files = pending_deltas
+        self.persisted = {record_id: self._encode(record) for record_id, record in records.items()}
+        self.stats['segments_loaded'] = len(segment_names)
+        logger.info(f"✅ {len(records)} registros cargados desde {self.prefix} (base + {len(pending_deltas)} deltas)")
+
+        if len(self.delta_files) >= self.compact_every:
+            await self.compact(records)
+        return records
+
+    # ---- escritura ----
+
+    def mark_changed(self, record_id: str):
+        """Registrar un cambio que debe subir el próximo guardado aunque sea parcial (p. ej. un borrado)"""
+        self.changed_ids.add(record_id)
+
+    def diff(self, records: Dict[str, dict], record_ids: Optional[Iterable[str]] = None):
+        """(upserts, deletes) respecto a lo persistido; con `record_ids` solo compara esos registros
+        (salvo que haya quedado un cambio sin subir: entonces se compara todo)"""
+        if record_ids is not None and not self.resync_pending:
+            candidates = set(record_ids) | self.changed_ids
+        else:
+            candidates = set(records) | set(self.persisted)
+        upserts, deletes = {}, []
+        for record_id in candidates:
+            record = records.get(record_id)
+            if record is None:
+                if record_id in self.persisted:
+                    deletes.append(record_id)
+            elif self._encode(record) != self.persisted.get(record_id):
+                upserts[record_id] = record
+        # Los marcados que ya coinciden con Blob no necesitan subirse
+        self.changed_ids.difference_update(candidates - set(upserts) - set(deletes))
+        return upserts, deletes
+
+    async def save_changes(self, upserts: Dict[str, dict], deletes: Iterable[str] = ()) -> bool:
+        """Subir un único delta con los cambios; compacta cuando se acumulan demasiados"""
+        from blob_storage_manager import blob_manager
+
+        deletes = list(deletes)
+        if not upserts and not deletes:
+            return True
+
+        delta_name = self._new_delta_name()
+        try:
+            url = await blob_manager.upload_json(delta_name, {
+                'upserts': upserts,
+                'deletes': deletes,
+                'written_at': datetime.now().isoformat()
+            })
+        except Exception as e:
+            logger.error(f"❌ Error subiendo delta de {self.prefix}: {e}")
+            url = None
+        if not url:
+            # Lo no subido sigue distinto de `persisted`: el próximo guardado hace el diff completo
+            self.stats['delta_failures'] += 1
+            self.resync_pending = True
+            return False
+
+        for record_id, record in upserts.items():
+            self.persisted[record_id] = self._encode(record)
+        for record_id in deletes:
+            self.persisted.pop(record_id, None)
+        self.delta_files.append(delta_name)
+        self.stats['deltas_written'] += 1
+        self.changed_ids.difference_update(upserts)
+        self.changed_ids.difference_update(deletes)
+        self.resync_pending = False
+        return True
+
+    def needs_compaction(self) -> bool:
+        return len(self.delta_files) >= self.compact_every
+
+    async def compact(self, records: Dict[str, dict]) -> bool:
+        """Escribir una base nueva con todos los registros, apuntar el manifiesto y borrar lo reemplazado"""
+        from blob_storage_manager import blob_manager
+
+        if self.compact_lock is None:
+            self.compact_lock = asyncio.Lock()
+
+        async with self.compact_lock:
+            snapshot = {record_id: dict(record) for record_id, record in records.items()}
+            folded_deltas = list(self.delta_files)
+            previous_base = (self.manifest or {}).get('base')
+
+            base_name = self._new_base_name()
+            if not await blob_manager.upload_json(base_name, {
+                'records': snapshot,
+                'written_at': datetime.now().isoformat()
+            }):
+                logger.error(f"❌ No se pudo subir la base compactada de {self.prefix}")
+                return False
+
+            manifest = {
+                'base': base_name,
+                'compacted_through': folded_deltas[-1] if folded_deltas else (self.manifest or {}).get('compacted_through', ''),
+                'total_records': len(snapshot),
+                'updated_at': datetime.now().isoformat()
+            }
+            if not await blob_manager.upload_json(self.manifest_name, manifest):
+                logger.error(f"❌ No se pudo actualizar el manifiesto de {self.prefix}")
+                await blob_manager.delete_file(base_name)
+                return False
+
+            self.manifest = manifest
+            self.delta_files = [name for name in self.delta_files if name not in set(folded_deltas)]
+            self.persisted = {record_id: self._encode(record) for record_id, record in snapshot.items()}
+            self.resync_pending = False
+            self.changed_ids.clear()
+            self.stats['compactions'] += 1
+
+            # Lo reemplazado ya no se lee nunca: borrar en paralelo
+            obsolete = folded_deltas + ([previous_base] if previous_base else [])
+            await asyncio.gather(*(blob_manager.delete_file(name) for name in obsolete))
+            logger.info(f"🗜️ {self.prefix} compactado: {len(snapshot)} registros, {len(folded_deltas)} deltas fusionados")
+            return True
+
+    def get_stats(self) -> dict:
+        return {
+            'base': (self.manifest or {}).get('base'),
+            'pending_deltas': len(self.delta_files),
+            'records': len(self.persisted),
+            'compact_every': self.compact_every,
+            'resync_pending': self.resync_pending,
+            **self.stats
+        }
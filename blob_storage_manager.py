@@ -27,8 +27,40 @@ class BlobStorageManager:
             logger.error("❌ BLOB_READ_WRITE_TOKEN no encontrado en variables de entorno")
             raise ValueError("Token de Blob Storage es requerido")
         
+        # Sesión HTTP compartida (se crea al primer uso dentro del event loop)
+        self.session: Optional[aiohttp.ClientSession] = None
+        
+        # Write-behind: escrituras pendientes por archivo, fusionadas dentro de la ventana de flush
+        self.flush_window = float(os.getenv('BLOB_FLUSH_WINDOW', '3'))
+        self.max_retries = 4
+        self.max_pending = int(os.getenv('BLOB_MAX_PENDING', '1000'))  # Límite de archivos distintos en cola
+        self.pending_writes: Dict[str, dict] = {}   # filename -> {'data', 'enqueued_at'}
+        self.failed_writes: Dict[str, dict] = {}    # filename -> {'attempts', 'last_failed_at'} (sigue en cola)
+        self.flush_task: Optional[asyncio.Task] = None
+        self.flush_lock: Optional[asyncio.Lock] = None
+        self.write_stats = {
+            'enqueued': 0,
+            'coalesced': 0,
+            'rejected': 0,
+            'flushed': 0,
+            'retries': 0,
+            'failed': 0,
+            'last_flush_lag': 0.0,
+            'max_flush_lag': 0.0
+        }
+        
         logger.info("✅ BlobStorageManager inicializado correctamente")
     
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Obtener la sesión HTTP compartida con pool de conexiones"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=20, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self.session
+    
     def _get_headers(self, content_type: str = "application/json") -> dict:
         """Obtener headers para las peticiones a Blob Storage"""
         return {
@@ -37,11 +69,12 @@ class BlobStorageManager:
         }
     
     async def upload_json(self, filename: str, data: dict) -> Optional[str]:
-        """Subir datos JSON a Blob Storage"""
-        try:
-            json_data = json.dumps(data, indent=2, ensure_ascii=False)
-            
-            async with aiohttp.ClientSession() as session:
+        """Subir datos JSON a Blob Storage (inmediato, con reintentos y backoff)"""
+        json_data = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        
+        for attempt in range(self.max_retries):
+            try:
+                session = await self.get_session()
                 async with session.put(
                     f"{self.base_url}/{filename}",
                     data=json_data.encode('utf-8'),
@@ -52,14 +85,127 @@ class BlobStorageManager:
                         url = response_data.get('url')
                         logger.info(f"✅ Datos subidos a Blob: {filename}")
                         return url
-                    else:
-                        error_text = await response.text()
+                    
+                    error_text = await response.text()
+                    # Solo reintentar errores transitorios (rate limit o errores del servidor)
+                    if response.status != 429 and response.status < 500:
                         logger.error(f"❌ Error subiendo {filename}: {response.status} - {error_text}")
                         return None
+                    logger.warning(f"⚠️ Error transitorio subiendo {filename}: {response.status} (intento {attempt + 1})")
+            
+            except Exception as e:
+                logger.warning(f"⚠️ Error en upload_json para {filename} (intento {attempt + 1}): {e}")
+            
+            if attempt < self.max_retries - 1:
+                self.write_stats['retries'] += 1
+                await asyncio.sleep(0.5 * (2 ** attempt))
         
-        except Exception as e:
-            logger.error(f"❌ Error en upload_json para {filename}: {e}")
-            return None
+        logger.error(f"❌ No se pudo subir {filename} tras {self.max_retries} intentos")
+        return None
+    
+    def enqueue_json(self, filename: str, data: dict) -> bool:
+        """Encolar una escritura write-behind; escrituras repetidas al mismo archivo se fusionan.
+        Devuelve False si la cola está llena (la escritura no se aceptó)"""
+        now = time.time()
+        pending = self.pending_writes.get(filename)
+        if pending:
+            # Se conserva la hora del primer encolado para medir el retraso real del flush
+            pending['data'] = data
+            self.write_stats['coalesced'] += 1
+        elif len(self.pending_writes) >= self.max_pending:
+            self.write_stats['rejected'] += 1
+            logger.warning(f"⚠️ Cola write-behind llena ({len(self.pending_writes)} archivos), escritura de {filename} rechazada")
+            return False
+        else:
+            self.pending_writes[filename] = {'data': data, 'enqueued_at': now}
+        self.write_stats['enqueued'] += 1
+        
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+        return True
+    
+    async def _flush_loop(self):
+        """Vaciar periódicamente las escrituras pendientes"""
+        while self.pending_writes:
+            await asyncio.sleep(self.flush_window)
+            await self.flush()
+    
+    async def flush(self) -> int:
+        """Subir todas las escrituras pendientes; las fallidas se vuelven a encolar"""
+        if self.flush_lock is None:
+            self.flush_lock = asyncio.Lock()
+        
+        async with self.flush_lock:
+            batch, self.pending_writes = self.pending_writes, {}
+            if not batch:
+                return 0
+            
+            filenames = list(batch)
+            results = await asyncio.gather(
+                *(self.upload_json(filename, batch[filename]['data']) for filename in filenames)
+            )
+            
+            flushed = 0
+            now = time.time()
+            for filename, url in zip(filenames, results):
+                entry = batch[filename]
+                if url is not None:
+                    flushed += 1
+                    self.failed_writes.pop(filename, None)
+                    lag = now - entry['enqueued_at']
+                    self.write_stats['last_flush_lag'] = round(lag, 3)
+                    self.write_stats['max_flush_lag'] = round(max(self.write_stats['max_flush_lag'], lag), 3)
+                else:
+                    self.write_stats['failed'] += 1
+                    failure = self.failed_writes.setdefault(filename, {'attempts': 0})
+                    failure['attempts'] += 1
+                    failure['last_failed_at'] = now
+                    # Reencolar salvo que haya llegado una versión más nueva mientras tanto
+                    self.pending_writes.setdefault(filename, entry)
+            
+            self.write_stats['flushed'] += flushed
+            return flushed
+    
+    async def drain(self, max_rounds: int = 5):
+        """Vaciar la cola antes de apagar para no perder escrituras"""
+        for _ in range(max_rounds):
+            if not self.pending_writes:
+                break
+            await self.flush()
+        
+        if self.pending_writes:
+            logger.error(f"❌ {len(self.pending_writes)} escrituras a Blob no se pudieron vaciar al cerrar")
+        else:
+            logger.info("✅ Cola write-behind de Blob vaciada")
+    
+    async def close(self):
+        """Vaciar escrituras pendientes y cerrar la sesión HTTP"""
+        await self.drain()
+        if self.flush_task and not self.flush_task.done():
+            self.flush_task.cancel()
+        if self.session and not self.session.closed:
+            await self.session.close()
+    
+    def get_write_status(self, filename: str) -> str:
+        """Estado de la última escritura encolada de un archivo: 'failing', 'pending' o 'synced'"""
+        if filename in self.failed_writes:
+            return 'failing'
+        if filename in self.pending_writes:
+            return 'pending'
+        return 'synced'
+    
+    def get_write_behind_stats(self) -> dict:
+        """Profundidad de la cola y retraso de flush de la capa write-behind"""
+        now = time.time()
+        oldest = min((entry['enqueued_at'] for entry in self.pending_writes.values()), default=None)
+        return {
+            'queue_depth': len(self.pending_writes),
+            'failing_files': len(self.failed_writes),
+            'max_pending': self.max_pending,
+            'oldest_pending_seconds': round(now - oldest, 3) if oldest else 0,
+            'flush_window': self.flush_window,
+            **self.write_stats
+        }
     
     async def download_json(self, filename: str, file_map: Optional[Dict[str, str]] = None) -> Optional[dict]:
         """Descargar datos JSON desde Blob Storage usando URL real"""
@@ -74,18 +220,18 @@ class BlobStorageManager:
                 logger.info(f"⚠️ Archivo no encontrado en Blob: {filename}")
                 return None
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(real_url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info(f"✅ Datos descargados desde Blob: {filename}")
-                        return data
-                    elif response.status == 404:
-                        logger.info(f"⚠️ Archivo no encontrado en URL: {real_url}")
-                        return None
-                    else:
-                        logger.error(f"❌ Error descargando {filename}: {response.status}")
-                        return None
+            session = await self.get_session()
+            async with session.get(real_url) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    logger.info(f"✅ Datos descargados desde Blob: {filename}")
+                    return data
+                elif response.status == 404:
+                    logger.info(f"⚠️ Archivo no encontrado en URL: {real_url}")
+                    return None
+                else:
+                    logger.error(f"❌ Error descargando {filename}: {response.status}")
+                    return None
         
         except Exception as e:
             logger.error(f"❌ Error en download_json para {filename}: {e}")
@@ -105,32 +251,32 @@ class BlobStorageManager:
                 if time.time() - self._cache_time < 30:  # Cache por 30 segundos
                     return self._file_cache
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}",
-                    headers={'Authorization': f'Bearer {self.blob_token}'}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        files = data.get('blobs', [])
-                        # Crear mapeo de nombre -> URL real
-                        file_map = {}
-                        for blob in files:
-                            pathname = blob.get('pathname', '')
-                            url = blob.get('url', '')
-                            if pathname and url:
-                                file_map[pathname] = url
+            session = await self.get_session()
+            async with session.get(
+                f"{self.base_url}",
+                headers={'Authorization': f'Bearer {self.blob_token}'}
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    files = data.get('blobs', [])
+                    # Crear mapeo de nombre -> URL real
+                    file_map = {}
+                    for blob in files:
+                        pathname = blob.get('pathname', '')
+                        url = blob.get('url', '')
+                        if pathname and url:
+                            file_map[pathname] = url
                         
-                        # Guardar en cache
-                        import time
-                        self._file_cache = file_map
-                        self._cache_time = time.time()
+                    # Guardar en cache
+                    import time
+                    self._file_cache = file_map
+                    self._cache_time = time.time()
                         
-                        logger.info(f"📋 {len(file_map)} archivos encontrados en Blob Storage")
-                        return file_map
-                    else:
-                        logger.error(f"❌ Error listando archivos: {response.status}")
-                        return {}
+                    logger.info(f"📋 {len(file_map)} archivos encontrados en Blob Storage")
+                    return file_map
+                else:
+                    logger.error(f"❌ Error listando archivos: {response.status}")
+                    return {}
         
         except Exception as e:
             logger.error(f"❌ Error listando archivos: {e}")
@@ -139,17 +285,17 @@ class BlobStorageManager:
     async def delete_file(self, filename: str) -> bool:
         """Eliminar archivo de Blob Storage"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.delete(
-                    f"{self.base_url}/{filename}",
-                    headers={'Authorization': f'Bearer {self.blob_token}'}
-                ) as response:
-                    if response.status in [200, 204]:
-                        logger.info(f"🗑️ Archivo eliminado de Blob: {filename}")
-                        return True
-                    else:
-                        logger.error(f"❌ Error eliminando {filename}: {response.status}")
-                        return False
+            session = await self.get_session()
+            async with session.delete(
+                f"{self.base_url}/{filename}",
+                headers={'Authorization': f'Bearer {self.blob_token}'}
+            ) as response:
+                if response.status in [200, 204]:
+                    logger.info(f"🗑️ Archivo eliminado de Blob: {filename}")
+                    return True
+                else:
+                    logger.error(f"❌ Error eliminando {filename}: {response.status}")
+                    return False
         
         except Exception as e:
             logger.error(f"❌ Error en delete_file para {filename}: {e}")
@@ -160,7 +306,8 @@ class BlobStorageManager:
     # ====================================
     
     async def save_user_servers(self, user_id: str, servers: List[str]) -> bool:
-        """Guardar servidores de un usuario"""
+        """Encolar los servidores de un usuario (write-behind).
+        True = escritura aceptada en la cola, no que ya esté en Blob; ver get_write_status"""
         try:
             filename = f"user_servers_{user_id}.json"
             data = {
@@ -170,8 +317,8 @@ class BlobStorageManager:
                 'total_servers': len(servers[:5])
             }
             
-            url = await self.upload_json(filename, data)
-            return url is not None
+            # Write-behind: las escrituras seguidas del mismo usuario se suben una sola vez
+            return self.enqueue_json(filename, data)
         
         except Exception as e:
             logger.error(f"❌ Error guardando servidores para usuario {user_id}: {e}")
@@ -181,7 +328,8 @@ class BlobStorageManager:
         """Obtener servidores de un usuario"""
         try:
             filename = f"user_servers_{user_id}.json"
-            data = await self.download_json(filename)
+            pending = self.pending_writes.get(filename)
+            data = pending['data'] if pending else await self.download_json(filename)
             
             if data:
                 return data.get('servers', [])
@@ -261,7 +409,8 @@ class BlobStorageManager:
             return []
     
     async def save_user_coins(self, user_id: str, coin_data: dict) -> bool:
-        """Guardar datos de monedas de usuario"""
+        """Encolar los datos de monedas de un usuario (write-behind).
+        True = escritura aceptada en la cola, no que ya esté en Blob; ver get_write_status"""
         try:
             filename = f"user_coins_{user_id}.json"
             data = {
@@ -270,8 +419,7 @@ class BlobStorageManager:
                 'last_updated': datetime.now(timezone.utc).isoformat()
             }
             
-            url = await self.upload_json(filename, data)
-            return url is not None
+            return self.enqueue_json(filename, data)
         
         except Exception as e:
             logger.error(f"❌ Error guardando monedas para usuario {user_id}: {e}")
@@ -281,7 +429,8 @@ class BlobStorageManager:
         """Obtener datos de monedas de usuario"""
         try:
             filename = f"user_coins_{user_id}.json"
-            data = await self.download_json(filename)
+            pending = self.pending_writes.get(filename)
+            data = pending['data'] if pending else await self.download_json(filename)
             
             if data:
                 return data.get('coin_data')
@@ -362,12 +511,14 @@ class BlobStorageManager:
             
             user_servers = local_data.get('user_servers', {})
             
+            enqueued = {}
             for user_id, servers in user_servers.items():
                 try:
-                    success = await self.save_user_servers(user_id, servers)
-                    if success:
-                        results['users_migrated'] += 1
-                        results['servers_migrated'] += len(servers)
+                    # Con la cola llena, vaciarla antes de seguir encolando
+                    if len(self.pending_writes) >= self.max_pending:
+                        await self.flush()
+                    if await self.save_user_servers(user_id, servers):
+                        enqueued[user_id] = servers
                     else:
                         results['errors'] += 1
                 
@@ -376,6 +527,15 @@ class BlobStorageManager:
                     results['errors'] += 1
                     continue
             
+            # Solo cuenta como migrado lo que realmente llegó a Blob
+            await self.drain()
+            for user_id, servers in enqueued.items():
+                if self.get_write_status(f"user_servers_{user_id}.json") == 'synced':
+                    results['users_migrated'] += 1
+                    results['servers_migrated'] += len(servers)
+                else:
+                    results['errors'] += 1
+            
             logger.info(f"📊 Migración completada: {results}")
             return results
         
@@ -0,0 +1,138 @@
+"""
+Bus de eventos de entrega de servidores para RbxServers
+Los guardados publican "servidores agregados para el usuario X" y los suscriptores reciben solo lo nuevo
+"""
+
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ServersAddedEvent:
+    """Servidores nuevos de un usuario (payload incremental, no la lista completa)"""
+
+    def __init__(self, user_id: str, added: List[str], source: str = 'unknown'):
+        self.user_id = str(user_id)
+        self.added = list(added)
+        self.source = source
+        self.created_at = time.time()
+
+    def merge(self, other: 'ServersAddedEvent'):
+        """Fusionar un evento posterior del mismo usuario (se conserva el orden y sin duplicados)"""
+        for server in other.added:
+            if server not in self.added:
+                self.added.append(server)
+        self.source = other.source
+
+class DeliverySubscriber:
+    """Suscriptor con cola propia acotada por usuario y un hilo que la consume"""
+
+    def __init__(self, bus: 'DeliveryEventBus', name: str, handler: Callable,
+                 max_pending: int = 500, batch_size: int = 50):
+        self.bus = bus
+        self.name = name
+        self.handler = handler                      # Recibe una lista de ServersAddedEvent
+        self.is_async = asyncio.iscoroutinefunction(handler)
+        self.max_pending = max_pending              # Usuarios pendientes antes de frenar al publicador
+        self.batch_size = batch_size
+        self.condition = threading.Condition()
+        self.pending: OrderedDict = OrderedDict()   # user_id -> ServersAddedEvent (coalescidos)
+        self.stats = {'received': 0, 'coalesced': 0, 'processed': 0, 'errors': 0, 'throttled': 0}
+
+        self.thread = threading.Thread(target=self._run, name=f"delivery-{name}", daemon=True)
+        self.thread.start()
+
+    def offer(self, event: ServersAddedEvent, wait_timeout: float):
+        with self.condition:
+            self.stats['received'] += 1
+            if (event.user_id not in self.pending and len(self.pending) >= self.max_pending
+                    and wait_timeout > 0):
+                self.stats['throttled'] += 1
+                self.condition.wait_for(lambda: len(self.pending) < self.max_pending, timeout=wait_timeout)
+
+            existing = self.pending.get(event.user_id)
+            if existing:
+                # Backpressure sin pérdida: los eventos del mismo usuario se fusionan
+                existing.merge(event)
+                self.stats['coalesced'] += 1
+                return
+
+            self.pending[event.user_id] = ServersAddedEvent(event.user_id, event.added, event.source)
+            self.condition.notify_all()
+
+    def _next_batch(self) -> List[ServersAddedEvent]:
+        with self.condition:
+            self.condition.wait_for(lambda: self.pending)
+            batch = []
+            while self.pending and len(batch) < self.batch_size:
+                batch.append(self.pending.popitem(last=False)[1])
+            self.condition.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                if self.is_async:
+                    loop = self.bus.loop
+                    if loop is None or loop.is_closed():
+                        logger.warning(f"⚠️ Suscriptor '{self.name}' sin event loop, descartando {len(batch)} eventos")
+                        continue
+                    asyncio.run_coroutine_threadsafe(self.handler(batch), loop).result(timeout=120)
+                else:
+                    self.handler(batch)
+                self.stats['processed'] += len(batch)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Error en suscriptor de entregas '{self.name}': {e}")
+
+    def get_stats(self) -> dict:
+        with self.condition:
+            return {'pending': len(self.pending), **self.stats}
+
+class DeliveryEventBus:
+    """Publicación/suscripción en proceso para las entregas de servidores"""
+
+    def __init__(self, publish_timeout: float = 2.0):
+        self.publish_timeout = publish_timeout  # Espera máxima del publicador si un suscriptor va atrasado
+        self.subscribers: Dict[str, DeliverySubscriber] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.lock = threading.Lock()
+
+    def set_loop(self, loop: asyncio.AbstractEventLoop):
+        """Event loop donde se ejecutan los suscriptores async (el del bot)"""
+        self.loop = loop
+
+    def subscribe(self, name: str, handler: Callable, **kwargs) -> DeliverySubscriber:
+        """Registrar un suscriptor (idempotente por nombre)"""
+        with self.lock:
+            if name not in self.subscribers:
+                self.subscribers[name] = DeliverySubscriber(self, name, handler, **kwargs)
+                logger.info(f"📡 Suscriptor de entregas '{name}' registrado")
+            return self.subscribers[name]
+
+    def publish(self, user_id: str, added: List[str], source: str = 'unknown'):
+        """Publicar servidores agregados para un usuario (no hace nada si no hay nuevos)"""
+        if not added or not self.subscribers:
+            return
+        event = ServersAddedEvent(user_id, added, source)
+
+        # Nunca bloquear el event loop del bot; los hilos de scraping sí esperan si hay atraso
+        try:
+            asyncio.get_running_loop()
+            wait_timeout = 0
+        except RuntimeError:
+            wait_timeout = self.publish_timeout
+
+        for subscriber in list(self.subscribers.values()):
+            subscriber.offer(event, wait_timeout)
+
+    def get_stats(self) -> dict:
+        return {name: subscriber.get_stats() for name, subscriber in list(self.subscribers.items())}
+
+# Bus global de entregas
+delivery_bus = DeliveryEventBus()
@@ -0,0 +1,199 @@
+"""
+Índice de servidores entregados para RbxServers
+Índice global por enlace, historial por usuario, buckets por hora y journal de entregas
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = 3600  # Las entregas se agrupan por hora para expirarlas sin recorrer todo
+
+def _bucket_for(delivered_at: str) -> int:
+    try:
+        return int(datetime.fromisoformat(delivered_at).timestamp() // BUCKET_SECONDS)
+    except Exception:
+        return int(time.time() // BUCKET_SECONDS)
+
+class DeliveryIndex:
+    """Índice de entregas: enlace -> entrega, usuario -> historial y bucket -> enlaces"""
+
+    def __init__(self, delivered_file: str = "delivered_servers.json",
+                 history_file: str = "user_server_history.json",
+                 journal_file: str = "delivered_servers.journal",
+                 compact_every: int = 500):
+        self.delivered_file = delivered_file
+        self.history_file = history_file
+        self.journal_file = journal_file
+        self.compact_every = compact_every   # Entradas de journal antes de reescribir los snapshots
+        self.lock = threading.RLock()
+
+        # Estructura: {server_link: {user_id, delivered_at, game_id, source}}
+        self.delivered: Dict[str, Dict] = {}
+        # Estructura: {user_id: [server_links]} (orden de entrega) + sets para búsquedas O(1)
+        self.user_history: Dict[str, List[str]] = {}
+        self.user_sets: Dict[str, Set[str]] = {}
+        # Estructura: {bucket_hora: {server_links}}
+        self.buckets: Dict[int, Set[str]] = {}
+        self.journal_entries = 0
+
+    # ---- carga y persistencia ----
+
+    def load(self) -> bool:
+        """Cargar snapshots y reaplicar el journal; devuelve False si no había datos"""
+        with self.lock:
+            if Path(self.delivered_file).exists():
+                with open(self.delivered_file, 'r', encoding='utf-8') as f:
+                    for link, info in json.load(f).get('delivered_servers', {}).items():
+                        self._index_delivery(link, info)
+
+            if Path(self.history_file).exists():
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    for user_id, links in json.load(f).get('user_history', {}).items():
+                        self._index_history(user_id, links)
+
+            replayed = self._replay_journal()
+            if replayed:
+                logger.info(f"📜 Reaplicadas {replayed} entradas del journal de entregas")
+                self.compact()
+
+            logger.info(f"✅ Índice de entregas cargado: {len(self.delivered)} servidores, {len(self.user_history)} usuarios")
+            return bool(self.delivered or self.user_history)
+
+    def _replay_journal(self) -> int:
+        if not Path(self.journal_file).exists():
+            return 0
+        replayed = 0
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except Exception:
+                    continue  # Línea incompleta por un cierre abrupto
+                self._apply(entry)
+                replayed += 1
+        return replayed
+
+    def _apply(self, entry: dict):
+        if entry.get('op') == 'deliver':
+            user_id = entry['user_id']
+            for link, game_id in entry['links']:
+                self._index_delivery(link, {
+                    'user_id': user_id,
+                    'delivered_at': entry['delivered_at'],
+                    'game_id': game_id,
+                    'source': entry.get('source', 'delivery')
+                })
+            self._index_history(user_id, [link for link, _ in entry['links']])
+
+    def _append_journal(self, entry: dict):
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+        self.journal_entries += 1
+        if self.journal_entries >= self.compact_every:
+            self.compact()
+
+    def _atomic_dump(self, path: str, data: dict):
+        target_dir = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{Path(path).stem}.", suffix=".tmp", dir=target_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def compact(self):
+        """Reescribir los snapshots JSON completos y vaciar el journal"""
+        with self.lock:
+            now = datetime.now().isoformat()
+            self._atomic_dump(self.delivered_file, {
+                'delivered_servers': self.delivered,
+                'last_updated': now,
+                'total_delivered': len(self.delivered)
+            })
+            self._atomic_dump(self.history_file, {
+                'user_history': self.user_history,
+                'last_updated': now,
+                'total_users': len(self.user_history)
+            })
+            open(self.journal_file, 'w', encoding='utf-8').close()
+            self.journal_entries = 0
+            logger.debug(f"💾 Índice de entregas compactado ({len(self.delivered)} servidores)")
+
+    # ---- índices ----
+
+    def _index_delivery(self, link: str, info: dict):
+        previous = self.delivered.get(link)
+        if previous:
+            old_bucket = self.buckets.get(_bucket_for(previous.get('delivered_at', '')))
+            if old_bucket:
+                old_bucket.discard(link)
+        self.delivered[link] = info
+        self.buckets.setdefault(_bucket_for(info.get('delivered_at', '')), set()).add(link)
+
+    def _index_history(self, user_id: str, links: Iterable[str]):
+        history = self.user_history.setdefault(user_id, [])
+        seen = self.user_sets.setdefault(user_id, set())
+        for link in links:
+            if link not in seen:
+                seen.add(link)
+                history.append(link)
+
+    # ---- consultas ----
+
+    def delivered_to(self, link: str) -> Optional[str]:
+        """Usuario al que se entregó el enlace (None si nadie lo recibió)"""
+        info = self.delivered.get(link)
+        return info.get('user_id') if info else None
+
+    def user_has(self, user_id: str, link: str) -> bool:
+        return link in self.user_sets.get(str(user_id), ())
+
+    def user_count(self, user_id: str) -> int:
+        return len(self.user_history.get(str(user_id), []))
+
+    # ---- escritura ----
+
+    def record_delivery(self, user_id: str, links_with_games: List[tuple], source: str = 'delivery'):
+        """Registrar una entrega (lista de (enlace, game_id)) agregándola al journal"""
+        user_id = str(user_id)
+        entry = {
+            'op': 'deliver',
+            'user_id': user_id,
+            'links': [[link, game_id] for link, game_id in links_with_games],
+            'delivered_at': datetime.now().isoformat(),
+            'source': source
+        }
+        with self.lock:
+            self._apply(entry)
+            try:
+                self._append_journal(entry)
+            except Exception as e:
+                logger.error(f"❌ Error escribiendo journal de entregas: {e}")
+
+    def expire_before(self, cutoff: datetime) -> int:
+        """Expirar entregas anteriores a `cutoff` eliminando buckets completos"""
+        cutoff_bucket = int(cutoff.timestamp() // BUCKET_SECONDS)
+        expired = 0
+        with self.lock:
+            for bucket in [b for b in self.buckets if b < cutoff_bucket]:
+                for link in self.buckets.pop(bucket):
+                    if self.delivered.pop(link, None) is not None:
+                        expired += 1
+            if expired:
+                self.compact()
+        return expired
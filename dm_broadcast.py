@@ -0,0 +1,363 @@
+"""
+Motor de envío masivo de DMs para RbxServers
+Concurrencia acotada que se adapta a los rate limits de Discord, caché de usuarios con DMs cerrados,
+checkpoints para reanudar envíos interrumpidos y progreso en vivo (enviados/s y tiempo restante)
+"""
+
+import os
+import json
+import time
+import asyncio
+import secrets
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+import logging
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Límite global de Discord: 50 peticiones/s por bot; se deja margen para el resto del bot
+GLOBAL_REQUESTS_PER_SECOND = 40
+# Un envío que tarda más que esto casi seguro esperó un rate limit (discord.py duerme según X-RateLimit-*)
+RATE_LIMITED_SEND_SECONDS = 2.0
+# Códigos de error de Discord de destinatario inexistente: 50033 Invalid Recipient, 10013 Unknown User
+UNKNOWN_RECIPIENT_CODES = {50033, 10013}
+
+class BroadcastProgress:
+    """Estado de un envío masivo (también es lo que se guarda como checkpoint)"""
+
+    def __init__(self, broadcast_id: str, kind: str, recipients: List[str], payload: dict, resumable: bool = False):
+        self.broadcast_id = broadcast_id
+        self.kind = kind
+        self.resumable = resumable          # Solo estos se guardan en disco y se reanudan tras un reinicio
+        self.recipients = recipients
+        self.payload = payload
+        self.results: Dict[str, str] = {}   # user_id -> 'sent' | 'dm_closed' | 'not_found' | 'skipped' | 'error'
+        self.created_at = datetime.now().isoformat()
+        self.started_at = time.time()
+        self.finished = False
+
+    @property
+    def remaining(self) -> int:
+        return len(self.recipients) - len(self.results)
+
+    def snapshot(self, concurrency: int = 0) -> dict:
+        elapsed = max(time.time() - self.started_at, 0.001)
+        rate = len(self.results) / elapsed
+        counts: Dict[str, int] = {}
+        for status in self.results.values():
+            counts[status] = counts.get(status, 0) + 1
+        return {
+            'broadcast_id': self.broadcast_id,
+            'kind': self.kind,
+            'total': len(self.recipients),
+            'processed': len(self.results),
+            'sent': counts.get('sent', 0),
+            'failed': len(self.results) - counts.get('sent', 0),
+            'by_status': counts,
+            'remaining': self.remaining,
+            'per_second': round(rate, 1),
+            'eta_seconds': round(self.remaining / rate) if rate > 0 else None,
+            'elapsed_seconds': round(elapsed, 1),
+            'concurrency': concurrency,
+            'finished': self.finished
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            'broadcast_id': self.broadcast_id,
+            'kind': self.kind,
+            'resumable': self.resumable,
+            'recipients': self.recipients,
+            'payload': self.payload,
+            'results': self.results,
+            'created_at': self.created_at,
+            'finished': self.finished
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BroadcastProgress':
+        progress = cls(data['broadcast_id'], data.get('kind', 'broadcast'), data.get('recipients', []), data.get('payload', {}),
+                       resumable=data.get('resumable', False))
+        progress.results = data.get('results', {})
+        progress.created_at = data.get('created_at', progress.created_at)
+        progress.finished = data.get('finished', False)
+        return progress
+
+class DMBroadcaster:
+    """Envía un mismo mensaje a muchos usuarios con workers acotados y control de ritmo AIMD"""
+
+    def __init__(self, checkpoint_dir: str = "dm_broadcasts", closed_dms_file: str = "dm_closed_users.json",
+                 max_concurrency: int = 8, closed_dm_ttl: int = 7 * 24 * 3600, checkpoint_every: int = 50):
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.closed_dms_file = closed_dms_file
+        self.max_concurrency = max_concurrency
+        self.closed_dm_ttl = closed_dm_ttl
+        self.checkpoint_every = checkpoint_every
+
+        self.closed_dms: Dict[str, float] = {}   # user_id -> momento en que se detectó el DM cerrado
+        self.closed_loaded = False
+        self.active: Dict[str, BroadcastProgress] = {}
+        self.stats = {'broadcasts': 0, 'resumed': 0, 'sent': 0, 'dm_closed': 0, 'skipped_closed': 0, 'rate_limited': 0}
+
+        # Token bucket global compartido por todos los envíos en curso
+        self.tokens = float(GLOBAL_REQUESTS_PER_SECOND)
+        self.tokens_updated = time.monotonic()
+        self.token_lock: Optional[asyncio.Lock] = None
+
+    # ---- caché de DMs cerrados ----
+
+    def _load_closed_dms(self):
+        if self.closed_loaded:
+            return
+        self.closed_loaded = True
+        try:
+            if Path(self.closed_dms_file).exists():
+                with open(self.closed_dms_file, 'r', encoding='utf-8') as f:
+                    self.closed_dms = {str(k): float(v) for k, v in json.load(f).get('closed_dms', {}).items()}
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo cargar la caché de DMs cerrados: {e}")
+
+    def _save_closed_dms(self):
+        now = time.time()
+        self.closed_dms = {uid: at for uid, at in self.closed_dms.items() if now - at < self.closed_dm_ttl}
+        self._write_json(Path(self.closed_dms_file), {'closed_dms': self.closed_dms, 'updated_at': datetime.now().isoformat()})
+
+    def is_dm_closed(self, user_id: str) -> bool:
+        self._load_closed_dms()
+        closed_at = self.closed_dms.get(str(user_id))
+        return closed_at is not None and time.time() - closed_at < self.closed_dm_ttl
+
+    # ---- checkpoints ----
+
+    @staticmethod
+    def _write_json(path: Path, data: dict):
+        """Escritura atómica (archivo temporal + replace) para no dejar checkpoints a medias"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _checkpoint_path(self, broadcast_id: str) -> Path:
+        return self.checkpoint_dir / f"{broadcast_id}.json"
+
+    def _checkpoint(self, progress: BroadcastProgress):
+        if not progress.resumable:
+            return
+        try:
+            self._write_json(self._checkpoint_path(progress.broadcast_id), progress.to_dict())
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo guardar el checkpoint {progress.broadcast_id}: {e}")
+
+    def list_unfinished(self) -> List[BroadcastProgress]:
+        unfinished = []
+        if not self.checkpoint_dir.exists():
+            return unfinished
+        for path in sorted(self.checkpoint_dir.glob("*.json")):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    progress = BroadcastProgress.from_dict(json.load(f))
+                if progress.finished or progress.broadcast_id in self.active:
+                    continue
+                if not progress.resumable:
+                    # Avisos ligados al momento (alertas de inicio, mantenimiento): reenviarlos más tarde no tiene sentido
+                    path.unlink(missing_ok=True)
+                    continue
+                unfinished.append(progress)
+            except Exception as e:
+                logger.warning(f"⚠️ Checkpoint ilegible {path.name}: {e}")
+        return unfinished
+
+    # ---- ritmo ----
+
+    async def _take_token(self):
+        """Token bucket global: como mucho GLOBAL_REQUESTS_PER_SECOND peticiones/s entre todos los envíos"""
+        if self.token_lock is None:
+            self.token_lock = asyncio.Lock()
+        async with self.token_lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(GLOBAL_REQUESTS_PER_SECOND, self.tokens + (now - self.tokens_updated) * GLOBAL_REQUESTS_PER_SECOND)
+                self.tokens_updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / GLOBAL_REQUESTS_PER_SECOND)
+
+    async def _send_one(self, bot, user_id: str, payload: dict) -> str:
+        """Abrir el DM (sin fetch_user) y enviar; devuelve el estado del destinatario"""
+        embed = discord.Embed.from_dict(payload['embed']) if payload.get('embed') else None
+        await self._take_token()
+        channel = await bot.create_dm(discord.Object(id=int(user_id)))
+        await self._take_token()
+        await channel.send(content=payload.get('content'), embed=embed)
+        return 'sent'
+
+    # ---- envío ----
+
+    async def broadcast(self, bot, user_ids: Iterable, kind: str = "broadcast", embed: Optional[discord.Embed] = None,
+                        content: Optional[str] = None, broadcast_id: Optional[str] = None,
+                        on_progress: Optional[Callable[[dict], Awaitable[None]]] = None,
+                        progress_interval: float = 5.0, resumable: bool = False) -> dict:
+        """Enviar a todos los `user_ids`; si `broadcast_id` tiene checkpoint sin terminar, se reanuda.
+        Con `resumable=False` (por defecto) no se guardan checkpoints ni se reanuda tras un reinicio"""
+        self._load_closed_dms()
+        progress = None
+        if broadcast_id and self._checkpoint_path(broadcast_id).exists():
+            try:
+                with open(self._checkpoint_path(broadcast_id), 'r', encoding='utf-8') as f:
+                    progress = BroadcastProgress.from_dict(json.load(f))
+                self.stats['resumed'] += 1
+                logger.info(f"♻️ Reanudando envío {broadcast_id}: {len(progress.results)}/{len(progress.recipients)} ya procesados")
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudo leer el checkpoint {broadcast_id}: {e}")
+
+        if progress is None:
+            recipients = list(dict.fromkeys(str(uid) for uid in user_ids))
+            payload = {'content': content, 'embed': embed.to_dict() if embed else None}
+            broadcast_id = broadcast_id or f"{kind}_{int(time.time())}_{secrets.token_hex(3)}"
+            progress = BroadcastProgress(broadcast_id, kind, recipients, payload, resumable=resumable)
+            self._checkpoint(progress)
+
+        return await self._run(bot, progress, on_progress, progress_interval)
+
+    async def resume(self, bot, progress: BroadcastProgress,
+                     on_progress: Optional[Callable[[dict], Awaitable[None]]] = None,
+                     progress_interval: float = 5.0) -> dict:
+        self.stats['resumed'] += 1
+        return await self._run(bot, progress, on_progress, progress_interval)
+
+    async def _run(self, bot, progress: BroadcastProgress, on_progress, progress_interval: float) -> dict:
+        self.active[progress.broadcast_id] = progress
+        self.stats['broadcasts'] += 1
+        progress.started_at = time.time()
+        progress.finished = False
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for user_id in progress.recipients:
+            if user_id not in progress.results:
+                queue.put_nowait(user_id)
+
+        # Concurrencia AIMD: +1 por tanda sin rate limit, a la mitad al detectar uno
+        state = {'limit': max(1, self.max_concurrency // 2), 'in_flight': 0, 'since_checkpoint': 0, 'clean_sends': 0}
+        slot_freed = asyncio.Event()
+        closed_changed = False
+
+        async def worker():
+            nonlocal closed_changed
+            while True:
+                try:
+                    user_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                if self.is_dm_closed(user_id):
+                    progress.results[user_id] = 'skipped'
+                    self.stats['skipped_closed'] += 1
+                    continue
+
+                while state['in_flight'] >= state['limit']:
+                    slot_freed.clear()
+                    await slot_freed.wait()
+
+                state['in_flight'] += 1
+                started = time.monotonic()
+                try:
+                    status = await self._send_one(bot, user_id, progress.payload)
+                    self.stats['sent'] += 1
+                except discord.Forbidden:
+                    status = 'dm_closed'
+                    self.closed_dms[user_id] = time.time()
+                    self.stats['dm_closed'] += 1
+                    closed_changed = True
+                except discord.NotFound:
+                    status = 'not_found'
+                except discord.HTTPException as e:
+                    # create_dm sobre un usuario borrado responde 400 (Invalid Recipient) o Unknown User
+                    status = 'not_found' if e.code in UNKNOWN_RECIPIENT_CODES else 'error'
+                    if e.status == 429:
+                        self._throttle(state)
+                    if status == 'error':
+                        logger.warning(f"⚠️ Error HTTP enviando DM a {user_id}: {e}")
+                except Exception as e:
+                    status = 'error'
+                    logger.error(f"❌ Error enviando DM a {user_id}: {e}")
+                finally:
+                    state['in_flight'] -= 1
+                    slot_freed.set()
+
+                elapsed = time.monotonic() - started
+                if elapsed >= RATE_LIMITED_SEND_SECONDS:
+                    self._throttle(state)
+                else:
+                    state['clean_sends'] += 1
+                    if state['clean_sends'] >= state['limit'] * 4 and state['limit'] < self.max_concurrency:
+                        state['limit'] += 1
+                        state['clean_sends'] = 0
+
+                progress.results[user_id] = status
+                state['since_checkpoint'] += 1
+                if state['since_checkpoint'] >= self.checkpoint_every:
+                    state['since_checkpoint'] = 0
+                    self._checkpoint(progress)
+
+        async def reporter():
+            while True:
+                await asyncio.sleep(progress_interval)
+                try:
+                    await on_progress(progress.snapshot(state['limit']))
+                except Exception as e:
+                    logger.debug(f"Error en callback de progreso del envío: {e}")
+
+        reporter_task = asyncio.create_task(reporter()) if on_progress else None
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.max_concurrency)))
+            progress.finished = True
+        finally:
+            if reporter_task:
+                reporter_task.cancel()
+            if progress.finished:
+                # Terminado: el checkpoint ya no hace falta para reanudar
+                if progress.resumable:
+                    self._checkpoint_path(progress.broadcast_id).unlink(missing_ok=True)
+            else:
+                self._checkpoint(progress)
+            if closed_changed:
+                self._save_closed_dms()
+            self.active.pop(progress.broadcast_id, None)
+
+        summary = progress.snapshot(state['limit'])
+        summary['results'] = dict(progress.results)
+        logger.info(f"📨 Envío {progress.broadcast_id} completado: {summary['sent']} enviados, {summary['failed']} fallidos en {summary['elapsed_seconds']}s ({summary['per_second']}/s)")
+        return summary
+
+    def _throttle(self, state: dict):
+        state['limit'] = max(1, state['limit'] // 2)
+        state['clean_sends'] = 0
+        self.stats['rate_limited'] += 1
+
+    async def resume_unfinished(self, bot):
+        """Reanudar envíos que quedaron a medias (p. ej. por un reinicio)"""
+        for progress in self.list_unfinished():
+            logger.info(f"♻️ Reanudando envío interrumpido {progress.broadcast_id} ({progress.remaining} pendientes)")
+            await self.resume(bot, progress)
+
+    def get_stats(self) -> dict:
+        return {
+            'active': [progress.snapshot() for progress in self.active.values()],
+            'closed_dms_cached': len(self.closed_dms),
+            'max_concurrency': self.max_concurrency,
+            **self.stats
+        }
+
+# Motor global de envíos masivos
+dm_broadcaster = DMBroadcaster(max_concurrency=int(os.getenv('DM_BROADCAST_CONCURRENCY', '8')))
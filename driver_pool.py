@@ -0,0 +1,271 @@
+"""
+Pool compartido de drivers de Chrome (Selenium) para RbxServers
+Mantiene navegadores calientes con cookies ya aplicadas y los presta a los comandos
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PooledDriver:
+    """Driver de Chrome gestionado por el pool con su contador de usos"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.time()
+        self.last_used = time.time()
+
+class WebDriverPool:
+    """Pool acotado de WebDrivers con health checks y reciclado tras N usos o fallo"""
+
+    def __init__(self, name: str, factory: Callable, max_size: int = 2, max_uses: int = 25,
+                 max_idle_seconds: int = 900, reset_url: str = "about:blank"):
+        self.name = name
+        self.factory = factory                      # Crea un driver listo (con cookies)
+        self.max_size = max_size                    # Navegadores vivos como máximo
+        self.max_uses = max_uses                    # Préstamos antes de reciclar
+        self.max_idle_seconds = max_idle_seconds    # Tiempo máximo sin uso
+        self.reset_url = reset_url
+
+        self.condition = threading.Condition()
+        self.idle: deque = deque()
+        self.leased: Dict[int, tuple] = {}          # id(driver) -> (PooledDriver, leased_at)
+        self.creating = 0
+        self.checking = 0                           # Fuera del lock: health check, reset o cierre en curso
+
+        self.acquire_waits: deque = deque(maxlen=500)
+        self.lease_durations: deque = deque(maxlen=500)
+        self.stats = {
+            'created': 0,
+            'recycled': 0,
+            'crashed': 0,
+            'leases': 0,
+            'acquire_timeouts': 0
+        }
+
+        logger.info(f"✅ Pool de drivers '{name}' inicializado (máximo {max_size}, {max_uses} usos por driver)")
+
+    def _total(self) -> int:
+        return len(self.idle) + len(self.leased) + self.creating + self.checking
+
+    def is_healthy(self, pooled: PooledDriver) -> bool:
+        """Verificar que el navegador sigue respondiendo"""
+        try:
+            _ = pooled.driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    def _destroy(self, pooled: PooledDriver, reason: str):
+        """Cerrar un driver del pool"""
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logger.debug(f"Error cerrando driver del pool '{self.name}': {e}")
+        logger.info(f"♻️ Driver del pool '{self.name}' cerrado ({reason}, {pooled.uses} usos)")
+
+    def _reset(self, pooled: PooledDriver) -> bool:
+        """Dejar el navegador en estado limpio (una pestaña, página en blanco) conservando cookies"""
+        try:
+            handles = pooled.driver.window_handles
+            for handle in handles[1:]:
+                pooled.driver.switch_to.window(handle)
+                pooled.driver.close()
+            pooled.driver.switch_to.window(handles[0])
+            pooled.driver.get(self.reset_url)
+            return True
+        except Exception:
+            return False
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Obtener un driver del pool, creando uno nuevo si hay capacidad"""
+        wait_start = time.time()
+        deadline = wait_start + timeout if timeout is not None else None
+
+        while True:
+            pooled = None
+            with self.condition:
+                while True:
+                    # Reutilizar un driver caliente (se verifica fuera del lock)
+                    if self.idle:
+                        pooled = self.idle.popleft()
+                        self.checking += 1
+                        break
+
+                    if self._total() < self.max_size:
+                        self.creating += 1
+                        break
+
+                    remaining = deadline - time.time() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        self.stats['acquire_timeouts'] += 1
+                        raise TimeoutError(f"No hay drivers disponibles en el pool '{self.name}'")
+                    self.condition.wait(remaining)
+
+            if pooled is None:
+                break
+
+            # Health check sin bloquear al resto del pool: puede tardar si Chrome no responde
+            stale = time.time() - pooled.last_used > self.max_idle_seconds
+            healthy = not stale and self.is_healthy(pooled)
+            if not healthy:
+                self._destroy(pooled, "inactivo" if stale else "health check fallido")
+
+            with self.condition:
+                self.checking -= 1
+                if healthy:
+                    return self._lease(pooled, wait_start)
+                self.stats['recycled' if stale else 'crashed'] += 1
+                self.condition.notify()
+
+        # Crear fuera del lock: arrancar Chrome y aplicar cookies tarda varios segundos
+        try:
+            driver = self.factory()
+        except Exception:
+            with self.condition:
+                self.creating -= 1
+                self.condition.notify()
+            raise
+
+        with self.condition:
+            self.creating -= 1
+            self.stats['created'] += 1
+            return self._lease(PooledDriver(driver), wait_start)
+
+    def _lease(self, pooled: PooledDriver, wait_start: float):
+        pooled.uses += 1
+        self.leased[id(pooled.driver)] = (pooled, time.time())
+        self.acquire_waits.append(time.time() - wait_start)
+        self.stats['leases'] += 1
+        return pooled.driver
+
+    def release(self, driver, broken: bool = False):
+        """Devolver un driver al pool; se recicla si falló o alcanzó el máximo de usos"""
+        with self.condition:
+            entry = self.leased.pop(id(driver), None)
+            if entry is not None:
+                pooled, leased_at = entry
+                self.lease_durations.append(time.time() - leased_at)
+                pooled.last_used = time.time()
+                self.checking += 1
+
+        if entry is None:
+            logger.warning(f"⚠️ Driver desconocido devuelto al pool '{self.name}', cerrándolo")
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return
+
+        # Reset, health check y cierre fuera del lock (navegación y quit tardan)
+        reason = None
+        if broken or not self.is_healthy(pooled) or not self._reset(pooled):
+            reason = "fallo"
+        elif pooled.uses >= self.max_uses:
+            reason = "máximo de usos"
+        if reason:
+            self._destroy(pooled, reason)
+
+        with self.condition:
+            self.checking -= 1
+            if reason == "fallo":
+                self.stats['crashed'] += 1
+            elif reason:
+                self.stats['recycled'] += 1
+            else:
+                self.idle.append(pooled)
+            self.condition.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """Context manager: `with pool.lease() as driver:` (se devuelve siempre al salir)"""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def warm_up(self, count: int = 1) -> int:
+        """Crear navegadores por adelantado (en paralelo) para que el primer comando no pague el arranque"""
+        count = min(count, self.max_size)
+        if count <= 0:
+            return 0
+
+        def create():
+            try:
+                return self.acquire(timeout=0)
+            except Exception as e:
+                logger.warning(f"⚠️ Calentamiento parcial del pool '{self.name}': {e}")
+                return None
+
+        # Cada arranque de Chrome tarda varios segundos: lanzarlos a la vez y no uno tras otro
+        with ThreadPoolExecutor(max_workers=count, thread_name_prefix=f"warm-{self.name}") as executor:
+            drivers = [driver for driver in executor.map(lambda _: create(), range(count)) if driver is not None]
+        for driver in drivers:
+            self.release(driver)
+        logger.info(f"🔥 Pool '{self.name}' calentado con {len(drivers)} navegadores")
+        return len(drivers)
+
+    def close_all(self):
+        """Cerrar todos los drivers inactivos del pool"""
+        with self.condition:
+            closing = list(self.idle)
+            self.idle.clear()
+        for pooled in closing:
+            self._destroy(pooled, "cierre del pool")
+
+    def get_metrics(self) -> dict:
+        """Métricas de espera al adquirir y duración de préstamos"""
+        def summarize(values) -> dict:
+            ordered = sorted(values)
+            if not ordered:
+                return {'count': 0, 'avg': 0, 'p95': 0, 'max': 0}
+            return {
+                'count': len(ordered),
+                'avg': round(sum(ordered) / len(ordered), 3),
+                'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+                'max': round(ordered[-1], 3)
+            }
+
+        with self.condition:
+            return {
+                'name': self.name,
+                'max_size': self.max_size,
+                'idle': len(self.idle),
+                'leased': len(self.leased),
+                'creating': self.creating,
+                'checking': self.checking,
+                'acquire_wait_seconds': summarize(self.acquire_waits),
+                'lease_duration_seconds': summarize(self.lease_durations),
+                **self.stats
+            }
+
+# Registro global de pools (uno por tipo de navegador)
+driver_pools: Dict[str, WebDriverPool] = {}
+_registry_lock = threading.Lock()
+
+def get_driver_pool(name: str, factory: Callable, **kwargs) -> WebDriverPool:
+    """Obtener (o crear) el pool compartido con el nombre dado"""
+    with _registry_lock:
+        if name not in driver_pools:
+            kwargs.setdefault('max_size', int(os.getenv('DRIVER_POOL_SIZE', '2')))
+            kwargs.setdefault('max_uses', int(os.getenv('DRIVER_POOL_MAX_USES', '25')))
+            driver_pools[name] = WebDriverPool(name, factory, **kwargs)
+        return driver_pools[name]
+
+def get_all_pool_metrics() -> List[dict]:
+    """Métricas de todos los pools registrados"""
+    return [pool.get_metrics() for pool in list(driver_pools.values())]
+
+def close_all_pools():
+    """Cerrar todos los pools registrados"""
+    for pool in list(driver_pools.values()):
+        pool.close_all()
@@ -0,0 +1,143 @@
+"""
+Pool de enlaces VIP por juego compartido entre usuarios para RbxServers
+Guarda los enlaces extraídos recientemente para responder sin abrir un navegador
+"""
+
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class GameLinkCache:
+    """Enlaces VIP recientes por juego con fecha de descubrimiento, TTL y marca de validez"""
+
+    def __init__(self, ttl_seconds: int = 1800, max_links_per_game: int = 50, evict_interval: int = 600):
+        self.ttl_seconds = ttl_seconds                  # Vida de un enlace en el pool
+        self.max_links_per_game = max_links_per_game    # Se descartan los más antiguos
+        self.evict_interval = evict_interval            # Limpieza periódica de juegos que nadie vuelve a pedir
+        self.evict_task: Optional[asyncio.Task] = None
+        self.lock = threading.RLock()
+        # game_id -> OrderedDict(vip_link -> entrada), en orden de descubrimiento
+        self.games: Dict[str, OrderedDict] = {}
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'links_added': 0,
+            'links_expired': 0,
+            'links_invalidated': 0
+        }
+
+    def _is_fresh(self, entry: dict, now: float) -> bool:
+        return entry['valid'] and now - entry['discovered_at'] < self.ttl_seconds
+
+    def _evict_game(self, game_id: str, now: float):
+        links = self.games.get(game_id)
+        if not links:
+            return
+        for link in [link for link, entry in links.items() if not self._is_fresh(entry, now)]:
+            del links[link]
+            self.stats['links_expired'] += 1
+        if not links:
+            del self.games[game_id]
+
+    def add_link(self, game_id: str, vip_link: str, source_user_id: Optional[str] = None,
+                 source_url: Optional[str] = None):
+        """Agregar (o refrescar) un enlace recién extraído al pool del juego"""
+        game_id = str(game_id)
+        with self.lock:
+            links = self.games.setdefault(game_id, OrderedDict())
+            if vip_link in links:
+                links.move_to_end(vip_link)
+            else:
+                self.stats['links_added'] += 1
+            links[vip_link] = {
+                'discovered_at': time.time(),
+                'valid': True,
+                'source_user_id': str(source_user_id) if source_user_id else None,
+                'source_url': source_url
+            }
+            while len(links) > self.max_links_per_game:
+                links.popitem(last=False)
+
+    def get_fresh_links(self, game_id: str, exclude: Optional[Iterable[str]] = None,
+                        limit: Optional[int] = None) -> List[str]:
+        """Enlaces válidos y no expirados del juego (más recientes primero), omitiendo `exclude`"""
+        game_id = str(game_id)
+        exclude = set(exclude or [])
+        now = time.time()
+
+        with self.lock:
+            self._evict_game(game_id, now)
+            links = self.games.get(game_id, {})
+            fresh = [link for link in reversed(links) if link not in exclude]
+            if limit is not None:
+                fresh = fresh[:limit]
+            self.stats['hits' if fresh else 'misses'] += 1
+            return fresh
+
+    def invalidate(self, vip_link: str, game_id: Optional[str] = None) -> bool:
+        """Marcar un enlace como inválido (p. ej. reportado como caído) para no volver a servirlo"""
+        with self.lock:
+            # Buscar primero en el juego indicado y luego en el resto
+            game_ids = ([str(game_id)] if game_id else []) + [gid for gid in self.games if gid != str(game_id)]
+            for gid in game_ids:
+                entry = self.games.get(gid, {}).get(vip_link)
+                if entry and entry['valid']:
+                    entry['valid'] = False
+                    self.stats['links_invalidated'] += 1
+                    return True
+            return False
+
+    def evict_expired(self) -> int:
+        """Eliminar enlaces expirados o inválidos de todos los juegos"""
+        now = time.time()
+        with self.lock:
+            before = self.stats['links_expired']
+            for game_id in list(self.games):
+                self._evict_game(game_id, now)
+            return self.stats['links_expired'] - before
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Iniciar la limpieza periódica de enlaces expirados en el event loop del bot"""
+        loop = loop or asyncio.get_running_loop()
+        if self.evict_task is None or self.evict_task.done():
+            self.evict_task = loop.create_task(self._evict_loop())
+            logger.info("🧹 Limpieza periódica del pool de enlaces iniciada")
+
+    async def _evict_loop(self):
+        while True:
+            await asyncio.sleep(self.evict_interval)
+            try:
+                evicted = self.evict_expired()
+                if evicted:
+                    logger.debug(f"🧹 {evicted} enlaces expirados eliminados del pool")
+            except Exception as e:
+                logger.error(f"❌ Error limpiando el pool de enlaces: {e}")
+
+    def close(self):
+        """Detener la limpieza periódica"""
+        if self.evict_task and not self.evict_task.done():
+            self.evict_task.cancel()
+
+    def get_stats(self) -> dict:
+        """Estado del pool para diagnóstico"""
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                'games': len(self.games),
+                'links': sum(len(links) for links in self.games.values()),
+                'ttl_seconds': self.ttl_seconds,
+                'hit_rate': round(self.stats['hits'] / lookups * 100, 1) if lookups else 0,
+                **self.stats
+            }
+
+# Pool global de enlaces por juego
+game_link_cache = GameLinkCache(
+    ttl_seconds=int(os.getenv('GAME_LINK_CACHE_TTL', '1800')),
+    max_links_per_game=int(os.getenv('GAME_LINK_CACHE_MAX_PER_GAME', '50'))
+)
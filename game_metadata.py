@@ -0,0 +1,503 @@
+"""
+Caché persistente de metadatos de juegos para RbxServers
+place ID -> universe ID -> nombre, icono y categoría, rellenada por lotes con los endpoints multi-ID de Roblox
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Alias de búsqueda -> juego conocido (también siembra la caché para que funcione sin red)
+KNOWN_GAMES = {
+    # Simulators
+    "pet simulator": {"id": "6284583030", "name": "🎃 Pet Simulator X", "category": "simulator"},
+    "pet sim": {"id": "6284583030", "name": "🎃 Pet Simulator X", "category": "simulator"},
+    "mining simulator": {"id": "2724924549", "name": "⛏️ Mining Simulator 2", "category": "simulator"},
+    "bee swarm": {"id": "1537690962", "name": "🐝 Bee Swarm Simulator", "category": "simulator"},
+    "bee simulator": {"id": "1537690962", "name": "🐝 Bee Swarm Simulator", "category": "simulator"},
+    "vehicle simulator": {"id": "171391948", "name": "Vehicle Simulator", "category": "simulator"},
+    "car simulator": {"id": "171391948", "name": "Vehicle Simulator", "category": "simulator"},
+    "bubble gum": {"id": "2512643572", "name": "🎈 Bubble Gum Simulator", "category": "simulator"},
+    "anime fighting": {"id": "2505996599", "name": "🌟 Anime Fighting Simulator", "category": "simulator"},
+    "muscle legends": {"id": "3623096087", "name": "💪 Muscle Legends", "category": "simulator"},
+    "lifting titans": {"id": "2986677229", "name": "Lifting Titans", "category": "simulator"},
+    "magnet simulator": {"id": "1250402770", "name": "🧲 Magnet Simulator", "category": "simulator"},
+    "saber simulator": {"id": "3823781113", "name": "⚔️ Saber Simulator", "category": "simulator"},
+    "clicking simulator": {"id": "2674698980", "name": "🖱️ Clicking Simulator", "category": "simulator"},
+    "shindo life": {"id": "4616652839", "name": "Shindo Life", "category": "rpg"},
+    "shinobi life": {"id": "4616652839", "name": "Shindo Life", "category": "rpg"},
+
+    # RPG/Adventure
+    "blox fruits": {"id": "2753915549", "name": "🌊 Blox Fruits", "category": "rpg"},
+    "one piece": {"id": "2753915549", "name": "🌊 Blox Fruits", "category": "rpg"},
+    "anime adventures": {"id": "8304191830", "name": "🎌 Anime Adventures", "category": "rpg"},
+    "all star tower defense": {"id": "4646477729", "name": "⭐ All Star Tower Defense", "category": "rpg"},
+    "astd": {"id": "4646477729", "name": "⭐ All Star Tower Defense", "category": "rpg"},
+    "anime defenders": {"id": "15186202290", "name": "<:1000182637:1396049292879200256> Anime Defenders", "category": "rpg"},
+    "deepwoken": {"id": "4111023553", "name": "Deepwoken", "category": "rpg"},
+    "rogue lineage": {"id": "3016661674", "name": "🗡️ Rogue Lineage", "category": "rpg"},
+    "world zero": {"id": "4738545896", "name": "⚔️ World // Zero", "category": "rpg"},
+    "dungeon quest": {"id": "2414851778", "name": "⚔️ Dungeon Quest", "category": "rpg"},
+    "arcane odyssey": {"id": "3272915504", "name": "🌊 Arcane Odyssey", "category": "rpg"},
+
+    # Popular Games
+    "dress to impress": {"id": "15101393044", "name": "[🏖️SUMMER!!] Dress To Impress", "category": "social"},
+    "dti": {"id": "15101393044", "name": "[🏖️SUMMER!!] Dress To Impress", "category": "social"},
+    "adopt me": {"id": "920587237", "name": "Adopt Me!", "category": "social"},
+    "brookhaven": {"id": "4924922222", "name": "🏡 Brookhaven RP", "category": "social"},
+    "brookhaven rp": {"id": "4924922222", "name": "🏡 Brookhaven RP", "category": "social"},
+    "bloxburg": {"id": "185655149", "name": "Welcome to Bloxburg", "category": "building"},
+    "welcome to bloxburg": {"id": "185655149", "name": "Welcome to Bloxburg", "category": "building"},
+    "royale high": {"id": "735030788", "name": "👑 Royale High", "category": "social"},
+    "rh": {"id": "735030788", "name": "👑 Royale High", "category": "social"},
+    "meep city": {"id": "370731277", "name": "MeepCity", "category": "social"},
+    "meepcity": {"id": "370731277", "name": "MeepCity", "category": "social"},
+
+    # Action/Fighting
+    "jailbreak": {"id": "606849621", "name": "🚓 Jailbreak", "category": "action"},
+    "arsenal": {"id": "286090429", "name": "🔫 Arsenal", "category": "action"},
+    "phantom forces": {"id": "292439477", "name": "Phantom Forces", "category": "action"},
+    "bad business": {"id": "3233893879", "name": "Bad Business", "category": "action"},
+    "counter blox": {"id": "301549746", "name": "Counter Blox", "category": "action"},
+    "criminality": {"id": "4588604953", "name": "Criminality", "category": "action"},
+    "da hood": {"id": "2788229376", "name": "Da Hood", "category": "action"},
+    "the hood": {"id": "2788229376", "name": "Da Hood", "category": "action"},
+    "prison life": {"id": "155615604", "name": "Prison Life", "category": "action"},
+    "mad city": {"id": "1224212277", "name": "Mad City", "category": "action"},
+
+    # Horror
+    "piggy": {"id": "4623386862", "name": "🐷 PIGGY", "category": "horror"},
+    "doors": {"id": "6516141723", "name": "🚪 DOORS", "category": "horror"},
+    "the mimic": {"id": "2377868063", "name": "👻 The Mimic", "category": "horror"},
+    "flee the facility": {"id": "893973440", "name": "Flee the Facility", "category": "horror"},
+    "dead silence": {"id": "2039118386", "name": "Dead Silence", "category": "horror"},
+    "midnight horrors": {"id": "318978013", "name": "Midnight Horrors", "category": "horror"},
+    "identity fraud": {"id": "776877586", "name": "Identity Fraud", "category": "horror"},
+    "survive the killer": {"id": "1320186298", "name": "Survive the Killer!", "category": "horror"},
+
+    # Puzzle/Strategy
+    "murder mystery": {"id": "142823291", "name": "🔍 Murder Mystery 2", "category": "puzzle"},
+    "mm2": {"id": "142823291", "name": "🔍 Murder Mystery 2", "category": "puzzle"},
+    "murder mystery 2": {"id": "142823291", "name": "🔍 Murder Mystery 2", "category": "puzzle"},
+    "tower of hell": {"id": "1962086868", "name": "🏗️ Tower of Hell [CHRISTMAS]", "category": "puzzle"},
+    "toh": {"id": "1962086868", "name": "🏗️ Tower of Hell [CHRISTMAS]", "category": "puzzle"},
+    "mega fun obby": {"id": "1499593574", "name": "Mega Fun Obby", "category": "puzzle"},
+    "escape room": {"id": "4777817887", "name": "Escape Room", "category": "puzzle"},
+    "find the markers": {"id": "6029715808", "name": "Find the Markers", "category": "puzzle"},
+
+    # Racing
+    "vehicle legends": {"id": "3146619063", "name": "🏁 Vehicle Legends", "category": "racing"},
+    "driving simulator": {"id": "3057042787", "name": "🚗 Driving Simulator", "category": "racing"},
+    "ultimate driving": {"id": "54865335", "name": "Ultimate Driving", "category": "racing"},
+    "ro racing": {"id": "1047802162", "name": "RO-Racing", "category": "racing"},
+    "speed run": {"id": "183364845", "name": "Speed Run 4", "category": "racing"},
+    "speed run 4": {"id": "183364845", "name": "Speed Run 4", "category": "racing"},
+
+    # Sports
+    "football fusion": {"id": "2987410699", "name": "🏈 Football Fusion 2", "category": "sports"},
+    "football fusion 2": {"id": "2987410699", "name": "🏈 Football Fusion 2", "category": "sports"},
+    "legendary football": {"id": "1045538060", "name": "Legendary Football", "category": "sports"},
+    "ro soccer": {"id": "372226183", "name": "RO-Soccer", "category": "sports"},
+    "basketball legends": {"id": "1499593574", "name": "Basketball Legends", "category": "sports"},
+
+    # Anime Games
+    "anime fighters": {"id": "2505996599", "name": "🌟 Anime Fighting Simulator", "category": "anime"},
+    "project slayers": {"id": "3823781113", "name": "Project Slayers", "category": "anime"},
+    "demon slayer": {"id": "3823781113", "name": "Project Slayers", "category": "anime"},
+    "naruto": {"id": "4616652839", "name": "Shindo Life", "category": "anime"},
+    "dragon ball": {"id": "536102540", "name": "Dragon Ball Z Final Stand", "category": "anime"},
+    "dbz": {"id": "536102540", "name": "Dragon Ball Z Final Stand", "category": "anime"},
+    "one punch man": {"id": "3297964905", "name": "Heroes Online", "category": "anime"},
+    "my hero academia": {"id": "3297964905", "name": "Heroes Online", "category": "anime"},
+    "mha": {"id": "3297964905", "name": "Heroes Online", "category": "anime"},
+
+    # Tycoon
+    "retail tycoon": {"id": "1304578966", "name": "🏪 Retail Tycoon 2", "category": "simulator"},
+    "retail tycoon 2": {"id": "1304578966", "name": "🏪 Retail Tycoon 2", "category": "simulator"},
+    "theme park tycoon": {"id": "69184822", "name": "🎢 Theme Park Tycoon 2", "category": "simulator"},
+    "restaurant tycoon": {"id": "6879537910", "name": "🍕 Restaurant Tycoon 2", "category": "simulator"},
+    "lumber tycoon": {"id": "58775777", "name": "🌲 Lumber Tycoon 2", "category": "simulator"},
+    "lumber tycoon 2": {"id": "58775777", "name": "🌲 Lumber Tycoon 2", "category": "simulator"},
+    "youtuber tycoon": {"id": "1345139196", "name": "📺 YouTuber Tycoon", "category": "simulator"},
+    "mega mansion tycoon": {"id": "1060666313", "name": "🏠 Mega Mansion Tycoon", "category": "simulator"},
+
+    # Otros juegos populares
+    "steal a brainrot": {"id": "109983668079237", "name": "🧠 Steal A Brainrot", "category": "other"},
+    "brainrot": {"id": "109983668079237", "name": "🧠 Steal A Brainrot", "category": "other"},
+    "steal brainrot": {"id": "109983668079237", "name": "🧠 Steal A Brainrot", "category": "other"}
+}
+
+# Género de Roblox -> categoría del bot (se usa si el nombre no permite clasificar el juego)
+GENRE_CATEGORIES = {
+    'RPG': 'rpg',
+    'Adventure': 'rpg',
+    'Medieval': 'rpg',
+    'Fighting': 'action',
+    'FPS': 'action',
+    'Military': 'action',
+    'Naval': 'action',
+    'Western': 'action',
+    'Horror': 'horror',
+    'Sports': 'sports',
+    'Skate Park': 'sports',
+    'Building': 'building',
+    'Town and City': 'social',
+    'Comedy': 'social',
+    'Puzzle': 'puzzle',
+    'SciFi': 'action'
+}
+
+class GameMetadataCache:
+    """Metadatos de juegos compartidos por el scraper, los perfiles y los comandos
+
+    Las lecturas síncronas nunca tocan la red: devuelven lo que haya en caché y encolan
+    el juego para que el refresco en segundo plano lo resuelva en el siguiente lote.
+    """
+
+    def __init__(self, cache_file: str = "game_metadata.json", ttl_seconds: int = 86400,
+                 negative_ttl_seconds: int = 900, refresh_interval: int = 60, batch_size: int = 50):
+        self.cache_file = cache_file
+        self.ttl_seconds = ttl_seconds                      # Vida de una entrada resuelta
+        self.negative_ttl_seconds = negative_ttl_seconds    # Reintento de juegos no encontrados
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size                        # Límite de IDs de games.roblox.com/v1/games
+        self.lock = threading.RLock()
+        self.entries: Dict[str, dict] = {}                  # place_id -> metadatos
+        self.pending: set = set()                           # place_ids por resolver en segundo plano
+        self.categorizer: Optional[Callable[[str], str]] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.refresh_task: Optional[asyncio.Task] = None
+        self.dirty = False
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'batches': 0,
+            'resolved': 0,
+            'not_found': 0,
+            'transient_failures': 0
+        }
+        self.load()
+        self._seed_known_games()
+
+    # ---- persistencia ----
+
+    def load(self):
+        """Cargar la caché del disco"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                with self.lock:
+                    self.entries = data.get('games', {})
+                logger.info(f"🎮 Metadatos de {len(self.entries)} juegos cargados desde {self.cache_file}")
+        except Exception as e:
+            logger.error(f"❌ Error cargando metadatos de juegos: {e}")
+            self.entries = {}
+
+    def save(self):
+        """Guardar la caché en disco (escritura atómica, solo si hubo cambios)"""
+        with self.lock:
+            if not self.dirty:
+                return
+            snapshot = {'games': dict(self.entries), 'saved_at': time.time()}
+            self.dirty = False
+        try:
+            temp_file = f"{self.cache_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            logger.error(f"❌ Error guardando metadatos de juegos: {e}")
+            with self.lock:
+                self.dirty = True
+
+    def _seed_known_games(self):
+        for alias_info in KNOWN_GAMES.values():
+            self.seed(alias_info['id'], alias_info['name'], category=alias_info.get('category'))
+
+    def seed(self, place_id, name: str, icon_url: Optional[str] = None, category: Optional[str] = None):
+        """Registrar datos ya conocidos (p. ej. del scraper) sin pisar una entrada resuelta por la API"""
+        place_id = str(place_id)
+        if not name or name.startswith('Game ') or name.startswith('Juego '):
+            return
+        with self.lock:
+            entry = self.entries.get(place_id)
+            if entry and entry.get('fetched_at'):
+                return
+            entry = entry or {}
+            entry.update({
+                'name': name,
+                'icon_url': icon_url or entry.get('icon_url'),
+                'category': category or entry.get('category') or self._categorize(name, None)
+            })
+            self.entries[place_id] = entry
+            self.dirty = True
+
+    # ---- lecturas sin red ----
+
+    def _is_stale(self, entry: Optional[dict], now: float) -> bool:
+        if not entry or not entry.get('fetched_at'):
+            return True
+        ttl = self.negative_ttl_seconds if entry.get('missing') else self.ttl_seconds
+        return now - entry['fetched_at'] > ttl
+
+    def get(self, place_id) -> Optional[dict]:
+        """Metadatos en caché (aunque estén vencidos); encola el refresco si faltan o vencieron"""
+        place_id = str(place_id)
+        with self.lock:
+            entry = self.entries.get(place_id)
+            if self._is_stale(entry, time.time()):
+                self.pending.add(place_id)
+            if entry and entry.get('name'):
+                self.stats['hits'] += 1
+                return dict(entry, place_id=place_id)
+            self.stats['misses'] += 1
+            return None
+
+    def get_name(self, place_id, default: Optional[str] = None) -> str:
+        entry = self.get(place_id)
+        return entry['name'] if entry else (default or f"Game {place_id}")
+
+    def get_category(self, place_id, default: str = 'other') -> str:
+        entry = self.get(place_id)
+        return (entry or {}).get('category') or default
+
+    def get_all(self) -> Dict[str, dict]:
+        """Juegos con nombre conocido: {place_id: {'name', 'category', 'icon_url'}}"""
+        with self.lock:
+            return {
+                place_id: {'name': entry['name'], 'category': entry.get('category'), 'icon_url': entry.get('icon_url')}
+                for place_id, entry in self.entries.items() if entry.get('name')
+            }
+
+    def get_scraper_info(self, place_id) -> Optional[dict]:
+        """Metadatos con las claves que usa links_by_user ('game_name', 'game_image_url', 'category')"""
+        entry = self.get(place_id)
+        if not entry:
+            return None
+        return {
+            'game_name': entry['name'],
+            'game_image_url': entry.get('icon_url'),
+            'category': entry.get('category') or 'other'
+        }
+
+    # ---- resolución por lotes ----
+
+    def _categorize(self, name: str, genre: Optional[str]) -> str:
+        category = 'other'
+        if self.categorizer and name:
+            try:
+                category = self.categorizer(name)
+            except Exception:
+                category = 'other'
+        if category == 'other' and genre:
+            category = GENRE_CATEGORIES.get(genre, 'other')
+        return category
+
+    async def _resolve_universe_ids(self, place_ids: List[str]) -> Tuple[Dict[str, int], Set[str]]:
+        """place_id -> universe_id (la relación no cambia: se reutiliza la ya guardada)
+        y los place_ids cuya consulta falló sin respuesta (error de red o de la API, no "no existe")"""
+        from roblox_client import roblox_client
+
+        universe_ids = {}
+        failed = set()
+        missing = []
+        with self.lock:
+            for place_id in place_ids:
+                universe_id = self.entries.get(place_id, {}).get('universe_id')
+                if universe_id:
+                    universe_ids[place_id] = universe_id
+                else:
+                    missing.append(place_id)
+
+        async def lookup(place_id: str):
+            data = await roblox_client.get_json(
+                f"https://apis.roblox.com/universes/v1/places/{place_id}/universe",
+                cache='game'
+            )
+            if data is None:
+                failed.add(place_id)
+            elif data.get('universeId'):
+                universe_ids[place_id] = data['universeId']
+
+        # No hay endpoint multi-ID sin autenticación para esta relación: consultas concurrentes acotadas
+        for start in range(0, len(missing), 10):
+            await asyncio.gather(*(lookup(place_id) for place_id in missing[start:start + 10]))
+
+        return universe_ids, failed
+
+    async def resolve_many(self, place_ids: Iterable, force: bool = False) -> Dict[str, dict]:
+        """Resolver varios juegos con una llamada multi-ID de detalles y otra de iconos por cada 50"""
+        from roblox_client import roblox_client
+        from thumbnail_batcher import thumbnail_batcher
+
+        now = time.time()
+        place_ids = list(dict.fromkeys(str(pid) for pid in place_ids))
+        results: Dict[str, dict] = {}
+        to_fetch = []
+
+        with self.lock:
+            for place_id in place_ids:
+                entry = self.entries.get(place_id)
+                if not force and not self._is_stale(entry, now):
+                    if not entry.get('missing'):
+                        results[place_id] = dict(entry, place_id=place_id)
+                    continue
+                to_fetch.append(place_id)
+
+        for start in range(0, len(to_fetch), self.batch_size):
+            chunk = to_fetch[start:start + self.batch_size]
+            self.stats['batches'] += 1
+            universe_ids, failed = await self._resolve_universe_ids(chunk)
+
+            details = {}
+            icons = {}
+            details_ok = True
+            if universe_ids:
+                universe_list = [str(uid) for uid in dict.fromkeys(universe_ids.values())]
+                data, icons = await asyncio.gather(
+                    roblox_client.get_json(
+                        "https://games.roblox.com/v1/games",
+                        params={"universeIds": ",".join(universe_list)}
+                    ),
+                    thumbnail_batcher.get_many('game_icon', universe_list, '512x512')
+                )
+                details_ok = data is not None
+                details = {str(game['id']): game for game in (data or {}).get('data', [])}
+
+            fetched_at = time.time()
+            with self.lock:
+                for place_id in chunk:
+                    universe_id = universe_ids.get(place_id)
+                    game = details.get(str(universe_id)) if universe_id else None
+                    entry = self.entries.get(place_id, {})
+
+                    if place_id in failed or (universe_id and not details_ok):
+                        # Fallo transitorio: no es un "no encontrado"; se reintenta en el próximo refresco
+                        if universe_id:
+                            entry['universe_id'] = universe_id
+                        if entry:
+                            self.entries[place_id] = entry
+                        self.pending.add(place_id)
+                        self.stats['transient_failures'] += 1
+                        continue
+
+                    if not game:
+                        # Caché negativa: conservar lo sembrado y no volver a preguntar hasta que venza
+                        entry.update({'fetched_at': fetched_at, 'missing': True})
+                        if universe_id:
+                            entry['universe_id'] = universe_id
+                        self.stats['not_found'] += 1
+                    else:
+                        name = game.get('name') or entry.get('name') or f"Game {place_id}"
+                        entry.update({
+                            'universe_id': universe_id,
+                            'name': name,
+                            'description': (game.get('description') or '')[:500],
+                            'genre': game.get('genre'),
+                            'icon_url': icons.get(str(universe_id)) or entry.get('icon_url'),
+                            'category': self._categorize(name, game.get('genre')),
+                            'fetched_at': fetched_at,
+                            'missing': False
+                        })
+                        results[place_id] = dict(entry, place_id=place_id)
+                        self.stats['resolved'] += 1
+
+                    self.entries[place_id] = entry
+                    self.pending.discard(place_id)
+                self.dirty = True
+
+            # Mantener el índice de búsqueda al día con los nombres resueltos
+            from game_search_index import game_search_index
+            if game_search_index.built:
+                for place_id in chunk:
+                    if place_id in results:
+                        game_search_index.add_game(place_id, results[place_id]['name'], category=results[place_id].get('category'))
+
+        return results
+
+    async def resolve(self, place_id, force: bool = False) -> Optional[dict]:
+        """Metadatos de un juego, consultando a Roblox si no están en caché"""
+        place_id = str(place_id)
+        result = (await self.resolve_many([place_id], force=force)).get(place_id)
+        if result is None:
+            # Sin datos de la API: devolver lo sembrado si existe
+            with self.lock:
+                entry = self.entries.get(place_id)
+                if entry and entry.get('name'):
+                    result = dict(entry, place_id=place_id)
+        return result
+
+    def resolve_blocking(self, place_id, timeout: float = 10) -> Optional[dict]:
+        """Resolver desde un hilo de trabajo (p. ej. el scraper) usando el event loop del bot"""
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return self.get(place_id)
+        try:
+            future = asyncio.run_coroutine_threadsafe(self.resolve(place_id), loop)
+            return future.result(timeout=timeout)
+        except Exception as e:
+            logger.debug(f"No se pudieron resolver metadatos de {place_id}: {e}")
+            return self.get(place_id)
+
+    # ---- refresco en segundo plano ----
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Iniciar el refresco periódico en el event loop del bot"""
+        self.loop = loop or asyncio.get_running_loop()
+        if self.refresh_task is None or self.refresh_task.done():
+            self.refresh_task = self.loop.create_task(self._refresh_loop())
+            logger.info("🎮 Refresco de metadatos de juegos iniciado")
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh_stale()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Error refrescando metadatos de juegos: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def refresh_stale(self) -> int:
+        """Resolver los juegos pedidos sin caché y los vencidos; devuelve cuántos se consultaron"""
+        now = time.time()
+        with self.lock:
+            targets = set(self.pending)
+            targets.update(pid for pid, entry in self.entries.items() if self._is_stale(entry, now))
+            self.pending.clear()
+
+        if targets:
+            await self.resolve_many(targets)
+        await asyncio.to_thread(self.save)
+        return len(targets)
+
+    async def close(self):
+        """Detener el refresco y guardar lo pendiente"""
+        if self.refresh_task and not self.refresh_task.done():
+            self.refresh_task.cancel()
+        self.save()
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            now = time.time()
+            return {
+                'games': len(self.entries),
+                'resolved_games': sum(1 for entry in self.entries.values() if entry.get('fetched_at') and not entry.get('missing')),
+                'negative_entries': sum(1 for entry in self.entries.values() if entry.get('missing')),
+                'stale_entries': sum(1 for entry in self.entries.values() if self._is_stale(entry, now)),
+                'pending': len(self.pending),
+                **self.stats
+            }
+
+# Caché global de metadatos de juegos
+game_metadata = GameMetadataCache(
+    ttl_seconds=int(os.getenv('GAME_METADATA_TTL', '86400')),
+    negative_ttl_seconds=int(os.getenv('GAME_METADATA_NEGATIVE_TTL', '900'))
+)
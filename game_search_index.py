@@ -0,0 +1,157 @@
+"""
+Índice de búsqueda de juegos para RbxServers
+Trigramas + prefijos sobre nombres y alias, ordenado por relevancia y popularidad, actualizable en caliente
+"""
+
+import re
+import bisect
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+CUSTOM_EMOJI_RE = re.compile(r"<a?:\w+:\d+>")
+NON_WORD_RE = re.compile(r"[^\w]+", re.UNICODE)
+
+def normalize(text: str) -> str:
+    """Minúsculas, sin emojis ni puntuación, espacios simples"""
+    text = CUSTOM_EMOJI_RE.sub(" ", text or "")
+    return " ".join(NON_WORD_RE.sub(" ", text.lower()).replace("_", " ").split())
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class GameSearchIndex:
+    """Índice invertido de trigramas y lista ordenada de claves para búsquedas por prefijo"""
+
+    def __init__(self, min_similarity: float = 0.3):
+        self.min_similarity = min_similarity
+        self.lock = threading.RLock()
+        self.games: Dict[str, dict] = {}            # game_id -> {'name', 'category', 'popularity'}
+        self.key_games: Dict[str, Set[str]] = {}    # clave normalizada -> game_ids
+        self.key_trigrams: Dict[str, int] = {}      # clave -> número de trigramas
+        self.postings: Dict[str, Set[str]] = {}     # trigrama -> claves
+        self.sorted_keys: List[str] = []            # claves y palabras sueltas para prefijos
+        self.prefix_keys: Dict[str, Set[str]] = {}  # palabra -> claves que la contienen
+        self.built = False
+
+    def _add_key(self, key: str, game_id: str):
+        if not key:
+            return
+        owners = self.key_games.get(key)
+        if owners is not None:
+            owners.add(game_id)
+            return
+
+        self.key_games[key] = {game_id}
+        grams = trigrams(key)
+        self.key_trigrams[key] = len(grams)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(key)
+
+        for word in set(key.split()) | {key}:
+            if word not in self.prefix_keys:
+                self.prefix_keys[word] = set()
+                bisect.insort(self.sorted_keys, word)
+            self.prefix_keys[word].add(key)
+
+    def add_game(self, game_id, name: str, category: Optional[str] = None,
+                 aliases: Iterable[str] = (), popularity: Optional[int] = None):
+        """Agregar o actualizar un juego (nombre nuevo, alias extra o popularidad) sin reconstruir"""
+        game_id = str(game_id)
+        if not name:
+            return
+        with self.lock:
+            game = self.games.setdefault(game_id, {'name': name, 'category': category or 'other', 'popularity': 0})
+            game['name'] = name
+            if category:
+                game['category'] = category
+            if popularity is not None:
+                game['popularity'] = popularity
+            for key in [normalize(name), *(normalize(alias) for alias in aliases)]:
+                self._add_key(key, game_id)
+
+    def bump_popularity(self, game_id, amount: int = 1):
+        with self.lock:
+            game = self.games.get(str(game_id))
+            if game:
+                game['popularity'] += amount
+
+    def _prefix_matches(self, prefix: str) -> Set[str]:
+        """Claves con alguna palabra (o la clave completa) que empiece por `prefix`"""
+        matches = set()
+        start = bisect.bisect_left(self.sorted_keys, prefix)
+        for word in self.sorted_keys[start:]:
+            if not word.startswith(prefix):
+                break
+            matches.update(self.prefix_keys[word])
+        return matches
+
+    def _score(self, query: str, query_words: List[str], key: str, shared: int, query_grams: int) -> float:
+        if key == query:
+            return 1.0
+        if key.startswith(query):
+            return 0.9 + 0.05 * len(query) / len(key)
+        key_words = key.split()
+        if all(any(kw.startswith(qw) for kw in key_words) for qw in query_words):
+            return 0.9 if len(query_words) > 1 else 0.85
+        if query in key:
+            return 0.8
+        # Similitud de Dice sobre trigramas: tolera errores de escritura
+        return 0.85 * 2 * shared / (query_grams + self.key_trigrams[key])
+
+    def search(self, text: str, limit: int = 8) -> List[Dict]:
+        """Juegos que coinciden con `text`: [{'id', 'name', 'category', 'relevance'}] del más relevante al menos"""
+        query = normalize(text)
+        if not query:
+            return []
+        query_words = query.split()
+
+        with self.lock:
+            # Candidatos: claves con trigramas en común y claves cuyas palabras empiezan por las de la búsqueda
+            query_grams = trigrams(query)
+            shared = Counter()
+            for gram in query_grams:
+                for key in self.postings.get(gram, ()):
+                    shared[key] += 1
+            candidates = set(shared)
+            for word in query_words:
+                candidates |= self._prefix_matches(word)
+
+            best: Dict[str, float] = {}
+            for key in candidates:
+                relevance = self._score(query, query_words, key, shared.get(key, 0), len(query_grams))
+                if relevance < self.min_similarity:
+                    continue
+                for game_id in self.key_games[key]:
+                    if relevance > best.get(game_id, 0):
+                        best[game_id] = relevance
+
+            ranked = sorted(
+                best.items(),
+                key=lambda item: (-round(item[1], 2), -self.games[item[0]]['popularity'], self.games[item[0]]['name'])
+            )
+            return [
+                {
+                    'id': game_id,
+                    'name': self.games[game_id]['name'],
+                    'category': self.games[game_id]['category'],
+                    'relevance': round(relevance, 3)
+                }
+                for game_id, relevance in ranked[:limit]
+            ]
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                'built': self.built,
+                'games': len(self.games),
+                'keys': len(self.key_games),
+                'trigrams': len(self.postings)
+            }
+
+# Índice global de búsqueda de juegos
+game_search_index = GameSearchIndex()
@@ -0,0 +1,203 @@
+"""
+Servicio de valoración de inventarios de Roblox para RbxServers
+Snapshot de RAP por usuario con TTL (se sirve el último valor mientras se refresca en segundo plano)
+y caché de precios por asset compartida entre usuarios; todo pasa por el cliente compartido de Roblox
+"""
+
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from roblox_client import TTLCache
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_URL = "https://inventory.roblox.com/v1/users/{user_id}/assets/collectibles"
+ASSET_DETAILS_URL = "https://economy.roblox.com/v2/assets/{asset_id}/details"
+
+class InventoryValuation:
+    """RAP por usuario (snapshots con TTL) y precios por asset (caché compartida)"""
+
+    def __init__(self, snapshot_ttl: int = 900, max_stale: int = 24 * 3600, failure_ttl: int = 120,
+                 price_ttl: int = 6 * 3600, max_items: int = 500, max_concurrency: int = 4,
+                 max_snapshots: int = 5000):
+        self.snapshot_ttl = snapshot_ttl      # Antigüedad a partir de la cual se refresca en segundo plano
+        self.max_stale = max_stale            # Más viejo que esto no se sirve: se espera al refresco
+        self.failure_ttl = failure_ttl        # Inventario privado o error: no reintentar antes de esto
+        self.max_items = max_items            # Límite de coleccionables recorridos por usuario
+        self.max_concurrency = max_concurrency
+        self.max_snapshots = max_snapshots
+
+        # user_id -> {'rap', 'items', 'fetched_at', 'available'}
+        self.snapshots: OrderedDict = OrderedDict()
+        self.prices = TTLCache(price_ttl, 20000)      # asset_id -> precio en Robux (0 si no está a la venta)
+        self.asset_rap: Dict[str, int] = {}           # asset_id -> último RAP visto en cualquier inventario
+        self.refreshing: Dict[str, asyncio.Task] = {}  # user_id -> refresco en curso (compartido)
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.stats = {
+            'snapshot_hits': 0,
+            'stale_served': 0,
+            'refreshes': 0,
+            'background_refreshes': 0,
+            'pages_fetched': 0,
+            'price_requests': 0
+        }
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Se crea dentro del event loop del bot
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.semaphore
+
+    # ---- RAP por usuario ----
+
+    async def get_user_rap(self, user_id) -> Optional[int]:
+        """RAP total del usuario; None si el inventario es privado o no se pudo leer"""
+        snapshot = await self.get_snapshot(user_id)
+        return snapshot['rap'] if snapshot else None
+
+    async def get_snapshot(self, user_id) -> Optional[dict]:
+        user_id = str(user_id)
+        snapshot = self.snapshots.get(user_id)
+        if snapshot is not None:
+            age = time.time() - snapshot['fetched_at']
+            ttl = self.snapshot_ttl if snapshot['available'] else self.failure_ttl
+            if age < ttl:
+                self.snapshots.move_to_end(user_id)
+                self.stats['snapshot_hits'] += 1
+                return snapshot
+            if snapshot['available'] and age < self.max_stale:
+                # Servir el valor anterior y refrescar sin que el comando espere
+                self.stats['stale_served'] += 1
+                self._schedule_refresh(user_id, background=True)
+                return snapshot
+
+        # shield: si se cancela el comando, el refresco compartido sigue para los demás
+        return await asyncio.shield(self._schedule_refresh(user_id))
+
+    def _schedule_refresh(self, user_id: str, background: bool = False) -> asyncio.Task:
+        """Un solo refresco en curso por usuario; los demás pedidos esperan el mismo resultado"""
+        task = self.refreshing.get(user_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refresh(user_id))
+            self.refreshing[user_id] = task
+            task.add_done_callback(lambda _: self.refreshing.pop(user_id, None))
+            if background:
+                self.stats['background_refreshes'] += 1
+        return task
+
+    async def _refresh(self, user_id: str) -> Optional[dict]:
+        async with self._get_semaphore():
+            self.stats['refreshes'] += 1
+            items = await self._fetch_collectibles(user_id)
+
+        snapshot = {
+            'rap': sum(rap for _, rap in items) if items is not None else None,
+            'items': items or [],
+            'fetched_at': time.time(),
+            'available': items is not None
+        }
+
+        # Un fallo no pisa un snapshot válido todavía servible: se sigue sirviendo y se reintenta tras failure_ttl
+        previous = self.snapshots.get(user_id)
+        if items is None and previous and previous['available'] and time.time() - previous['fetched_at'] < self.max_stale:
+            previous['fetched_at'] = min(previous['fetched_at'], time.time() - self.snapshot_ttl + self.failure_ttl)
+            return previous
+
+        self.snapshots[user_id] = snapshot
+        self.snapshots.move_to_end(user_id)
+        while len(self.snapshots) > self.max_snapshots:
+            self.snapshots.popitem(last=False)
+        return snapshot
+
+    async def _fetch_collectibles(self, user_id: str) -> Optional[List[tuple]]:
+        """Recorrer los coleccionables del usuario; devuelve [(asset_id, rap)] o None si es privado"""
+        from roblox_client import roblox_client
+
+        items = []
+        cursor = ""
+        while len(items) < self.max_items:
+            params = {"sortOrder": "Asc", "limit": 100}
+            if cursor:
+                params["cursor"] = cursor
+
+            data = await roblox_client.get_json(INVENTORY_URL.format(user_id=user_id), params=params)
+            self.stats['pages_fetched'] += 1
+            if data is None:
+                # Si la API devuelve error, probablemente el inventario es privado
+                logger.debug(f"Inventario del usuario {user_id} no disponible")
+                return None
+
+            for item in data.get("data") or []:
+                asset_id = str(item.get("assetId"))
+                rap = item.get("recentAveragePrice") or 0
+                if rap > 0:
+                    self.asset_rap[asset_id] = rap
+                items.append((asset_id, max(rap, 0)))
+                if len(items) >= self.max_items:
+                    break
+
+            cursor = data.get("nextPageCursor")
+            if not cursor or not data.get("data"):
+                break
+
+        return items
+
+    # ---- precios por asset ----
+
+    async def get_asset_prices(self, asset_ids: Iterable) -> Dict[str, int]:
+        """Precio en Robux de varios assets; solo se piden a la API los que no están en caché"""
+        asset_ids = [str(asset_id) for asset_id in asset_ids if asset_id is not None]
+        prices = {}
+        missing = []
+        for asset_id in dict.fromkeys(asset_ids):
+            price = self.prices.get(asset_id)
+            if price is None:
+                missing.append(asset_id)
+            else:
+                prices[asset_id] = price
+
+        if missing:
+            fetched = await asyncio.gather(*(self._fetch_price(asset_id) for asset_id in missing))
+            prices.update(zip(missing, fetched))
+        return prices
+
+    async def get_asset_price(self, asset_id) -> int:
+        return (await self.get_asset_prices([asset_id])).get(str(asset_id), 0)
+
+    async def _fetch_price(self, asset_id: str) -> int:
+        from roblox_client import roblox_client
+
+        async with self._get_semaphore():
+            self.stats['price_requests'] += 1
+            data = await roblox_client.get_json(ASSET_DETAILS_URL.format(asset_id=asset_id))
+
+        if data is None:
+            return 0  # No se cachea: se reintenta en la próxima consulta
+        price = data.get("PriceInRobux") or 0   # Gratis o no disponible
+        self.prices.set(asset_id, price)
+        return price
+
+    def get_asset_rap(self, asset_id) -> Optional[int]:
+        """Último RAP conocido de un limited (visto en el inventario de cualquier usuario)"""
+        return self.asset_rap.get(str(asset_id))
+
+    def get_stats(self) -> dict:
+        return {
+            'snapshots': len(self.snapshots),
+            'refreshing': len(self.refreshing),
+            'cached_prices': len(self.prices.entries),
+            'price_cache_hits': self.prices.hits,
+            'price_cache_misses': self.prices.misses,
+            'known_limiteds': len(self.asset_rap),
+            **self.stats
+        }
+
+# Servicio global de valoración de inventarios
+inventory_valuation = InventoryValuation(
+    snapshot_ttl=int(os.getenv('INVENTORY_SNAPSHOT_TTL', '900')),
+    max_concurrency=int(os.getenv('INVENTORY_MAX_CONCURRENCY', '4'))
+)
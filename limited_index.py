@@ -0,0 +1,372 @@
+"""
+Índice local de ítems limitados de Roblox para RbxServers
+Se refresca en segundo plano por páginas completas del catálogo (por relevancia y por precio ascendente); guarda precio, RAP y stock ordenados
+por precio y un índice de prefijos por nombre/abreviación para que /limited responda sin red
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEARCH_DETAILS_URL = "https://catalog.roblox.com/v1/search/items/details"
+RESALE_DATA_URL = "https://economy.roblox.com/v1/assets/{asset_id}/resale-data"
+ASSET_DETAILS_URL = "https://economy.roblox.com/v2/assets/{asset_id}/details"
+
+# Valores de SortType del catálogo (0 = Relevance, 4 = PriceAsc)
+SORT_RELEVANCE = 0
+SORT_PRICE_ASC = 4
+
+# Prioridad de cada tipo de clave al desempatar resultados de búsqueda
+KEY_NAME, KEY_ABBREVIATION, KEY_WORD = 0, 1, 2
+MAX_PREFIX_SCAN = 500
+
+def normalize(text: str) -> str:
+    """Minúsculas, solo letras/números y espacios simples"""
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", (text or "").lower()).split())
+
+def abbreviation(name: str) -> str:
+    """Iniciales de cada palabra: 'Dominus Empyreus' -> 'de'"""
+    return "".join(word[0] for word in normalize(name).split())
+
+class LimitedSnapshot:
+    """Foto inmutable del índice: se reemplaza entera en cada refresco (lecturas consistentes)"""
+
+    def __init__(self, items: Dict[str, dict], built_at: float):
+        self.items = items
+        self.built_at = built_at
+        # Ítems a la venta ordenados por precio
+        self.by_price: List[str] = sorted(
+            (item_id for item_id, item in items.items() if item.get('price')),
+            key=lambda item_id: (items[item_id]['price'], item_id)
+        )
+        # Claves de búsqueda ordenadas: (clave, prioridad, item_id)
+        keys: List[Tuple[str, int, str]] = []
+        for item_id, item in items.items():
+            name = normalize(item['name'])
+            if not name:
+                continue
+            keys.append((name, KEY_NAME, item_id))
+            abbr = abbreviation(name)
+            if len(abbr) >= 2:
+                keys.append((abbr, KEY_ABBREVIATION, item_id))
+            for word in set(name.split()[1:]):
+                keys.append((word, KEY_WORD, item_id))
+        keys.sort()
+        self.keys = [key for key, _, _ in keys]
+        self.key_entries = [(priority, item_id) for _, priority, item_id in keys]
+
+class LimitedItemsIndex:
+    """Índice de limitados en memoria, refrescado en segundo plano y persistido en disco"""
+
+    def __init__(self, cache_file: str = "limited_items.json", refresh_interval: int = 900,
+                 max_pages: int = 40, price_pages: int = 10, page_size: int = 30, rap_ttl: int = 6 * 3600,
+                 rap_batch: int = 100, max_concurrency: int = 4):
+        self.cache_file = cache_file
+        self.refresh_interval = refresh_interval
+        self.max_pages = max_pages            # Páginas del catálogo por relevancia (cobertura para búsquedas)
+        self.price_pages = price_pages        # Páginas por precio ascendente: garantizan los más baratos
+        self.page_size = page_size
+        self.rap_ttl = rap_ttl
+        self.rap_batch = rap_batch            # RAP consultados por ciclo (los más viejos primero)
+        self.max_concurrency = max_concurrency
+
+        self.snapshot = LimitedSnapshot({}, 0)
+        self.loaded = False
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.refresh_task: Optional[asyncio.Task] = None
+        self.current_refresh: Optional[asyncio.Task] = None
+        self.stats = {'refreshes': 0, 'refresh_failures': 0, 'pages_fetched': 0, 'rap_requests': 0,
+                      'lookups': 0, 'fallback_requests': 0, 'last_refresh_seconds': 0}
+
+    # ---- carga y persistencia ----
+
+    def load(self):
+        """Cargar el último índice guardado para responder desde el arranque"""
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.snapshot = LimitedSnapshot(data.get('items', {}), data.get('built_at', 0))
+                logger.info(f"💎 Índice de limitados cargado: {len(self.snapshot.items)} ítems")
+        except Exception as e:
+            logger.error(f"❌ Error cargando índice de limitados: {e}")
+
+    def save(self):
+        """Guardar el índice en disco (escritura atómica)"""
+        snapshot = self.snapshot
+        try:
+            temp_file = f"{self.cache_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'items': snapshot.items, 'built_at': snapshot.built_at}, f,
+                          ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            logger.error(f"❌ Error guardando índice de limitados: {e}")
+
+    # ---- refresco en segundo plano ----
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Iniciar el refresco periódico en el event loop del bot"""
+        self.load()
+        self.loop = loop or asyncio.get_running_loop()
+        if self.refresh_task is None or self.refresh_task.done():
+            self.refresh_task = self.loop.create_task(self._refresh_loop())
+            logger.info("💎 Refresco del índice de limitados iniciado")
+
+    async def _refresh_loop(self):
+        while True:
+            # Si el índice guardado es reciente, esperar a que venza antes del primer refresco
+            wait = self.snapshot.built_at + self.refresh_interval - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['refresh_failures'] += 1
+                logger.error(f"❌ Error refrescando índice de limitados: {e}")
+                await asyncio.sleep(60)
+
+    async def refresh(self) -> int:
+        """Reconstruir el índice; un solo refresco en curso (los demás esperan el mismo)"""
+        if self.current_refresh is None or self.current_refresh.done():
+            self.current_refresh = asyncio.create_task(self._rebuild())
+        return await asyncio.shield(self.current_refresh)
+
+    async def _rebuild(self) -> int:
+        started = time.time()
+        items = await self._fetch_catalog()
+        if not items:
+            raise RuntimeError("el catálogo no devolvió ítems limitados")
+
+        # Conservar el RAP ya conocido; consultar solo los que faltan o vencieron
+        previous = self.snapshot.items
+        for item_id, item in items.items():
+            old = previous.get(item_id)
+            if old:
+                item['rap'] = old.get('rap', 0)
+                item['rap_updated'] = old.get('rap_updated', 0)
+        await self._refresh_raps(items)
+
+        self.snapshot = LimitedSnapshot(items, time.time())
+        self.stats['refreshes'] += 1
+        self.stats['last_refresh_seconds'] = round(time.time() - started, 2)
+        await asyncio.to_thread(self.save)
+        logger.info(f"💎 Índice de limitados actualizado: {len(items)} ítems en {self.stats['last_refresh_seconds']}s")
+        return len(items)
+
+    async def _fetch_catalog(self) -> Dict[str, dict]:
+        """Catálogo de coleccionables: una pasada por relevancia y otra por precio ascendente, fusionadas.
+        La de relevancia se corta en max_pages; la de precio asegura que by_price empiece por los más baratos"""
+        by_relevance, by_price = await asyncio.gather(
+            self._fetch_pages({'SortType': SORT_RELEVANCE}, self.max_pages),
+            self._fetch_pages({'SortType': SORT_PRICE_ASC, 'MinPrice': 1}, self.price_pages)
+        )
+        # Los datos de la pasada por precio son igual de recientes; se prefieren al fusionar
+        return {**by_relevance, **by_price}
+
+    async def _fetch_pages(self, sort_params: dict, max_pages: int) -> Dict[str, dict]:
+        """Recorrer el catálogo en páginas completas (detalles incluidos) con el orden dado"""
+        from roblox_client import roblox_client
+
+        items: Dict[str, dict] = {}
+        cursor = ""
+        for _ in range(max_pages):
+            params = {'Category': 'Collectibles', 'Limit': self.page_size, **sort_params}
+            if cursor:
+                params['Cursor'] = cursor
+            data = await roblox_client.get_json(SEARCH_DETAILS_URL, params=params)
+            self.stats['pages_fetched'] += 1
+            if not data:
+                break
+
+            for entry in data.get('data') or []:
+                item = self._parse_catalog_item(entry)
+                if item:
+                    items[item['id']] = item
+
+            cursor = data.get('nextPageCursor')
+            if not cursor:
+                break
+        return items
+
+    @staticmethod
+    def _parse_catalog_item(entry: dict) -> Optional[dict]:
+        restrictions = entry.get('itemRestrictions') or []
+        is_limited = 'Limited' in restrictions
+        is_limited_unique = 'LimitedUnique' in restrictions or 'Collectible' in restrictions
+        if not (is_limited or is_limited_unique) or not entry.get('id'):
+            return None
+
+        total_copies = entry.get('totalQuantity') or 0
+        remaining = entry.get('unitsAvailableForConsumption') or 0
+        return {
+            'id': str(entry['id']),
+            'name': entry.get('name', 'Unknown Item'),
+            'price': entry.get('lowestPrice') or entry.get('price') or 0,
+            'rap': 0,
+            'rap_updated': 0,
+            'creator': entry.get('creatorName', 'Roblox'),
+            'stock': remaining if total_copies else None,
+            'totalCopies': total_copies,
+            'remaining': remaining,
+            'itemType': entry.get('itemType', 'Asset'),
+            'isLimitedUnique': is_limited_unique
+        }
+
+    async def _refresh_raps(self, items: Dict[str, dict]):
+        """Actualizar el RAP de los ítems más desactualizados con concurrencia acotada"""
+        from roblox_client import roblox_client
+
+        try:
+            from inventory_valuation import inventory_valuation
+        except Exception:
+            inventory_valuation = None
+
+        now = time.time()
+        stale = sorted(
+            (item for item in items.values() if now - item.get('rap_updated', 0) > self.rap_ttl),
+            key=lambda item: item.get('rap_updated', 0)
+        )
+
+        # RAP visto en inventarios de usuarios: gratis, sin red
+        if inventory_valuation is not None:
+            for item in stale:
+                known = inventory_valuation.get_asset_rap(item['id'])
+                if known and not item['rap']:
+                    item['rap'] = known
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(item):
+            async with semaphore:
+                self.stats['rap_requests'] += 1
+                data = await roblox_client.get_json(RESALE_DATA_URL.format(asset_id=item['id']))
+            if data:
+                item['rap'] = data.get('recentAveragePrice') or 0
+                item['rap_updated'] = time.time()
+                if not item['totalCopies'] and data.get('assetStock'):
+                    item['totalCopies'] = data['assetStock']
+
+        await asyncio.gather(*(fetch(item) for item in stale[:self.rap_batch]))
+
+    # ---- consultas (en memoria) ----
+
+    async def ensure_ready(self, timeout: float = 20) -> bool:
+        """Solo bloquea la primera vez, si no hay ningún índice guardado"""
+        self.load()
+        if self.snapshot.items:
+            return True
+        try:
+            await asyncio.wait_for(self.refresh(), timeout=timeout)
+        except Exception as e:
+            logger.warning(f"⚠️ Índice de limitados no disponible todavía: {e}")
+        return bool(self.snapshot.items)
+
+    def get_cheapest(self, limit: int = 1) -> List[dict]:
+        """Ítems limitados más baratos a la venta"""
+        self.stats['lookups'] += 1
+        snapshot = self.snapshot
+        return [dict(snapshot.items[item_id]) for item_id in snapshot.by_price[:limit]]
+
+    def get_item(self, item_id) -> Optional[dict]:
+        self.stats['lookups'] += 1
+        item = self.snapshot.items.get(str(item_id))
+        return dict(item) if item else None
+
+    def search(self, query: str, limit: int = 1) -> List[dict]:
+        """Buscar por prefijo de nombre, de palabra o por abreviación (coincidencias exactas primero)"""
+        self.stats['lookups'] += 1
+        snapshot = self.snapshot
+        query = normalize(query)
+        if not query:
+            return []
+
+        best: Dict[str, tuple] = {}
+        start = bisect_left(snapshot.keys, query)
+        for position in range(start, min(start + MAX_PREFIX_SCAN, len(snapshot.keys))):
+            key = snapshot.keys[position]
+            if not key.startswith(query):
+                break
+            priority, item_id = snapshot.key_entries[position]
+            item = snapshot.items[item_id]
+            score = (key != query, priority, -(item.get('rap') or 0))
+            if item_id not in best or score < best[item_id]:
+                best[item_id] = score
+
+        ranked = sorted(best, key=best.get)[:limit]
+        return [dict(snapshot.items[item_id]) for item_id in ranked]
+
+    async def lookup_asset(self, asset_id: str) -> Optional[dict]:
+        """Limitado por ID: del índice, o una consulta directa si todavía no está indexado"""
+        item = self.get_item(asset_id)
+        if item:
+            return item
+
+        from roblox_client import roblox_client
+        self.stats['fallback_requests'] += 1
+        data = await roblox_client.get_json(ASSET_DETAILS_URL.format(asset_id=asset_id), cache='catalog')
+        if not data or not (data.get('IsLimited') or data.get('IsLimitedUnique')):
+            return None
+        return {
+            'id': str(asset_id),
+            'name': data.get('Name', 'Unknown Item'),
+            'price': data.get('PriceInRobux', 0),
+            'rap': data.get('RecentAveragePrice', 0),
+            'creator': data.get('Creator', {}).get('Name', 'Unknown'),
+            'totalCopies': data.get('Sales', 0) if data.get('IsLimited') else 0,
+            'remaining': data.get('Remaining', 0) if data.get('IsLimited') else 0,
+            'itemType': data.get('AssetTypeDisplayName', 'Accessory'),
+            'isLimitedUnique': data.get('IsLimitedUnique', False)
+        }
+
+    async def search_catalog(self, query: str) -> Optional[dict]:
+        """Limitado por nombre fuera del índice: una sola búsqueda por palabra clave en el catálogo (cacheada)"""
+        from roblox_client import roblox_client
+
+        self.stats['fallback_requests'] += 1
+        data = await roblox_client.get_json(
+            SEARCH_DETAILS_URL,
+            params={'Category': 'Collectibles', 'Keyword': query, 'Limit': 10},
+            cache='catalog'
+        )
+        items = [item for item in map(self._parse_catalog_item, (data or {}).get('data') or []) if item]
+        if not items:
+            return None
+        # Coincidencia exacta de nombre primero; si no, el orden de relevancia del catálogo
+        normalized = normalize(query)
+        return next((item for item in items if normalize(item['name']) == normalized), items[0])
+
+    async def close(self):
+        """Detener el refresco"""
+        if self.refresh_task and not self.refresh_task.done():
+            self.refresh_task.cancel()
+
+    def get_stats(self) -> dict:
+        snapshot = self.snapshot
+        return {
+            'items': len(snapshot.items),
+            'for_sale': len(snapshot.by_price),
+            'search_keys': len(snapshot.keys),
+            'built_at': snapshot.built_at,
+            'age_seconds': round(time.time() - snapshot.built_at) if snapshot.built_at else None,
+            **self.stats
+        }
+
+# Índice global de ítems limitados
+limited_index = LimitedItemsIndex(
+    refresh_interval=int(os.getenv('LIMITED_INDEX_REFRESH_SECONDS', '900')),
+    max_pages=int(os.getenv('LIMITED_INDEX_MAX_PAGES', '40')),
+    price_pages=int(os.getenv('LIMITED_INDEX_PRICE_PAGES', '10'))
+)
@@ -11,6 +11,8 @@ import re
 import aiohttp
 import string
 import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from aiohttp import web
 import asyncio
 import json
@@ -46,8 +48,14 @@ except Exception as env_error:
     # Continuar de todas formas, Railway proporciona las variables directamente
 
 # Import new systems
-from recommendations import RecommendationEngine
-from report_system import ServerReportSystem
+from recommendations import RecommendationEngine, recommendation_model
+from report_system import report_system
+from game_link_cache import game_link_cache
+from game_metadata import game_metadata, KNOWN_GAMES
+from game_search_index import game_search_index
+from stats_aggregator import stats_aggregator
+from runtime_metrics import runtime_metrics
+from scraping_queue import scraping_scheduler, current_job, PRIORITY_VIP, PRIORITY_DONATOR, PRIORITY_NORMAL
 from rbxserversbot import setup_roblox_control_commands
 from middleman_system import setup_middleman_system
 from selenium import webdriver
@@ -764,6 +772,7 @@ class RobloxVerificationSystem:
                     self.verified_users = data.get('verified_users', {})
                     self.pending_verifications = data.get('pending_verifications', {})
                     logger.info(f"Loaded {len(self.verified_users)} verified users")
+                    stats_aggregator.rebuild_verifications(self.verified_users)
             else:
                 self.verified_users = {}
                 self.pending_verifications = {}
@@ -851,6 +860,7 @@ class RobloxVerificationSystem:
         
         for discord_id, roblox_username in expired_verified:
             del self.verified_users[discord_id]
+            stats_aggregator.remove_verification(discord_id)
             logger.info(f"Verification expired for user {discord_id}")
         
         # Limpiar verificaciones pendientes expiradas (10 minutos)
@@ -1026,6 +1036,7 @@ class RobloxVerificationSystem:
             'verification_code': pending_data['verification_code'],
             'verified_at': time.time()
         }
+        stats_aggregator.record_verification(discord_id, self.verified_users[discord_id]['verified_at'])
         
         # Remover de pendientes
         del self.pending_verifications[discord_id]
@@ -1047,29 +1058,16 @@ class RobloxVerificationSystem:
     async def get_roblox_user_by_username(self, username: str) -> Optional[dict]:
         """Get Roblox user ID and info by username"""
         try:
-            async with aiohttp.ClientSession() as session:
-                # First, get user ID from username
-                url = "https://users.roblox.com/v1/usernames/users"
-                payload = {
-                    "usernames": [username],
-                    "excludeBannedUsers": True
-                }
-                headers = {
-                    "Content-Type": "application/json",
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+            # Cliente compartido: conexión reutilizada y username -> id en caché
+            from roblox_client import roblox_client
+            user_data = await roblox_client.get_user_by_username(username)
+            if user_data:
+                return {
+                    "id": user_data.get("id"),
+                    "name": user_data.get("name"),
+                    "displayName": user_data.get("displayName")
                 }
-                
-                async with session.post(url, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("data") and len(data["data"]) > 0:
-                            user_data = data["data"][0]
-                            return {
-                                "id": user_data.get("id"),
-                                "name": user_data.get("name"),
-                                "displayName": user_data.get("displayName")
-                            }
-                    return None
+            return None
         except Exception as e:
             logger.error(f"Error getting Roblox user by username: {e}")
             return None
@@ -1337,6 +1335,7 @@ def remove_delegated_owner(user_id: str) -> bool:
         
         for discord_id, roblox_username in expired_verified:
             del self.verified_users[discord_id]
+            stats_aggregator.remove_verification(discord_id)
             logger.info(f"Verification expired for user {discord_id}")
             # Enviar alerta por DM de forma asíncrona
             asyncio.create_task(self.send_expiration_alert(discord_id, roblox_username))
@@ -1514,6 +1513,7 @@ def remove_delegated_owner(user_id: str) -> bool:
             'verification_code': pending_data['verification_code'],
             'verified_at': time.time()
         }
+        stats_aggregator.record_verification(discord_id, self.verified_users[discord_id]['verified_at'])
         
         # Remover de pendientes
         del self.pending_verifications[discord_id]
@@ -1535,29 +1535,16 @@ def remove_delegated_owner(user_id: str) -> bool:
     async def get_roblox_user_by_username(self, username: str) -> Optional[dict]:
         """Get Roblox user ID and info by username"""
         try:
-            async with aiohttp.ClientSession() as session:
-                # First, get user ID from username
-                url = "https://users.roblox.com/v1/usernames/users"
-                payload = {
-                    "usernames": [username],
-                    "excludeBannedUsers": True
-                }
-                headers = {
-                    "Content-Type": "application/json",
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+            # Cliente compartido: conexión reutilizada y username -> id en caché
+            from roblox_client import roblox_client
+            user_data = await roblox_client.get_user_by_username(username)
+            if user_data:
+                return {
+                    "id": user_data.get("id"),
+                    "name": user_data.get("name"),
+                    "displayName": user_data.get("displayName")
                 }
-                
-                async with session.post(url, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("data") and len(data["data"]) > 0:
-                            user_data = data["data"][0]
-                            return {
-                                "id": user_data.get("id"),
-                                "name": user_data.get("name"),
-                                "displayName": user_data.get("displayName")
-                            }
-                    return None
+            return None
         except Exception as e:
             logger.error(f"Error getting Roblox user by username: {e}")
             return None
@@ -1640,6 +1627,10 @@ class VIPServerScraper:
         
         # Initialize report system reference (will be set after global initialization)
         self.report_system = None
+        
+        # Extracción paralela: varios navegadores del pool procesan servidores a la vez
+        self.parallel_extraction_workers = int(os.getenv('SCRAPER_PARALLEL_WORKERS', '3'))
+        self.links_lock = threading.RLock()  # Protege links_by_user durante la extracción paralela
 
     def load_existing_links(self):
         """Load existing user server data from users_servers.json and user_game_servers.json"""
@@ -1652,15 +1643,17 @@ class VIPServerScraper:
         total_links_loaded = 0
         total_users_loaded = 0
         
-        # PRIORIDAD 1: Cargar desde user_game_servers.json (estructura simplificada)
-        user_game_servers_file = Path("user_game_servers.json")
-        if user_game_servers_file.exists():
+        # PRIORIDAD 1: Cargar desde el almacén user_game_servers.db (estructura simplificada)
+        try:
+            from server_storage import server_storage
+            user_servers_data = server_storage.get_all_user_servers()
+        except Exception as e:
+            logger.error(f"❌ Error abriendo almacén de servidores: {e}")
+            user_servers_data = None
+
+        if user_servers_data is not None:
             try:
-                logger.info(f"🔍 Cargando datos desde user_game_servers.json...")
-                with open(user_game_servers_file, 'r', encoding='utf-8') as f:
-                    simple_data = json.load(f)
-                    
-                user_servers_data = simple_data.get('user_servers', {})
+                logger.info(f"🔍 Cargando datos desde user_game_servers.db...")
                 
                 for user_id, servers_list in user_servers_data.items():
                     user_id_str = str(user_id)
@@ -1687,10 +1680,10 @@ class VIPServerScraper:
                         
                         logger.info(f"✅ Usuario {user_id_str} cargado: {len(servers_list)} servidores")
                 
-                logger.info(f"✅ Datos cargados desde user_game_servers.json: {total_users_loaded} usuarios, {total_links_loaded} enlaces")
+                logger.info(f"✅ Datos cargados desde user_game_servers.db: {total_users_loaded} usuarios, {total_links_loaded} enlaces")
                 
             except Exception as e:
-                logger.error(f"❌ Error cargando user_game_servers.json: {e}")
+                logger.error(f"❌ Error cargando user_game_servers.db: {e}")
         
         # PRIORIDAD 2: Cargar desde users_servers.json (estructura compleja) si no hay datos
         if total_users_loaded == 0 and Path(self.users_servers_file).exists():
@@ -2178,34 +2171,11 @@ class VIPServerScraper:
         return info
 
     def save_links(self):
-        """Guardar SOLO en user_game_servers.json estructura simplificada y datos generales en vip_links.json"""
-        # GUARDAR EXCLUSIVAMENTE EN user_game_servers.json (estructura simplificada)
+        """Guardar servidores en el almacén transaccional (exportado a user_game_servers.json) y datos generales en vip_links.json"""
         try:
-            import json
-            from pathlib import Path
-            from datetime import datetime
-            
-            servers_file = Path("user_game_servers.json")
-            logger.info(f"💾 GUARDANDO EXCLUSIVAMENTE en {servers_file}")
-            
-            # Cargar datos existentes
-            if servers_file.exists():
-                try:
-                    with open(servers_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    logger.info(f"📄 Archivo existente cargado")
-                except Exception as read_error:
-                    logger.error(f"❌ Error leyendo archivo existente: {read_error}")
-                    data = {}
-            else:
-                logger.info(f"📄 Creando nuevo user_game_servers.json")
-                data = {}
+            from server_storage import server_storage
 
-            # Asegurar estructura correcta
-            if 'user_servers' not in data:
-                data['user_servers'] = {}
-            if 'metadata' not in data:
-                data['metadata'] = {}
+            logger.info(f"💾 GUARDANDO servidores de {len(self.links_by_user)} usuarios en user_game_servers.db")
 
             # Procesar cada usuario
             total_servers_saved = 0
@@ -2220,33 +2190,23 @@ class VIPServerScraper:
                     game_servers = game_data.get('links', [])
                     user_all_servers.extend(game_servers)
                 
-                # Limitar a máximo 5 servidores
-                user_all_servers = user_all_servers[:5]
-                
-                # Guardar en el formato simplificado
-                data['user_servers'][user_id_str] = user_all_servers
-                total_servers_saved += len(user_all_servers)
+                # Guardar en el formato simplificado (máximo 5 servidores)
+                saved_servers = server_storage.set_user_servers(user_id_str, user_all_servers, limit=5)
+                total_servers_saved += len(saved_servers)
                 users_processed += 1
-                
-                logger.info(f"👤 Usuario {user_id_str}: {len(user_all_servers)} servidores guardados")
+                stats_aggregator.set_user_links(user_id_str, user_games)
+                recommendation_model.set_user(user_id_str, user_games, self.user_favorites.get(user_id_str, []))
             
-            # Actualizar metadata
-            data['metadata'].update({
-                'created_at': data['metadata'].get('created_at', datetime.now().isoformat()),
-                'last_updated': datetime.now().isoformat(),
-                'total_users': len(data['user_servers']),
-                'total_servers': sum(len(user_servers) for user_servers in data['user_servers'].values()),
-                'description': "Estructura simplificada: user_id -> array de hasta 5 servidores"
-            })
-
-            # Guardar archivo
-            with open(servers_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            stats_aggregator.retain_link_users(list(self.links_by_user))
+            recommendation_model.retain_users(list(self.links_by_user))
+            
+            # Exportar user_game_servers.json de forma atómica
+            server_storage.export_legacy_json(force=True)
             
-            logger.info(f"✅ GUARDADO EXITOSO en user_game_servers.json: {users_processed} usuarios, {total_servers_saved} servidores")
+            logger.info(f"✅ GUARDADO EXITOSO en user_game_servers.db: {users_processed} usuarios, {total_servers_saved} servidores")
             
         except Exception as e:
-            logger.error(f"❌ ERROR CRÍTICO guardando en user_game_servers.json: {e}")
+            logger.error(f"❌ ERROR CRÍTICO guardando servidores de usuarios: {e}")
             import traceback
             logger.error(f"❌ Traceback: {traceback.format_exc()}")
         
@@ -2378,7 +2338,7 @@ class VIPServerScraper:
                     if user_servers:
                         blob_success = await blob_manager.save_user_servers(user_id, user_servers)
                         if blob_success:
-                            logger.info(f"☁️ BLOB: Favoritos actualizados automáticamente en Blob Storage para usuario {user_id}")
+                            logger.info(f"☁️ BLOB: Favoritos encolados para Blob Storage (write-behind) para usuario {user_id}")
                 except Exception as e:
                     logger.error(f"❌ BLOB FAVORITOS ERROR: {e}")
             
@@ -2394,6 +2354,7 @@ class VIPServerScraper:
         user_id = str(user_id)
         if user_id in self.user_favorites and game_id in self.user_favorites[user_id]:
             self.user_favorites[user_id].remove(game_id)
+            recommendation_model.set_user(user_id, self.links_by_user.get(user_id, {}), self.user_favorites[user_id])
             return True
         return False
 
@@ -2460,7 +2421,7 @@ class VIPServerScraper:
                     if user_servers:
                         blob_success = await blob_manager.save_user_servers(user_id, user_servers)
                         if blob_success:
-                            logger.info(f"☁️ BLOB: Reserva guardada automáticamente en Blob Storage para usuario {user_id}")
+                            logger.info(f"☁️ BLOB: Reserva encolada para Blob Storage (write-behind) para usuario {user_id}")
                 except Exception as e:
                     logger.error(f"❌ BLOB RESERVA ERROR: {e}")
             
@@ -2503,7 +2464,7 @@ class VIPServerScraper:
                             if user_servers:
                                 blob_success = await blob_manager.save_user_servers(user_id, user_servers)
                                 if blob_success:
-                                    logger.info(f"☁️ BLOB: Remoción de reserva guardada automáticamente en Blob Storage para usuario {user_id}")
+                                    logger.info(f"☁️ BLOB: Remoción de reserva encolada para Blob Storage (write-behind) para usuario {user_id}")
                         except Exception as e:
                             logger.error(f"❌ BLOB REMOCIÓN ERROR: {e}")
                     
@@ -2515,244 +2476,77 @@ class VIPServerScraper:
                 return True
         return False
 
-    async def search_game_by_name(self, game_name: str) -> List[Dict]:
-        """Search for games by name using expanded database and fuzzy matching"""
-        results = []
-        
-        # Expanded database of popular Roblox games
-        common_games = {
-            # Simulators
-            "pet simulator": {"id": "6284583030", "name": "🎃 Pet Simulator X", "category": "simulator"},
-            "pet sim": {"id": "6284583030", "name": "🎃 Pet Simulator X", "category": "simulator"},
-            "mining simulator": {"id": "2724924549", "name": "⛏️ Mining Simulator 2", "category": "simulator"},
-            "bee swarm": {"id": "1537690962", "name": "🐝 Bee Swarm Simulator", "category": "simulator"},
-            "bee simulator": {"id": "1537690962", "name": "🐝 Bee Swarm Simulator", "category": "simulator"},
-            "vehicle simulator": {"id": "171391948", "name": "Vehicle Simulator", "category": "simulator"},
-            "car simulator": {"id": "171391948", "name": "Vehicle Simulator", "category": "simulator"},
-            "bubble gum": {"id": "2512643572", "name": "🎈 Bubble Gum Simulator", "category": "simulator"},
-            "anime fighting": {"id": "2505996599", "name": "🌟 Anime Fighting Simulator", "category": "simulator"},
-            "muscle legends": {"id": "3623096087", "name": "💪 Muscle Legends", "category": "simulator"},
-            "lifting titans": {"id": "2986677229", "name": "Lifting Titans", "category": "simulator"},
-            "magnet simulator": {"id": "1250402770", "name": "🧲 Magnet Simulator", "category": "simulator"},
-            "saber simulator": {"id": "3823781113", "name": "⚔️ Saber Simulator", "category": "simulator"},
-            "clicking simulator": {"id": "2674698980", "name": "🖱️ Clicking Simulator", "category": "simulator"},
-            "shindo life": {"id": "4616652839", "name": "Shindo Life", "category": "rpg"},
-            "shinobi life": {"id": "4616652839", "name": "Shindo Life", "category": "rpg"},
-            
-            # RPG/Adventure
-            "blox fruits": {"id": "2753915549", "name": "🌊 Blox Fruits", "category": "rpg"},
-            "one piece": {"id": "2753915549", "name": "🌊 Blox Fruits", "category": "rpg"},
-            "anime adventures": {"id": "8304191830", "name": "🎌 Anime Adventures", "category": "rpg"},
-            "all star tower defense": {"id": "4646477729", "name": "⭐ All Star Tower Defense", "category": "rpg"},
-            "astd": {"id": "4646477729", "name": "⭐ All Star Tower Defense", "category": "rpg"},
-            "anime defenders": {"id": "15186202290", "name": "<:1000182637:1396049292879200256> Anime Defenders", "category": "rpg"},
-            "deepwoken": {"id": "4111023553", "name": "Deepwoken", "category": "rpg"},
-            "rogue lineage": {"id": "3016661674", "name": "🗡️ Rogue Lineage", "category": "rpg"},
-            "world zero": {"id": "4738545896", "name": "⚔️ World // Zero", "category": "rpg"},
-            "dungeon quest": {"id": "2414851778", "name": "⚔️ Dungeon Quest", "category": "rpg"},
-            "arcane odyssey": {"id": "3272915504", "name": "🌊 Arcane Odyssey", "category": "rpg"},
-            
-            # Popular Games
-            "dress to impress": {"id": "15101393044", "name": "[🏖️SUMMER!!] Dress To Impress", "category": "social"},
-            "dti": {"id": "15101393044", "name": "[🏖️SUMMER!!] Dress To Impress", "category": "social"},
-            "adopt me": {"id": "920587237", "name": "Adopt Me!", "category": "social"},
-            "brookhaven": {"id": "4924922222", "name": "🏡 Brookhaven RP", "category": "social"},
-            "brookhaven rp": {"id": "4924922222", "name": "🏡 Brookhaven RP", "category": "social"},
-            "bloxburg": {"id": "185655149", "name": "Welcome to Bloxburg", "category": "building"},
-            "welcome to bloxburg": {"id": "185655149", "name": "Welcome to Bloxburg", "category": "building"},
-            "royale high": {"id": "735030788", "name": "👑 Royale High", "category": "social"},
-            "rh": {"id": "735030788", "name": "👑 Royale High", "category": "social"},
-            "meep city": {"id": "370731277", "name": "MeepCity", "category": "social"},
-            "meepcity": {"id": "370731277", "name": "MeepCity", "category": "social"},
-            
-            # Action/Fighting
-            "jailbreak": {"id": "606849621", "name": "🚓 Jailbreak", "category": "action"},
-            "arsenal": {"id": "286090429", "name": "🔫 Arsenal", "category": "action"},
-            "phantom forces": {"id": "292439477", "name": "Phantom Forces", "category": "action"},
-            "bad business": {"id": "3233893879", "name": "Bad Business", "category": "action"},
-            "counter blox": {"id": "301549746", "name": "Counter Blox", "category": "action"},
-            "criminality": {"id": "4588604953", "name": "Criminality", "category": "action"},
-            "da hood": {"id": "2788229376", "name": "Da Hood", "category": "action"},
-            "the hood": {"id": "2788229376", "name": "Da Hood", "category": "action"},
-            "prison life": {"id": "155615604", "name": "Prison Life", "category": "action"},
-            "mad city": {"id": "1224212277", "name": "Mad City", "category": "action"},
-            
-            # Horror
-            "piggy": {"id": "4623386862", "name": "🐷 PIGGY", "category": "horror"},
-            "doors": {"id": "6516141723", "name": "🚪 DOORS", "category": "horror"},
-            "the mimic": {"id": "2377868063", "name": "👻 The Mimic", "category": "horror"},
-            "flee the facility": {"id": "893973440", "name": "Flee the Facility", "category": "horror"},
-            "dead silence": {"id": "2039118386", "name": "Dead Silence", "category": "horror"},
-            "midnight horrors": {"id": "318978013", "name": "Midnight Horrors", "category": "horror"},
-            "identity fraud": {"id": "776877586", "name": "Identity Fraud", "category": "horror"},
-            "survive the killer": {"id": "1320186298", "name": "Survive the Killer!", "category": "horror"},
-            
-            # Puzzle/Strategy
-            "murder mystery": {"id": "142823291", "name": "🔍 Murder Mystery 2", "category": "puzzle"},
-            "mm2": {"id": "142823291", "name": "🔍 Murder Mystery 2", "category": "puzzle"},
-            "murder mystery 2": {"id": "142823291", "name": "🔍 Murder Mystery 2", "category": "puzzle"},
-            "tower of hell": {"id": "1962086868", "name": "🏗️ Tower of Hell [CHRISTMAS]", "category": "puzzle"},
-            "toh": {"id": "1962086868", "name": "🏗️ Tower of Hell [CHRISTMAS]", "category": "puzzle"},
-            "mega fun obby": {"id": "1499593574", "name": "Mega Fun Obby", "category": "puzzle"},
-            "escape room": {"id": "4777817887", "name": "Escape Room", "category": "puzzle"},
-            "find the markers": {"id": "6029715808", "name": "Find the Markers", "category": "puzzle"},
-            
-            # Racing
-            "vehicle legends": {"id": "3146619063", "name": "🏁 Vehicle Legends", "category": "racing"},
-            "driving simulator": {"id": "3057042787", "name": "🚗 Driving Simulator", "category": "racing"},
-            "ultimate driving": {"id": "54865335", "name": "Ultimate Driving", "category": "racing"},
-            "ro racing": {"id": "1047802162", "name": "RO-Racing", "category": "racing"},
-            "speed run": {"id": "183364845", "name": "Speed Run 4", "category": "racing"},
-            "speed run 4": {"id": "183364845", "name": "Speed Run 4", "category": "racing"},
-            
-            # Sports
-            "football fusion": {"id": "2987410699", "name": "🏈 Football Fusion 2", "category": "sports"},
-            "football fusion 2": {"id": "2987410699", "name": "🏈 Football Fusion 2", "category": "sports"},
-            "legendary football": {"id": "1045538060", "name": "Legendary Football", "category": "sports"},
-            "ro soccer": {"id": "372226183", "name": "RO-Soccer", "category": "sports"},
-            "basketball legends": {"id": "1499593574", "name": "Basketball Legends", "category": "sports"},
-            
-            # Anime Games
-            "anime fighters": {"id": "2505996599", "name": "🌟 Anime Fighting Simulator", "category": "anime"},
-            "project slayers": {"id": "3823781113", "name": "Project Slayers", "category": "anime"},
-            "demon slayer": {"id": "3823781113", "name": "Project Slayers", "category": "anime"},
-            "naruto": {"id": "4616652839", "name": "Shindo Life", "category": "anime"},
-            "dragon ball": {"id": "536102540", "name": "Dragon Ball Z Final Stand", "category": "anime"},
-            "dbz": {"id": "536102540", "name": "Dragon Ball Z Final Stand", "category": "anime"},
-            "one punch man": {"id": "3297964905", "name": "Heroes Online", "category": "anime"},
-            "my hero academia": {"id": "3297964905", "name": "Heroes Online", "category": "anime"},
-            "mha": {"id": "3297964905", "name": "Heroes Online", "category": "anime"},
-            
-            # Tycoon
-            "retail tycoon": {"id": "1304578966", "name": "🏪 Retail Tycoon 2", "category": "simulator"},
-            "retail tycoon 2": {"id": "1304578966", "name": "🏪 Retail Tycoon 2", "category": "simulator"},
-            "theme park tycoon": {"id": "69184822", "name": "🎢 Theme Park Tycoon 2", "category": "simulator"},
-            "restaurant tycoon": {"id": "6879537910", "name": "🍕 Restaurant Tycoon 2", "category": "simulator"},
-            "lumber tycoon": {"id": "58775777", "name": "🌲 Lumber Tycoon 2", "category": "simulator"},
-            "lumber tycoon 2": {"id": "58775777", "name": "🌲 Lumber Tycoon 2", "category": "simulator"},
-            "youtuber tycoon": {"id": "1345139196", "name": "📺 YouTuber Tycoon", "category": "simulator"},
-            "mega mansion tycoon": {"id": "1060666313", "name": "🏠 Mega Mansion Tycoon", "category": "simulator"},
-            
-            # Otros juegos populares
-            "steal a brainrot": {"id": "109983668079237", "name": "🧠 Steal A Brainrot", "category": "other"},
-            "brainrot": {"id": "109983668079237", "name": "🧠 Steal A Brainrot", "category": "other"},
-            "steal brainrot": {"id": "109983668079237", "name": "🧠 Steal A Brainrot", "category": "other"},
-        }
-        
-        search_lower = game_name.lower().strip()
-        
-        # Exact match first
-        if search_lower in common_games:
-            game_info = common_games[search_lower]
-            results.append({
-                "id": game_info["id"],
-                "name": game_info["name"],
-                "category": game_info.get("category", "other"),
-                "relevance": 1.0
-            })
-        
-        # Partial matches
-        for key, game_info in common_games.items():
-            if key != search_lower:  # Skip exact match already added
-                # Check if search term is in game key or vice versa
-                if (search_lower in key or key in search_lower or 
-                    any(word in key for word in search_lower.split()) or
-                    any(word in search_lower for word in key.split())):
-                    
-                    # Calculate relevance based on match quality
-                    if search_lower == key:
-                        relevance = 1.0
-                    elif search_lower in key or key in search_lower:
-                        relevance = 0.9
-                    elif len(search_lower.split()) > 1 and any(word in key for word in search_lower.split()):
-                        relevance = 0.8
-                    else:
-                        relevance = 0.7
-                    
-                    # Avoid duplicates
-                    if not any(r["id"] == game_info["id"] for r in results):
-                        results.append({
-                            "id": game_info["id"],
-                            "name": game_info["name"],
-                            "category": game_info.get("category", "other"),
-                            "relevance": relevance
-                        })
-        
-        # Sort by relevance and then by name
-        results.sort(key=lambda x: (-x["relevance"], x["name"]))
-        return results[:8]  # Return top 8 results
-
-    def save_servers_directly_to_new_format(self, user_id: str, servers: list):
-        """Método para guardar servidores directamente en user_game_servers.json"""
-        try:
-            import json
-            from pathlib import Path
-            from datetime import datetime
+    def build_search_index(self):
+        """Construir el índice de búsqueda con los alias conocidos, la caché de metadatos y los juegos scrapeados"""
+        names = {}
+        categories = dict(self.game_categories)
+        aliases: Dict[str, set] = {}
+        popularity: Dict[str, int] = {}
+
+        for alias, game_info in KNOWN_GAMES.items():
+            names.setdefault(game_info["id"], game_info["name"])
+            categories.setdefault(game_info["id"], game_info.get("category", "other"))
+            aliases.setdefault(game_info["id"], set()).update({alias, game_info["name"]})
+
+        # Popularidad = número de usuarios que tienen enlaces del juego
+        for user_games in self.links_by_user.values():
+            if not isinstance(user_games, dict):
+                continue
+            for game_id, game_data in user_games.items():
+                if not isinstance(game_data, dict):
+                    continue
+                popularity[game_id] = popularity.get(game_id, 0) + 1
+                game_name = game_data.get('game_name')
+                if game_name and not game_name.startswith('Game '):
+                    names.setdefault(game_id, game_name)
+                    aliases.setdefault(game_id, set()).add(game_name)
+
+        # Los nombres resueltos por la API de Roblox tienen prioridad
+        for game_id, game_info in game_metadata.get_all().items():
+            names[game_id] = game_info['name']
+            if game_info.get('category'):
+                categories.setdefault(game_id, game_info['category'])
+
+        for game_id, game_name in names.items():
+            game_search_index.add_game(
+                game_id, game_name,
+                category=categories.get(game_id, 'other'),
+                aliases=aliases.get(game_id, ()),
+                popularity=popularity.get(game_id, 0)
+            )
+        game_search_index.built = True
+        logger.info(f"🔎 Índice de búsqueda de juegos construido: {game_search_index.get_stats()}")
+
+    def index_scraped_game(self, game_id: str, game_name: str, category: str):
+        """Actualizar el índice de búsqueda cuando un usuario obtiene enlaces de un juego nuevo para él"""
+        if game_name and not game_name.startswith('Game '):
+            game_search_index.add_game(game_id, game_name, category=category)
+        game_search_index.bump_popularity(game_id)
 
-            servers_file = Path("user_game_servers.json")
-            
-            logger.info(f"💾 INICIANDO guardado directo para usuario {user_id} con {len(servers)} servidores")
-            
-            # Cargar datos existentes
-            if servers_file.exists():
-                try:
-                    with open(servers_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    logger.info(f"📄 Archivo existente cargado con {len(data.get('user_servers', {}))} usuarios")
-                except Exception as read_error:
-                    logger.error(f"❌ Error leyendo archivo existente: {read_error}")
-                    data = {}
-            else:
-                logger.info(f"📄 Creando nuevo archivo user_game_servers.json")
-                data = {}
+    async def search_game_by_name(self, game_name: str) -> List[Dict]:
+        """Search for games by name using the trigram/prefix search index"""
+        if not game_search_index.built:
+            self.build_search_index()
+        return game_search_index.search(game_name, limit=8)  # Return top 8 results
 
-            # Asegurar estructura correcta
-            if 'user_servers' not in data:
-                data['user_servers'] = {}
-            if 'metadata' not in data:
-                data['metadata'] = {}
+    def save_servers_directly_to_new_format(self, user_id: str, servers: list, export_legacy: bool = True):
+        """Método para guardar servidores del usuario en el almacén transaccional (user_game_servers.db)"""
+        try:
+            from server_storage import server_storage
 
             # Limitar a máximo 5 servidores
             servers = servers[:5] if servers else []
-            logger.info(f"📊 Limitando a {len(servers)} servidores (máximo 5)")
-            
-            # Actualizar datos del usuario
-            data['user_servers'][user_id] = servers
-            logger.info(f"👤 Usuario {user_id} actualizado con {len(servers)} servidores")
-            
-            # Actualizar metadata
-            data['metadata'].update({
-                'created_at': data['metadata'].get('created_at', datetime.now().isoformat()),
-                'last_updated': datetime.now().isoformat(),
-                'total_users': len(data['user_servers']),
-                'total_servers': sum(len(user_servers) for user_servers in data['user_servers'].values()),
-                'description': "Estructura simplificada: user_id -> array de hasta 5 servidores"
-            })
+            logger.info(f"💾 Guardando {len(servers)} servidores para usuario {user_id} (máximo 5)")
 
-            # Guardar archivo con múltiples intentos
-            for attempt in range(3):
-                try:
-                    with open(servers_file, 'w', encoding='utf-8') as f:
-                        json.dump(data, f, indent=2, ensure_ascii=False)
-                    
-                    # Verificar que se guardó correctamente
-                    with open(servers_file, 'r', encoding='utf-8') as f:
-                        verify_data = json.load(f)
-                        saved_servers = verify_data.get('user_servers', {}).get(user_id, [])
-                        
-                    if len(saved_servers) == len(servers):
-                        logger.info(f"✅ GUARDADO EXITOSO en intento {attempt + 1}: {len(saved_servers)} servidores verificados")
-                        return True
-                    else:
-                        logger.warning(f"⚠️ Intento {attempt + 1}: Guardado incompleto ({len(saved_servers)}/{len(servers)})")
-                        
-                except Exception as save_error:
-                    logger.error(f"❌ Error en intento {attempt + 1} de guardado: {save_error}")
-                    if attempt == 2:  # Último intento
-                        raise save_error
-                    time.sleep(1)  # Esperar antes del siguiente intento
+            # Upsert atómico de una sola fila en vez de reescribir todo el archivo
+            saved_servers = server_storage.set_user_servers(user_id, servers)
 
-            return False
+            # Exportar user_game_servers.json para los lectores legados (limitado por tiempo)
+            if export_legacy:
+                server_storage.export_legacy_json()
+
+            logger.info(f"✅ GUARDADO EXITOSO: {len(saved_servers)} servidores para usuario {user_id}")
+            return True
 
         except Exception as e:
             logger.error(f"❌ ERROR CRÍTICO en guardado directo para {user_id}: {e}")
@@ -2873,6 +2667,11 @@ class VIPServerScraper:
             logger.error(f"Error creating Chrome driver: {e}")
             raise Exception(f"Chrome driver creation failed: {e}")
     
+    def get_driver_pool(self):
+        """Pool compartido de drivers calientes (con cookies ya aplicadas) para el scraper"""
+        from driver_pool import get_driver_pool
+        return get_driver_pool('vip_scraper', self.create_driver)
+    
     def _create_driver_with_manager(self, chrome_options):
         """Create driver using WebDriverManager"""
         try:
@@ -2987,7 +2786,7 @@ class VIPServerScraper:
 
         return []
 
-    def extract_vip_link(self, driver, server_url, game_id, max_retries=2):
+    def extract_vip_link(self, driver, server_url, game_id, max_retries=2, user_id=None):
         """Extract VIP link from server page with detailed information and cookie application"""
         start_time = time.time()
 
@@ -3016,24 +2815,29 @@ class VIPServerScraper:
                     extraction_time = time.time() - start_time
 
                     # Store detailed information - now stored under user ID and game ID
-                    user_id = getattr(self, 'current_user_id', 'unknown_user')
-                    
-                    if user_id not in self.links_by_user:
-                        self.links_by_user[user_id] = {}
+                    # (user_id llega como argumento: varios workers de la cola extraen a la vez)
+                    user_id = str(user_id) if user_id else 'unknown_user'
                     
-                    if game_id not in self.links_by_user[user_id]:
-                        self.links_by_user[user_id][game_id] = {'links': [], 'game_name': f'Game {game_id}', 'server_details': {}}
-                    
-                    if 'server_details' not in self.links_by_user[user_id][game_id]:
-                        self.links_by_user[user_id][game_id]['server_details'] = {}
-
-                    self.links_by_user[user_id][game_id]['server_details'][vip_link] = {
-                        'source_url': server_url,
-                        'discovered_at': datetime.now().isoformat(),
-                        'extraction_time': round(extraction_time, 2),
-                        'server_info': server_info,
-                        'cookies_used': True
-                    }
+                    with self.links_lock:
+                        if user_id not in self.links_by_user:
+                            self.links_by_user[user_id] = {}
+                        
+                        if game_id not in self.links_by_user[user_id]:
+                            self.links_by_user[user_id][game_id] = {'links': [], 'game_name': f'Game {game_id}', 'server_details': {}}
+                        
+                        if 'server_details' not in self.links_by_user[user_id][game_id]:
+                            self.links_by_user[user_id][game_id]['server_details'] = {}
+
+                        self.links_by_user[user_id][game_id]['server_details'][vip_link] = {
+                            'source_url': server_url,
+                            'discovered_at': datetime.now().isoformat(),
+                            'extraction_time': round(extraction_time, 2),
+                            'server_info': server_info,
+                            'cookies_used': True
+                        }
+
+                    # Compartir el enlace con el pool del juego para otros usuarios
+                    game_link_cache.add_link(game_id, vip_link, source_user_id=user_id, source_url=server_url)
 
                     logger.debug(f"✅ VIP link extraído con cookies: {vip_link[:50]}...")
                     return vip_link
@@ -3048,6 +2852,55 @@ class VIPServerScraper:
 
         return None
 
+    def extract_vip_links_parallel(self, driver, server_links, game_id, user_id=None):
+        """Extraer varios servidores a la vez usando navegadores adicionales del pool.
+        Devuelve la lista de (server_url, vip_link) y la cantidad de navegadores usados"""
+        driver_pool = self.get_driver_pool()
+        worker_count = min(self.parallel_extraction_workers, len(server_links))
+        
+        pending = list(server_links)
+        pending_lock = threading.Lock()
+        used = [driver]
+        
+        def worker(worker_driver):
+            extra = worker_driver is None
+            if extra:
+                # Cada worker extra pide su propio navegador sin esperar (los arranques van en paralelo);
+                # si el pool está ocupado, los demás workers se reparten los servidores
+                try:
+                    worker_driver = driver_pool.acquire(timeout=0)
+                except Exception:
+                    return []
+                with pending_lock:
+                    used.append(worker_driver)
+            
+            results = []
+            try:
+                while True:
+                    with pending_lock:
+                        if not pending:
+                            return results
+                        server_url = pending.pop(0)
+                    try:
+                        results.append((server_url, self.extract_vip_link(worker_driver, server_url, game_id, user_id=user_id)))
+                    except Exception as e:
+                        logger.error(f"❌ Error processing {server_url}: {e}")
+                        results.append((server_url, None))
+            finally:
+                # Devolver los navegadores extra (el principal lo devuelve scrape_vip_links)
+                if extra:
+                    driver_pool.release(worker_driver)
+        
+        logger.info(f"⚡ Extracción paralela: {len(server_links)} servidores con hasta {worker_count} navegadores")
+        
+        results = []
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            futures = [executor.submit(worker, driver)] + [executor.submit(worker, None) for _ in range(worker_count - 1)]
+            for future in as_completed(futures):
+                results.extend(future.result())
+        
+        return results, len(used)
+
     def extract_server_info(self, driver, server_url):
         """Extract additional server information"""
         try:
@@ -3079,63 +2932,16 @@ class VIPServerScraper:
             logger.debug(f"Could not extract server info: {e}")
             return {'server_id': 'unknown', 'page_title': 'Unknown', 'description': 'No info available'}
 
-    def extract_game_info(self, driver, game_id):
-        """Extract game information including name and image from rbxservers.xyz"""
-        try:
-            info = {'game_name': f'Game {game_id}', 'game_image_url': None}
-            
-            # Navigate to the game page
-            url = f"https://rbxservers.xyz/games/{game_id}"
-            driver.get(url)
-            
-            # Wait for page to load
-            wait = WebDriverWait(driver, 10)
-            
-            # Try to get game name from title
-            try:
-                title_element = driver.find_element(By.TAG_NAME, "title")
-                page_title = title_element.get_attribute("textContent")
-                if page_title and page_title != "Unknown":
-                    # Clean up the title (remove "- rbxservers.xyz" if present)
-                    game_name = page_title.replace(" - rbxservers.xyz", "").strip()
-                    if game_name:
-                        info['game_name'] = game_name
-            except Exception as e:
-                logger.debug(f"Could not extract game name: {e}")
-            
-            # Try to get game image
-            try:
-                # Look for common image selectors that might contain the game thumbnail
-                image_selectors = [
-                    "img[src*='roblox']", 
-                    "img[src*='rbxcdn']",
-                    ".game-image img",
-                    ".thumbnail img",
-                    "img[alt*='game']"
-                ]
-                
-                for selector in image_selectors:
-                    try:
-                        img_elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        for img in img_elements:
-                            src = img.get_attribute("src")
-                            if src and ("roblox" in src.lower() or "rbxcdn" in src.lower()):
-                                info['game_image_url'] = src
-                                logger.info(f"Found game image: {src}")
-                                break
-                        if info['game_image_url']:
-                            break
-                    except:
-                        continue
-                        
-            except Exception as e:
-                logger.debug(f"Could not extract game image: {e}")
-            
-            return info
-            
-        except Exception as e:
-            logger.error(f"Error extracting game info: {e}")
-            return {'game_name': f'Game {game_id}', 'game_image_url': None}
+    def get_game_info(self, game_id):
+        """Nombre, imagen y categoría del juego desde la caché de metadatos (sin navegar con Selenium)"""
+        entry = game_metadata.resolve_blocking(game_id)
+        if entry:
+            return {
+                'game_name': entry['name'],
+                'game_image_url': entry.get('icon_url'),
+                'category': entry.get('category') or self.categorize_game(entry['name'])
+            }
+        return {'game_name': f'Game {game_id}', 'game_image_url': None, 'category': 'other'}
 
     def scrape_vip_links(self, game_id="109983668079237", user_id=None):
         """Main scraping function with detailed statistics"""
@@ -3144,8 +2950,8 @@ class VIPServerScraper:
         new_links_count = 0
         processed_count = 0
 
-        # Set current user ID for tracking - ensure it's always a string
-        self.current_user_id = str(user_id) if user_id else 'unknown_user'
+        # User ID for tracking - ensure it's always a string (local: no se comparte entre workers)
+        current_user_id = str(user_id) if user_id else 'unknown_user'
         
         # Validate user_id
         if user_id is None:
@@ -3153,8 +2959,8 @@ class VIPServerScraper:
             raise ValueError("user_id is required for scraping")
 
         try:
-            logger.info(f"🚀 Starting VIP server scraping for game ID: {game_id} (User: {self.current_user_id})...")
-            driver = self.create_driver()
+            logger.info(f"🚀 Starting VIP server scraping for game ID: {game_id} (User: {current_user_id})...")
+            driver = self.get_driver_pool().acquire()
             
             # Aplicar cookies inmediatamente después de crear el driver
             logger.info("🍪 Aplicando cookies de alt.txt al driver...")
@@ -3175,78 +2981,81 @@ class VIPServerScraper:
             logger.info(f"🎯 Processing {len(server_links)} server links (limited to 5)...")
 
             # Initialize user and game data if not exists
-            if self.current_user_id not in self.links_by_user:
-                self.links_by_user[self.current_user_id] = {}
+            if current_user_id not in self.links_by_user:
+                self.links_by_user[current_user_id] = {}
             
-            if game_id not in self.links_by_user[self.current_user_id]:
-                # Extract game information first
-                game_info = self.extract_game_info(driver, game_id)
+            if game_id not in self.links_by_user[current_user_id]:
+                # Metadatos del juego desde la caché compartida (sin navegación extra)
+                game_info = self.get_game_info(game_id)
                 game_name = game_info['game_name']
-                category = self.categorize_game(game_name)
+                category = game_info['category']
                 self.game_categories[game_id] = category
                 
-                self.links_by_user[self.current_user_id][game_id] = {
+                self.links_by_user[current_user_id][game_id] = {
                     'links': [],
                     'game_name': game_name,
                     'game_image_url': game_info.get('game_image_url'),
                     'category': category,
                     'server_details': {}
                 }
-
-            existing_links = set(self.links_by_user[self.current_user_id][game_id]['links'])
-
-            for i, server_url in enumerate(server_links):
-                try:
-                    processed_count += 1
-                    vip_link = self.extract_vip_link(driver, server_url, game_id)
-
-                    if vip_link and vip_link not in existing_links:
-                        self.links_by_user[self.current_user_id][game_id]['links'].append(vip_link)
-                        existing_links.add(vip_link)
-                        new_links_count += 1
-                        logger.info(f"🎉 New VIP link found for user {self.current_user_id}, game {game_id} ({new_links_count}): {vip_link}")
+                self.index_scraped_game(game_id, game_name, category)
+
+            existing_links = set(self.links_by_user[current_user_id][game_id]['links'])
+            workers_used = 1
+
+            if self.parallel_extraction_workers > 1 and len(server_links) > 1:
+                # MODO PARALELO: varios navegadores extraen a la vez; se guarda una sola vez por lote
+                extraction_results, workers_used = self.extract_vip_links_parallel(driver, server_links, game_id, user_id=current_user_id)
+                processed_count = len(extraction_results)
+                
+                with self.links_lock:
+                    for server_url, vip_link in extraction_results:
+                        if vip_link and vip_link not in existing_links:
+                            self.links_by_user[current_user_id][game_id]['links'].append(vip_link)
+                            existing_links.add(vip_link)
+                            new_links_count += 1
+                            logger.info(f"🎉 New VIP link found for user {current_user_id}, game {game_id} ({new_links_count}): {vip_link}")
+                        elif vip_link:
+                            logger.debug(f"🔄 Duplicate link skipped: {vip_link}")
+                
+                logger.info(f"⚡ Lote paralelo completado: {new_links_count} nuevos de {processed_count} servidores (guardado al final del lote)")
+            else:
+                for i, server_url in enumerate(server_links):
+                    try:
+                        processed_count += 1
+                        vip_link = self.extract_vip_link(driver, server_url, game_id, user_id=current_user_id)
+
+                        if vip_link and vip_link not in existing_links:
+                            self.links_by_user[current_user_id][game_id]['links'].append(vip_link)
+                            existing_links.add(vip_link)
+                            new_links_count += 1
+                            logger.info(f"🎉 New VIP link found for user {current_user_id}, game {game_id} ({new_links_count}): {vip_link}")
                         
-                        # GUARDADO INMEDIATO después de cada servidor encontrado
-                        current_servers = self.links_by_user[self.current_user_id][game_id]['links']
-                        logger.info(f"💾 GUARDANDO INMEDIATAMENTE servidor #{new_links_count} en user_game_servers.json")
+                            # GUARDADO INMEDIATO después de cada servidor encontrado
+                            current_servers = self.links_by_user[current_user_id][game_id]['links']
+                            logger.info(f"💾 GUARDANDO INMEDIATAMENTE servidor #{new_links_count} en user_game_servers.json")
                         
-                        # Usar el método especializado para guardado directo
-                        save_success = self.save_servers_directly_to_new_format(self.current_user_id, current_servers)
-                        if save_success:
-                            logger.info(f"✅ CONFIRMADO: Servidor #{new_links_count} guardado exitosamente")
-                        else:
-                            logger.error(f"❌ FALLO: No se pudo guardar servidor #{new_links_count}")
+                            # Usar el método especializado para guardado directo
+                            save_success = self.save_servers_directly_to_new_format(current_user_id, current_servers)
+                            if save_success:
+                                logger.info(f"✅ CONFIRMADO: Servidor #{new_links_count} guardado exitosamente")
+                            else:
+                                logger.error(f"❌ FALLO: No se pudo guardar servidor #{new_links_count}")
                         
-                        # GUARDADO AUTOMÁTICO EN BLOB STORAGE
-                        try:
-                            async def save_to_blob():
-                                try:
-                                    from blob_storage_manager import blob_manager
-                                    blob_success = await blob_manager.save_user_servers(self.current_user_id, current_servers)
-                                    if blob_success:
-                                        logger.info(f"☁️ BLOB: Servidor #{new_links_count} guardado automáticamente en Blob Storage")
-                                    else:
-                                        logger.warning(f"⚠️ BLOB: No se pudo guardar servidor #{new_links_count} en Blob Storage")
-                                except Exception as e:
-                                    logger.error(f"❌ BLOB ERROR: {e}")
-                            
-                            # Ejecutar de forma asíncrona sin bloquear
-                            asyncio.create_task(save_to_blob())
-                        except Exception as blob_error:
-                            logger.error(f"❌ Error creando tarea de guardado en blob: {blob_error}")
+                            # Blob Storage se sincroniza desde el bus de entregas (evento publicado al guardar)
                         
-                    elif vip_link:
-                        logger.debug(f"🔄 Duplicate link skipped: {vip_link}")
+                        elif vip_link:
+                            logger.debug(f"🔄 Duplicate link skipped: {vip_link}")
 
-                    # Progress indicator with ETA
-                    if (i + 1) % 3 == 0:
-                        elapsed = time.time() - start_time
-                        eta = (elapsed / (i + 1)) * (len(server_links) - i - 1)
-                        logger.info(f"📊 Progress: {i + 1}/{len(server_links)} | New: {new_links_count} | ETA: {eta:.1f}s")
+                        # Progress indicator with ETA
+                        if (i + 1) % 3 == 0:
+                            elapsed = time.time() - start_time
+                            eta = (elapsed / (i + 1)) * (len(server_links) - i - 1)
+                            logger.info(f"📊 Progress: {i + 1}/{len(server_links)} | New: {new_links_count} | ETA: {eta:.1f}s")
 
-                except Exception as e:
-                    logger.error(f"❌ Error processing {server_url}: {e}")
-                    continue
+                    except Exception as e:
+                        logger.error(f"❌ Error processing {server_url}: {e}")
+                        continue
 
             # Update statistics
             total_time = time.time() - start_time
@@ -3256,7 +3065,8 @@ class VIPServerScraper:
                 'failed_extractions': self.scraping_stats['failed_extractions'] + (processed_count - new_links_count),
                 'last_scrape_time': datetime.now().isoformat(),
                 'scrape_duration': round(total_time, 2),
-                'servers_per_minute': round((processed_count / total_time) * 60, 1) if total_time > 0 else 0
+                'servers_per_minute': round((processed_count / total_time) * 60, 1) if total_time > 0 else 0,
+                'parallel_workers': workers_used
             })
 
             # Extraer cookies de Roblox si estamos en un sitio relevante
@@ -3270,40 +3080,26 @@ class VIPServerScraper:
                 logger.debug(f"No se pudieron extraer cookies: {e}")
 
             logger.info(f"✅ Scraping completed in {total_time:.1f}s")
-            user_game_total = len(self.links_by_user[self.current_user_id][game_id]['links']) if self.current_user_id in self.links_by_user and game_id in self.links_by_user[self.current_user_id] else 0
+            user_game_total = len(self.links_by_user[current_user_id][game_id]['links']) if current_user_id in self.links_by_user and game_id in self.links_by_user[current_user_id] else 0
             logger.info(f"📈 Found {new_links_count} new VIP links (User Total: {user_game_total})")
-            logger.info(f"⚡ Processing speed: {self.scraping_stats['servers_per_minute']} servers/minute")
+            logger.info(f"⚡ Processing speed: {self.scraping_stats['servers_per_minute']} servers/minute ({workers_used} navegador(es))")
 
             # GUARDADO FINAL OBLIGATORIO EXCLUSIVO en user_game_servers.json
-            if self.current_user_id in self.links_by_user and game_id in self.links_by_user[self.current_user_id]:
-                user_servers = self.links_by_user[self.current_user_id][game_id]['links']
+            if current_user_id in self.links_by_user and game_id in self.links_by_user[current_user_id]:
+                user_servers = self.links_by_user[current_user_id][game_id]['links']
                 
-                logger.info(f"🔄 GUARDADO FINAL OBLIGATORIO: {len(user_servers)} servidores para usuario {self.current_user_id}")
+                logger.info(f"🔄 GUARDADO FINAL OBLIGATORIO: {len(user_servers)} servidores para usuario {current_user_id}")
                 
                 # Usar método especializado para guardado final
-                save_success = self.save_servers_directly_to_new_format(self.current_user_id, user_servers)
+                save_success = self.save_servers_directly_to_new_format(current_user_id, user_servers)
                 if save_success:
+                    # Exportar user_game_servers.json al terminar el scraping
+                    from server_storage import server_storage
+                    server_storage.export_legacy_json(force=True)
                     logger.info(f"✅ GUARDADO FINAL EXITOSO: {len(user_servers)} servidores confirmados en user_game_servers.json")
                 else:
                     logger.error(f"❌ GUARDADO FINAL FALLIDO para {len(user_servers)} servidores")
                 
-                # GUARDADO AUTOMÁTICO FINAL EN BLOB STORAGE
-                try:
-                    async def save_final_to_blob():
-                        try:
-                            from blob_storage_manager import blob_manager
-                            blob_final_success = await blob_manager.save_user_servers(self.current_user_id, user_servers)
-                            if blob_final_success:
-                                logger.info(f"☁️ BLOB FINAL: {len(user_servers)} servidores guardados automáticamente en Blob Storage")
-                            else:
-                                logger.warning(f"⚠️ BLOB FINAL: No se pudieron guardar {len(user_servers)} servidores en Blob Storage")
-                        except Exception as e:
-                            logger.error(f"❌ BLOB FINAL ERROR: {e}")
-                    
-                    # Ejecutar de forma asíncrona sin bloquear
-                    asyncio.create_task(save_final_to_blob())
-                except Exception as blob_final_error:
-                    logger.error(f"❌ Error creando tarea de guardado final en blob: {blob_final_error}")
             
             # Guardar solo datos generales (stats y categorías) en vip_links.json
             try:
@@ -3321,14 +3117,17 @@ class VIPServerScraper:
             except Exception as e:
                 logger.error(f"❌ Error guardando datos generales: {e}")
             
+            runtime_metrics.record_scrape('direct', time.time() - start_time, new_links=new_links_count)
             return new_links_count
 
         except Exception as e:
             logger.error(f"💥 Scraping failed: {e}")
+            runtime_metrics.record_scrape('direct', time.time() - start_time, new_links=new_links_count, success=False)
             raise
         finally:
             if driver:
-                driver.quit()
+                # Devolver el navegador al pool (se recicla si se cayó o alcanzó el máximo de usos)
+                self.get_driver_pool().release(driver)
 
     def get_random_link(self, game_id, user_id):
         """Get a random VIP link for a specific game and user with its details"""
@@ -3381,10 +3180,10 @@ bot = commands.Bot(command_prefix='/', intents=intents, case_insensitive=True)
 
 # Global instances
 scraper = VIPServerScraper()
+game_metadata.categorizer = scraper.categorize_game
 roblox_verification = RobloxVerificationSystem()
 remote_control = None  # Se inicializará después de que el bot esté configurado
 recommendation_engine = RecommendationEngine(scraper)
-report_system = ServerReportSystem()
 
 # Set report system reference in scraper
 scraper.report_system = report_system
@@ -3396,6 +3195,13 @@ class RobloxUserMonitoring:
         self.user_states = {}      # roblox_user_id -> {online, game_id, game_name, last_check}
         self.alerts_file = "user_alerts.json"
         self.monitoring_task = None
+        
+        # Consultas por lotes a la API de presencia
+        self.presence_batch_size = 50        # IDs por petición a presence.roblox.com
+        self.game_name_ttl = 3600            # Segundos que se cachea el nombre de un juego
+        self.notification_concurrency = 10   # Envíos de notificaciones simultáneos
+        self.game_name_cache: Dict[str, tuple] = {}  # universe_id -> (game_name, expires_at)
+        
         self.load_alerts_data()
     
     def load_alerts_data(self):
@@ -3510,63 +3316,157 @@ class RobloxUserMonitoring:
         except Exception as e:
             logger.error(f"Error verificando estado inmediato: {e}")
     
+    def _presence_headers(self, cookie: str) -> dict:
+        """Headers para las APIs de Roblox usadas por el monitoreo"""
+        return {
+            'Cookie': f'.ROBLOSECURITY={cookie}',
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+    
     async def get_user_presence(self, roblox_user_id: str, cookie: str) -> dict:
         """Obtener presencia de usuario usando la API de Roblox"""
+        presences = await self.get_users_presence_batch([roblox_user_id], cookie)
+        return presences.get(str(roblox_user_id))
+    
+    async def get_users_presence_batch(self, roblox_user_ids: list, cookie: str) -> Dict[str, dict]:
+        """Obtener presencia de muchos usuarios enviando los IDs por lotes"""
+        results = {}
+        headers = self._presence_headers(cookie)
+        url = "https://presence.roblox.com/v1/presence/users"
+        
         try:
             async with aiohttp.ClientSession() as session:
-                headers = {
-                    'Cookie': f'.ROBLOSECURITY={cookie}',
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
+                raw_presences = []
+                
+                for i in range(0, len(roblox_user_ids), self.presence_batch_size):
+                    chunk = roblox_user_ids[i:i + self.presence_batch_size]
+                    payload = {"userIds": [int(user_id) for user_id in chunk]}
+                    
+                    for attempt in range(3):
+                        async with session.post(url, json=payload, headers=headers) as response:
+                            if response.status == 200:
+                                data = await response.json()
+                                raw_presences.extend(data.get('userPresences', []))
+                                break
+                            elif response.status == 429:
+                                retry_after = float(response.headers.get('Retry-After', 2 ** attempt))
+                                logger.warning(f"⚠️ Rate limit en API presencia, reintentando en {retry_after}s")
+                                await asyncio.sleep(retry_after)
+                            else:
+                                logger.warning(f"⚠️ Error API presencia: {response.status}")
+                                break
                 
-                # API de presencia de Roblox
-                url = f"https://presence.roblox.com/v1/presence/users"
-                payload = {"userIds": [int(roblox_user_id)]}
+                # Resolver nombres de juegos en lote (con cache TTL)
+                universe_ids = {str(p['universeId']) for p in raw_presences if p.get('universeId')}
+                game_names = await self.resolve_game_names(universe_ids, session, headers)
                 
-                async with session.post(url, json=payload, headers=headers) as response:
+                for presence in raw_presences:
+                    game_id = presence.get('placeId')
+                    universe_id = presence.get('universeId')
+                    
+                    status = {
+                        'online': presence.get('userPresenceType') in [1, 2, 3],  # 1=Online, 2=InGame, 3=InStudio
+                        'game_id': str(game_id) if game_id else None,
+                        'game_name': None,
+                        'presence_type': presence.get('userPresenceType', 0)
+                    }
+                    
+                    if game_id:
+                        status['game_name'] = (game_names.get(str(universe_id)) if universe_id else None) or presence.get('lastLocation') or f'Game {game_id}'
+                    
+                    results[str(presence.get('userId'))] = status
+        
+        except Exception as e:
+            logger.error(f"Error obteniendo presencia por lotes: {e}")
+        
+        return results
+    
+    async def resolve_game_names(self, universe_ids, session: aiohttp.ClientSession, headers: dict) -> Dict[str, str]:
+        """Resolver nombres de universos usando cache TTL y consultas multiget para los que falten"""
+        now = time.time()
+        names = {}
+        missing = []
+        
+        for universe_id in universe_ids:
+            cached = self.game_name_cache.get(universe_id)
+            if cached and cached[1] > now:
+                names[universe_id] = cached[0]
+            else:
+                missing.append(universe_id)
+        
+        for i in range(0, len(missing), 50):
+            chunk = missing[i:i + 50]
+            try:
+                url = f"https://games.roblox.com/v1/games?universeIds={','.join(chunk)}"
+                async with session.get(url, headers=headers) as response:
                     if response.status == 200:
                         data = await response.json()
-                        user_presences = data.get('userPresences', [])
-                        
-                        if user_presences:
-                            presence = user_presences[0]
-                            game_id = presence.get('placeId')
-                            
-                            status = {
-                                'online': presence.get('userPresenceType') in [1, 2, 3],  # 1=Online, 2=InGame, 3=InStudio
-                                'game_id': str(game_id) if game_id else None,
-                                'game_name': None,
-                                'presence_type': presence.get('userPresenceType', 0)
-                            }
-                            
-                            # Obtener nombre del juego si está jugando
-                            if game_id:
-                                game_name = await self.get_game_name(game_id, session, headers)
-                                status['game_name'] = game_name
-                            
-                            return status
-                    else:
-                        logger.warning(f"⚠️ Error API presencia: {response.status}")
-                        return None
+                        for game in data.get('data', []):
+                            universe_id = str(game.get('id'))
+                            names[universe_id] = game.get('name', f'Game {universe_id}')
+                            self.game_name_cache[universe_id] = (names[universe_id], now + self.game_name_ttl)
+            except Exception as e:
+                logger.debug(f"Error obteniendo nombres de juegos: {e}")
         
-        except Exception as e:
-            logger.error(f"Error obteniendo presencia: {e}")
-            return None
+        return names
     
     async def get_game_name(self, game_id: int, session: aiohttp.ClientSession, headers: dict) -> str:
         """Obtener nombre del juego"""
-        try:
-            url = f"https://games.roblox.com/v1/games?universeIds={game_id}"
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    games = data.get('data', [])
-                    if games:
-                        return games[0].get('name', f'Game {game_id}')
-            return f'Game {game_id}'
-        except Exception as e:
-            logger.debug(f"Error obteniendo nombre del juego: {e}")
-            return f'Game {game_id}'
+        names = await self.resolve_game_names([str(game_id)], session, headers)
+        return names.get(str(game_id), f'Game {game_id}')
+    
+    def diff_user_state(self, old_state: dict, current_status: dict) -> list:
+        """Comparar estado anterior y actual, devolviendo las notificaciones a enviar"""
+        notifications = []
+        
+        # Cambio de conexión (offline -> online)
+        if not old_state.get('online', False) and current_status['online']:
+            notifications.append({
+                'type': 'connected',
+                'message': '🟢 **Se conectó**',
+                'color': 0x00ff00
+            })
+        
+        # Cambio de conexión (online -> offline)
+        elif old_state.get('online', False) and not current_status['online']:
+            notifications.append({
+                'type': 'disconnected',
+                'message': '🔴 **Se desconectó**',
+                'color': 0xff0000
+            })
+        
+        # Cambio de juego
+        old_game = old_state.get('game_id')
+        new_game = current_status.get('game_id')
+        
+        if current_status['online'] and old_game != new_game:
+            if new_game and not old_game:
+                # Empezó a jugar
+                notifications.append({
+                    'type': 'started_playing',
+                    'message': f'🎮 **Empezó a jugar:** {current_status.get("game_name", "Unknown Game")}',
+                    'color': 0x00aaff,
+                    'game_name': current_status.get('game_name'),
+                    'game_id': new_game
+                })
+            elif not new_game and old_game:
+                # Dejó de jugar
+                notifications.append({
+                    'type': 'stopped_playing',
+                    'message': f'⏹️ **Dejó de jugar:** {old_state.get("game_name", "Unknown Game")}',
+                    'color': 0xffaa00
+                })
+            elif new_game and old_game and new_game != old_game:
+                # Cambió de juego
+                notifications.append({
+                    'type': 'changed_game',
+                    'message': f'🔄 **Cambió de juego:** {current_status.get("game_name", "Unknown Game")}',
+                    'color': 0xaa00ff,
+                    'game_name': current_status.get('game_name'),
+                    'game_id': new_game
+                })
+        
+        return notifications
     
     async def check_all_users(self):
         """Verificar estado de todos los usuarios monitoreados"""
@@ -3580,117 +3480,73 @@ class RobloxUserMonitoring:
                 return
             
             logger.info(f"🔍 Verificando estado de {len(self.monitored_users)} usuarios monitoreados...")
+            sweep_start = time.time()
             
-            # Obtener todos los IDs de usuarios únicos
-            roblox_user_ids = list(set([data['roblox_user_id'] for data in self.monitored_users.values()]))
+            # Índice roblox_user_id -> usuarios de Discord que lo monitorean (una sola pasada)
+            watchers = {}
+            for discord_id, data in self.monitored_users.items():
+                watchers.setdefault(data['roblox_user_id'], []).append(discord_id)
             
-            for roblox_user_id in roblox_user_ids:
-                try:
-                    # Obtener estado actual
-                    current_status = await self.get_user_presence(roblox_user_id, cookie)
-                    
-                    if current_status is None:
-                        continue
-                    
-                    # Comparar con estado anterior
-                    old_state = self.user_states.get(roblox_user_id, {})
-                    
-                    # Detectar cambios
-                    status_changed = False
-                    notifications = []
-                    
-                    # Cambio de conexión (offline -> online)
-                    if not old_state.get('online', False) and current_status['online']:
-                        notifications.append({
-                            'type': 'connected',
-                            'message': '🟢 **Se conectó**',
-                            'color': 0x00ff00
-                        })
-                        status_changed = True
-                    
-                    # Cambio de conexión (online -> offline)
-                    elif old_state.get('online', False) and not current_status['online']:
-                        notifications.append({
-                            'type': 'disconnected',
-                            'message': '🔴 **Se desconectó**',
-                            'color': 0xff0000
-                        })
-                        status_changed = True
-                    
-                    # Cambio de juego
-                    old_game = old_state.get('game_id')
-                    new_game = current_status.get('game_id')
-                    
-                    if current_status['online'] and old_game != new_game:
-                        if new_game and not old_game:
-                            # Empezó a jugar
-                            notifications.append({
-                                'type': 'started_playing',
-                                'message': f'🎮 **Empezó a jugar:** {current_status.get("game_name", "Unknown Game")}',
-                                'color': 0x00aaff,
-                                'game_name': current_status.get('game_name'),
-                                'game_id': new_game
-                            })
-                            status_changed = True
-                        elif not new_game and old_game:
-                            # Dejó de jugar
-                            notifications.append({
-                                'type': 'stopped_playing',
-                                'message': f'⏹️ **Dejó de jugar:** {old_state.get("game_name", "Unknown Game")}',
-                                'color': 0xffaa00
-                            })
-                            status_changed = True
-                        elif new_game and old_game and new_game != old_game:
-                            # Cambió de juego
-                            notifications.append({
-                                'type': 'changed_game',
-                                'message': f'🔄 **Cambió de juego:** {current_status.get("game_name", "Unknown Game")}',
-                                'color': 0xaa00ff,
-                                'game_name': current_status.get('game_name'),
-                                'game_id': new_game
-                            })
-                            status_changed = True
-                    
-                    # Actualizar estado
-                    if current_status['online']:
-                        current_status['last_online'] = datetime.now().isoformat()
-                    current_status['last_check'] = datetime.now().isoformat()
-                    
-                    self.user_states[roblox_user_id] = current_status
-                    
-                    # Enviar notificaciones
-                    if status_changed and notifications:
-                        await self.send_notifications(roblox_user_id, notifications)
-                    
-                    await asyncio.sleep(1)  # Pequeña pausa entre verificaciones
-                    
-                except Exception as e:
-                    logger.error(f"Error verificando usuario {roblox_user_id}: {e}")
-                    continue
+            # Obtener presencias de todos los usuarios en lotes
+            presences = await self.get_users_presence_batch(list(watchers.keys()), cookie)
+            
+            # Comparar estados en una sola pasada
+            pending_notifications = []
+            now_iso = datetime.now().isoformat()
+            
+            for roblox_user_id, current_status in presences.items():
+                old_state = self.user_states.get(roblox_user_id, {})
+                notifications = self.diff_user_state(old_state, current_status)
+                
+                # Actualizar estado
+                if current_status['online']:
+                    current_status['last_online'] = now_iso
+                else:
+                    current_status['last_online'] = old_state.get('last_online')
+                current_status['last_check'] = now_iso
+                self.user_states[roblox_user_id] = current_status
+                
+                if notifications:
+                    pending_notifications.append((roblox_user_id, notifications))
+            
+            # Enviar notificaciones en paralelo con concurrencia limitada
+            if pending_notifications:
+                semaphore = asyncio.Semaphore(self.notification_concurrency)
+                
+                async def notify(roblox_user_id, notifications):
+                    async with semaphore:
+                        await self.send_notifications(roblox_user_id, notifications, watchers.get(roblox_user_id))
+                
+                await asyncio.gather(
+                    *(notify(roblox_user_id, notifications) for roblox_user_id, notifications in pending_notifications),
+                    return_exceptions=True
+                )
             
             # Guardar datos actualizados
             self.save_alerts_data()
-            logger.info(f"✅ Verificación de usuarios completada")
+            logger.info(f"✅ Verificación de usuarios completada: {len(presences)} presencias, {len(pending_notifications)} con cambios en {time.time() - sweep_start:.1f}s")
             
         except Exception as e:
             logger.error(f"Error en verificación masiva: {e}")
     
-    async def send_notifications(self, roblox_user_id: str, notifications: list):
+    async def send_notifications(self, roblox_user_id: str, notifications: list, watcher_ids: Optional[list] = None):
         """Enviar notificaciones a usuarios de Discord"""
         try:
             # Encontrar todos los usuarios de Discord que monitorean este usuario de Roblox
-            discord_users = []
-            for discord_id, data in self.monitored_users.items():
-                if (data['roblox_user_id'] == roblox_user_id and 
-                    data.get('notifications_enabled', True)):
-                    discord_users.append(discord_id)
+            if watcher_ids is None:
+                watcher_ids = [discord_id for discord_id, data in self.monitored_users.items()
+                               if data['roblox_user_id'] == roblox_user_id]
+            
+            discord_users = [discord_id for discord_id in watcher_ids
+                             if self.monitored_users.get(discord_id, {}).get('notifications_enabled', True)]
             
             if not discord_users:
                 return
             
             roblox_username = None
-            for data in self.monitored_users.values():
-                if data['roblox_user_id'] == roblox_user_id:
+            for discord_id in watcher_ids:
+                data = self.monitored_users.get(discord_id)
+                if data:
                     roblox_username = data['roblox_username']
                     break
             
@@ -3797,9 +3653,16 @@ web_api_system = None
 
 
 
-@bot.event
+# discord.py 2.x no despacha on_app_command_error como evento: el manejador va en el CommandTree
+@bot.tree.error
 async def on_app_command_error(interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
     """Manejo global de errores para comandos slash"""
+    try:
+        from Commands.command_logging import record_command_metrics
+        record_command_metrics(interaction, interaction.command, success=False)
+    except Exception as e:
+        logger.debug(f"No se pudieron registrar métricas del comando fallido: {e}")
+
     user_id = str(interaction.user.id)
     username = f"{interaction.user.name}#{interaction.user.discriminator}"
     
@@ -3908,6 +3771,24 @@ async def on_ready():
         else:
             logger.error(f"❌ Archivo {scraper.users_servers_file} no existe")
     
+    # Sembrar la caché de metadatos con los juegos ya scrapeados y refrescarla en segundo plano
+    for user_games in scraper.links_by_user.values():
+        if isinstance(user_games, dict):
+            for game_id, game_data in user_games.items():
+                if isinstance(game_data, dict):
+                    game_metadata.seed(game_id, game_data.get('game_name'), game_data.get('game_image_url'), game_data.get('category'))
+    game_metadata.start(asyncio.get_running_loop())
+    game_link_cache.start(asyncio.get_running_loop())
+
+    # Calentar el pool de navegadores en segundo plano (arranques de Chrome en paralelo)
+    warm_count = int(os.getenv('DRIVER_POOL_WARM', str(scraper.parallel_extraction_workers)))
+    if warm_count > 0:
+        asyncio.create_task(asyncio.to_thread(scraper.get_driver_pool().warm_up, warm_count))
+
+    # Índice de ítems limitados para /limited (se refresca en segundo plano)
+    from limited_index import limited_index
+    limited_index.start(asyncio.get_running_loop())
+
     # Cargar owners delegados
     load_delegated_owners()
     
@@ -4033,6 +3914,13 @@ async def on_ready():
     except Exception as e:
         logger.error(f"❌ Error sincronizando comandos: {e}")
 
+    # Reanudar en segundo plano envíos masivos de DMs que quedaron a medias
+    try:
+        from dm_broadcast import dm_broadcaster
+        asyncio.create_task(dm_broadcaster.resume_unfinished(bot))
+    except Exception as e:
+        logger.error(f"❌ Error reanudando envíos de DMs pendientes: {e}")
+
     # Enviar alertas de inicio a usuarios suscritos
     try:
         if startup_alert_system:
@@ -9292,12 +9180,10 @@ class ServerBrowserView(discord.ui.View):
         if game_image_url and game_image_url != "https://rbxservers.xyz/svgs/roblox.svg":
             embed.set_thumbnail(url=game_image_url)
         else:
-            # Intentar obtener imagen del juego desde Roblox API
-            try:
-                game_icon_url = f"https://thumbnails.roblox.com/v1/games/icons?universeIds={game_id}&returnPolicy=PlaceHolder&size=512x512&format=Png&isCircular=false"
-                embed.set_thumbnail(url=game_icon_url)
-            except:
-                pass
+            # Icono del juego desde la caché de metadatos (sin llamada de red)
+            game_meta = game_metadata.get(game_id)
+            if game_meta and game_meta.get('icon_url'):
+                embed.set_thumbnail(url=game_meta['icon_url'])
 
         # Footer with server count
         embed.set_footer(text=f"Servidor {self.current_index + 1}/{self.total_servers} | Usuario: {self.authorized_user_id}")
@@ -10597,9 +10483,60 @@ async def scrape_command(interaction: discord.Interaction, juego: str):
 
         await interaction.followup.send(embed=error_embed, view=error_view)
 
+def serve_from_game_link_cache(game_id, user_id, limit=5):
+    """Entregar enlaces recientes del pool del juego sin abrir navegador (None si no hay suficientes)"""
+    user_games = scraper.links_by_user.get(user_id, {})
+    game_data = user_games.get(game_id)
+    game_info = game_metadata.get_scraper_info(game_id)
+    if not game_data and not game_info:
+        return None
+
+    # Mismo filtro que las entregas de reemplazo: nada ya entregado a otro usuario ni en la blacklist
+    from Commands.unique_server_manager import unique_server_manager
+    existing_links = game_data['links'] if game_data else []
+    cached_links = unique_server_manager.get_pooled_servers(user_id, game_id, limit, exclude=existing_links)
+    if not cached_links:
+        return None
+    unique_server_manager.mark_servers_as_delivered(user_id, cached_links)
+
+    with scraper.links_lock:
+        if user_id not in scraper.links_by_user:
+            scraper.links_by_user[user_id] = {}
+        if game_id not in scraper.links_by_user[user_id]:
+            scraper.links_by_user[user_id][game_id] = {
+                'links': [],
+                'game_name': game_info['game_name'],
+                'game_image_url': game_info.get('game_image_url'),
+                'category': game_info.get('category', 'other'),
+                'server_details': {}
+            }
+            scraper.index_scraped_game(game_id, game_info['game_name'], game_info.get('category', 'other'))
+        game_data = scraper.links_by_user[user_id][game_id]
+        game_data['links'].extend(cached_links)
+
+    logger.info(f"⚡ {len(cached_links)} enlaces servidos desde el pool del juego {game_id} para usuario {user_id} (sin navegador)")
+
+    return {
+        'new_links_count': len(cached_links),
+        'processed_count': len(cached_links),
+        'total_time': 0,
+        'success': True,
+        'error': None,
+        'from_cache': True,
+        'game_info': {
+            'game_name': game_data['game_name'],
+            'category': game_data.get('category', 'other'),
+            'game_image_url': game_data.get('game_image_url'),
+            'total_links': len(game_data['links'])
+        }
+    }
+
 def run_scraping_sync(game_id, user_id):
-    """Función síncrona para ejecutar el scraping sin bloquear Discord"""
+    """Función síncrona para ejecutar el scraping sin bloquear Discord (se ejecuta en la cola de scraping)"""
     driver = None
+    driver_broken = False
+    driver_pool = scraper.get_driver_pool()
+    job = current_job()
     new_links_count = 0
     processed_count = 0
     results = {
@@ -10618,9 +10555,17 @@ def run_scraping_sync(game_id, user_id):
     
     user_id = str(user_id)
 
+    # Servir desde el pool compartido del juego si otro usuario lo scrapeó hace poco
+    cached_results = serve_from_game_link_cache(game_id, user_id)
+    if cached_results:
+        return cached_results
+
+    scrape_start = time.time()
     try:
         logger.info(f"🚀 Iniciando scraping VIP para game ID: {game_id} | Usuario: {user_id}")
-        driver = scraper.create_driver()
+        if job:
+            job.update_progress(stage='driver')
+        driver = driver_pool.acquire()
         
         server_links = scraper.get_server_links(driver, game_id)
         if not server_links:
@@ -10631,19 +10576,18 @@ def run_scraping_sync(game_id, user_id):
         # Limit to 5 servers to avoid overloading
         server_links = server_links[:5]
         logger.info(f"🎯 Processing {len(server_links)} server links (limited to 5)...")
-
-        # Set current user ID for tracking - ensure it's a string
-        scraper.current_user_id = str(user_id)
+        if job:
+            job.update_progress(stage='extracting', total=len(server_links), processed=0, new_links=0)
 
         # Initialize user and game data if not exists
         if str(user_id) not in scraper.links_by_user:
             scraper.links_by_user[str(user_id)] = {}
         
         if game_id not in scraper.links_by_user[user_id]:
-            # Extract game information first
-            game_info = scraper.extract_game_info(driver, game_id)
+            # Metadatos del juego desde la caché compartida (sin navegación extra)
+            game_info = scraper.get_game_info(game_id)
             game_name = game_info['game_name']
-            category = scraper.categorize_game(game_name)
+            category = game_info['category']
             scraper.game_categories[game_id] = category
             
             scraper.links_by_user[user_id][game_id] = {
@@ -10653,13 +10597,21 @@ def run_scraping_sync(game_id, user_id):
                 'category': category,
                 'server_details': {}
             }
+            scraper.index_scraped_game(game_id, game_name, category)
 
         existing_links = set(scraper.links_by_user[user_id][game_id]['links'])
 
         for i, server_url in enumerate(server_links):
+            # Cancelación cooperativa entre servidores
+            if job and job.is_cancelled():
+                logger.info(f"⏹️ Scraping cancelado para game ID: {game_id} | Usuario: {user_id}")
+                results['error'] = "Búsqueda cancelada"
+                results['cancelled'] = True
+                break
+
             try:
                 processed_count += 1
-                vip_link = scraper.extract_vip_link(driver, server_url, game_id)
+                vip_link = scraper.extract_vip_link(driver, server_url, game_id, user_id=user_id)
 
                 if vip_link and vip_link not in existing_links:
                     scraper.links_by_user[user_id][game_id]['links'].append(vip_link)
@@ -10672,11 +10624,14 @@ def run_scraping_sync(game_id, user_id):
             except Exception as e:
                 logger.error(f"❌ Error processing {server_url}: {e}")
                 continue
+            finally:
+                if job:
+                    job.update_progress(processed=processed_count, new_links=new_links_count)
 
         # Prepare results
         results['new_links_count'] = new_links_count
         results['processed_count'] = processed_count
-        results['success'] = True
+        results['success'] = not results.get('cancelled', False)
         results['game_info'] = {
             'game_name': scraper.links_by_user[user_id][game_id]['game_name'],
             'category': scraper.links_by_user[user_id][game_id].get('category', 'other'),
@@ -10688,14 +10643,60 @@ def run_scraping_sync(game_id, user_id):
 
     except Exception as e:
         logger.error(f"💥 Scraping failed: {e}")
+        driver_broken = isinstance(e, WebDriverException)
         results['error'] = str(e)
         return results
     finally:
         if driver:
-            try:
-                driver.quit()
-            except:
-                pass
+            driver_pool.release(driver, broken=driver_broken)
+        results['total_time'] = round(time.time() - scrape_start, 2)
+        runtime_metrics.record_scrape(
+            'queue', results['total_time'],
+            new_links=results['new_links_count'],
+            success=results['success'] or results.get('cancelled', False)
+        )
+
+def get_scraping_priority(user_id) -> int:
+    """Prioridad en la cola de scraping: owner/delegados (VIP), donadores y usuarios normales"""
+    if is_owner_or_delegated(str(user_id)):
+        return PRIORITY_VIP
+    try:
+        from Commands.donacion import is_user_donator
+        if is_user_donator(str(user_id)):
+            return PRIORITY_DONATOR
+    except Exception as e:
+        logger.debug(f"No se pudo verificar donador para prioridad: {e}")
+    return PRIORITY_NORMAL
+
+class CancelScrapeView(discord.ui.View):
+    """Vista de progreso con botón para cancelar el trabajo de scraping en cola"""
+
+    def __init__(self, job_id, target_user_id):
+        super().__init__(timeout=None)
+        self.job_id = job_id
+        self.target_user_id = str(target_user_id)
+
+        follow_button = discord.ui.Button(
+            label="<:1000182614:1396049500375875646> Seguir a hesiz",
+            style=discord.ButtonStyle.secondary,
+            url="https://www.roblox.com/users/11834624/profile"
+        )
+        self.add_item(follow_button)
+
+    @discord.ui.button(label="Cancelar", style=discord.ButtonStyle.danger, emoji="⏹️")
+    async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if str(interaction.user.id) != self.target_user_id:
+            await interaction.response.send_message(
+                "❌ Solo quien ejecutó el comando puede cancelar la búsqueda.", 
+                ephemeral=True
+            )
+            return
+
+        cancelled = scraping_scheduler.cancel(self.job_id)
+        await interaction.response.send_message(
+            "⏹️ Cancelando búsqueda..." if cancelled else "ℹ️ La búsqueda ya terminó.",
+            ephemeral=True
+        )
 
 async def scrape_with_updates(message, start_time, game_id, user_id, discord_user):
     """Run scraping with real-time Discord message updates and user notification"""
@@ -10704,57 +10705,62 @@ async def scrape_with_updates(message, start_time, game_id, user_id, discord_use
     try:
         logger.info(f"🚀 Iniciando scraping async para game ID: {game_id} | Usuario: {username} (ID: {user_id}) | Mensaje ID: {message.id}")
         
-        # Crear una tarea para ejecutar el scraping en un hilo separado
-        scraping_task = asyncio.create_task(
-            asyncio.to_thread(run_scraping_sync, game_id, user_id)
+        # Encolar el trabajo en la cola central de scraping (workers fijos)
+        job = scraping_scheduler.submit(
+            game_id, user_id, run_scraping_sync, game_id, user_id,
+            priority=get_scraping_priority(user_id)
         )
-        
-        # Mientras se ejecuta el scraping, actualizar el mensaje periódicamente
-        while not scraping_task.done():
-            try:
-                elapsed = time.time() - start_time
-                
-                # Embed de progreso genérico
-                progress_embed = discord.Embed(
-                    title="<a:control:1418490793223651409> ROBLOX PRIVATE SERVER LINKS",
-                    description=f"Procesando servidores para el juego ID: **{game_id}**... Búsqueda activa de servidores VIP.",
-                    color=0x2F3136
-                )
-                
-                progress_embed.add_field(name="⏱️ Tiempo Transcurrido", value=f"{elapsed:.0f}s", inline=True)
+        progress_view = CancelScrapeView(job.job_id, user_id)
+
+        async def update_progress(job):
+            elapsed = time.time() - start_time
+            
+            # Embed de progreso genérico
+            progress_embed = discord.Embed(
+                title="<a:control:1418490793223651409> ROBLOX PRIVATE SERVER LINKS",
+                description=f"Procesando servidores para el juego ID: **{game_id}**... Búsqueda activa de servidores VIP.",
+                color=0x2F3136
+            )
+            
+            progress_embed.add_field(name="⏱️ Tiempo Transcurrido", value=f"{elapsed:.0f}s", inline=True)
+            if job.status == 'queued':
+                position = scraping_scheduler.queue_position(job)
+                progress_embed.add_field(name="<a:loading:1418504453580918856> Estado", value=f"En cola (posición {position})", inline=True)
+            else:
                 progress_embed.add_field(name="<a:loading:1418504453580918856> Estado", value="Procesando...", inline=True)
-                progress_embed.add_field(name="🆔 ID del Juego", value=f"```{game_id}```", inline=True)
+            progress_embed.add_field(name="🆔 ID del Juego", value=f"```{game_id}```", inline=True)
 
-                # Animación de progreso
+            # Progreso real reportado por el worker
+            if 'total' in job.progress:
+                progress_value = f"Servidores analizados: {job.progress.get('processed', 0)}/{job.progress['total']} | Nuevos: {job.progress.get('new_links', 0)}"
+            else:
                 dots = "." * (int(elapsed) % 4)
-                progress_embed.add_field(
-                    name="<:stats:1418490788437823599> Progreso", 
-                    value=f"Analizando servidores{dots}", 
-                    inline=False
-                )
+                progress_value = f"Analizando servidores{dots}"
+            progress_embed.add_field(
+                name="<:stats:1418490788437823599> Progreso", 
+                value=progress_value, 
+                inline=False
+            )
 
-                view = discord.ui.View(timeout=None)
-                follow_button = discord.ui.Button(
-                    label="<:1000182614:1396049500375875646> Seguir a hesiz",
-                    style=discord.ButtonStyle.secondary,
-                    url="https://www.roblox.com/users/11834624/profile"
-                )
-                view.add_item(follow_button)
+            try:
+                await message.edit(embed=progress_embed, view=progress_view)
+            except (discord.HTTPException, discord.NotFound):
+                logger.warning("Failed to update Discord message, continuing...")
 
-                try:
-                    await message.edit(embed=progress_embed, view=view)
-                except (discord.HTTPException, discord.NotFound):
-                    logger.warning("Failed to update Discord message, continuing...")
-                
-                # Esperar 5 segundos antes de la próxima actualización
-                await asyncio.sleep(5)
-                
-            except Exception as e:
-                logger.warning(f"Error updating progress: {e}")
-                await asyncio.sleep(5)
-        
-        # Obtener resultados del scraping
-        results = await scraping_task
+        # Esperar el resultado actualizando el mensaje cada 5 segundos
+        results = await scraping_scheduler.wait(job, on_progress=update_progress, interval=5)
+
+        if job.status == 'cancelled' or (results and results.get('cancelled')):
+            cancel_embed = discord.Embed(
+                title="⏹️ Búsqueda Cancelada",
+                description=f"La búsqueda de servidores para el juego ID **{game_id}** fue cancelada.",
+                color=0xffaa00
+            )
+            await message.edit(embed=cancel_embed, view=None)
+            return
+
+        if results is None:
+            results = {'success': False, 'error': job.error or 'Error desconocido'}
 
         # Verificar si hubo error
         if not results['success']:
@@ -11553,9 +11559,10 @@ class DebugMenuSelect(discord.ui.Select):
                 embed.add_field(name="🕐 Último Scraping", value="Desconocido", inline=True)
         
         # Promedio de servidores por usuario
-        if len(scraper.links_by_user) > 0:
-            total_servers = sum(len(game_data.get('links', [])) for user_games in scraper.links_by_user.values() for game_data in user_games.values())
-            avg_servers = total_servers / len(scraper.links_by_user)
+        stats_aggregator.ensure_links(scraper.links_by_user)
+        server_snapshot = stats_aggregator.get_server_snapshot()
+        if server_snapshot['total_users_with_servers'] > 0:
+            avg_servers = server_snapshot['total_servers'] / server_snapshot['total_users_with_servers']
             embed.add_field(name="📈 Promedio Serv/Usuario", value=f"**{avg_servers:.1f}**", inline=True)
         
         # Uso de memoria aproximado (tamaños de archivos)
@@ -11751,6 +11758,7 @@ async def admin_command(interaction: discord.Interaction,
                 'verification_code': verification_code,
                 'verified_at': time.time()
             }
+            stats_aggregator.record_verification(usuario_id, roblox_verification.verified_users[usuario_id]['verified_at'])
             
             # Remover de pendientes si existía
             if usuario_id in roblox_verification.pending_verifications:
@@ -11811,6 +11819,7 @@ async def admin_command(interaction: discord.Interaction,
             if usuario_id in roblox_verification.verified_users:
                 old_username = roblox_verification.verified_users[usuario_id]['roblox_username']
                 del roblox_verification.verified_users[usuario_id]
+                stats_aggregator.remove_verification(usuario_id)
                 roblox_verification.save_data()
                 
                 embed = discord.Embed(
@@ -11843,6 +11852,7 @@ async def admin_command(interaction: discord.Interaction,
             # Remover de verificados si estaba verificado
             if usuario_id in roblox_verification.verified_users:
                 del roblox_verification.verified_users[usuario_id]
+                stats_aggregator.remove_verification(usuario_id)
                 roblox_verification.save_data()
             
             embed = discord.Embed(
@@ -13194,5 +13204,27 @@ async def main():
             await remote_control.stop_web_server()
             logger.info("🔴 Remote control server stopped")
 
+        # Guardar los metadatos de juegos y cerrar las conexiones compartidas con las APIs de Roblox
+        await game_metadata.close()
+        game_link_cache.close()
+        from limited_index import limited_index
+        await limited_index.close()
+        from roblox_client import roblox_client
+        await roblox_client.close()
+
+        # Cerrar los navegadores calientes de los pools para no dejar procesos de Chrome huérfanos
+        try:
+            from driver_pool import close_all_pools
+            await asyncio.to_thread(close_all_pools)
+        except Exception as e:
+            logger.error(f"❌ Error cerrando los pools de navegadores: {e}")
+
+        # Vaciar escrituras pendientes a Blob Storage para no perder datos
+        try:
+            from blob_storage_manager import blob_manager
+            await blob_manager.close()
+        except Exception as e:
+            logger.error(f"❌ Error vaciando la cola de Blob Storage: {e}")
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -2,7 +2,6 @@
 import discord
 from discord.ext import commands
 import json
-import asyncio
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -61,7 +60,7 @@ class MaintenanceSystem:
             logger.error(f"Error obteniendo usuarios verificados: {e}")
             return []
 
-    async def send_maintenance_notification(self, message: str, started_by: str, action: str = "start"):
+    async def send_maintenance_notification(self, message: str, started_by: str, action: str = "start", on_progress=None):
         """Enviar notificación de mantenimiento a todos los usuarios verificados"""
         verified_users = await self.get_all_verified_users()
         
@@ -69,9 +68,6 @@ class MaintenanceSystem:
             logger.warning("⚠️ No hay usuarios verificados para notificar")
             return 0, 0
         
-        successful_notifications = 0
-        failed_notifications = 0
-        
         # Determinar título y color según la acción
         if action == "start":
             title = "🔧 Mantenimiento Programado"
@@ -82,68 +78,53 @@ class MaintenanceSystem:
             color = 0x00ff88
             icon = "<a:verify2:1418486831993061497>"
         
-        for user_id in verified_users:
-            try:
-                user = self.bot.get_user(int(user_id))
-                if not user:
-                    user = await self.bot.fetch_user(int(user_id))
-                
-                if user:
-                    embed = discord.Embed(
-                        title=title,
-                        description=message,
-                        color=color,
-                        timestamp=datetime.now()
-                    )
-                    
-                    embed.add_field(
-                        name="<:1000182614:1396049500375875646> Iniciado por",
-                        value=started_by,
-                        inline=True
-                    )
-                    
-                    embed.add_field(
-                        name="<a:loading:1418504453580918856> Fecha",
-                        value=f"<t:{int(datetime.now().timestamp())}:F>",
-                        inline=True
-                    )
-                    
-                    if action == "start":
-                        embed.add_field(
-                            name="<a:foco:1418492184373755966> Durante el mantenimiento",
-                            value="• Los comandos del bot pueden estar limitados\n• Algunas funciones pueden no estar disponibles\n• Te notificaremos cuando termine",
-                            inline=False
-                        )
-                    else:
-                        embed.add_field(
-                            name="🎉 ¡Todo listo!",
-                            value="• Todos los comandos están disponibles\n• Las funciones están completamente operativas\n• Gracias por tu paciencia",
-                            inline=False
-                        )
-                    
-                    embed.set_footer(
-                        text="RbxServers • Sistema de Mantenimiento",
-                        icon_url=self.bot.user.avatar.url if self.bot.user.avatar else None
-                    )
-                    
-                    await user.send(embed=embed)
-                    successful_notifications += 1
-                    logger.info(f"📨 Notificación de mantenimiento enviada a {user.name} (ID: {user_id})")
-                    
-                    # Pequeña pausa para evitar rate limits
-                    await asyncio.sleep(0.5)
-                
-            except discord.errors.Forbidden:
-                logger.warning(f"⚠️ No se pudo enviar DM a usuario {user_id} - DMs cerrados")
-                failed_notifications += 1
-            except discord.errors.NotFound:
-                logger.warning(f"⚠️ Usuario {user_id} no encontrado")
-                failed_notifications += 1
-            except Exception as e:
-                logger.error(f"❌ Error enviando notificación a usuario {user_id}: {e}")
-                failed_notifications += 1
+        # El embed es el mismo para todos: se construye una vez
+        embed = discord.Embed(
+            title=title,
+            description=message,
+            color=color,
+            timestamp=datetime.now()
+        )
+        
+        embed.add_field(
+            name="<:1000182614:1396049500375875646> Iniciado por",
+            value=started_by,
+            inline=True
+        )
+        
+        embed.add_field(
+            name="<a:loading:1418504453580918856> Fecha",
+            value=f"<t:{int(datetime.now().timestamp())}:F>",
+            inline=True
+        )
         
-        return successful_notifications, failed_notifications
+        if action == "start":
+            embed.add_field(
+                name="<a:foco:1418492184373755966> Durante el mantenimiento",
+                value="• Los comandos del bot pueden estar limitados\n• Algunas funciones pueden no estar disponibles\n• Te notificaremos cuando termine",
+                inline=False
+            )
+        else:
+            embed.add_field(
+                name="🎉 ¡Todo listo!",
+                value="• Todos los comandos están disponibles\n• Las funciones están completamente operativas\n• Gracias por tu paciencia",
+                inline=False
+            )
+        
+        embed.set_footer(
+            text="RbxServers • Sistema de Mantenimiento",
+            icon_url=self.bot.user.avatar.url if self.bot.user.avatar else None
+        )
+        
+        # Envío concurrente con control de rate limit (sin checkpoints: el aviso no se reanuda tras reiniciar)
+        from dm_broadcast import dm_broadcaster
+        result = await dm_broadcaster.broadcast(
+            self.bot, verified_users, kind=f"maintenance_{action}",
+            embed=embed, on_progress=on_progress
+        )
+        logger.info(f"📨 Notificaciones de mantenimiento: {result['sent']} enviadas, {result['failed']} fallidas ({result['per_second']}/s)")
+        
+        return result['sent'], result['failed']
 
     def is_owner_or_delegated(self, user_id: str) -> bool:
         """Verificar si un usuario es owner original o tiene acceso delegado"""
@@ -155,6 +136,19 @@ class MaintenanceSystem:
             # Fallback - solo permitir al owner principal
             return user_id == "916070251895091241"
 
+def make_progress_reporter(message_obj, progress_embed):
+    """Callback de progreso que actualiza el mensaje de estado con enviados, velocidad y tiempo restante"""
+    async def report(progress):
+        progress_embed.set_field_at(
+            len(progress_embed.fields) - 1,
+            name="⏳ Estado",
+            value=(f"Enviadas {progress['sent']}/{progress['total']} • Fallidas {progress['failed']}\n"
+                   f"{progress['per_second']}/s • ~{progress['eta_seconds'] or 0}s restantes"),
+            inline=False
+        )
+        await message_obj.edit(embed=progress_embed)
+    return report
+
 def setup_maintenance_commands(bot):
     """Configurar comandos de mantenimiento"""
     maintenance_system = MaintenanceSystem(bot)
@@ -256,7 +250,9 @@ def setup_maintenance_commands(bot):
                 message_obj = await interaction.followup.send(embed=progress_embed, ephemeral=True)
                 
                 # Enviar notificaciones
-                successful, failed = await maintenance_system.send_maintenance_notification(message, username, "start")
+                successful, failed = await maintenance_system.send_maintenance_notification(
+                    message, username, "start", on_progress=make_progress_reporter(message_obj, progress_embed)
+                )
                 
                 # Actualizar con resultados
                 final_embed = discord.Embed(
@@ -296,7 +292,9 @@ def setup_maintenance_commands(bot):
                 message_obj = await interaction.followup.send(embed=progress_embed, ephemeral=True)
                 
                 # Enviar notificaciones de finalización
-                successful, failed = await maintenance_system.send_maintenance_notification(message, username, "end")
+                successful, failed = await maintenance_system.send_maintenance_notification(
+                    message, username, "end", on_progress=make_progress_reporter(message_obj, progress_embed)
+                )
                 
                 # Desactivar mantenimiento
                 maintenance_system.maintenance_data = {
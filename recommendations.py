@@ -1,6 +1,7 @@
 
 import json
 import time
+import threading
 from datetime import datetime
 from collections import defaultdict, Counter
 from typing import Dict, List, Tuple, Optional
@@ -8,12 +9,158 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+class RecommendationModel:
+    """Modelo precalculado desde links_by_user y favoritos: popularidad por juego, índice por categoría
+    y matriz dispersa de co-ocurrencia (juegos que comparten usuarios), actualizado por usuario"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        # Aporte de cada usuario para poder restarlo al actualizarlo: {game_id: (servidores, favorito, nombre, categoría)}
+        self.user_contributions: Dict[str, Dict[str, Tuple[int, bool, str, str]]] = {}
+        self.games: Dict[str, Dict] = {}                      # game_id -> user_count, server_count, favorites, game_name, category
+        self.category_games: Dict[str, set] = defaultdict(set)
+        self.cooccurrence: Dict[str, Counter] = defaultdict(Counter)
+        self.version = 0
+        self.initialized = False
+        self.rankings: Dict[Optional[str], Tuple[int, List[str]]] = {}   # categoría (None = global) -> (versión, game_ids)
+
+    @staticmethod
+    def _contribution(user_games: Dict, favorites) -> Dict[str, Tuple[int, bool, str, str]]:
+        favorites = set(favorites or [])
+        contribution = {}
+        for game_id, game_data in (user_games or {}).items():
+            if isinstance(game_data, dict):
+                contribution[str(game_id)] = (
+                    len(game_data.get('links', [])),
+                    game_id in favorites,
+                    game_data.get('game_name', f'Game {game_id}'),
+                    game_data.get('category', 'other')
+                )
+        return contribution
+
+    def set_user(self, user_id: str, user_games: Dict, favorites=None):
+        """Reemplazar el aporte de un usuario (O(juegos del usuario²) por la co-ocurrencia)"""
+        user_id = str(user_id)
+        contribution = self._contribution(user_games, favorites)
+        with self.lock:
+            previous = self.user_contributions.get(user_id, {})
+            if previous == contribution:
+                return
+            self._apply(previous, -1)
+            if contribution:
+                self.user_contributions[user_id] = contribution
+                self._apply(contribution, 1)
+            else:
+                self.user_contributions.pop(user_id, None)
+            self.version += 1
+
+    def remove_user(self, user_id: str):
+        with self.lock:
+            previous = self.user_contributions.pop(str(user_id), None)
+            if previous:
+                self._apply(previous, -1)
+                self.version += 1
+
+    def retain_users(self, user_ids):
+        """Quitar el aporte de usuarios que ya no están en links_by_user"""
+        with self.lock:
+            for user_id in set(self.user_contributions) - {str(uid) for uid in user_ids}:
+                self.remove_user(user_id)
+            self.initialized = True
+
+    def sync(self, links_by_user: Dict, user_favorites: Dict):
+        with self.lock:
+            for user_id, user_games in list(links_by_user.items()):
+                if isinstance(user_games, dict):
+                    self.set_user(user_id, user_games, user_favorites.get(str(user_id), []))
+            self.retain_users(list(links_by_user))
+
+    def ensure_synced(self, scraper):
+        if not self.initialized and scraper:
+            self.sync(scraper.links_by_user, scraper.user_favorites)
+
+    def _apply(self, contribution: Dict[str, Tuple[int, bool, str, str]], sign: int):
+        for game_id, (servers, favorite, name, category) in contribution.items():
+            game = self.games.get(game_id)
+            if game is None:
+                game = self.games[game_id] = {'user_count': 0, 'server_count': 0, 'favorites': 0,
+                                              'game_name': name, 'category': category}
+            game['user_count'] += sign
+            game['server_count'] += sign * servers
+            game['favorites'] += sign * int(favorite)
+            if sign > 0:
+                if game['category'] != category:
+                    self.category_games[game['category']].discard(game_id)
+                game['game_name'], game['category'] = name, category
+                self.category_games[category].add(game_id)
+            elif game['user_count'] <= 0:
+                del self.games[game_id]
+                self.category_games[game['category']].discard(game_id)
+                self.cooccurrence.pop(game_id, None)
+
+        # Co-ocurrencia: cada par de juegos del mismo usuario
+        game_ids = list(contribution)
+        for i, game_a in enumerate(game_ids):
+            for game_b in game_ids[i + 1:]:
+                for x, y in ((game_a, game_b), (game_b, game_a)):
+                    row = self.cooccurrence[x]
+                    row[y] += sign
+                    if row[y] <= 0:
+                        del row[y]
+                        if not row:
+                            del self.cooccurrence[x]
+
+    @staticmethod
+    def popularity(game: Dict) -> float:
+        return game['user_count'] * 1.0 + game['server_count'] * 0.1 + game['favorites'] * 2.0
+
+    def ranking(self, category: Optional[str] = None) -> List[str]:
+        """game_ids ordenados por (popularidad, servidores); se reordena solo si el modelo cambió"""
+        with self.lock:
+            version, ranked = self.rankings.get(category, (-1, []))
+            if version != self.version:
+                candidates = self.category_games.get(category, ()) if category is not None else self.games
+                ranked = sorted(
+                    candidates,
+                    key=lambda gid: (self.popularity(self.games[gid]), self.games[gid]['server_count']),
+                    reverse=True
+                )
+                self.rankings[category] = (self.version, ranked)
+            return ranked
+
+    def get_game(self, game_id: str) -> Optional[Dict]:
+        with self.lock:
+            game = self.games.get(str(game_id))
+            if not game:
+                return None
+            return {
+                'game_id': str(game_id),
+                'game_name': game['game_name'],
+                'category': game['category'],
+                'server_count': game['server_count'],
+                'user_count': game['user_count'],
+                'popularity': self.popularity(game)
+            }
+
+    def get_cooccurring(self, game_id: str, limit: int = 10) -> List[Tuple[str, int]]:
+        with self.lock:
+            return self.cooccurrence.get(str(game_id), Counter()).most_common(limit)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                'initialized': self.initialized,
+                'users': len(self.user_contributions),
+                'games': len(self.games),
+                'categories': sum(1 for games in self.category_games.values() if games),
+                'cooccurrence_pairs': sum(len(row) for row in self.cooccurrence.values()),
+                'version': self.version
+            }
+
 class RecommendationEngine:
     def __init__(self, scraper=None):
         self.scraper = scraper
-        self.user_preferences = {}
-        self.game_similarities = {}
-        self.trend_data = {}
+        self.model = recommendation_model
     
     def calculate_user_preferences(self, user_id: str) -> Dict[str, float]:
         """Calcular preferencias del usuario basado en su actividad"""
@@ -79,23 +226,21 @@ class RecommendationEngine:
         return dict(preferences)
     
     def get_similar_games(self, game_id: str, user_games: Dict) -> List[str]:
-        """Encontrar juegos similares basado en categoría y patrones"""
+        """Encontrar juegos similares: primero los que comparten usuarios, luego los populares de la categoría"""
         if game_id not in user_games:
             return []
+        self.model.ensure_synced(self.scraper)
         
         target_category = user_games[game_id].get('category', 'other')
-        similar_games = []
+        similar_games = [other_id for other_id, _ in self.model.get_cooccurring(game_id, limit=10)]
         
-        # Buscar en todos los usuarios para encontrar juegos similares
-        for user_id, user_data in self.scraper.links_by_user.items():
-            for other_game_id, other_game_data in user_data.items():
-                if (other_game_id != game_id and 
-                    other_game_data.get('category') == target_category):
-                    similar_games.append(other_game_id)
+        for other_id in self.model.ranking(target_category):
+            if len(similar_games) >= 10:
+                break
+            if other_id != game_id and other_id not in similar_games:
+                similar_games.append(other_id)
         
-        # Contar frecuencia y devolver los más comunes
-        game_counter = Counter(similar_games)
-        return [game_id for game_id, _ in game_counter.most_common(10)]
+        return similar_games
     
     def recommend_games_for_user(self, user_id: str, limit: int = 5) -> List[Dict]:
         """Generar recomendaciones personalizadas para un usuario"""
@@ -153,118 +298,51 @@ class RecommendationEngine:
         return unique_recommendations[:limit]
     
     def get_games_by_category(self, category: str, exclude_user_games: set = None, limit: int = 5) -> List[Dict]:
-        """Obtener juegos por categoría"""
+        """Obtener juegos por categoría (ranking precalculado por popularidad y servidores)"""
         if exclude_user_games is None:
             exclude_user_games = set()
+        self.model.ensure_synced(self.scraper)
         
         category_games = []
-        
-        # Buscar en todos los usuarios
-        for user_id, user_games in self.scraper.links_by_user.items():
-            for game_id, game_data in user_games.items():
-                if (game_data.get('category') == category and 
-                    game_id not in exclude_user_games):
-                    
-                    server_count = len(game_data.get('links', []))
-                    if server_count > 0:  # Solo recomendar juegos con servidores
-                        category_games.append({
-                            'game_id': game_id,
-                            'game_name': game_data.get('game_name', f'Game {game_id}'),
-                            'category': category,
-                            'server_count': server_count,
-                            'popularity': self.calculate_game_popularity(game_id)
-                        })
-        
-        # Eliminar duplicados y ordenar por popularidad
-        unique_games = {}
-        for game in category_games:
-            game_id = game['game_id']
-            if game_id not in unique_games:
-                unique_games[game_id] = game
-            else:
-                # Sumar servidores de diferentes usuarios
-                unique_games[game_id]['server_count'] += game['server_count']
-        
-        # Ordenar por popularidad y servidor count
-        sorted_games = sorted(
-            unique_games.values(),
-            key=lambda x: (x['popularity'], x['server_count']),
-            reverse=True
-        )
-        
-        return sorted_games[:limit]
+        for game_id in self.model.ranking(category):
+            if game_id in exclude_user_games:
+                continue
+            game = self.model.get_game(game_id)
+            if game and game['server_count'] > 0:  # Solo recomendar juegos con servidores
+                game.pop('user_count', None)
+                category_games.append(game)
+                if len(category_games) >= limit:
+                    break
+        
+        return category_games
     
     def calculate_game_popularity(self, game_id: str) -> float:
         """Calcular popularidad de un juego"""
-        popularity_score = 0
-        
-        # Contar en cuántos usuarios aparece
-        user_count = 0
-        total_servers = 0
-        total_favorites = 0
-        
-        for user_id, user_games in self.scraper.links_by_user.items():
-            if game_id in user_games:
-                user_count += 1
-                total_servers += len(user_games[game_id].get('links', []))
-                
-                # Bonus si está en favoritos
-                if game_id in self.scraper.user_favorites.get(user_id, []):
-                    total_favorites += 1
-        
-        # Calcular score
-        popularity_score = user_count * 1.0 + total_servers * 0.1 + total_favorites * 2.0
-        
-        return popularity_score
+        self.model.ensure_synced(self.scraper)
+        game = self.model.get_game(game_id)
+        return game['popularity'] if game else 0
     
     def get_trending_games(self, limit: int = 5) -> List[Dict]:
         """Obtener juegos en tendencia"""
-        all_games = {}
+        self.model.ensure_synced(self.scraper)
         
-        # Recopilar todos los juegos
-        for user_id, user_games in self.scraper.links_by_user.items():
-            for game_id, game_data in user_games.items():
-                if game_id not in all_games:
-                    all_games[game_id] = {
-                        'game_id': game_id,
-                        'game_name': game_data.get('game_name', f'Game {game_id}'),
-                        'category': game_data.get('category', 'other'),
-                        'server_count': 0,
-                        'user_count': 0,
-                        'popularity': 0
-                    }
-                
-                all_games[game_id]['server_count'] += len(game_data.get('links', []))
-                all_games[game_id]['user_count'] += 1
-                all_games[game_id]['popularity'] = self.calculate_game_popularity(game_id)
-        
-        # Ordenar por popularidad
-        trending = sorted(
-            all_games.values(),
-            key=lambda x: x['popularity'],
-            reverse=True
-        )
-        
-        # Agregar razón de recomendación
-        for game in trending:
+        trending = []
+        for game_id in self.model.ranking()[:limit]:
+            game = self.model.get_game(game_id)
+            # Agregar razón de recomendación
             game['recommendation_reason'] = "Juego popular en la comunidad"
             game['weight'] = game['popularity'] / 100  # Normalizar
+            trending.append(game)
         
-        return trending[:limit]
+        return trending
     
     def get_game_data(self, game_id: str) -> Optional[Dict]:
         """Obtener datos de un juego específico"""
-        for user_id, user_games in self.scraper.links_by_user.items():
-            if game_id in user_games:
-                game_data = user_games[game_id]
-                return {
-                    'game_id': game_id,
-                    'game_name': game_data.get('game_name', f'Game {game_id}'),
-                    'category': game_data.get('category', 'other'),
-                    'server_count': len(game_data.get('links', [])),
-                    'popularity': self.calculate_game_popularity(game_id)
-                }
-        return None
+        self.model.ensure_synced(self.scraper)
+        game = self.model.get_game(game_id)
+        if game:
+            game.pop('user_count', None)
+        return game
     
     def get_personalized_message(self, user_id: str) -> str:
         """Generar mensaje personalizado para el usuario"""
@@ -288,3 +366,6 @@ class RecommendationEngine:
         }
         
         return messages.get(top_category, "¡Sigue explorando y descubriendo nuevos juegos!")
+
+# Modelo global de recomendaciones (lo actualiza el scraper al guardar enlaces y favoritos)
+recommendation_model = RecommendationModel()
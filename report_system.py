@@ -1,82 +1,209 @@
-
 import asyncio
+import os
 import json
 import time
+import tempfile
+import threading
+from collections import Counter
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
+class ReportIndex:
+    """Índices de reportes: por enlace, por reportero y contadores de confirmaciones pendientes por enlace"""
+
+    def __init__(self):
+        self.by_link: Dict[str, Set[str]] = {}           # server_link -> report_ids
+        self.by_reporter: Dict[str, Set[str]] = {}       # reporter_id -> report_ids
+        self.pending_by_link: Dict[str, Set[str]] = {}   # server_link -> report_ids pendientes
+        self.reporter_links: Counter = Counter()         # (reporter_id, server_link) -> reportes
+        self.pending_confirmations: Counter = Counter()  # server_link -> confirmaciones de reportes pendientes
+        self.status_counts: Counter = Counter()
+        self.issue_types: Counter = Counter()
+        self.reported_games: Counter = Counter()
+
+    @staticmethod
+    def _adjust(counter: Counter, key, delta: int):
+        counter[key] += delta
+        if counter[key] <= 0:
+            del counter[key]
+
+    @staticmethod
+    def _link(index: Dict[str, Set[str]], key: str, report_id: str, add: bool):
+        if add:
+            index.setdefault(key, set()).add(report_id)
+            return
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(report_id)
+            if not ids:
+                del index[key]
+
+    def _apply(self, report: Dict, sign: int):
+        report_id = report['report_id']
+        link = report['server_link']
+        add = sign > 0
+        self._link(self.by_link, link, report_id, add)
+        self._link(self.by_reporter, report['reporter_id'], report_id, add)
+        self._adjust(self.reporter_links, (report['reporter_id'], link), sign)
+        if report['status'] == 'pending':
+            self._link(self.pending_by_link, link, report_id, add)
+            self._adjust(self.pending_confirmations, link, sign * report['confirmations'])
+        self._adjust(self.status_counts, report['status'], sign)
+        self._adjust(self.issue_types, report['issue_type'], sign)
+        self._adjust(self.reported_games, report['game_id'], sign)
+
+    def add(self, report: Dict):
+        self._apply(report, 1)
+
+    def remove(self, report: Dict):
+        self._apply(report, -1)
+
+    def has_reported(self, reporter_id: str, server_link: str) -> bool:
+        return (reporter_id, server_link) in self.reporter_links
+
 class ServerReportSystem:
     def __init__(self):
         self.reports_file = "server_reports.json"
         self.blacklist_file = "server_blacklist.json"
+        self.journal_file = "server_reports.journal"
+        self.compact_every = 500   # Entradas de journal antes de reescribir los snapshots
+        self.lock = threading.RLock()
         self.reports = {}
         self.blacklisted_servers = {}
+        self.index = ReportIndex()
+        self.journal_entries = 0
         self.load_data()
-    
+
     def load_data(self):
-        """Cargar datos de reportes"""
-        try:
-            if Path(self.reports_file).exists():
-                with open(self.reports_file, 'r') as f:
-                    data = json.load(f)
-                    self.reports = data.get('reports', {})
-                    logger.info(f"Loaded {len(self.reports)} server reports")
-            else:
+        """Cargar snapshots de reportes y blacklist y reaplicar el journal"""
+        with self.lock:
+            try:
+                if Path(self.reports_file).exists():
+                    with open(self.reports_file, 'r') as f:
+                        data = json.load(f)
+                        self.reports = data.get('reports', {})
+                else:
+                    self.reports = {}
+            except Exception as e:
+                logger.error(f"Error loading reports data: {e}")
                 self.reports = {}
-        except Exception as e:
-            logger.error(f"Error loading reports data: {e}")
-            self.reports = {}
-        
-        try:
-            if Path(self.blacklist_file).exists():
-                with open(self.blacklist_file, 'r') as f:
-                    data = json.load(f)
-                    self.blacklisted_servers = data.get('blacklisted', {})
-                    logger.info(f"Loaded {len(self.blacklisted_servers)} blacklisted servers")
-            else:
+
+            try:
+                if Path(self.blacklist_file).exists():
+                    with open(self.blacklist_file, 'r') as f:
+                        data = json.load(f)
+                        self.blacklisted_servers = data.get('blacklisted', {})
+                else:
+                    self.blacklisted_servers = {}
+            except Exception as e:
+                logger.error(f"Error loading blacklist data: {e}")
                 self.blacklisted_servers = {}
+
+            replayed = self._replay_journal()
+
+            self.index = ReportIndex()
+            for report in self.reports.values():
+                self.index.add(report)
+
+            logger.info(f"Loaded {len(self.reports)} server reports")
+            logger.info(f"Loaded {len(self.blacklisted_servers)} blacklisted servers")
+
+            if replayed:
+                logger.info(f"📜 Reaplicadas {replayed} entradas del journal de reportes")
+                self.save_data()
+
+    def _replay_journal(self) -> int:
+        if not Path(self.journal_file).exists():
+            return 0
+        replayed = 0
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except Exception:
+                        continue  # Línea incompleta por un cierre abrupto
+                    op = entry.get('op')
+                    if op == 'report':
+                        self.reports[entry['report']['report_id']] = entry['report']
+                    elif op == 'delete':
+                        for report_id in entry.get('report_ids', []):
+                            self.reports.pop(report_id, None)
+                    elif op == 'blacklist':
+                        self.blacklisted_servers[entry['entry']['server_link']] = entry['entry']
+                    replayed += 1
         except Exception as e:
-            logger.error(f"Error loading blacklist data: {e}")
-            self.blacklisted_servers = {}
-    
-    def save_data(self):
-        """Guardar datos de reportes"""
+            logger.error(f"Error replaying reports journal: {e}")
+        return replayed
+
+    def _append_journal(self, entry: dict):
+        """Anexar un cambio al journal; cada `compact_every` entradas se reescriben los snapshots"""
         try:
-            data = {
-                'reports': self.reports,
-                'last_updated': datetime.now().isoformat(),
-                'total_reports': len(self.reports),
-                'stats': self.get_report_stats()
-            }
-            with open(self.reports_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            logger.info(f"Saved reports data with {len(self.reports)} reports")
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
         except Exception as e:
-            logger.error(f"Error saving reports data: {e}")
-        
+            logger.error(f"❌ Error escribiendo journal de reportes: {e}")
+            return
+        self.journal_entries += 1
+        if self.journal_entries >= self.compact_every:
+            self.save_data()
+
+    def _atomic_dump(self, path: str, data: dict):
+        target_dir = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{Path(path).stem}.", suffix=".tmp", dir=target_dir)
         try:
-            data = {
-                'blacklisted': self.blacklisted_servers,
-                'last_updated': datetime.now().isoformat(),
-                'total_blacklisted': len(self.blacklisted_servers)
-            }
-            with open(self.blacklist_file, 'w') as f:
+            with os.fdopen(fd, 'w') as f:
                 json.dump(data, f, indent=2)
-            logger.info(f"Saved blacklist data with {len(self.blacklisted_servers)} servers")
-        except Exception as e:
-            logger.error(f"Error saving blacklist data: {e}")
-    
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def save_data(self):
+        """Reescribir los snapshots completos de reportes y blacklist y vaciar el journal"""
+        with self.lock:
+            try:
+                self._atomic_dump(self.reports_file, {
+                    'reports': self.reports,
+                    'last_updated': datetime.now().isoformat(),
+                    'total_reports': len(self.reports),
+                    'stats': self.get_report_stats()
+                })
+                self._atomic_dump(self.blacklist_file, {
+                    'blacklisted': self.blacklisted_servers,
+                    'last_updated': datetime.now().isoformat(),
+                    'total_blacklisted': len(self.blacklisted_servers)
+                })
+            except Exception as e:
+                logger.error(f"Error saving reports data: {e}")
+                return
+
+            open(self.journal_file, 'w', encoding='utf-8').close()
+            self.journal_entries = 0
+            logger.info(f"Saved reports data with {len(self.reports)} reports and {len(self.blacklisted_servers)} blacklisted servers")
+
+    def _update_report(self, report: Dict, **changes):
+        """Aplicar cambios a un reporte manteniendo los índices y registrarlo en el journal"""
+        self.index.remove(report)
+        report.update(changes)
+        self.index.add(report)
+        self._append_journal({'op': 'report', 'report': report})
+
     def validate_server_link(self, server_link: str) -> Dict[str, str]:
         """Validar formato del enlace de servidor"""
         # Validar formato de URL de Roblox
         roblox_pattern = r'https?://(?:www\.)?roblox\.com/games/(\d+)(?:/[^?]*)?[?&]privateServerLinkCode=([%\w\-_]+)'
         match = re.match(roblox_pattern, server_link)
-        
+
         if not match:
             return {
                 'valid': False,
@@ -84,17 +211,17 @@ class ServerReportSystem:
                 'game_id': None,
                 'private_code': None
             }
-        
+
         game_id, private_code = match.groups()
-        
+
         return {
             'valid': True,
             'error': None,
             'game_id': game_id,
             'private_code': private_code
         }
-    
-    def submit_report(self, user_id: str, server_link: str, issue_type: str, 
+
+    def submit_report(self, user_id: str, server_link: str, issue_type: str,
                      description: str = "", additional_info: Dict = None) -> Dict[str, any]:
         """Enviar reporte de servidor problemático"""
         # Validar enlace
@@ -104,140 +231,130 @@ class ServerReportSystem:
                 'success': False,
                 'error': validation['error']
             }
-        
-        # Verificar si ya está blacklisted
-        if server_link in self.blacklisted_servers:
-            return {
-                'success': False,
-                'error': 'Este servidor ya está en la lista negra.'
-            }
-        
-        # Crear ID único para el reporte
-        report_id = f"report_{int(time.time())}_{user_id}"
-        
-        # Verificar si el usuario ya reportó este servidor
-        for existing_report in self.reports.values():
-            if (existing_report['server_link'] == server_link and 
-                existing_report['reporter_id'] == user_id):
+
+        with self.lock:
+            # Verificar si ya está blacklisted
+            if server_link in self.blacklisted_servers:
+                return {
+                    'success': False,
+                    'error': 'Este servidor ya está en la lista negra.'
+                }
+
+            # Verificar si el usuario ya reportó este servidor
+            if self.index.has_reported(user_id, server_link):
                 return {
                     'success': False,
                     'error': 'Ya reportaste este servidor anteriormente.'
                 }
-        
-        report = {
-            'report_id': report_id,
-            'reporter_id': user_id,
-            'server_link': server_link,
-            'game_id': validation['game_id'],
-            'private_code': validation['private_code'],
-            'issue_type': issue_type,
-            'description': description,
-            'additional_info': additional_info or {},
-            'reported_at': time.time(),
-            'status': 'pending',
-            'confirmations': 1,  # El reporte inicial cuenta como confirmación
-            'confirming_users': [user_id],
-            'investigated_at': None,
-            'resolved_at': None
-        }
-        
-        self.reports[report_id] = report
-        
-        # GUARDADO INSTANTÁNEO después de agregar el reporte
-        self.save_data()
-        
-        # Verificar si hay suficientes reportes para blacklist automático
-        self.check_auto_blacklist(server_link)
-        
-        # GUARDADO INSTANTÁNEO después de auto-blacklist si aplica
-        self.save_data()
-        
+
+            # Crear ID único para el reporte (sufijo si el mismo usuario reporta dos veces en el mismo segundo)
+            report_id = f"report_{int(time.time())}_{user_id}"
+            suffix = 1
+            while report_id in self.reports:
+                suffix += 1
+                report_id = f"report_{int(time.time())}_{user_id}_{suffix}"
+
+            report = {
+                'report_id': report_id,
+                'reporter_id': user_id,
+                'server_link': server_link,
+                'game_id': validation['game_id'],
+                'private_code': validation['private_code'],
+                'issue_type': issue_type,
+                'description': description,
+                'additional_info': additional_info or {},
+                'reported_at': time.time(),
+                'status': 'pending',
+                'confirmations': 1,  # El reporte inicial cuenta como confirmación
+                'confirming_users': [user_id],
+                'investigated_at': None,
+                'resolved_at': None
+            }
+
+            self.reports[report_id] = report
+            self.index.add(report)
+            self._append_journal({'op': 'report', 'report': report})
+
+            # Verificar si hay suficientes reportes para blacklist automático
+            self.check_auto_blacklist(server_link)
+
         logger.info(f"Report {report_id} submitted by user {user_id} for server {server_link}")
-        
+
         return {
             'success': True,
             'report_id': report_id,
             'message': 'Reporte enviado exitosamente.'
         }
-    
+
     def confirm_report(self, user_id: str, server_link: str) -> Dict[str, any]:
         """Confirmar un reporte existente"""
-        # Buscar reportes pendientes para este servidor
-        pending_reports = []
-        for report in self.reports.values():
-            if (report['server_link'] == server_link and 
-                report['status'] == 'pending'):
-                pending_reports.append(report)
-        
-        if not pending_reports:
-            return {
-                'success': False,
-                'error': 'No hay reportes pendientes para este servidor.'
-            }
-        
-        # Confirmar en el reporte más reciente
-        latest_report = max(pending_reports, key=lambda x: x['reported_at'])
-        
-        # Verificar que no haya confirmado ya
-        if user_id in latest_report['confirming_users']:
-            return {
-                'success': False,
-                'error': 'Ya confirmaste este reporte anteriormente.'
-            }
-        
-        # Agregar confirmación
-        latest_report['confirmations'] += 1
-        latest_report['confirming_users'].append(user_id)
-        latest_report['last_confirmation'] = time.time()
-        
-        # GUARDADO INSTANTÁNEO después de agregar confirmación
-        self.save_data()
-        
-        # Verificar auto-blacklist
-        self.check_auto_blacklist(server_link)
-        
-        # GUARDADO INSTANTÁNEO después de auto-blacklist si aplica
-        self.save_data()
-        
+        with self.lock:
+            # Reportes pendientes para este servidor (índice por enlace)
+            pending_reports = [self.reports[report_id] for report_id in self.index.pending_by_link.get(server_link, ())]
+
+            if not pending_reports:
+                return {
+                    'success': False,
+                    'error': 'No hay reportes pendientes para este servidor.'
+                }
+
+            # Confirmar en el reporte más reciente
+            latest_report = max(pending_reports, key=lambda x: x['reported_at'])
+
+            # Verificar que no haya confirmado ya
+            if user_id in latest_report['confirming_users']:
+                return {
+                    'success': False,
+                    'error': 'Ya confirmaste este reporte anteriormente.'
+                }
+
+            # Agregar confirmación
+            self._update_report(
+                latest_report,
+                confirmations=latest_report['confirmations'] + 1,
+                confirming_users=latest_report['confirming_users'] + [user_id],
+                last_confirmation=time.time()
+            )
+
+            # Verificar auto-blacklist
+            self.check_auto_blacklist(server_link)
+
         logger.info(f"Report {latest_report['report_id']} confirmed by user {user_id}")
-        
+
         return {
             'success': True,
             'confirmations': latest_report['confirmations'],
             'message': f'Confirmación agregada. Total: {latest_report["confirmations"]} confirmaciones.'
         }
-    
+
     def check_auto_blacklist(self, server_link: str, threshold: int = 3):
-        """Verificar si un servidor debe ser automáticamente blacklisted"""
-        total_confirmations = 0
-        
-        # Contar confirmaciones totales para este servidor
-        for report in self.reports.values():
-            if (report['server_link'] == server_link and 
-                report['status'] == 'pending'):
-                total_confirmations += report['confirmations']
-        
-        # Si alcanza el threshold, blacklist automático
-        if total_confirmations >= threshold:
-            self.blacklist_server(server_link, reason="Auto-blacklisted por múltiples reportes")
-            
-            # Marcar reportes como resueltos
-            for report in self.reports.values():
-                if (report['server_link'] == server_link and 
-                    report['status'] == 'pending'):
-                    report['status'] = 'resolved'
-                    report['resolved_at'] = time.time()
-                    report['resolution'] = 'auto_blacklisted'
-            
-            logger.info(f"Server {server_link} auto-blacklisted with {total_confirmations} confirmations")
-            return True
-        
+        """Verificar si un servidor debe ser automáticamente blacklisted (contador de confirmaciones pendientes)"""
+        with self.lock:
+            total_confirmations = self.index.pending_confirmations.get(server_link, 0)
+
+            # Si alcanza el threshold, blacklist automático
+            if total_confirmations >= threshold:
+                self.blacklist_server(server_link, reason="Auto-blacklisted por múltiples reportes")
+
+                # Marcar reportes como resueltos
+                resolved_at = time.time()
+                for report_id in list(self.index.pending_by_link.get(server_link, ())):
+                    self._update_report(
+                        self.reports[report_id],
+                        status='resolved',
+                        resolved_at=resolved_at,
+                        resolution='auto_blacklisted'
+                    )
+
+                logger.info(f"Server {server_link} auto-blacklisted with {total_confirmations} confirmations")
+                return True
+
         return False
-    
+
     def blacklist_server(self, server_link: str, reason: str = "Manual blacklist"):
         """Agregar servidor a la blacklist"""
         validation = self.validate_server_link(server_link)
-        
+
         blacklist_entry = {
             'server_link': server_link,
             'game_id': validation.get('game_id'),
@@ -246,94 +363,82 @@ class ServerReportSystem:
             'reason': reason,
             'confirmed_broken': True
         }
-        
-        self.blacklisted_servers[server_link] = blacklist_entry
-        
-        # GUARDADO INSTANTÁNEO después de blacklist
-        self.save_data()
-        
+
+        with self.lock:
+            self.blacklisted_servers[server_link] = blacklist_entry
+            self._append_journal({'op': 'blacklist', 'entry': blacklist_entry})
+
+        # No volver a servir este enlace desde el pool compartido del juego
+        from game_link_cache import game_link_cache
+        game_link_cache.invalidate(server_link, validation.get('game_id'))
+
         logger.info(f"Server blacklisted: {server_link} - Reason: {reason}")
-    
+
     def is_server_blacklisted(self, server_link: str) -> bool:
         """Verificar si un servidor está en la blacklist"""
         return server_link in self.blacklisted_servers
-    
+
     def get_pending_reports(self, limit: int = 50) -> List[Dict]:
         """Obtener reportes pendientes"""
-        pending = []
-        
-        for report in self.reports.values():
-            if report['status'] == 'pending':
-                pending.append(report)
-        
+        with self.lock:
+            pending = [
+                self.reports[report_id]
+                for report_ids in self.index.pending_by_link.values()
+                for report_id in report_ids
+            ]
+
         # Ordenar por número de confirmaciones (descendente) y fecha
         pending.sort(key=lambda x: (x['confirmations'], x['reported_at']), reverse=True)
-        
+
         return pending[:limit]
-    
+
     def get_user_reports(self, user_id: str) -> List[Dict]:
         """Obtener reportes de un usuario"""
-        user_reports = []
-        
-        for report in self.reports.values():
-            if report['reporter_id'] == user_id:
-                user_reports.append(report)
-        
+        with self.lock:
+            user_reports = [self.reports[report_id] for report_id in self.index.by_reporter.get(user_id, ())]
+
         user_reports.sort(key=lambda x: x['reported_at'], reverse=True)
         return user_reports
-    
+
     def get_report_stats(self) -> Dict:
-        """Obtener estadísticas de reportes"""
-        stats = {
-            'total_reports': len(self.reports),
-            'pending_reports': 0,
-            'resolved_reports': 0,
-            'blacklisted_servers': len(self.blacklisted_servers),
-            'top_issue_types': {},
-            'top_reported_games': {}
-        }
-        
-        issue_types = {}
-        reported_games = {}
-        
-        for report in self.reports.values():
-            # Contar por estado
-            if report['status'] == 'pending':
-                stats['pending_reports'] += 1
-            elif report['status'] == 'resolved':
-                stats['resolved_reports'] += 1
-            
-            # Contar tipos de problemas
-            issue_type = report['issue_type']
-            issue_types[issue_type] = issue_types.get(issue_type, 0) + 1
-            
-            # Contar juegos reportados
-            game_id = report['game_id']
-            reported_games[game_id] = reported_games.get(game_id, 0) + 1
-        
-        # Top 5 de cada categoría
-        stats['top_issue_types'] = dict(sorted(issue_types.items(), key=lambda x: x[1], reverse=True)[:5])
-        stats['top_reported_games'] = dict(sorted(reported_games.items(), key=lambda x: x[1], reverse=True)[:5])
-        
-        return stats
-    
+        """Obtener estadísticas de reportes (contadores mantenidos por el índice)"""
+        with self.lock:
+            return {
+                'total_reports': len(self.reports),
+                'pending_reports': self.index.status_counts.get('pending', 0),
+                'resolved_reports': self.index.status_counts.get('resolved', 0),
+                'blacklisted_servers': len(self.blacklisted_servers),
+                # Top 5 de cada categoría
+                'top_issue_types': dict(self.index.issue_types.most_common(5)),
+                'top_reported_games': dict(self.index.reported_games.most_common(5)),
+                'journal_entries': self.journal_entries
+            }
+
     def filter_blacklisted_servers(self, server_links: List[str]) -> List[str]:
         """Filtrar servidores blacklisted de una lista"""
-        return [link for link in server_links if not self.is_server_blacklisted(link)]
-    
+        blacklisted = self.blacklisted_servers
+        if not blacklisted:
+            return list(server_links)
+        return [link for link in server_links if link not in blacklisted]
+
     def cleanup_old_reports(self, days_old: int = 30):
         """Limpiar reportes antiguos resueltos"""
         cutoff_time = time.time() - (days_old * 24 * 60 * 60)
-        old_reports = []
-        
-        for report_id, report in list(self.reports.items()):
-            if (report['status'] == 'resolved' and 
-                report.get('resolved_at', 0) < cutoff_time):
-                old_reports.append(report_id)
-                del self.reports[report_id]
-        
-        if old_reports:
-            self.save_data()
-            logger.info(f"Cleaned up {len(old_reports)} old resolved reports")
-        
+
+        with self.lock:
+            old_reports = [
+                report_id for report_id, report in self.reports.items()
+                if report['status'] == 'resolved' and (report.get('resolved_at') or 0) < cutoff_time
+            ]
+
+            for report_id in old_reports:
+                self.index.remove(self.reports.pop(report_id))
+
+            if old_reports:
+                self._append_journal({'op': 'delete', 'report_ids': old_reports})
+                logger.info(f"Cleaned up {len(old_reports)} old resolved reports")
+
         return len(old_reports)
+
+# Sistema global de reportes de servidores
+report_system = ServerReportSystem()
@@ -0,0 +1,230 @@
+"""
+Cliente compartido de las APIs web de Roblox para RbxServers
+Un pool de conexiones por host, fusión de peticiones idénticas en vuelo, caché TTL/LRU y respeto de 429
+"""
+
+import os
+import time
+import json
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+import aiohttp
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "application/json"
+}
+
+# Clase de caché -> (TTL en segundos, entradas máximas)
+CACHE_POLICIES = {
+    'username': (6 * 3600, 5000),   # username -> id casi nunca cambia
+    'user': (3600, 5000),
+    'thumbnail': (600, 5000),
+    'game': (1800, 2000),
+    'badge': (3600, 2000),
+    'catalog': (600, 2000),
+    'inventory': (120, 1000)
+}
+# Respuestas vacías ({"data": []}, p. ej. username inexistente): se cachean poco para no fijar un "no encontrado"
+NEGATIVE_CACHE_TTL = 60
+
+class TTLCache:
+    """Caché LRU acotada con expiración por entrada"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()   # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.time():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value, ttl_seconds: Optional[int] = None):
+        self.entries[key] = (time.time() + (ttl_seconds or self.ttl_seconds), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+class RobloxAPIClient:
+    """Cliente asíncrono compartido para users/thumbnails/games/badges/catalog/inventory.roblox.com"""
+
+    def __init__(self, max_connections_per_host: int = 10, max_retries: int = 2):
+        self.max_connections_per_host = max_connections_per_host
+        self.max_retries = max_retries
+        self.sessions: Dict[str, aiohttp.ClientSession] = {}    # host -> sesión con su propio pool
+        self.in_flight: Dict[str, asyncio.Future] = {}          # clave de petición -> resultado compartido
+        self.blocked_until: Dict[str, float] = {}               # host -> fin del rate limit (429)
+        self.caches = {name: TTLCache(ttl, size) for name, (ttl, size) in CACHE_POLICIES.items()}
+        self.stats = {
+            'requests': 0,
+            'coalesced': 0,
+            'rate_limited': 0,
+            'errors': 0
+        }
+
+    def get_session(self, host: str) -> aiohttp.ClientSession:
+        """Sesión persistente del host (conexiones keep-alive reutilizadas entre comandos)"""
+        session = self.sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.max_connections_per_host, ttl_dns_cache=300)
+            session = aiohttp.ClientSession(
+                connector=connector,
+                headers=DEFAULT_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=15)
+            )
+            self.sessions[host] = session
+        return session
+
+    async def _wait_for_rate_limit(self, host: str):
+        wait = self.blocked_until.get(host, 0) - time.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _send(self, method: str, url: str, host: str, **kwargs) -> Optional[Any]:
+        """Enviar la petición con reintentos; devuelve el JSON si la respuesta es 200"""
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_rate_limit(host)
+            self.stats['requests'] += 1
+            try:
+                session = self.get_session(host)
+                async with session.request(method, url, **kwargs) as response:
+                    if response.status == 200:
+                        return await response.json(content_type=None)
+
+                    if response.status == 429:
+                        self.stats['rate_limited'] += 1
+                        retry_after = float(response.headers.get('Retry-After', 2 ** attempt))
+                        self.blocked_until[host] = time.time() + retry_after
+                        logger.warning(f"⏳ Rate limit en {host}, esperando {retry_after:.0f}s")
+                        continue
+
+                    if response.status >= 500 and attempt < self.max_retries:
+                        await asyncio.sleep(0.5 * (2 ** attempt))
+                        continue
+
+                    logger.debug(f"Roblox API {method} {url} respondió {response.status}")
+                    return None
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.stats['errors'] += 1
+                logger.debug(f"Error de red con {url} (intento {attempt + 1}): {e}")
+                if attempt < self.max_retries:
+                    await asyncio.sleep(0.5 * (2 ** attempt))
+
+        return None
+
+    async def request(self, method: str, url: str, cache: Optional[str] = None,
+                      cache_key: Optional[str] = None, **kwargs) -> Optional[Any]:
+        """Petición JSON compartida: caché por clase de endpoint y fusión de peticiones idénticas"""
+        key = cache_key or f"{method} {url} {json.dumps(kwargs.get('params'), sort_keys=True)} {json.dumps(kwargs.get('json'), sort_keys=True)}"
+
+        store = self.caches.get(cache) if cache else None
+        if store is not None:
+            cached = store.get(key)
+            if cached is not None:
+                return cached
+
+        # Si ya hay una petición idéntica en vuelo, esperar su resultado en lugar de repetirla
+        pending = self.in_flight.get(key)
+        if pending is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            result = await self._send(method, url, urlsplit(url).netloc, **kwargs)
+            if store is not None and result is not None:
+                empty = isinstance(result, dict) and 'data' in result and not result['data']
+                store.set(key, result, NEGATIVE_CACHE_TTL if empty else None)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            logger.error(f"❌ Error en petición a Roblox {url}: {e}")
+            return None
+        finally:
+            # Liberar a quienes esperaban aunque esta petición fallara o se cancelara
+            if not future.done():
+                future.set_result(None)
+            del self.in_flight[key]
+
+    async def get_json(self, url: str, params: Optional[dict] = None, cache: Optional[str] = None,
+                       headers: Optional[dict] = None, cache_key: Optional[str] = None) -> Optional[Any]:
+        return await self.request('GET', url, cache=cache, cache_key=cache_key, params=params, headers=headers)
+
+    async def post_json(self, url: str, payload: Any, cache: Optional[str] = None,
+                        headers: Optional[dict] = None, cache_key: Optional[str] = None) -> Optional[Any]:
+        return await self.request('POST', url, cache=cache, cache_key=cache_key, json=payload, headers=headers)
+
+    # ---- endpoints comunes ----
+
+    async def get_user_by_username(self, username: str) -> Optional[dict]:
+        """Resolver username -> {id, name, displayName} (caché de horas; "no encontrado" solo 60s)"""
+        data = await self.post_json(
+            "https://users.roblox.com/v1/usernames/users",
+            {"usernames": [username], "excludeBannedUsers": True},
+            cache='username',
+            cache_key=f"username:{username.lower()}"
+        )
+        if data and data.get("data"):
+            return data["data"][0]
+        return None
+
+    async def get_user(self, user_id) -> Optional[dict]:
+        """Información pública del usuario (users/v1/users/{id})"""
+        return await self.get_json(f"https://users.roblox.com/v1/users/{user_id}", cache='user')
+
+    async def get_avatar_headshots(self, user_ids: List, size: str = "420x420") -> Dict[str, str]:
+        """URLs de headshot por user_id en una sola petición"""
+        if not user_ids:
+            return {}
+        data = await self.get_json(
+            "https://thumbnails.roblox.com/v1/users/avatar-headshot",
+            params={"userIds": ",".join(str(uid) for uid in user_ids), "size": size,
+                    "format": "Png", "isCircular": "false"},
+            cache='thumbnail'
+        )
+        return {
+            str(item.get("targetId")): item.get("imageUrl")
+            for item in (data or {}).get("data", [])
+            if item.get("imageUrl")
+        }
+
+    async def close(self):
+        """Cerrar todas las sesiones"""
+        for session in list(self.sessions.values()):
+            if not session.closed:
+                await session.close()
+        self.sessions.clear()
+
+    def get_stats(self) -> dict:
+        """Estadísticas de peticiones y aciertos de caché por clase de endpoint"""
+        return {
+            'hosts': list(self.sessions),
+            'in_flight': len(self.in_flight),
+            'caches': {
+                name: {'entries': len(store.entries), 'hits': store.hits, 'misses': store.misses}
+                for name, store in self.caches.items()
+            },
+            **self.stats
+        }
+
+# Cliente global compartido
+roblox_client = RobloxAPIClient(
+    max_connections_per_host=int(os.getenv('ROBLOX_API_CONNECTIONS_PER_HOST', '10'))
+)
@@ -0,0 +1,333 @@
+"""
+Métricas de ejecución de RbxServers
+Histogramas de latencia (rutas web, comandos slash, scraping), contadores de errores y tasas de acierto
+de las cachés, expuestos en formato Prometheus en /metrics y resumidos para las APIs de estadísticas
+"""
+
+import sys
+import time
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (segundos) de los buckets de cada tipo de histograma
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMMAND_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SCRAPE_BUCKETS = (1.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# Días que se conservan en los contadores diarios
+DAILY_RETENTION_DAYS = 7
+
+class Histogram:
+    """Histograma acumulativo de buckets fijos (mismo modelo que Prometheus)"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # el último es +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimación del cuantil por interpolación lineal dentro del bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def merge(self, other: 'Histogram'):
+        for i, bucket_count in enumerate(other.counts):
+            self.counts[i] += bucket_count
+        self.total += other.total
+        self.count += other.count
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+class RuntimeMetrics:
+    """Registro central de métricas del proceso"""
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, Dict[tuple, Histogram]] = {}
+        self.histogram_buckets: Dict[str, Tuple[float, ...]] = {}
+        self.counters: Dict[str, Counter] = {}
+        self.daily: Counter = Counter()   # (nombre, 'YYYY-MM-DD') -> valor
+        self.help: Dict[str, str] = {}
+
+        self.register_histogram('rbx_http_request_duration_seconds', HTTP_BUCKETS, 'Latencia de las rutas de la API web')
+        self.register_histogram('rbx_command_duration_seconds', COMMAND_BUCKETS, 'Latencia de los comandos slash')
+        self.register_histogram('rbx_scrape_duration_seconds', SCRAPE_BUCKETS, 'Duración de los trabajos de scraping')
+        self.help.update({
+            'rbx_http_requests_total': 'Peticiones a la API web por ruta, método y estado',
+            'rbx_commands_total': 'Comandos slash ejecutados por resultado',
+            'rbx_scrapes_total': 'Trabajos de scraping por origen y resultado',
+            'rbx_scrape_links_found_total': 'Enlaces VIP nuevos encontrados por el scraping',
+            'rbx_errors_total': 'Errores por componente'
+        })
+
+    # ---- registro ----
+
+    def register_histogram(self, name: str, buckets: Tuple[float, ...], help_text: str = ''):
+        with self.lock:
+            self.histograms.setdefault(name, {})
+            self.histogram_buckets[name] = buckets
+            if help_text:
+                self.help[name] = help_text
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.histogram_buckets.get(name, HTTP_BUCKETS))
+            histogram.observe(max(seconds, 0.0))
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self.lock:
+            self.counters.setdefault(name, Counter())[key] += amount
+
+    def increment_daily(self, name: str, amount: float = 1):
+        today = datetime.now().strftime('%Y-%m-%d')
+        with self.lock:
+            self.daily[(name, today)] += amount
+            if len(self.daily) > DAILY_RETENTION_DAYS * 8:
+                days = sorted({day for _, day in self.daily}, reverse=True)[:DAILY_RETENTION_DAYS]
+                self.daily = Counter({key: value for key, value in self.daily.items() if key[1] in days})
+
+    def get_today(self, name: str) -> float:
+        with self.lock:
+            return self.daily.get((name, datetime.now().strftime('%Y-%m-%d')), 0)
+
+    # ---- puntos de instrumentación ----
+
+    def record_http_request(self, route: str, method: str, status: int, seconds: float):
+        self.observe('rbx_http_request_duration_seconds', seconds, route=route, method=method)
+        self.increment('rbx_http_requests_total', route=route, method=method, status=status)
+        self.increment_daily('http_requests')
+        if status >= 500:
+            self.increment('rbx_errors_total', component='web_api')
+            self.increment_daily('http_errors')
+
+    def record_command(self, command: str, seconds: Optional[float], success: bool = True):
+        if seconds is not None:
+            self.observe('rbx_command_duration_seconds', seconds, command=command)
+        self.increment('rbx_commands_total', command=command, result='success' if success else 'error')
+        self.increment_daily('commands')
+        if not success:
+            self.increment('rbx_errors_total', component='commands')
+            self.increment_daily('command_errors')
+
+    def record_scrape(self, source: str, seconds: float, new_links: int = 0, success: bool = True):
+        self.observe('rbx_scrape_duration_seconds', seconds, source=source)
+        self.increment('rbx_scrapes_total', source=source, result='success' if success else 'error')
+        if new_links:
+            self.increment('rbx_scrape_links_found_total', new_links, source=source)
+            self.increment_daily('scrape_links_found', new_links)
+        if not success:
+            self.increment('rbx_errors_total', component='scraper')
+
+    # ---- lecturas ----
+
+    def _merged(self, name: str) -> Histogram:
+        merged = Histogram(self.histogram_buckets.get(name, HTTP_BUCKETS))
+        with self.lock:
+            for histogram in self.histograms.get(name, {}).values():
+                merged.merge(histogram)
+        return merged
+
+    def _counter_total(self, name: str, **match) -> float:
+        with self.lock:
+            return sum(
+                value for key, value in self.counters.get(name, {}).items()
+                if all(dict(key).get(k) == str(v) for k, v in match.items())
+            )
+
+    def get_cache_stats(self) -> Dict[str, dict]:
+        """Aciertos y fallos de las cachés compartidas (se leen de sus propios contadores)"""
+        caches = {}
+
+        def add(name, hits, misses):
+            lookups = hits + misses
+            caches[name] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / lookups * 100, 1) if lookups else 0
+            }
+
+        try:
+            from roblox_client import roblox_client
+            for name, store in roblox_client.caches.items():
+                add(f'roblox_api_{name}', store.hits, store.misses)
+        except Exception as e:
+            logger.debug(f"Sin métricas de roblox_client: {e}")
+        try:
+            from thumbnail_batcher import thumbnail_batcher
+            stats = thumbnail_batcher.get_stats()
+            add('thumbnails', stats['cache_hits'], stats['requested'] - stats['cache_hits'])
+        except Exception as e:
+            logger.debug(f"Sin métricas de thumbnails: {e}")
+        try:
+            from game_link_cache import game_link_cache
+            stats = game_link_cache.get_stats()
+            add('game_links', stats['hits'], stats['misses'])
+        except Exception as e:
+            logger.debug(f"Sin métricas de game_link_cache: {e}")
+        try:
+            from game_metadata import game_metadata
+            stats = game_metadata.get_stats()
+            add('game_metadata', stats['hits'], stats['misses'])
+        except Exception as e:
+            logger.debug(f"Sin métricas de game_metadata: {e}")
+        try:
+            from inventory_valuation import inventory_valuation
+            stats = inventory_valuation.get_stats()
+            add('asset_prices', stats['price_cache_hits'], stats['price_cache_misses'])
+            add('inventory_snapshots', stats['snapshot_hits'] + stats['stale_served'], stats['refreshes'] - stats['background_refreshes'])
+        except Exception as e:
+            logger.debug(f"Sin métricas de inventory_valuation: {e}")
+        profile_system = getattr(sys.modules.get('user_profile_system'), 'user_profile_system', None)
+        if profile_system is not None:
+            stats = profile_system.get_cache_stats()
+            add('user_profiles', stats['hits'], stats['misses'])
+        return caches
+
+    def get_summary(self) -> dict:
+        """Resumen legible para las APIs de estadísticas"""
+        http = self._merged('rbx_http_request_duration_seconds')
+        commands = self._merged('rbx_command_duration_seconds')
+        scrapes = self._merged('rbx_scrape_duration_seconds')
+
+        total_commands = self._counter_total('rbx_commands_total')
+        failed_commands = self._counter_total('rbx_commands_total', result='error')
+        total_requests = self._counter_total('rbx_http_requests_total')
+        with self.lock:
+            failed_requests = sum(
+                value for key, value in self.counters.get('rbx_http_requests_total', {}).items()
+                if int(dict(key).get('status', 0)) >= 500
+            )
+        total_operations = total_commands + total_requests
+        failed_operations = failed_commands + failed_requests
+
+        caches = self.get_cache_stats()
+        cache_hits = sum(cache['hits'] for cache in caches.values())
+        cache_lookups = cache_hits + sum(cache['misses'] for cache in caches.values())
+
+        return {
+            'uptime_seconds': round(time.time() - self.start_time),
+            'http': {
+                'requests': int(total_requests),
+                'requests_today': int(self.get_today('http_requests')),
+                'errors': int(failed_requests),
+                'avg_ms': round(http.total / http.count * 1000, 1) if http.count else 0,
+                'p50_ms': round(http.quantile(0.5) * 1000, 1),
+                'p95_ms': round(http.quantile(0.95) * 1000, 1)
+            },
+            'commands': {
+                'executed': int(total_commands),
+                'executed_today': int(self.get_today('commands')),
+                'errors': int(failed_commands),
+                'avg_ms': round(commands.total / commands.count * 1000, 1) if commands.count else 0,
+                'p95_ms': round(commands.quantile(0.95) * 1000, 1)
+            },
+            'scraping': {
+                'jobs': scrapes.count,
+                'errors': int(self._counter_total('rbx_scrapes_total', result='error')),
+                'avg_seconds': round(scrapes.total / scrapes.count, 1) if scrapes.count else 0,
+                'p95_seconds': round(scrapes.quantile(0.95), 1),
+                'links_found_today': int(self.get_today('scrape_links_found'))
+            },
+            'success_rate': round((1 - failed_operations / total_operations) * 100, 1) if total_operations else 100.0,
+            'error_rate': round(failed_operations / total_operations * 100, 1) if total_operations else 0.0,
+            'cache_hit_rate': round(cache_hits / cache_lookups * 100, 1) if cache_lookups else 0,
+            'caches': caches
+        }
+
+    def render_prometheus(self) -> str:
+        """Texto en formato de exposición de Prometheus (text/plain; version=0.0.4)"""
+        lines: List[str] = []
+
+        lines.append('# HELP rbx_uptime_seconds Segundos desde el arranque del proceso')
+        lines.append('# TYPE rbx_uptime_seconds gauge')
+        lines.append(f'rbx_uptime_seconds {time.time() - self.start_time:.0f}')
+
+        with self.lock:
+            histograms = {name: dict(series) for name, series in self.histograms.items()}
+            counters = {name: dict(values) for name, values in self.counters.items()}
+
+        for name, series in histograms.items():
+            if self.help.get(name):
+                lines.append(f'# HELP {name} {self.help[name]}')
+            lines.append(f'# TYPE {name} histogram')
+            for labels, histogram in sorted(series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{_format_labels(labels, ("le", repr(bound)))} {cumulative}')
+                lines.append(f'{name}_bucket{_format_labels(labels, ("le", "+Inf"))} {histogram.count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {histogram.total:.6f}')
+                lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+
+        for name, values in counters.items():
+            if self.help.get(name):
+                lines.append(f'# HELP {name} {self.help[name]}')
+            lines.append(f'# TYPE {name} counter')
+            for labels, value in sorted(values.items()):
+                lines.append(f'{name}{_format_labels(labels)} {value:g}')
+
+        caches = self.get_cache_stats()
+        if caches:
+            lines.append('# HELP rbx_cache_hits_total Aciertos por caché')
+            lines.append('# TYPE rbx_cache_hits_total counter')
+            for cache_name, cache in caches.items():
+                lines.append(f'rbx_cache_hits_total{{cache="{cache_name}"}} {cache["hits"]}')
+            lines.append('# HELP rbx_cache_misses_total Fallos por caché')
+            lines.append('# TYPE rbx_cache_misses_total counter')
+            for cache_name, cache in caches.items():
+                lines.append(f'rbx_cache_misses_total{{cache="{cache_name}"}} {cache["misses"]}')
+
+        try:
+            from scraping_queue import scraping_scheduler
+            queue_stats = scraping_scheduler.get_stats()
+            lines.append('# HELP rbx_scraping_queue_depth Trabajos de scraping esperando')
+            lines.append('# TYPE rbx_scraping_queue_depth gauge')
+            lines.append(f'rbx_scraping_queue_depth {queue_stats.get("queued", 0)}')
+            lines.append('# HELP rbx_scraping_running Trabajos de scraping en ejecución')
+            lines.append('# TYPE rbx_scraping_running gauge')
+            lines.append(f'rbx_scraping_running {queue_stats.get("running", 0)}')
+        except Exception as e:
+            logger.debug(f"Sin métricas de la cola de scraping: {e}")
+
+        return '\n'.join(lines) + '\n'
+
+# Métricas globales del proceso
+runtime_metrics = RuntimeMetrics()
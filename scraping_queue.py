@@ -0,0 +1,249 @@
+"""
+Cola central de trabajos de scraping para RbxServers
+Saca el trabajo bloqueante de Selenium del event loop de Discord con un número fijo de workers
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Prioridades (menor número = se atiende antes)
+PRIORITY_VIP = 0
+PRIORITY_DONATOR = 1
+PRIORITY_NORMAL = 2
+
+_thread_state = threading.local()
+
+def current_job() -> Optional['ScrapeJob']:
+    """Trabajo que se está ejecutando en el worker actual (None fuera de la cola)"""
+    return getattr(_thread_state, 'job', None)
+
+class JobCancelled(Exception):
+    """El trabajo fue cancelado mientras se ejecutaba"""
+
+class ScrapeJob:
+    """Trabajo de scraping con estado, progreso y cancelación"""
+
+    def __init__(self, game_id: str, user_id: str, func: Callable, args: tuple, kwargs: dict,
+                 priority: int, loop: asyncio.AbstractEventLoop, kind: Optional[str] = None):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.game_id = str(game_id)
+        self.user_id = str(user_id)
+        self.func = func
+        # Tipo de trabajo (por defecto la función): scraping normal y headless del mismo juego no se mezclan
+        self.kind = kind or f"{func.__module__}.{func.__qualname__}"
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.status = 'queued'  # queued, running, done, failed, cancelled
+        self.progress: Dict = {}
+        self.result = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self.cancel_event = threading.Event()
+        self.loop = loop
+        self.future: asyncio.Future = loop.create_future()
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return (self.game_id, self.user_id, self.kind)
+
+    def is_cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Lanzar JobCancelled si se pidió cancelar (para usar entre pasos de Selenium)"""
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"Trabajo {self.job_id} cancelado")
+
+    def update_progress(self, **fields):
+        """Publicar progreso; lo lee el loop que actualiza el mensaje de Discord"""
+        self.progress.update(fields)
+        self.progress['updated_at'] = time.time()
+
+    def _finish(self, status: str, result=None, error: Optional[str] = None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+
+        def resolve():
+            if not self.future.done():
+                self.future.set_result(result)
+        self.loop.call_soon_threadsafe(resolve)
+
+class ScrapingScheduler:
+    """Planificador con workers fijos, equidad por usuario, deduplicación, prioridades y cancelación"""
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self.condition = threading.Condition()
+        # prioridad -> (user_id -> cola de trabajos); se atiende a los usuarios por turnos
+        self.queues: Dict[int, OrderedDict] = {}
+        self.active_jobs: Dict[Tuple[str, str, str], ScrapeJob] = {}
+        self.jobs: Dict[str, ScrapeJob] = {}
+        self.threads = []
+        self.recent_durations: deque = deque(maxlen=100)
+        self.stats = {
+            'submitted': 0,
+            'deduplicated': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0
+        }
+
+    def start(self):
+        """Arrancar los workers (idempotente)"""
+        with self.condition:
+            if self.threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f"scrape-worker-{i + 1}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        logger.info(f"✅ Cola de scraping iniciada con {self.workers} workers")
+
+    def submit(self, game_id: str, user_id: str, func: Callable, *args,
+               priority: int = PRIORITY_NORMAL, kind: Optional[str] = None, **kwargs) -> ScrapeJob:
+        """Encolar un trabajo; si ya hay uno idéntico (game_id, user_id, tipo) activo se reutiliza"""
+        self.start()
+        job = ScrapeJob(game_id, user_id, func, args, kwargs, priority, asyncio.get_running_loop(), kind=kind)
+
+        with self.condition:
+            existing = self.active_jobs.get(job.key)
+            if existing and existing.status in ('queued', 'running'):
+                self.stats['deduplicated'] += 1
+                logger.info(f"🔁 Trabajo duplicado para juego {game_id} / usuario {user_id} ({job.kind}), reutilizando {existing.job_id}")
+                return existing
+
+            self.jobs[job.job_id] = job
+            self.active_jobs[job.key] = job
+            self.queues.setdefault(priority, OrderedDict()).setdefault(job.user_id, deque()).append(job)
+            self.stats['submitted'] += 1
+            self.condition.notify()
+
+        logger.info(f"📥 Trabajo {job.job_id} encolado (juego {game_id}, usuario {user_id}, prioridad {priority})")
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancelar un trabajo en cola (se descarta) o en ejecución (se marca para detenerse)"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if not job or job.status not in ('queued', 'running'):
+                return False
+
+            job.cancel_event.set()
+            if job.status == 'queued':
+                user_queues = self.queues.get(job.priority, {})
+                user_jobs = user_queues.get(job.user_id)
+                if user_jobs and job in user_jobs:
+                    user_jobs.remove(job)
+                    if not user_jobs:
+                        del user_queues[job.user_id]
+                self._release(job)
+                self.stats['cancelled'] += 1
+                job._finish('cancelled', error='Cancelado por el usuario')
+
+        logger.info(f"⏹️ Trabajo {job_id} cancelado")
+        return True
+
+    def queue_position(self, job: ScrapeJob) -> int:
+        """Posición aproximada del trabajo en la cola (0 si ya se está ejecutando)"""
+        with self.condition:
+            if job.status != 'queued':
+                return 0
+            position = 0
+            for priority in sorted(self.queues):
+                for user_jobs in self.queues[priority].values():
+                    for queued in user_jobs:
+                        position += 1
+                        if queued is job:
+                            return position
+            return position
+
+    def _next_job(self) -> Optional[ScrapeJob]:
+        """Elegir el siguiente trabajo: mayor prioridad primero y turnos entre usuarios"""
+        for priority in sorted(self.queues):
+            user_queues = self.queues[priority]
+            while user_queues:
+                user_id, user_jobs = user_queues.popitem(last=False)
+                if not user_jobs:
+                    continue
+                job = user_jobs.popleft()
+                if user_jobs:
+                    user_queues[user_id] = user_jobs  # El usuario vuelve al final de su turno
+                return job
+        return None
+
+    def _release(self, job: ScrapeJob):
+        if self.active_jobs.get(job.key) is job:
+            del self.active_jobs[job.key]
+
+    def _worker_loop(self):
+        while True:
+            with self.condition:
+                job = self._next_job()
+                while job is None:
+                    self.condition.wait()
+                    job = self._next_job()
+                job.status = 'running'
+                job.started_at = time.time()
+
+            _thread_state.job = job
+            try:
+                result = job.func(*job.args, **job.kwargs)
+                status = 'cancelled' if job.is_cancelled() else 'done'
+                job._finish(status, result=result)
+            except JobCancelled:
+                job._finish('cancelled', error='Cancelado por el usuario')
+            except Exception as e:
+                logger.error(f"❌ Trabajo {job.job_id} falló: {e}")
+                job._finish('failed', error=str(e))
+            finally:
+                _thread_state.job = None
+                with self.condition:
+                    self._release(job)
+                    self.recent_durations.append(job.finished_at - job.started_at)
+                    self.stats[{'done': 'completed', 'failed': 'failed', 'cancelled': 'cancelled'}[job.status]] += 1
+                    # Conservar solo los trabajos recientes para consultas de estado
+                    if len(self.jobs) > 500:
+                        for old_id in [j for j, old in self.jobs.items() if old.finished_at][:100]:
+                            del self.jobs[old_id]
+
+    async def wait(self, job: ScrapeJob, on_progress: Optional[Callable] = None, interval: float = 5):
+        """Esperar el resultado llamando on_progress(job) periódicamente (canal de progreso ligero)"""
+        while not job.future.done():
+            if on_progress:
+                try:
+                    await on_progress(job)
+                except Exception as e:
+                    logger.debug(f"Error en callback de progreso: {e}")
+            await asyncio.wait({job.future}, timeout=interval)
+        return job.future.result()
+
+    def get_stats(self) -> dict:
+        """Estado de la cola para diagnóstico"""
+        with self.condition:
+            queued = sum(len(jobs) for user_queues in self.queues.values() for jobs in user_queues.values())
+            running = sum(1 for job in self.active_jobs.values() if job.status == 'running')
+            durations = list(self.recent_durations)
+            return {
+                'workers': self.workers,
+                'queued': queued,
+                'running': running,
+                'avg_job_seconds': round(sum(durations) / len(durations), 1) if durations else 0,
+                **self.stats
+            }
+
+# Planificador global (los workers arrancan con el primer trabajo)
+scraping_scheduler = ScrapingScheduler(workers=int(os.getenv('SCRAPER_QUEUE_WORKERS', '2')))
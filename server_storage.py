@@ -0,0 +1,258 @@
+"""
+Almacenamiento transaccional de servidores por usuario para RbxServers
+Reemplaza las reescrituras completas de user_game_servers.json por un SQLite en modo WAL
+"""
+
+import os
+import sys
+import json
+import atexit
+import time
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ServerStorage:
+    """Almacén embebido (SQLite WAL) para los servidores VIP de cada usuario"""
+
+    def __init__(self, db_file: str = "user_game_servers.db", legacy_file: str = "user_game_servers.json"):
+        self.db_file = db_file
+        self.legacy_file = legacy_file
+        self.export_interval = 5  # Segundos mínimos entre exportaciones del JSON legado
+        self.lock = threading.RLock()
+        self._dirty = False
+        self._last_export = 0.0
+
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_servers (
+                user_id TEXT PRIMARY KEY,
+                servers TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS metadata (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+
+        self.import_legacy_json()
+        logger.info(f"✅ ServerStorage inicializado en {self.db_file}")
+
+    def import_legacy_json(self) -> int:
+        """Importar user_game_servers.json una sola vez si la base de datos está vacía"""
+        with self.lock:
+            row = self.conn.execute("SELECT COUNT(*) FROM user_servers").fetchone()
+            if row[0] > 0 or not Path(self.legacy_file).exists():
+                return 0
+
+            try:
+                with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.error(f"❌ Error leyendo {self.legacy_file} para importar: {e}")
+                return 0
+
+            user_servers = data.get('user_servers', {})
+            now = datetime.now().isoformat()
+            rows = [
+                (str(user_id), json.dumps(servers, ensure_ascii=False), now)
+                for user_id, servers in user_servers.items()
+                if isinstance(servers, list)
+            ]
+
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO user_servers (user_id, servers, updated_at) VALUES (?, ?, ?)",
+                    rows
+                )
+                created_at = data.get('metadata', {}).get('created_at', now)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO metadata (key, value) VALUES ('created_at', ?)",
+                    (created_at,)
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+            logger.info(f"📥 Importados {len(rows)} usuarios desde {self.legacy_file}")
+            return len(rows)
+
+    def get_user_servers(self, user_id: str) -> List[str]:
+        """Obtener la lista de servidores de un usuario"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT servers FROM user_servers WHERE user_id = ?", (str(user_id),)
+            ).fetchone()
+        if not row:
+            return []
+        try:
+            servers = json.loads(row[0])
+            return servers if isinstance(servers, list) else []
+        except Exception:
+            return []
+
+    def get_all_user_servers(self) -> Dict[str, List[str]]:
+        """Obtener los servidores de todos los usuarios (user_id -> lista)"""
+        with self.lock:
+            rows = self.conn.execute("SELECT user_id, servers FROM user_servers").fetchall()
+        result = {}
+        for user_id, servers_json in rows:
+            try:
+                servers = json.loads(servers_json)
+            except Exception:
+                continue
+            if isinstance(servers, list):
+                result[user_id] = servers
+        return result
+
+    def set_user_servers(self, user_id: str, servers: List[str], limit: Optional[int] = None,
+                         source: str = 'storage') -> List[str]:
+        """Reemplazar los servidores de un usuario (upsert atómico de una sola fila)"""
+        servers = list(servers or [])
+        if limit is not None:
+            servers = servers[:limit]
+
+        with self.lock:
+            previous = set(self.get_user_servers(user_id))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO user_servers (user_id, servers, updated_at) VALUES (?, ?, ?)",
+                (str(user_id), json.dumps(servers, ensure_ascii=False), datetime.now().isoformat())
+            )
+            self._dirty = True
+
+        self._update_counters(user_id, len(servers))
+        self._publish_added(user_id, [server for server in servers if server not in previous], source)
+        return servers
+
+    def add_user_servers(self, user_id: str, new_servers: List[str], limit: Optional[int] = None,
+                         source: str = 'storage') -> List[str]:
+        """Agregar servidores a los existentes del usuario evitando duplicados"""
+        user_id = str(user_id)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT servers FROM user_servers WHERE user_id = ?", (user_id,)
+                ).fetchone()
+                existing = json.loads(row[0]) if row else []
+                previous = set(existing)
+                merged = list(existing)
+                for server in new_servers or []:
+                    if server not in merged:
+                        merged.append(server)
+                if limit is not None:
+                    merged = merged[:limit]
+
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO user_servers (user_id, servers, updated_at) VALUES (?, ?, ?)",
+                    (user_id, json.dumps(merged, ensure_ascii=False), datetime.now().isoformat())
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self._dirty = True
+
+        self._update_counters(user_id, len(merged))
+        self._publish_added(user_id, [server for server in merged if server not in previous], source)
+        return merged
+
+    def _update_counters(self, user_id: str, count: int):
+        """Mantener al día los contadores de estadísticas (leaderboard, totales)"""
+        try:
+            from stats_aggregator import stats_aggregator
+            stats_aggregator.set_user_server_count(user_id, count)
+        except Exception as e:
+            logger.error(f"❌ Error actualizando contadores de servidores para {user_id}: {e}")
+
+        # Invalidar el perfil cacheado solo si el sistema de perfiles ya está cargado
+        profile_system = getattr(sys.modules.get('user_profile_system'), 'user_profile_system', None)
+        if profile_system is not None:
+            profile_system.invalidate_user(user_id)
+
+    def _publish_added(self, user_id: str, added: List[str], source: str):
+        """Avisar al bus de entregas de los servidores nuevos del usuario"""
+        if not added:
+            return
+        try:
+            from delivery_events import delivery_bus
+            delivery_bus.publish(user_id, added, source=source)
+        except Exception as e:
+            logger.error(f"❌ Error publicando evento de entrega para {user_id}: {e}")
+
+    def remove_user(self, user_id: str) -> bool:
+        """Eliminar todos los servidores de un usuario"""
+        with self.lock:
+            cursor = self.conn.execute("DELETE FROM user_servers WHERE user_id = ?", (str(user_id),))
+            self._dirty = True
+        self._update_counters(user_id, 0)
+        return cursor.rowcount > 0
+
+    def export_legacy_layout(self) -> dict:
+        """Construir la estructura legada de user_game_servers.json"""
+        user_servers = self.get_all_user_servers()
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM metadata WHERE key = 'created_at'").fetchone()
+        now = datetime.now().isoformat()
+
+        return {
+            'user_servers': user_servers,
+            'metadata': {
+                'created_at': row[0] if row else now,
+                'last_updated': now,
+                'total_users': len(user_servers),
+                'total_servers': sum(len(servers) for servers in user_servers.values()),
+                'description': "Estructura simplificada: user_id -> array de servidores",
+                'source': 'server_storage'
+            }
+        }
+
+    def export_legacy_json(self, force: bool = False) -> bool:
+        """Exportar el JSON legado de forma atómica (archivo temporal + os.replace)"""
+        with self.lock:
+            if not force and (not self._dirty or time.time() - self._last_export < self.export_interval):
+                return False
+
+            data = self.export_legacy_layout()
+            target_dir = os.path.dirname(os.path.abspath(self.legacy_file))
+            fd, tmp_path = tempfile.mkstemp(prefix=".user_game_servers.", suffix=".tmp", dir=target_dir)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.legacy_file)
+            except Exception as e:
+                logger.error(f"❌ Error exportando {self.legacy_file}: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return False
+
+            self._dirty = False
+            self._last_export = time.time()
+            logger.debug(f"💾 {self.legacy_file} exportado: {data['metadata']['total_users']} usuarios")
+            return True
+
+    def close(self):
+        """Exportar cambios pendientes y cerrar la conexión"""
+        with self.lock:
+            if self._dirty:
+                self.export_legacy_json(force=True)
+            self.conn.close()
+
+# Instancia global del almacén
+server_storage = ServerStorage()
+atexit.register(server_storage.close)
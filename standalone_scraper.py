@@ -278,6 +278,18 @@ class StandaloneScraper:
                 logger.error(f"Failed to create driver after {max_retries + 1} attempts")
                 raise Exception(f"Could not create Chrome driver after {max_retries + 1} attempts: {e}")
 
+    def create_cookied_driver(self):
+        """Crear driver con las cookies de Roblox ya aplicadas (fábrica del pool)"""
+        driver = self.create_driver()
+        cookies_loaded = self.load_cookies_to_driver(driver)
+        logger.info(f"{cookies_loaded} cookies de Roblox aplicadas")
+        return driver
+
+    def get_driver_pool(self):
+        """Pool de drivers calientes; tamaño 1 porque Chrome usa un puerto de depuración fijo"""
+        from driver_pool import get_driver_pool
+        return get_driver_pool('standalone_scraper', self.create_cookied_driver, max_size=1)
+
     def load_cookies_to_driver(self, driver):
         """Cargar cookies de Roblox al driver"""
         try:
@@ -389,14 +401,11 @@ class StandaloneScraper:
             self.stats['start_time'] = time.time()
             logger.info(f"Starting independent scraping for {target_amount} servers of game {self.game_id} (Attempt {retry_count + 1}/{max_retries + 1})")
 
-            # Crear driver con reintentos automáticos
-            driver = self.create_driver()
+            # Obtener driver caliente del pool (creado con reintentos automáticos y cookies aplicadas)
+            driver_pool = self.get_driver_pool()
+            driver = driver_pool.acquire()
 
             try:
-                # Cargar cookies de Roblox
-                cookies_loaded = self.load_cookies_to_driver(driver)
-                logger.info(f"{cookies_loaded} cookies de Roblox aplicadas")
-
                 # Obtener enlaces de servidores
                 server_links = self.get_server_links(driver, target_amount * 2)  # Obtener extras por si fallan
 
@@ -493,12 +502,9 @@ class StandaloneScraper:
                 return valid_servers
 
             finally:
-                # Cerrar driver
-                try:
-                    driver.quit()
-                    logger.info("Driver cerrado exitosamente")
-                except:
-                    pass
+                # Devolver driver al pool
+                driver_pool.release(driver)
+                logger.info("Driver devuelto al pool")
 
         except (WebDriverException, Exception) as e:
             logger.error(f"Critical error in scraping attempt {retry_count + 1}: {e}")
@@ -741,6 +747,10 @@ async def main():
     except Exception as e:
         logger.error(f"Error crítico en main: {e}")
         return 1
+    finally:
+        # Cerrar navegadores del pool al terminar el proceso
+        from driver_pool import close_all_pools
+        close_all_pools()
 
 if __name__ == "__main__":
     print("Framework Independiente de Scraping RbxServers")
@@ -0,0 +1,290 @@
+"""
+Agregados incrementales para las estadísticas de RbxServers
+Contadores que se actualizan al escribir (servidores, verificaciones, monedas, tienda) para que los
+endpoints de estadísticas lean una foto en O(1) en vez de recorrer todos los usuarios y archivos
+"""
+
+import os
+import json
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class StatsAggregator:
+    """Contadores globales mantenidos por los propios sistemas al guardar sus datos"""
+
+    def __init__(self, coins_file: str = "user_coins.json", shop_file: str = "shop_items.json"):
+        self.coins_file = coins_file
+        self.shop_file = shop_file
+        self.lock = threading.RLock()
+
+        # Enlaces del scraper (links_by_user): aporte de cada usuario para poder restarlo al actualizarlo
+        self.user_links: Dict[str, Dict[str, Tuple[int, str]]] = {}   # user_id -> {game_id: (enlaces, categoría)}
+        self.servers_by_category: Counter = Counter()
+        self.servers_by_game: Counter = Counter()
+        self.total_link_servers = 0
+        self.total_user_games = 0
+        self.links_initialized = False
+
+        # Servidores guardados en server_storage (base del leaderboard)
+        self.user_server_counts: Dict[str, int] = {}
+        self.total_stored_servers = 0
+        self.storage_initialized = False
+        self.storage_version = 0
+        self.leaderboard_cache: Tuple[int, List[Tuple[str, int]]] = (-1, [])
+
+        # Verificaciones por día
+        self.verification_days: Dict[str, str] = {}    # discord_id -> 'YYYY-MM-DD'
+        self.verifications_by_day: Counter = Counter()
+
+        # Agregados de archivos escritos también fuera del proceso: se recalculan solo si cambia el archivo
+        self.file_aggregates: Dict[str, Tuple[tuple, dict]] = {}
+
+    # ---- enlaces del scraper ----
+
+    def set_user_links(self, user_id: str, user_games: dict):
+        """Reemplazar el aporte de un usuario (O(juegos del usuario))"""
+        user_id = str(user_id)
+        contribution = {}
+        for game_id, game_data in (user_games or {}).items():
+            if isinstance(game_data, dict):
+                contribution[str(game_id)] = (len(game_data.get('links', [])), game_data.get('category', 'other'))
+
+        with self.lock:
+            self._apply_links(self.user_links.pop(user_id, {}), -1)
+            if contribution:
+                self.user_links[user_id] = contribution
+                self._apply_links(contribution, 1)
+
+    def remove_user_links(self, user_id: str):
+        with self.lock:
+            self._apply_links(self.user_links.pop(str(user_id), {}), -1)
+
+    def _apply_links(self, contribution: Dict[str, Tuple[int, str]], sign: int):
+        for game_id, (count, category) in contribution.items():
+            self.servers_by_category[category] += sign * count
+            self.servers_by_game[game_id] += sign * count
+            self.total_link_servers += sign * count
+            self.total_user_games += sign
+            if self.servers_by_category[category] <= 0:
+                del self.servers_by_category[category]
+            if self.servers_by_game[game_id] <= 0:
+                del self.servers_by_game[game_id]
+
+    def retain_link_users(self, user_ids):
+        """Quitar el aporte de los usuarios que ya no están en links_by_user"""
+        with self.lock:
+            for user_id in set(self.user_links) - {str(uid) for uid in user_ids}:
+                self.remove_user_links(user_id)
+            self.links_initialized = True
+
+    def sync_links(self, links_by_user: dict):
+        """Sincronizar con links_by_user completo (solo en la carga inicial)"""
+        with self.lock:
+            for user_id, user_games in list(links_by_user.items()):
+                if isinstance(user_games, dict):
+                    self.set_user_links(user_id, user_games)
+            self.retain_link_users(list(links_by_user))
+
+    def ensure_links(self, links_by_user: dict):
+        if not self.links_initialized:
+            self.sync_links(links_by_user)
+
+    def get_server_snapshot(self) -> dict:
+        """Totales de servidores del scraper: usuarios, servidores, juegos y servidores por categoría"""
+        with self.lock:
+            return {
+                'total_users_with_servers': len(self.user_links),
+                'total_servers': self.total_link_servers,
+                'total_games': self.total_user_games,
+                'unique_games': len(self.servers_by_game),
+                'servers_by_category': dict(self.servers_by_category)
+            }
+
+    def get_top_games(self, limit: int = 10) -> List[Tuple[str, int]]:
+        with self.lock:
+            return self.servers_by_game.most_common(limit)
+
+    # ---- servidores guardados (server_storage) ----
+
+    def set_user_server_count(self, user_id: str, count: int):
+        """Llamado por server_storage tras cada escritura de la lista de un usuario"""
+        user_id = str(user_id)
+        with self.lock:
+            previous = self.user_server_counts.pop(user_id, 0)
+            if count > 0:
+                self.user_server_counts[user_id] = count
+            if count != previous:
+                self.total_stored_servers += count - previous
+                self.storage_version += 1
+
+    def _ensure_storage(self):
+        if self.storage_initialized:
+            return
+        try:
+            from server_storage import server_storage
+            all_servers = server_storage.get_all_user_servers()
+        except Exception as e:
+            logger.error(f"❌ Error cargando contadores de servidores guardados: {e}")
+            return
+        with self.lock:
+            self.user_server_counts = {uid: len(servers) for uid, servers in all_servers.items() if servers}
+            self.total_stored_servers = sum(self.user_server_counts.values())
+            self.storage_version += 1
+            self.storage_initialized = True
+
+    def get_leaderboard(self, limit: int = 50) -> List[Tuple[str, int]]:
+        """[(user_id, servidores)] de mayor a menor; se reordena solo si hubo escrituras desde la última vez"""
+        self._ensure_storage()
+        with self.lock:
+            version, ranking = self.leaderboard_cache
+            if version != self.storage_version:
+                ranking = sorted(self.user_server_counts.items(), key=lambda item: item[1], reverse=True)
+                self.leaderboard_cache = (self.storage_version, ranking)
+            return ranking[:limit]
+
+    def get_storage_snapshot(self) -> dict:
+        top = self.get_leaderboard(1)
+        with self.lock:
+            return {
+                'total_users': len(self.user_server_counts),
+                'total_servers': self.total_stored_servers,
+                'top_user_servers': top[0][1] if top else 0
+            }
+
+    # ---- verificaciones ----
+
+    def rebuild_verifications(self, verified_users: dict):
+        with self.lock:
+            self.verification_days = {}
+            self.verifications_by_day = Counter()
+            for discord_id, user_data in verified_users.items():
+                self.record_verification(discord_id, user_data.get('verified_at'))
+
+    def record_verification(self, discord_id: str, verified_at: Optional[float]):
+        """Registrar (o reemplazar) la verificación de un usuario en el histograma diario"""
+        discord_id = str(discord_id)
+        with self.lock:
+            self._forget_verification(discord_id)
+            if verified_at:
+                day = datetime.fromtimestamp(verified_at).strftime('%Y-%m-%d')
+                self.verification_days[discord_id] = day
+                self.verifications_by_day[day] += 1
+
+    def remove_verification(self, discord_id: str):
+        with self.lock:
+            self._forget_verification(str(discord_id))
+
+    def _forget_verification(self, discord_id: str):
+        day = self.verification_days.pop(discord_id, None)
+        if day:
+            self.verifications_by_day[day] -= 1
+            if self.verifications_by_day[day] <= 0:
+                del self.verifications_by_day[day]
+
+    def get_daily_verifications(self, days: int = 7) -> Dict[str, int]:
+        """Verificaciones de los últimos `days` días naturales, del más reciente al más antiguo"""
+        today = datetime.now()
+        with self.lock:
+            return {
+                date_key: self.verifications_by_day.get(date_key, 0)
+                for date_key in ((today - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days))
+            }
+
+    # ---- monedas y tienda ----
+
+    def _file_aggregate(self, path: str, compute) -> dict:
+        """Agregado de un archivo JSON, recalculado solo cuando cambian su tamaño o fecha de modificación"""
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return compute({})
+
+        with self.lock:
+            cached = self.file_aggregates.get(path)
+            if cached and cached[0] == signature:
+                return cached[1]
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo leer {path} para estadísticas: {e}")
+            data = {}
+
+        aggregate = compute(data)
+        with self.lock:
+            self.file_aggregates[path] = (signature, aggregate)
+        return aggregate
+
+    @staticmethod
+    def _compute_coins(data: dict) -> dict:
+        user_coins = data.get('user_coins', {})
+        balances = []
+        total_transactions = 0
+        transactions_by_day = Counter()
+        for user_id, user_data in user_coins.items():
+            transactions = user_data.get('transactions', [])
+            total_transactions += len(transactions)
+            for transaction in transactions:
+                timestamp = transaction.get('timestamp') if isinstance(transaction, dict) else None
+                if isinstance(timestamp, str) and len(timestamp) >= 10:
+                    transactions_by_day[timestamp[:10]] += 1
+            balances.append({
+                'user_id': user_id,
+                'balance': user_data.get('balance', 0),
+                'total_earned': user_data.get('total_earned', 0)
+            })
+        total_coins = sum(entry['balance'] for entry in balances)
+        balances.sort(key=lambda entry: entry['balance'], reverse=True)
+        return {
+            'total_users_with_coins': len(user_coins),
+            'total_coins_in_circulation': total_coins,
+            'total_transactions': total_transactions,
+            'average_balance': total_coins / len(balances) if balances else 0,
+            'top_balances': balances[:10],
+            'transactions_by_day': dict(transactions_by_day)
+        }
+
+    @staticmethod
+    def _compute_shop(data: dict) -> dict:
+        shop_items = data.get('shop_items', {})
+        stats = {
+            'total_categories': len(shop_items),
+            'total_items': 0,
+            'items_in_stock': 0,
+            'total_stock_units': 0
+        }
+        for items in shop_items.values():
+            stats['total_items'] += len(items)
+            for item_data in items.values():
+                stock = item_data.get('stock', 0)
+                stats['total_stock_units'] += stock
+                if stock > 0:
+                    stats['items_in_stock'] += 1
+        return stats
+
+    def get_coins_snapshot(self) -> dict:
+        return dict(self._file_aggregate(self.coins_file, self._compute_coins))
+
+    def get_shop_snapshot(self) -> dict:
+        return dict(self._file_aggregate(self.shop_file, self._compute_shop))
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                'links_initialized': self.links_initialized,
+                'storage_initialized': self.storage_initialized,
+                'tracked_link_users': len(self.user_links),
+                'tracked_storage_users': len(self.user_server_counts),
+                'tracked_verifications': len(self.verification_days),
+                'cached_files': list(self.file_aggregates)
+            }
+
+# Agregador global de estadísticas
+stats_aggregator = StatsAggregator()
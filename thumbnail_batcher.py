@@ -0,0 +1,140 @@
+"""
+Resolución de thumbnails por lotes para RbxServers
+Junta las peticiones concurrentes en llamadas multi-ID a thumbnails.roblox.com y cachea las URLs del CDN
+"""
+
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from roblox_client import roblox_client, TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Tipo de thumbnail -> (endpoint, parámetro multi-ID, parámetros extra)
+THUMBNAIL_ENDPOINTS = {
+    'user_headshot': ("/v1/users/avatar-headshot", "userIds", {}),
+    'user_avatar': ("/v1/users/avatar", "userIds", {}),
+    'badge': ("/v1/badges/icons", "badgeIds", {}),
+    'game_icon': ("/v1/games/icons", "universeIds", {"returnPolicy": "PlaceHolder"}),
+    'asset': ("/v1/assets", "assetIds", {}),
+    'group': ("/v1/groups/icons", "groupIds", {}),
+    'bundle': ("/v1/bundles/thumbnails", "bundleIds", {})
+}
+
+class ThumbnailBatcher:
+    """Agrupa IDs pedidos dentro de una ventana corta en una sola llamada por (tipo, tamaño)"""
+
+    def __init__(self, window_seconds: float = 0.05, max_batch_size: int = 100, cache_ttl: int = 600):
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size        # Límite de IDs por llamada de la API
+        self.cache = TTLCache(cache_ttl, 20000)      # (tipo, tamaño, id) -> URL del CDN
+        # (tipo, tamaño) -> {id: [futures esperando]}
+        self.pending: Dict[Tuple[str, str], Dict[str, List[asyncio.Future]]] = {}
+        self.flush_handles: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        self.stats = {'requested': 0, 'cache_hits': 0, 'batches': 0, 'ids_fetched': 0}
+
+    async def get(self, kind: str, target_id, size: str = "420x420",
+                  fallback_size: Optional[str] = None) -> Optional[str]:
+        """URL del thumbnail de un objeto (prueba `fallback_size` si el tamaño pedido no está disponible)"""
+        url = (await self.get_many(kind, [target_id], size)).get(str(target_id))
+        if not url and fallback_size:
+            url = (await self.get_many(kind, [target_id], fallback_size)).get(str(target_id))
+        return url
+
+    async def get_many(self, kind: str, target_ids: Iterable, size: str = "420x420") -> Dict[str, str]:
+        """URLs de varios objetos del mismo tipo: {id: url} (los que no tienen imagen se omiten)"""
+        if kind not in THUMBNAIL_ENDPOINTS:
+            raise ValueError(f"Tipo de thumbnail desconocido: {kind}")
+
+        loop = asyncio.get_running_loop()
+        batch_key = (kind, size)
+        results: Dict[str, str] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+
+        for target_id in dict.fromkeys(str(tid) for tid in target_ids):
+            self.stats['requested'] += 1
+            cached = self.cache.get(f"{kind}:{size}:{target_id}")
+            if cached:
+                self.stats['cache_hits'] += 1
+                results[target_id] = cached
+                continue
+
+            future = loop.create_future()
+            self.pending.setdefault(batch_key, {}).setdefault(target_id, []).append(future)
+            waiting[target_id] = future
+
+        if waiting:
+            batch = self.pending[batch_key]
+            if len(batch) >= self.max_batch_size:
+                self._schedule_flush(batch_key, delay=0)
+            else:
+                self._schedule_flush(batch_key, delay=self.window_seconds)
+
+            for target_id, future in waiting.items():
+                url = await future
+                if url:
+                    results[target_id] = url
+
+        return results
+
+    def _schedule_flush(self, batch_key: Tuple[str, str], delay: float):
+        handle = self.flush_handles.get(batch_key)
+        if handle is not None:
+            if delay > 0:
+                return  # Ya hay un flush programado para esta ventana
+            handle.cancel()
+        loop = asyncio.get_running_loop()
+        self.flush_handles[batch_key] = loop.call_later(
+            delay, lambda: loop.create_task(self._flush(batch_key))
+        )
+
+    async def _flush(self, batch_key: Tuple[str, str]):
+        self.flush_handles.pop(batch_key, None)
+        batch = self.pending.pop(batch_key, {})
+        if not batch:
+            return
+
+        kind, size = batch_key
+        path, id_param, extra_params = THUMBNAIL_ENDPOINTS[kind]
+        target_ids = list(batch)
+        resolved: Dict[str, str] = {}
+
+        try:
+            for start in range(0, len(target_ids), self.max_batch_size):
+                chunk = target_ids[start:start + self.max_batch_size]
+                params = {
+                    id_param: ",".join(chunk),
+                    "size": size,
+                    "format": "Png",
+                    "isCircular": "false",
+                    **extra_params
+                }
+                self.stats['batches'] += 1
+                self.stats['ids_fetched'] += len(chunk)
+                data = await roblox_client.get_json(f"https://thumbnails.roblox.com{path}", params=params)
+
+                for item in (data or {}).get("data", []):
+                    image_url = item.get("imageUrl")
+                    target_id = str(item.get("targetId"))
+                    if image_url and item.get("state") in (None, "Completed"):
+                        resolved[target_id] = image_url
+                        self.cache.set(f"{kind}:{size}:{target_id}", image_url)
+        except Exception as e:
+            logger.error(f"❌ Error resolviendo thumbnails {kind} ({len(target_ids)} IDs): {e}")
+        finally:
+            # Repartir el resultado a todos los que esperaban (None si no hubo imagen)
+            for target_id, futures in batch.items():
+                for future in futures:
+                    if not future.done():
+                        future.set_result(resolved.get(target_id))
+
+    def get_stats(self) -> dict:
+        return {
+            'pending_batches': len(self.pending),
+            'cached_urls': len(self.cache.entries),
+            **self.stats
+        }
+
+# Servicio global de thumbnails
+thumbnail_batcher = ThumbnailBatcher()
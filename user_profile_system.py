@@ -5,7 +5,9 @@ import asyncio
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
+import os
 import time
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -779,7 +781,12 @@ class ProfileView(discord.ui.View):
 class UserProfileSystem:
     def __init__(self):
         self.profiles_file = "user_profiles.json"
+        self.coins_file = "user_coins.json"
         self.user_profiles = {}
+        self.cache_lock = threading.RLock()
+        self.servers_cache = {}            # user_id -> sección 'servers' ya agrupada por juego
+        self.coins_cache = ((), {})        # (firma de user_coins.json, {user_id: resumen de monedas})
+        self.cache_stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'coins_reloads': 0}
         self.load_profiles_data()
 
     def load_profiles_data(self):
@@ -844,6 +851,19 @@ class UserProfileSystem:
         # Guardar cambios
         self.save_profiles_data()
 
+    def update_server_counts(self, counts: dict):
+        """Actualizar total_servers de varios usuarios con un solo guardado
+        (solo perfiles ya existentes: collect_user_data ya no los crea al consultarlos)"""
+        updated = 0
+        for user_id, total_servers in counts.items():
+            profile = self.user_profiles.get(str(user_id))
+            if profile is not None and profile.get('total_servers') != total_servers:
+                profile['total_servers'] = total_servers
+                updated += 1
+
+        if updated:
+            self.save_profiles_data()
+
     def get_user_profile(self, user_id: str) -> dict:
         """Obtener perfil completo de usuario"""
         user_id = str(user_id)
@@ -855,29 +875,17 @@ class UserProfileSystem:
         return self.user_profiles.get(user_id, {})
 
     
+    def invalidate_user(self, user_id: str):
+        """Descartar la sección de servidores cacheada de un usuario (la llama server_storage al cambiar)"""
+        with self.cache_lock:
+            if self.servers_cache.pop(str(user_id), None) is not None:
+                self.cache_stats['invalidations'] += 1
+
     def collect_user_data(self, user_id: str, user_obj=None) -> dict:
-        """Recopilar todos los datos de un usuario desde diferentes sistemas (sin límite de servidores)"""
+        """Recopilar los datos de un usuario desde diferentes sistemas (sin límite de servidores)
+        Reutiliza las secciones cacheadas y no escribe nada a disco"""
+        user_id = str(user_id)
         try:
-            # Cargar datos de monedas desde user_coins.json
-            coins_data = self.load_user_coins_data(user_id)
-
-            # Cargar datos de servidores desde user_game_servers.json (sin límite)
-            servers_data = self.load_user_servers_data(user_id)
-
-            # Obtener datos de verificación desde el sistema global
-            verification_data = self.get_verification_data(user_id)
-
-            # Calcular estadísticas adicionales de servidores
-            total_servers = servers_data['total_servers']
-            daily_avg = 0
-            last_server_added = time.time()
-            
-            # Estimar progreso basado en cantidad de servidores
-            if total_servers > 0:
-                # Estimar que el usuario ha estado activo por algunos días
-                estimated_days = max(1, total_servers // 5)  # Aproximadamente 5 servidores por día activo
-                daily_avg = total_servers / estimated_days
-
             # Datos básicos
             data = {
                 'user_id': user_id,
@@ -886,57 +894,18 @@ class UserProfileSystem:
                 'avatar_url': str(user_obj.avatar.url) if user_obj and user_obj.avatar else None,
                 'created_at': user_obj.created_at.isoformat() if user_obj else None,
                 'joined_at': None,  # Se llenará si está en un servidor
-
-                # Verificación (desde sistema global)
-                'is_verified': verification_data['is_verified'],
-                'verification_date': verification_data.get('verified_at'),
-                'roblox_username': verification_data.get('roblox_username'),
-                'roblox_id': verification_data.get('roblox_id'),
-
-                # Servidores de juegos (desde user_game_servers.json - SIN LÍMITE)
-                'servers_data': servers_data,  # Todos los datos de servidores
-                'user_servers': servers_data['servers'],  # Lista completa de servidores
-                'game_servers': servers_data['games'],  # Datos organizados por juego
-                'total_servers': total_servers,  # Cantidad real sin límite
-                'total_games': servers_data['total_games'],
-                'main_game': servers_data.get('main_game'),
-                'servers_by_game': servers_data.get('servers_by_game', {}),
-
-                # Estadísticas adicionales de servidores
-                'daily_server_average': daily_avg,
-                'last_server_added': last_server_added,
-                'total_scraping_attempts': max(total_servers, 1),  # Estimación
-
-                # Monedas (desde user_coins.json)
-                'coins': coins_data,
-                'coins_balance': coins_data.get('balance', 0),
-
-                # Actividad y seguridad
-                'warnings': verification_data.get('warnings', 0),
-                'is_banned': verification_data.get('is_banned', False),
-                'ban_info': verification_data.get('ban_info', {}),
-                'is_trusted': not verification_data.get('is_banned', False),
-                'risk_level': 'bajo' if not verification_data.get('is_banned', False) else 'alto',
-
-                # Estadísticas de actividad
-                'total_commands': total_servers,  # Usar servidores como proxy de actividad
-                'active_days': max(1, total_servers // 5),  # Estimación
-                'first_seen': verification_data.get('verified_at', time.time()),
                 'last_activity': time.time(),
 
                 # Logros y estadísticas
                 'achievements': [],
-                'redeemed_codes': [],
-                'total_commands_used': total_servers,
-                'first_command_date': verification_data.get('verified_at'),
-                'verified_at': verification_data.get('verified_at')
+                'redeemed_codes': []
             }
 
-            # Guardar en perfiles
-            self.user_profiles[user_id] = data
-            self.save_profiles_data()
+            data.update(self.get_servers_section(user_id))
+            data.update(self.get_coins_section(user_id))
+            data.update(self.get_verification_section(user_id))
 
-            logger.info(f"📊 Datos recopilados para usuario {user_id}: verificado={data['is_verified']}, juegos={data['total_games']}, servidores={data['total_servers']:,} (sin límite)")
+            logger.debug(f"📊 Perfil de {user_id} armado")
             return data
 
         except Exception as e:
@@ -950,6 +919,92 @@ class UserProfileSystem:
                 'coins_balance': 0
             }
 
+    def get_servers_section(self, user_id: str) -> dict:
+        """Sección de servidores agrupada por juego; se recalcula solo si los servidores del usuario cambiaron"""
+        with self.cache_lock:
+            cached = self.servers_cache.get(user_id)
+            if cached is not None:
+                self.cache_stats['hits'] += 1
+                return cached
+            self.cache_stats['misses'] += 1
+
+        # Cargar datos de servidores desde el almacén (sin límite)
+        servers_data = self.load_user_servers_data(user_id)
+
+        # Calcular estadísticas adicionales de servidores
+        total_servers = servers_data['total_servers']
+        daily_avg = 0
+
+        # Estimar progreso basado en cantidad de servidores
+        if total_servers > 0:
+            # Estimar que el usuario ha estado activo por algunos días
+            estimated_days = max(1, total_servers // 5)  # Aproximadamente 5 servidores por día activo
+            daily_avg = total_servers / estimated_days
+
+        section = {
+            # Servidores de juegos (SIN LÍMITE)
+            'servers_data': servers_data,  # Todos los datos de servidores
+            'user_servers': servers_data['servers'],  # Lista completa de servidores
+            'game_servers': servers_data['games'],  # Datos organizados por juego
+            'total_servers': total_servers,  # Cantidad real sin límite
+            'total_games': servers_data['total_games'],
+            'main_game': servers_data.get('main_game'),
+            'servers_by_game': servers_data.get('servers_by_game', {}),
+
+            # Estadísticas adicionales de servidores
+            'daily_server_average': daily_avg,
+            'last_server_added': time.time(),
+            'total_scraping_attempts': max(total_servers, 1),  # Estimación
+
+            # Estadísticas de actividad
+            'total_commands': total_servers,  # Usar servidores como proxy de actividad
+            'active_days': max(1, total_servers // 5),  # Estimación
+            'total_commands_used': total_servers
+        }
+
+        with self.cache_lock:
+            self.servers_cache[user_id] = section
+        return section
+
+    def get_coins_section(self, user_id: str) -> dict:
+        """Sección de monedas (desde user_coins.json, parseado una vez por cada cambio del archivo)"""
+        coins_data = self.load_user_coins_data(user_id)
+        return {
+            'coins': coins_data,
+            'coins_balance': coins_data.get('balance', 0)
+        }
+
+    def get_verification_section(self, user_id: str) -> dict:
+        """Sección de verificación y seguridad (lectura directa del sistema en memoria)"""
+        verification_data = self.get_verification_data(user_id)
+        is_banned = verification_data.get('is_banned', False)
+        return {
+            # Verificación (desde sistema global)
+            'is_verified': verification_data['is_verified'],
+            'verification_date': verification_data.get('verified_at'),
+            'roblox_username': verification_data.get('roblox_username'),
+            'roblox_id': verification_data.get('roblox_id'),
+
+            # Actividad y seguridad
+            'warnings': verification_data.get('warnings', 0),
+            'is_banned': is_banned,
+            'ban_info': verification_data.get('ban_info', {}),
+            'is_trusted': not is_banned,
+            'risk_level': 'bajo' if not is_banned else 'alto',
+
+            'first_seen': verification_data.get('verified_at', time.time()),
+            'first_command_date': verification_data.get('verified_at'),
+            'verified_at': verification_data.get('verified_at')
+        }
+
+    def get_cache_stats(self) -> dict:
+        with self.cache_lock:
+            return {
+                'cached_server_sections': len(self.servers_cache),
+                'cached_coin_users': len(self.coins_cache[1]),
+                **self.cache_stats
+            }
+
     def get_verification_data(self, user_id: str) -> dict:
         """Obtener datos de verificación desde el sistema global"""
         try:
@@ -982,100 +1037,108 @@ class UserProfileSystem:
                 'ban_info': {}
             }
 
-    def load_user_coins_data(self, user_id: str) -> dict:
-        """Cargar datos de monedas desde user_coins.json"""
+    def _coins_summaries(self) -> dict:
+        """Resúmenes de monedas por usuario; user_coins.json se vuelve a parsear solo si cambió (mtime/tamaño)"""
         try:
-            import json
-            from pathlib import Path
+            stat = os.stat(self.coins_file)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return {}
 
-            coins_file = Path("user_coins.json")
-            if coins_file.exists():
-                with open(coins_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    user_coins = data.get('user_coins', {}).get(user_id, {})
+        with self.cache_lock:
+            cached_signature, summaries = self.coins_cache
+            if cached_signature == signature:
+                return summaries
+
+        with open(self.coins_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        summaries = {}
+        for coins_user_id, user_coins in data.get('user_coins', {}).items():
+            transactions = user_coins.get('transactions', [])
+            summaries[coins_user_id] = {
+                'balance': user_coins.get('balance', 0),
+                'total_earned': user_coins.get('total_earned', 0),
+                'total_transactions': len(transactions),
+                'last_activity': transactions[-1].get('timestamp') if transactions else None
+            }
 
-                    transactions = user_coins.get('transactions', [])
-                    return {
-                        'balance': user_coins.get('balance', 0),
-                        'total_earned': user_coins.get('total_earned', 0),
-                        'total_transactions': len(transactions),
-                        'last_activity': transactions[-1]['timestamp'] if transactions else None
-                    }
+        with self.cache_lock:
+            self.coins_cache = (signature, summaries)
+            self.cache_stats['coins_reloads'] += 1
+        return summaries
 
-            return {
-                'balance': 0,
-                'total_earned': 0,
-                'total_transactions': 0,
-                'last_activity': None
-            }
+    def load_user_coins_data(self, user_id: str) -> dict:
+        """Cargar datos de monedas desde user_coins.json"""
+        empty = {
+            'balance': 0,
+            'total_earned': 0,
+            'total_transactions': 0,
+            'last_activity': None
+        }
+        try:
+            return dict(self._coins_summaries().get(str(user_id), empty))
         except Exception as e:
             logger.error(f"❌ Error cargando datos de monedas para {user_id}: {e}")
-            return {
-                'balance': 0,
-                'total_earned': 0,
-                'total_transactions': 0,
-                'last_activity': None
-            }
+            return empty
 
     def load_user_servers_data(self, user_id: str) -> dict:
-        """Cargar datos de servidores desde user_game_servers.json sin límite de servidores"""
+        """Cargar datos de servidores desde el almacén de servidores sin límite de servidores"""
         try:
             import json
             from pathlib import Path
+            from server_storage import server_storage
 
-            # Cargar desde el archivo simplificado user_game_servers.json
-            servers_file = Path("user_game_servers.json")
-            if servers_file.exists():
-                with open(servers_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    user_servers = data.get('user_servers', {}).get(user_id, [])
-                    
-                    # Detectar juegos únicos desde los enlaces (sin límite)
-                    game_ids_found = set()
-                    games_data = {}
-                    
-                    for server_link in user_servers:
-                        # Extraer game ID desde el enlace
-                        try:
-                            if "/games/" in server_link:
-                                game_id = server_link.split("/games/")[1].split("?")[0]
-                                game_ids_found.add(game_id)
-                                
-                                if game_id not in games_data:
-                                    games_data[game_id] = {
-                                        'server_links': [],
-                                        'game_name': self.get_game_name_from_id(game_id),
-                                        'category': 'rpg' if game_id == "2753915549" else 'other'
-                                    }
-                                
-                                games_data[game_id]['server_links'].append(server_link)
-                        except Exception:
-                            # Si no se puede extraer el game ID, agrupar en un juego por defecto
-                            default_game = "unknown"
-                            if default_game not in games_data:
-                                games_data[default_game] = {
+            # Cargar desde el almacén (estructura simplificada de user_game_servers.json)
+            user_servers = server_storage.get_user_servers(user_id)
+            if user_servers:
+                
+                # Detectar juegos únicos desde los enlaces (sin límite)
+                game_ids_found = set()
+                games_data = {}
+                
+                for server_link in user_servers:
+                    # Extraer game ID desde el enlace
+                    try:
+                        if "/games/" in server_link:
+                            game_id = server_link.split("/games/")[1].split("?")[0]
+                            game_ids_found.add(game_id)
+                            
+                            if game_id not in games_data:
+                                games_data[game_id] = {
                                     'server_links': [],
-                                    'game_name': 'Juegos Varios',
-                                    'category': 'other'
+                                    'game_name': self.get_game_name_from_id(game_id),
+                                    'category': 'rpg' if game_id == "2753915549" else 'other'
                                 }
-                            games_data[default_game]['server_links'].append(server_link)
-                    
-                    # Detectar juego principal (el que más servidores tenga)
-                    main_game = None
-                    max_servers = 0
-                    for game_id, game_data in games_data.items():
-                        if len(game_data['server_links']) > max_servers:
-                            max_servers = len(game_data['server_links'])
-                            main_game = game_id
-                    
-                    return {
-                        'servers': user_servers,  # Lista completa sin límite
-                        'total_servers': len(user_servers),  # Cantidad real sin límite
-                        'games': games_data,  # Datos organizados por juego
-                        'total_games': len(games_data),  # Cantidad de juegos únicos
-                        'main_game': main_game,  # Juego principal
-                        'servers_by_game': {game_id: len(game_data['server_links']) for game_id, game_data in games_data.items()}
-                    }
+                            
+                            games_data[game_id]['server_links'].append(server_link)
+                    except Exception:
+                        # Si no se puede extraer el game ID, agrupar en un juego por defecto
+                        default_game = "unknown"
+                        if default_game not in games_data:
+                            games_data[default_game] = {
+                                'server_links': [],
+                                'game_name': 'Juegos Varios',
+                                'category': 'other'
+                            }
+                        games_data[default_game]['server_links'].append(server_link)
+                
+                # Detectar juego principal (el que más servidores tenga)
+                main_game = None
+                max_servers = 0
+                for game_id, game_data in games_data.items():
+                    if len(game_data['server_links']) > max_servers:
+                        max_servers = len(game_data['server_links'])
+                        main_game = game_id
+                
+                return {
+                    'servers': user_servers,  # Lista completa sin límite
+                    'total_servers': len(user_servers),  # Cantidad real sin límite
+                    'games': games_data,  # Datos organizados por juego
+                    'total_games': len(games_data),  # Cantidad de juegos únicos
+                    'main_game': main_game,  # Juego principal
+                    'servers_by_game': {game_id: len(game_data['server_links']) for game_id, game_data in games_data.items()}
+                }
 
             # Fallback: intentar cargar desde users_servers.json (estructura antigua)
             fallback_file = Path("users_servers.json")
@@ -1121,60 +1184,18 @@ class UserProfileSystem:
             }
     
     def get_game_name_from_id(self, game_id: str) -> str:
-        """Obtener nombre del juego desde su ID"""
-        game_names = {
-            "2753915549": "🌊 Blox Fruits",
-            "6284583030": "🎃 Pet Simulator X",
-            "185655149": "🏡 Welcome to Bloxburg",
-            "920587237": "🏠 Adopt Me!",
-            "4924922222": "🏘️ Brookhaven RP",
-            "735030788": "👑 Royale High",
-            "606849621": "🚓 Jailbreak",
-            "4616652839": "⚔️ Shindo Life",
-            "142823291": "🔍 Murder Mystery 2",
-            "4646477729": "⭐ All Star Tower Defense"
-        }
-        return game_names.get(game_id, f"🎮 Game {game_id}")
+        """Obtener nombre del juego desde su ID (caché de metadatos, sin red)"""
+        from game_metadata import game_metadata
+        return game_metadata.get_name(game_id, default=f"🎮 Game {game_id}")
 
     def save_user_servers_simple(self, user_id: str, servers: list):
         """Guardar servidores de usuario en la estructura simplificada"""
         try:
-            import json
-            from pathlib import Path
-            from datetime import datetime
-
-            servers_file = Path("user_game_servers.json")
-            
-            # Cargar datos existentes
-            if servers_file.exists():
-                with open(servers_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            else:
-                data = {
-                    "user_servers": {},
-                    "metadata": {
-                        "created_at": datetime.now().isoformat(),
-                        "last_updated": datetime.now().isoformat(),
-                        "total_users": 0,
-                        "total_servers": 0,
-                        "description": "Estructura simplificada: user_id -> array de hasta 5 servidores"
-                    }
-                }
+            from server_storage import server_storage
 
             # Limitar a máximo 5 servidores
-            servers = servers[:5] if servers else []
-            
-            # Actualizar datos del usuario
-            data['user_servers'][user_id] = servers
-            
-            # Actualizar metadata
-            data['metadata']['last_updated'] = datetime.now().isoformat()
-            data['metadata']['total_users'] = len(data['user_servers'])
-            data['metadata']['total_servers'] = sum(len(user_servers) for user_servers in data['user_servers'].values())
-
-            # Guardar archivo
-            with open(servers_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            servers = server_storage.set_user_servers(user_id, servers, limit=5)
+            server_storage.export_legacy_json()
 
             logger.info(f"✅ Servidores guardados para usuario {user_id}: {len(servers)} servidores")
             return True
@@ -1206,16 +1227,8 @@ class UserProfileSystem:
     def get_all_user_servers(self):
         """Obtener todos los servidores de todos los usuarios desde la estructura simplificada"""
         try:
-            import json
-            from pathlib import Path
-
-            servers_file = Path("user_game_servers.json")
-            if servers_file.exists():
-                with open(servers_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('user_servers', {})
-            
-            return {}
+            from server_storage import server_storage
+            return server_storage.get_all_user_servers()
 
         except Exception as e:
             logger.error(f"❌ Error obteniendo todos los servidores: {e}")